@@ -19,6 +19,15 @@ functionality from here and reexpose it in a more focused way.
 # annotations - since those aren't evaluated at runtime, it is cleaner
 # looking to use top level names directly.
 
+# To keep startup quick, names from our submodules are imported only
+# when first accessed. To expose a new one, import it in the
+# lazy-import block below, add it to __all__, and run 'make update' to
+# regenerate the lookup table.
+
+import os
+import importlib
+from typing import TYPE_CHECKING
+
 import _babase
 from _babase import (
     add_clean_frame_callback,
@@ -126,90 +135,213 @@ from _babase import (
     workspaces_in_use,
 )
 
-from babase._accountv2 import AccountV2Handle, AccountV2Subsystem
-from babase._analytics import AnalyticsSubsystem
-from babase._app import App, AppState
-from babase._appcomponent import AppComponentSubsystem
-from babase._appconfig import commit_app_config
-from babase._appintent import AppIntent, AppIntentDefault, AppIntentExec
-from babase._appmode import AppMode
-from babase._appsubsystem import AppSubsystem
-from babase._appmodeselector import AppModeSelector
-from babase._appconfig import AppConfig
-from babase._apputils import (
-    AppHealthSubsystem,
-    get_remote_app_name,
-    handle_leftover_v1_cloud_log_file,
-    is_browser_likely_available,
-    utc_now_cloud,
-)
-from babase._cloud import CloudSubscription
-from babase._devconsole import (
-    DevConsoleButtonDef,
-    DevConsoleSubsystem,
-    DevConsoleTab,
-    DevConsoleTabEntry,
-)
-from babase._emptyappmode import EmptyAppMode
-from babase._error import (
-    ActivityNotFoundError,
-    ActorNotFoundError,
-    ContextError,
-    DelegateNotFoundError,
-    InputDeviceNotFoundError,
-    MapNotFoundError,
-    NodeNotFoundError,
-    NotFoundError,
-    PlayerNotFoundError,
-    SessionNotFoundError,
-    SessionPlayerNotFoundError,
-    SessionTeamNotFoundError,
-    TeamNotFoundError,
-    WidgetNotFoundError,
-)
-from babase._gc import GarbageCollectionSubsystem
-from babase._general import (
-    AppTime,
-    Call,
-    CallPartial,
-    CallStrict,
-    DisplayTime,
-    Existable,
-    WeakCall,
-    WeakCallPartial,
-    WeakCallStrict,
-    existing,
-    get_type_name,
-    getclass,
-    storagename,
-    verify_object_death,
-)
-from babase._language import LanguageSubsystem, Lstr
-from babase._locale import LocaleSubsystem
-from babase._logging import (
-    accountlog,
-    applog,
-    balog,
-    lifecyclelog,
-    netlog,
-    uilog,
-)
-from babase._login import LoginAdapter, LoginInfo, discord_sign_in
-from babase._mgen.enums import (
-    InputType,
-    Permission,
-    QuitType,
-    SpecialChar,
-    UIScale,
-)
-from babase._math import normalized_color, is_point_in_box, vec3validate
-from babase._meta import MetadataSubsystem
-from babase._env import DEFAULT_REQUEST_TIMEOUT_SECONDS
-from babase._net import get_ip_address_type, NetworkSubsystem
-from babase._plugin import PluginSpec, Plugin, PluginSubsystem
-from babase._stringedit import StringEditAdapter, StringEditSubsystem
-from babase._text import timestring
-from babase._workspace import WorkspaceSubsystem
+# Set BA_EAGER_IMPORTS=1 to import everything up front instead (handy
+# for tracking down import problems or comparing startup times).
+_LAZY_IMPORTS = os.environ.get('BA_EAGER_IMPORTS') != '1'
+
+if TYPE_CHECKING or not _LAZY_IMPORTS:
+    from babase._accountv2 import AccountV2Handle, AccountV2Subsystem
+    from babase._analytics import AnalyticsSubsystem
+    from babase._app import AppState
+    from babase._appcomponent import AppComponentSubsystem
+    from babase._appconfig import commit_app_config
+    from babase._appintent import AppIntent, AppIntentDefault, AppIntentExec
+    from babase._appmode import AppMode
+    from babase._appsubsystem import AppSubsystem
+    from babase._appmodeselector import AppModeSelector
+    from babase._appconfig import AppConfig
+    from babase._apputils import (
+        AppHealthSubsystem,
+        get_remote_app_name,
+        handle_leftover_v1_cloud_log_file,
+        is_browser_likely_available,
+        utc_now_cloud,
+    )
+    from babase._cloud import CloudSubscription
+    from babase._devconsole import (
+        DevConsoleButtonDef,
+        DevConsoleSubsystem,
+        DevConsoleTab,
+        DevConsoleTabEntry,
+    )
+    from babase._emptyappmode import EmptyAppMode
+    from babase._error import (
+        ActivityNotFoundError,
+        ActorNotFoundError,
+        ContextError,
+        DelegateNotFoundError,
+        InputDeviceNotFoundError,
+        MapNotFoundError,
+        NodeNotFoundError,
+        NotFoundError,
+        PlayerNotFoundError,
+        SessionNotFoundError,
+        SessionPlayerNotFoundError,
+        SessionTeamNotFoundError,
+        TeamNotFoundError,
+        WidgetNotFoundError,
+    )
+    from babase._gc import GarbageCollectionSubsystem, GCPassHistogram
+    from babase._general import (
+        AppTime,
+        Call,
+        CallPartial,
+        CallStrict,
+        DisplayTime,
+        Existable,
+        WeakCall,
+        WeakCallPartial,
+        WeakCallStrict,
+        existing,
+        get_type_name,
+        getclass,
+        storagename,
+        verify_object_death,
+    )
+    from babase._language import LanguageSubsystem, Lstr, LstrCache
+    from babase._locale import LocaleSubsystem
+    from babase._logging import (
+        accountlog,
+        applog,
+        balog,
+        lifecyclelog,
+        netlog,
+        uilog,
+    )
+    from babase._login import LoginAdapter, LoginInfo, discord_sign_in
+    from babase._mgen.enums import (
+        InputType,
+        Permission,
+        QuitType,
+        SpecialChar,
+        UIScale,
+    )
+    from babase._math import normalized_color, is_point_in_box, vec3validate
+    from babase._meta import MetadataSubsystem
+    from babase._env import DEFAULT_REQUEST_TIMEOUT_SECONDS
+    from babase._net import get_ip_address_type, NetworkSubsystem
+    from babase._plugin import PluginSpec, Plugin, PluginSubsystem
+    from babase._stringedit import StringEditAdapter, StringEditSubsystem
+    from babase._text import timestring
+    from babase._workspace import WorkspaceSubsystem
+
+# __LAZY_IMPORTS_BEGIN__
+# This section generated by batools.lazyimports; do not edit.
+
+# Names we provide but only import from their modules when
+# first accessed (see lazy-import block above).
+_LAZY_ATTRS: dict[str, str] = {
+    'AccountV2Handle': 'babase._accountv2',
+    'AccountV2Subsystem': 'babase._accountv2',
+    'ActivityNotFoundError': 'babase._error',
+    'ActorNotFoundError': 'babase._error',
+    'AnalyticsSubsystem': 'babase._analytics',
+    'AppComponentSubsystem': 'babase._appcomponent',
+    'AppConfig': 'babase._appconfig',
+    'AppHealthSubsystem': 'babase._apputils',
+    'AppIntent': 'babase._appintent',
+    'AppIntentDefault': 'babase._appintent',
+    'AppIntentExec': 'babase._appintent',
+    'AppMode': 'babase._appmode',
+    'AppModeSelector': 'babase._appmodeselector',
+    'AppState': 'babase._app',
+    'AppSubsystem': 'babase._appsubsystem',
+    'AppTime': 'babase._general',
+    'Call': 'babase._general',
+    'CallPartial': 'babase._general',
+    'CallStrict': 'babase._general',
+    'CloudSubscription': 'babase._cloud',
+    'ContextError': 'babase._error',
+    'DEFAULT_REQUEST_TIMEOUT_SECONDS': 'babase._env',
+    'DelegateNotFoundError': 'babase._error',
+    'DevConsoleButtonDef': 'babase._devconsole',
+    'DevConsoleSubsystem': 'babase._devconsole',
+    'DevConsoleTab': 'babase._devconsole',
+    'DevConsoleTabEntry': 'babase._devconsole',
+    'DisplayTime': 'babase._general',
+    'EmptyAppMode': 'babase._emptyappmode',
+    'Existable': 'babase._general',
+    'GCPassHistogram': 'babase._gc',
+    'GarbageCollectionSubsystem': 'babase._gc',
+    'InputDeviceNotFoundError': 'babase._error',
+    'InputType': 'babase._mgen.enums',
+    'LanguageSubsystem': 'babase._language',
+    'LocaleSubsystem': 'babase._locale',
+    'LoginAdapter': 'babase._login',
+    'LoginInfo': 'babase._login',
+    'Lstr': 'babase._language',
+    'LstrCache': 'babase._language',
+    'MapNotFoundError': 'babase._error',
+    'MetadataSubsystem': 'babase._meta',
+    'NetworkSubsystem': 'babase._net',
+    'NodeNotFoundError': 'babase._error',
+    'NotFoundError': 'babase._error',
+    'Permission': 'babase._mgen.enums',
+    'PlayerNotFoundError': 'babase._error',
+    'Plugin': 'babase._plugin',
+    'PluginSpec': 'babase._plugin',
+    'PluginSubsystem': 'babase._plugin',
+    'QuitType': 'babase._mgen.enums',
+    'SessionNotFoundError': 'babase._error',
+    'SessionPlayerNotFoundError': 'babase._error',
+    'SessionTeamNotFoundError': 'babase._error',
+    'SpecialChar': 'babase._mgen.enums',
+    'StringEditAdapter': 'babase._stringedit',
+    'StringEditSubsystem': 'babase._stringedit',
+    'TeamNotFoundError': 'babase._error',
+    'UIScale': 'babase._mgen.enums',
+    'WeakCall': 'babase._general',
+    'WeakCallPartial': 'babase._general',
+    'WeakCallStrict': 'babase._general',
+    'WidgetNotFoundError': 'babase._error',
+    'WorkspaceSubsystem': 'babase._workspace',
+    'accountlog': 'babase._logging',
+    'applog': 'babase._logging',
+    'balog': 'babase._logging',
+    'commit_app_config': 'babase._appconfig',
+    'discord_sign_in': 'babase._login',
+    'existing': 'babase._general',
+    'get_ip_address_type': 'babase._net',
+    'get_remote_app_name': 'babase._apputils',
+    'get_type_name': 'babase._general',
+    'getclass': 'babase._general',
+    'handle_leftover_v1_cloud_log_file': 'babase._apputils',
+    'is_browser_likely_available': 'babase._apputils',
+    'is_point_in_box': 'babase._math',
+    'lifecyclelog': 'babase._logging',
+    'netlog': 'babase._logging',
+    'normalized_color': 'babase._math',
+    'storagename': 'babase._general',
+    'timestring': 'babase._text',
+    'uilog': 'babase._logging',
+    'utc_now_cloud': 'babase._apputils',
+    'vec3validate': 'babase._math',
+    'verify_object_death': 'babase._general',
+}
+
+if not TYPE_CHECKING:
+
+    def __getattr__(name: str) -> object:
+        modname = _LAZY_ATTRS.get(name)
+        if modname is None:
+            raise AttributeError(
+                f'module {__name__!r} has no attribute {name!r}'
+            )
+        value = getattr(importlib.import_module(modname), name)
+
+        # Store it so we don't come through here next time.
+        globals()[name] = value
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(globals()) | _LAZY_ATTRS.keys())
+
+
+# __LAZY_IMPORTS_END__
+
+# The app object itself is always needed, so we import it right away.
+# pylint: disable-next=wrong-import-position
+from babase._app import App
 
 _babase.app = app = App()
 
@@ -284,6 +416,7 @@ __all__ = [
     'fade_screen',
     'fatal_error',
     'GarbageCollectionSubsystem',
+    'GCPassHistogram',
     'get_display_resolution',
     'get_immediate_return_code',
     'get_input_idle_time',
@@ -323,6 +456,7 @@ __all__ = [
     'LoginAdapter',
     'LoginInfo',
     'Lstr',
+    'LstrCache',
     'mac_music_app_get_playlists',
     'mac_music_app_get_volume',
     'mac_music_app_init',
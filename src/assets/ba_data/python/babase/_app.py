@@ -31,7 +31,7 @@ from babase._stringedit import StringEditSubsystem
 from babase._devconsole import DevConsoleSubsystem
 from babase._analytics import AnalyticsSubsystem
 from babase._appconfig import AppConfig
-from babase._logging import lifecyclelog, balog, applog
+from babase._logging import lifecyclelog, balog, applog, perflog
 from babase._gc import GarbageCollectionSubsystem
 
 if TYPE_CHECKING:
@@ -185,7 +185,6 @@ class App:
         self._pending_apply_app_config = False
         self._asyncio_loop: asyncio.AbstractEventLoop | None = None
         self._asyncio_tasks: set[asyncio.Task] = set()
-        self._asyncio_timer: babase.AppTimer | None = None
         self._pending_intent: AppIntent | None = None
         self._intent: AppIntent | None = None
         self._mode_selector: babase.AppModeSelector | None = None
@@ -244,12 +243,11 @@ class App:
         work is done.
 
         Note that, at this time, the asyncio loop is encapsulated and
-        explicitly stepped by the engine's logic thread loop and thus
-        things like :meth:`asyncio.get_running_loop()` will
-        unintuitively *not* return this loop from most places in the
-        logic thread; only from within a task explicitly created in this
-        loop. Hopefully this situation will be improved in the future
-        with a unified event loop.
+        run in steps posted to the engine's logic thread event loop
+        whenever it has work ready, and thus things like
+        :meth:`asyncio.get_running_loop()` will unintuitively *not*
+        return this loop from most places in the logic thread; only from
+        within a task explicitly created in this loop.
         """
         assert self._asyncio_loop is not None
         return self._asyncio_loop
@@ -1085,6 +1083,14 @@ class App:
             # plugin hasn't already told it to do something.
             self.set_intent(AppIntentDefault())
 
+        # If we've been timing imports, report where startup went.
+        # pylint: disable=cyclic-import
+        import baenv
+
+        import_timer = baenv.get_env_config().import_timer
+        if import_timer is not None:
+            perflog.info(import_timer.get_report())
+
         lifecyclelog.info('on-running end')
 
     def _apply_app_config(self) -> None:
@@ -6,25 +6,43 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Annotated
 from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+import urllib.request
+import urllib.error
 import threading
-import logging
+import hashlib
 import weakref
 import time
 import os
-import sys
 
+from efro.error import CommunicationError, IntegrityError
 from efro.dataclassio import (
     ioprepped,
     IOAttrs,
     dataclass_from_json,
     dataclass_to_json,
 )
+from bacommon.bacloud import asset_file_cache_path
+
+from babase._logging import assetslog
 
 if TYPE_CHECKING:
-    from typing import Any
+    from typing import Callable, Sequence
+    import ssl
+
+    from bacommon.assets import AssetPackageFlavorManifest
+
+# How much we read/write/hash at a time.
+_CHUNK_SIZE = 256 * 1024
+
+# Socket timeout for downloads. Cancels are only noticed between reads,
+# so this also bounds how long a stalled download can hold up a stop.
+_DOWNLOAD_TIMEOUT = 10.0
 
-    from bacommon.assets import AssetPackageFlavor
+# How many times we try a file before giving up on it (continuing from
+# where we left off each time).
+_DOWNLOAD_ATTEMPTS = 3
 
 
 @ioprepped
@@ -32,57 +50,105 @@ if TYPE_CHECKING:
 class FileValue:
     """State for an individual file."""
 
+    #: Size of the file in bytes.
+    size: Annotated[int, IOAttrs('s')] = 0
+
+    #: When a gather last asked for the file (unix time).
+    last_use_time: Annotated[float, IOAttrs('t')] = 0.0
+
 
 @ioprepped
 @dataclass
 class State:
     """Holds all persistent state for the asset-manager."""
 
+    #: Verified files in our store, keyed by sha256 hex hash.
     files: Annotated[dict[str, FileValue], IOAttrs('files')] = field(
         default_factory=dict
     )
 
 
+class GatherCancelledError(Exception):
+    """An asset gather was cancelled."""
+
+
+class AssetRequestError(Exception):
+    """A server rejected a request for an asset file (such as a 404).
+
+    Unlike :class:`~efro.error.CommunicationError`, retrying will not
+    help with these.
+    """
+
+
 class AssetManager:
-    """Wrangles all assets."""
+    """Wrangles all assets.
+
+    Files are stored by content: each lives in our files dir at a path
+    derived from its sha256 hash (see
+    :func:`bacommon.bacloud.asset_file_cache_path`), so a file shared by
+    any number of packages is stored and downloaded only once. Servers
+    host files in that same layout under some base url.
+    """
+
+    #: Default limit on simultaneous downloads per gather.
+    DEFAULT_MAX_DOWNLOADS = 4
 
     _state: State
 
-    def __init__(self, rootdir: Path) -> None:
-        print('AssetManager()')
+    def __init__(
+        self,
+        rootdir: Path,
+        *,
+        sslcontext: ssl.SSLContext | None = None,
+        user_agent: str | None = None,
+    ) -> None:
         assert isinstance(rootdir, Path)
         self.thread_ident = threading.get_ident()
         self._rootdir = rootdir
+        self._sslcontext = sslcontext
+        self._user_agent = user_agent
         self._started = False
+        self._gathers: weakref.WeakSet[AssetGather] = weakref.WeakSet()
+
+        # Guards state and in-progress downloads; gathers hit these
+        # from their background threads.
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._state_dirty = False
+        self._downloads: dict[str, threading.Event] = {}
+
         if not self._rootdir.is_dir():
             raise RuntimeError(f'Provided rootdir does not exist: "{rootdir}"')
 
         self.load_state()
 
     def __del__(self) -> None:
-        print('~AssetManager()')
         if self._started:
-            logging.warning('AssetManager dying in a started state.')
+            assetslog.warning('AssetManager dying in a started state.')
 
     def launch_gather(
         self,
-        packages: list[str],
-        flavor: AssetPackageFlavor,
-        account_token: str,
+        manifests: Sequence[AssetPackageFlavorManifest],
+        base_url: str,
+        max_downloads: int = DEFAULT_MAX_DOWNLOADS,
     ) -> AssetGather:
-        """Spawn an asset-gather operation from this manager."""
-        print(
-            'would gather',
-            packages,
-            'and flavor',
-            flavor,
-            'with token',
-            account_token,
-        )
-        return AssetGather(self)
+        """Spawn an asset-gather operation from this manager.
+
+        The gather makes sure every file referenced by the provided
+        manifests is in our store, downloading any that are missing from
+        base_url (up to max_downloads at a time) in the background.
+        """
+        assert threading.get_ident() == self.thread_ident
+        if not self._started:
+            raise RuntimeError('AssetManager is not started.')
+        gather = AssetGather(self, manifests, base_url, max_downloads)
+        self._gathers.add(gather)
+        return gather
 
     def update(self) -> None:
         """Can be called periodically to perform upkeep."""
+        if self._state_dirty:
+            self.save_state()
 
     def start(self) -> None:
         """Tell the manager to start working.
@@ -90,7 +156,7 @@ class AssetManager:
         This will initiate network activity and other processing.
         """
         if self._started:
-            logging.warning('AssetManager.start() called on running manager.')
+            assetslog.warning('AssetManager.start() called on running manager.')
         self._started = True
 
     def stop(self) -> None:
@@ -99,8 +165,13 @@ class AssetManager:
         All network activity should be ceased before this function returns.
         """
         if not self._started:
-            logging.warning('AssetManager.stop() called on stopped manager.')
+            assetslog.warning('AssetManager.stop() called on stopped manager.')
         self._started = False
+        gathers = list(self._gathers)
+        for gather in gathers:
+            gather.cancel()
+        for gather in gathers:
+            gather.wait()
         self.save_state()
 
     @property
@@ -113,9 +184,65 @@ class AssetManager:
         """The path of the state file."""
         return Path(self._rootdir, 'state')
 
+    @property
+    def files_dir(self) -> Path:
+        """The root of our content-addressed file store."""
+        return Path(self._rootdir, 'files')
+
+    def get_file_path(self, filehash: str) -> Path:
+        """Return where the file with a given sha256 hash gets stored."""
+        return Path(self.files_dir, asset_file_cache_path(filehash))
+
+    def has_file(self, filehash: str) -> bool:
+        """Return whether a file with a given hash is in our store."""
+        with self._lock:
+            return filehash in self._state.files and (
+                self.get_file_path(filehash).is_file()
+            )
+
+    def fetch_file(
+        self,
+        filehash: str,
+        url: str,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> int:
+        """Make sure a file is in our store, downloading it if need be.
+
+        This blocks, so it should only be called from background
+        threads. If another call is already downloading the same file,
+        waits for that one instead. Returns the number of bytes
+        downloaded. Raises GatherCancelledError if should_stop returns
+        True before we're done, IntegrityError if downloaded data does
+        not match the hash, AssetRequestError if the server rejects the
+        request, or CommunicationError on other network errors.
+        """
+        while True:
+            with self._lock:
+                entry = self._state.files.get(filehash)
+                if entry is not None and self.get_file_path(filehash).is_file():
+                    entry.last_use_time = time.time()
+                    self._state_dirty = True
+                    return 0
+                event = self._downloads.get(filehash)
+                if event is None:
+                    event = self._downloads[filehash] = threading.Event()
+                    break
+
+            # Someone else has it; wait and then look again (they may
+            # have failed or been cancelled).
+            while not event.wait(0.1):
+                if should_stop is not None and should_stop():
+                    raise GatherCancelledError()
+
+        try:
+            return self._download_file(filehash, url, should_stop)
+        finally:
+            with self._lock:
+                del self._downloads[filehash]
+            event.set()
+
     def load_state(self) -> None:
         """Loads state from disk. Resets to default state if unable to."""
-        print('ASSET-MANAGER LOADING STATE')
         try:
             state_path = self.state_path
             if state_path.exists():
@@ -123,130 +250,288 @@ class AssetManager:
                     self._state = dataclass_from_json(State, infile.read())
                     return
         except Exception:
-            logging.exception('Error loading existing AssetManager state')
+            assetslog.exception('Error loading existing AssetManager state')
         self._state = State()
 
     def save_state(self) -> None:
         """Save state to disk (if possible)."""
+        with self._save_lock:
+            with self._lock:
+                self._state_dirty = False
+                statestr = dataclass_to_json(self._state)
 
-        print('ASSET-MANAGER SAVING STATE')
+            # Write to a temp file and move it into place so we never
+            # leave a partial state file behind.
+            try:
+                tmppath = Path(self._rootdir, 'state.tmp')
+                with open(tmppath, 'w', encoding='utf-8') as outfile:
+                    outfile.write(statestr)
+                os.replace(tmppath, self.state_path)
+            except Exception:
+                assetslog.exception('Error writing AssetManager state')
+
+    def _download_file(
+        self,
+        filehash: str,
+        url: str,
+        should_stop: Callable[[], bool] | None,
+    ) -> int:
+        """Download a file into our store, resuming if possible."""
+        partpath = Path(self._rootdir, 'partial', filehash)
+        partpath.parent.mkdir(parents=True, exist_ok=True)
+        downloaded = 0
+        attempt = 1
+        while True:
+            try:
+                downloaded += self._download_part(
+                    filehash, url, partpath, should_stop
+                )
+                break
+            except (CommunicationError, IntegrityError) as exc:
+                if attempt >= _DOWNLOAD_ATTEMPTS:
+                    raise
+                assetslog.info(
+                    'Error downloading %s (attempt %d of %d): %s',
+                    url,
+                    attempt,
+                    _DOWNLOAD_ATTEMPTS,
+                    exc,
+                )
+                attempt += 1
+                time.sleep(0.5 * attempt)
+
+        path = self.get_file_path(filehash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(partpath, path)
+        with self._lock:
+            self._state.files[filehash] = FileValue(
+                size=path.stat().st_size, last_use_time=time.time()
+            )
+            self._state_dirty = True
+        return downloaded
+
+    def _download_part(
+        self,
+        filehash: str,
+        url: str,
+        partpath: Path,
+        should_stop: Callable[[], bool] | None,
+    ) -> int:
+        """Fill out a partial file and verify it; return bytes read."""
+        # Pick up where any earlier attempt left off.
+        hasher = hashlib.sha256()
+        offset = 0
+        if partpath.exists():
+            with open(partpath, 'rb') as infile:
+                while chunk := infile.read(_CHUNK_SIZE):
+                    hasher.update(chunk)
+                    offset += len(chunk)
+
+        headers: dict[str, str] = {}
+        if self._user_agent is not None:
+            headers['User-Agent'] = self._user_agent
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+
+        downloaded = 0
         try:
-            with open(self.state_path, 'w', encoding='utf-8') as outfile:
-                outfile.write(dataclass_to_json(self._state))
-        except Exception:
-            logging.exception('Error writing AssetManager state')
+            with urllib.request.urlopen(
+                urllib.request.Request(url, headers=headers),
+                context=self._sslcontext,
+                timeout=_DOWNLOAD_TIMEOUT,
+            ) as response:
+                if offset and response.status != 206:
+                    # Server ignored our range; start over.
+                    hasher = hashlib.sha256()
+                    offset = 0
+                lengthstr = response.headers.get('Content-Length')
+                with open(partpath, 'ab' if offset else 'wb') as outfile:
+                    while True:
+                        if should_stop is not None and should_stop():
+                            raise GatherCancelledError()
+                        chunk = response.read(_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        outfile.write(chunk)
+                        hasher.update(chunk)
+                        downloaded += len(chunk)
+                    outfile.flush()
+                    os.fsync(outfile.fileno())
+
+                # Dropped connections can look like a normal end of
+                # data; keep what we got and resume on the next try.
+                if lengthstr is not None and downloaded < int(lengthstr):
+                    raise CommunicationError(
+                        f'Connection closed early fetching {url}.'
+                    )
+        except urllib.error.HTTPError as exc:
+            # We may have already had the whole thing.
+            if exc.code != 416 or not offset:
+                # Client errors won't go away by asking again (aside
+                # from timeouts and rate limiting).
+                if 400 <= exc.code < 500 and exc.code not in (408, 429):
+                    raise AssetRequestError(
+                        f'Error fetching {url}: {exc}'
+                    ) from exc
+                raise CommunicationError(
+                    f'Error fetching {url}: {exc}'
+                ) from exc
+        except (urllib.error.URLError, OSError) as exc:
+            raise CommunicationError(f'Error fetching {url}: {exc}') from exc
+
+        if hasher.hexdigest() != filehash:
+            partpath.unlink(missing_ok=True)
+            raise IntegrityError(f'Got data not matching hash {filehash}.')
+        return downloaded
 
 
 class AssetGather:
-    """Wrangles a gathering of assets."""
+    """Wrangles a gathering of assets.
+
+    Created via :meth:`AssetManager.launch_gather()`. Work happens in a
+    background thread; use :attr:`done` or :meth:`wait()` to find out
+    when it finishes and :attr:`failed_files` to see whether it
+    succeeded.
+    """
 
-    def __init__(self, manager: AssetManager) -> None:
+    def __init__(
+        self,
+        manager: AssetManager,
+        manifests: Sequence[AssetPackageFlavorManifest],
+        base_url: str,
+        max_downloads: int,
+    ) -> None:
         assert threading.get_ident() == manager.thread_ident
+        if max_downloads < 1:
+            raise ValueError('max_downloads must be at least 1.')
         self._manager = weakref.ref(manager)
-        # self._valid = True
-        print('AssetGather()')
-        # url = 'https://files.ballistica.net/bombsquad/promo/BSGamePlay.mov'
-        # url = 'http://www.python.org/ftp/python/2.7.3/Python-2.7.3.tgz'
-        # fetch_url(url,
-        #           filename=Path(manager.rootdir, 'testdl'),
-        #           asset_gather=self)
-        # print('fetch success')
-        thread = threading.Thread(target=self._run)
-        thread.run()
+        self._base_url = base_url.rstrip('/')
+        self._max_downloads = max_downloads
+
+        # Dedupe; plenty of files are shared between packages.
+        filehashes: set[str] = set()
+        for manifest in manifests:
+            filehashes.update(manifest.cloudfiles.values())
+        for filehash in filehashes:
+            if (
+                len(filehash) != 64
+                or not filehash.isalnum()
+                or not filehash.islower()
+            ):
+                raise ValueError(f'Invalid file hash: "{filehash}".')
+        self._filehashes = sorted(filehashes)
+
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._completed_count = 0
+        self._bytes_downloaded = 0
+        self._failed_files: dict[str, str] = {}
+        self._thread = threading.Thread(
+            target=self._run, name='asset-gather', daemon=True
+        )
+        self._thread.start()
 
-    def _run(self) -> None:
-        """Run the gather in a background thread."""
-        print('hello from gather bg')
+    @property
+    def total_count(self) -> int:
+        """The number of unique files this gather covers."""
+        return len(self._filehashes)
 
-        # First, do some sort of.
+    @property
+    def completed_count(self) -> int:
+        """The number of files present or finished downloading so far."""
+        with self._lock:
+            return self._completed_count
 
-    # @property
-    # def valid(self) -> bool:
-    #     """Whether this gather is still valid.
+    @property
+    def bytes_downloaded(self) -> int:
+        """Total bytes downloaded so far."""
+        with self._lock:
+            return self._bytes_downloaded
 
-    #     A gather becomes in valid if its originating AssetManager dies.
-    #     """
-    #     return True
+    @property
+    def failed_files(self) -> dict[str, str]:
+        """Error messages for any files we failed to get, by hash."""
+        with self._lock:
+            return dict(self._failed_files)
 
-    def __del__(self) -> None:
-        print('~AssetGather()')
-
-
-def fetch_url(url: str, filename: Path, asset_gather: AssetGather) -> None:
-    """Fetch a given url to a given filename for a given AssetGather."""
-    import socket
-
-    del url  # Unused.
-
-    # We don't want to keep the provided AssetGather alive, but we want
-    # to abort if it dies.
-    assert isinstance(asset_gather, AssetGather)
-    # weak_gather = weakref.ref(asset_gather)
-
-    if bool(True):
-        raise RuntimeError('should not be using this')
-
-    # Pass a very short timeout to urllib so we have opportunities
-    # to cancel even with network blockage.
-    req: Any = None
-    # req = urllib.request.urlopen(
-    #     urllib.request.Request(
-    #         url, None, {'User-Agent': _babase.user_agent_string()}
-    #     ),
-    #     context=_babase.app.net.sslcontext,
-    #     timeout=1,
-    # )
-    file_size = int(req.headers['Content-Length'])
-    print(f'\nDownloading: {filename} Bytes: {file_size:,}')
-
-    def doit() -> None:
-        time.sleep(1)
-        print('dir', type(req.fp), dir(req.fp))
-        print('WOULD DO IT', flush=True)
-        # req.close()
-        # req.fp.close()
-
-    threading.Thread(target=doit).start()
-
-    with open(filename, 'wb') as outfile:
-        file_size_dl = 0
-
-        block_sz = 1024 * 1024 * 1000
-        time_outs = 0
-        while True:
-            try:
-                data = req.read(block_sz)
-            except ValueError:
-                import traceback
+    @property
+    def done(self) -> bool:
+        """Whether the gather has finished (successfully or not)."""
+        return self._done.is_set()
 
-                traceback.print_exc()
-                print('VALUEERROR', flush=True)
-                break
-            except socket.timeout:
-                print('TIMEOUT', flush=True)
-                # File has not had activity in max seconds.
-                if time_outs > 3:
-                    print('\n\n\nsorry -- try back later')
-                    os.unlink(filename)
-                    raise
-                print(
-                    '\nHmmm... little issue... '
-                    'I\'ll wait a couple of seconds'
-                )
-                time.sleep(3)
-                time_outs += 1
-                continue
-
-            # We reached the end of the download!
-            if not data:
-                sys.stdout.write('\rDone!\n\n')
-                sys.stdout.flush()
-                break
+    @property
+    def succeeded(self) -> bool:
+        """Whether the gather finished with all files present."""
+        return self.done and self.completed_count == self.total_count
+
+    def cancel(self) -> None:
+        """Stop the gather as soon as possible.
 
-            file_size_dl += len(data)
-            outfile.write(data)
-            percent = file_size_dl * 1.0 / file_size
-            status = f'{file_size_dl:20,} Bytes [{percent:.2%}] received'
-            sys.stdout.write('\r' + status)
-            sys.stdout.flush()
-    print('done with', req.fp)
+        Partial downloads are kept so a later gather can resume them.
+        """
+        self._cancelled.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the gather finishes; return whether it did."""
+        return self._done.wait(timeout)
+
+    def _run(self) -> None:
+        """Run the gather in a background thread."""
+        manager: AssetManager | None = None
+        try:
+            manager = self._manager()
+            if manager is not None:
+                self._gather(manager)
+        except Exception:
+            assetslog.exception('Error running asset gather.')
+        finally:
+            # Don't keep the manager alive past when we say we're done.
+            manager = None
+            self._done.set()
+
+    def _gather(self, manager: AssetManager) -> None:
+        starttime = time.monotonic()
+        with ThreadPoolExecutor(
+            max_workers=self._max_downloads, thread_name_prefix='asset-fetch'
+        ) as executor:
+            futures = {
+                executor.submit(
+                    manager.fetch_file,
+                    filehash,
+                    f'{self._base_url}/{asset_file_cache_path(filehash)}',
+                    self._cancelled.is_set,
+                ): filehash
+                for filehash in self._filehashes
+            }
+            for future in as_completed(futures):
+                filehash = futures[future]
+
+                # Note: inspecting errors instead of re-raising them and
+                # only passing their messages along, so their tracebacks
+                # don't wind up in cycles or log records that keep the
+                # manager alive.
+                exc = future.exception()
+                if isinstance(exc, GatherCancelledError):
+                    continue
+                if exc is not None:
+                    error = str(exc)
+                    assetslog.warning(
+                        'Failed to fetch asset file %s: %s', filehash, error
+                    )
+                    with self._lock:
+                        self._failed_files[filehash] = error
+                    continue
+                with self._lock:
+                    self._completed_count += 1
+                    self._bytes_downloaded += future.result()
+
+        manager.save_state()
+        assetslog.debug(
+            'Asset gather finished %d of %d files (%d bytes downloaded)'
+            ' in %.2fs.',
+            self.completed_count,
+            self.total_count,
+            self.bytes_downloaded,
+            time.monotonic() - starttime,
+        )
@@ -9,25 +9,30 @@ operations or possibly game logic.
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, override
+import threading
+import selectors
 import asyncio
 import logging
-import time
+import queue
 import os
 
 from efro.util import strip_exception_tracebacks
 
 if TYPE_CHECKING:
-    from typing import Any
+    from typing import Any, Callable
+    import collections
+    import contextvars
 
-    import babase
-
-# Our timer and event loop for the ballistica logic thread.
-_g_asyncio_timer: babase.AppTimer | None = None
+# Our event loop for the ballistica logic thread.
 _g_asyncio_event_loop: asyncio.AbstractEventLoop | None = None
 
 DEBUG_TIMING = os.environ.get('BA_DEBUG_TIMING') == '1'
 
+# Longest we'll block waiting on the selector in one go (same as
+# asyncio's own limit).
+_MAX_WAIT_TIME = 24.0 * 3600.0
+
 
 def setup_asyncio() -> asyncio.AbstractEventLoop:
     """Setup asyncio functionality for the logic thread."""
@@ -46,41 +51,25 @@ def setup_asyncio() -> asyncio.AbstractEventLoop:
     except RuntimeError:
         pass
 
+    def _post_step(call: Callable[[], None]) -> None:
+        _babase.pushcall(call, raw=True)
+
     global _g_asyncio_event_loop
-    _g_asyncio_event_loop = asyncio.new_event_loop()
-    _g_asyncio_event_loop.set_default_executor(babase.app.threadpool)
+    loop = _LogicThreadEventLoop(_post_step)
+    _g_asyncio_event_loop = loop
+    loop.set_default_executor(babase.app.threadpool)
 
     # Try to avoid reference loops from exceptions.
-    _g_asyncio_event_loop.set_exception_handler(_exception_handler)
-
-    # Ideally we should integrate asyncio into our C++ Thread class's
-    # low level event loop so that asyncio timers/sockets/etc. could
-    # be true first-class citizens. For now, though, we can explicitly
-    # pump an asyncio loop periodically which gets us a decent
-    # approximation of that, which should be good enough for
-    # all but extremely time sensitive uses.
-    # See https://stackoverflow.com/questions/29782377/
-    # is-it-possible-to-run-only-a-single-step-of-the-asyncio-event-loop
-    def run_cycle() -> None:
-        assert _g_asyncio_event_loop is not None
-        _g_asyncio_event_loop.call_soon(_g_asyncio_event_loop.stop)
-        starttime = time.monotonic() if DEBUG_TIMING else 0
-        _g_asyncio_event_loop.run_forever()
-        endtime = time.monotonic() if DEBUG_TIMING else 0
-
-        # Let's aim to have nothing take longer than 1/120 of a second.
-        if DEBUG_TIMING:
-            warn_time = 1.0 / 120
-            duration = endtime - starttime
-            if duration > warn_time:
-                logging.warning(
-                    'Asyncio loop step took %.4fs; ideal max is %.4f',
-                    duration,
-                    warn_time,
-                )
-
-    global _g_asyncio_timer
-    _g_asyncio_timer = _babase.AppTimer(1.0 / 30.0, run_cycle, repeat=True)
+    loop.set_exception_handler(_exception_handler)
+
+    # Have asyncio time each callback it runs and warn about any that
+    # take longer than 1/120 of a second.
+    if DEBUG_TIMING:
+        loop.set_debug(True)
+        # pylint: disable-next=attribute-defined-outside-init
+        loop.slow_callback_duration = 1.0 / 120
+
+    loop.start()
 
     if bool(False):
 
@@ -93,7 +82,198 @@ def setup_asyncio() -> asyncio.AbstractEventLoop:
 
         _testtask = _g_asyncio_event_loop.create_task(aio_test())
 
-    return _g_asyncio_event_loop
+    return loop
+
+
+# pylint: disable-next=too-many-ancestors
+class _WakingSelector(selectors.DefaultSelector):
+    """A selector which reports changes to its registrations.
+
+    Some selector types don't pick up changes made while another thread
+    is blocked on them, so our loop uses this to get its wait restarted.
+    """
+
+    on_change: Callable[[], None] | None = None
+
+    @override
+    def register(
+        self, fileobj: Any, events: int, data: Any = None
+    ) -> selectors.SelectorKey:
+        key = super().register(fileobj, events, data)
+        if self.on_change is not None:
+            self.on_change()
+        return key
+
+    @override
+    def modify(
+        self, fileobj: Any, events: int, data: Any = None
+    ) -> selectors.SelectorKey:
+        key = super().modify(fileobj, events, data)
+        if self.on_change is not None:
+            self.on_change()
+        return key
+
+
+class _LogicThreadEventLoop(asyncio.SelectorEventLoop):
+    """An asyncio event loop driven by the logic thread's event queue.
+
+    The loop is run in single steps posted to the logic thread. Whenever
+    a step leaves nothing ready to run, a helper thread blocks on our
+    selector until I/O arrives or our next timer comes due and then
+    posts another step. This way callbacks run as soon as they are
+    ready and an idle loop costs nothing.
+
+    Only one of a step or a wait is ever in progress at a time, so the
+    selector is never used from two threads at once. Scheduling a call
+    or changing selector registrations while the helper thread is
+    waiting wakes it via the loop's self-pipe.
+    """
+
+    # Base event loop internals we make use of.
+    _ready: collections.deque[asyncio.Handle]
+    _scheduled: list[asyncio.TimerHandle]
+    _write_to_self: Callable[[], None]
+
+    def __init__(self, post_call: Callable[[Callable[[], None]], None]):
+        selector = _WakingSelector()
+        super().__init__(selector)
+        self._wait_selector = selector
+        self._post_call = post_call
+
+        # Whether our wait thread owns the selector, and the loop-time
+        # at which it will give up waiting (None for never).
+        self._waiting = False
+        self._wait_deadline: float | None = None
+        self._wake_sent = False
+        self._shutting_down = False
+        self._wait_requests: queue.SimpleQueue[float | None] = (
+            queue.SimpleQueue()
+        )
+        self._wait_thread = threading.Thread(
+            target=self._wait_thread_main,
+            name='asyncio-logic-wait',
+            daemon=True,
+        )
+
+        # Set this last; registering our self-pipe above calls it.
+        selector.on_change = self._on_selector_change
+
+    def start(self) -> None:
+        """Start running steps; call once from the logic thread."""
+        self._wait_thread.start()
+        self._post_call(self._step)
+
+    @override
+    def call_soon[*Ts](
+        self,
+        callback: Callable[[*Ts], object],
+        *args: *Ts,
+        context: contextvars.Context | None = None,
+    ) -> asyncio.Handle:
+        """Arrange for a callback to be called as soon as possible."""
+        handle = super().call_soon(callback, *args, context=context)
+        if self._waiting:
+            self._wake()
+        return handle
+
+    @override
+    def call_at[*Ts](
+        self,
+        when: float,
+        callback: Callable[[*Ts], object],
+        *args: *Ts,
+        context: contextvars.Context | None = None,
+    ) -> asyncio.TimerHandle:
+        """Arrange for a callback to be called at a given loop time."""
+        handle = super().call_at(when, callback, *args, context=context)
+        if self._waiting and (
+            self._wait_deadline is None or when < self._wait_deadline
+        ):
+            self._wake()
+        return handle
+
+    @override
+    def close(self) -> None:
+        if not self.is_running() and not self.is_closed():
+            self._shutting_down = True
+            if self._wait_thread.is_alive():
+                self._wait_requests.put(None)
+                self._write_to_self()
+                self._wait_thread.join()
+        super().close()
+
+    def _is_shutting_down(self) -> bool:
+        # Set by close() from the logic thread while we may be waiting,
+        # so this is always read fresh.
+        return self._shutting_down
+
+    def _on_selector_change(self) -> None:
+        if self._waiting:
+            self._wake()
+
+    def _wake(self) -> None:
+        if not self._wake_sent:
+            self._wake_sent = True
+            self._write_to_self()
+
+    def _step(self) -> None:
+        if self.is_closed():
+            return
+
+        # This runs everything currently ready (plus any I/O callbacks
+        # the non-blocking select turns up) and then returns.
+        self.call_soon(self.stop)
+        try:
+            self.run_forever()
+        finally:
+            self._schedule_next_step()
+
+    def _schedule_next_step(self) -> None:
+        if self.is_closed():
+            return
+
+        # If calls are already lined up, we can go again right away
+        # (after anything else queued for the logic thread).
+        if self._ready:
+            self._post_call(self._step)
+            return
+
+        # Otherwise hand off to our wait thread.
+        timeout: float | None = None
+        if self._scheduled:
+            timeout = min(
+                max(0.0, self._scheduled[0].when() - self.time()),
+                _MAX_WAIT_TIME,
+            )
+        self._wait_deadline = None if timeout is None else self.time() + timeout
+        self._wake_sent = False
+        self._waiting = True
+        self._wait_requests.put(timeout)
+
+    def _wait_thread_main(self) -> None:
+        while True:
+            timeout = self._wait_requests.get()
+            if self._is_shutting_down():
+                return
+
+            # We don't need the results; they will still be there for
+            # the step's own select call.
+            try:
+                self._wait_selector.select(timeout)
+            except OSError:
+                # Let the step's select surface anything persistent.
+                pass
+            if self._is_shutting_down():
+                return
+
+            # Clear this before posting so the step is free to set it.
+            self._waiting = False
+            try:
+                self._post_call(self._step)
+            except Exception:
+                # Can happen if the app is going down.
+                logging.exception('Error posting asyncio step.')
+                return
 
 
 def _exception_handler(
@@ -7,9 +7,11 @@ from __future__ import annotations
 import gc
 import os
 import time
+import bisect
 import random
 import logging
 from enum import Enum
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, assert_never, override
 
 import bacommon.logging
@@ -21,6 +23,78 @@ from babase._logging import gc_log
 if TYPE_CHECKING:
     import babase
 
+# Default upper bounds (in seconds) for pass-duration histogram buckets.
+_HISTOGRAM_BUCKET_BOUNDS = (
+    0.0005,
+    0.001,
+    0.002,
+    0.004,
+    0.008,
+    0.016,
+    0.032,
+    0.064,
+    0.128,
+    0.256,
+)
+
+
+@dataclass
+class GCPassHistogram:
+    """Distribution of durations for one type of garbage-collection pass.
+
+    Returned by :meth:`GarbageCollectionSubsystem.get_pass_histograms()`.
+    """
+
+    #: Upper bounds in seconds for all buckets but the last; the last
+    #: bucket holds everything longer.
+    bucket_bounds: tuple[float, ...] = _HISTOGRAM_BUCKET_BOUNDS
+
+    #: Number of passes falling into each bucket.
+    bucket_counts: list[int] = field(
+        default_factory=lambda: [0] * (len(_HISTOGRAM_BUCKET_BOUNDS) + 1)
+    )
+
+    #: Combined duration of all passes in seconds.
+    total_duration: float = 0.0
+
+    #: Longest single pass in seconds.
+    max_duration: float = 0.0
+
+    @property
+    def count(self) -> int:
+        """Total number of passes recorded."""
+        return sum(self.bucket_counts)
+
+    def add(self, duration: float) -> None:
+        """Record a pass."""
+        self.bucket_counts[
+            bisect.bisect_left(self.bucket_bounds, duration)
+        ] += 1
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+
+    def describe(self) -> str:
+        """Return a short human readable summary."""
+        count = self.count
+        if count == 0:
+            return 'no passes'
+        buckets = []
+        for i, bucket_count in enumerate(self.bucket_counts):
+            if not bucket_count:
+                continue
+            label = (
+                f'<={self.bucket_bounds[i] * 1000.0:g}ms'
+                if i < len(self.bucket_bounds)
+                else f'>{self.bucket_bounds[-1] * 1000.0:g}ms'
+            )
+            buckets.append(f'{label}: {bucket_count}')
+        bucketstr = ', '.join(buckets)
+        return (
+            f'{count} passes, avg {self.total_duration / count * 1000.0:.2f}ms,'
+            f' max {self.max_duration * 1000.0:.2f}ms'
+            f' ({bucketstr})'
+        )
+
 
 class GarbageCollectionSubsystem(AppSubsystem):
     """Garbage collection functionality for the app.
@@ -117,6 +191,22 @@ class GarbageCollectionSubsystem(AppSubsystem):
         #: deeper.
         STANDARD = 'standard'
 
+        #: Like :attr:`STANDARD`, but geared towards keeping hitches
+        #: small during long uninterrupted stretches of gameplay (busy
+        #: servers, etc). In addition to explicit passes, the engine
+        #: collects Python's younger generations (0 and 1) in small
+        #: steps whenever the logic thread seems to have time to spare,
+        #: and only falls back to a full pass outside of explicit ones
+        #: when the collector's own full-pass threshold has tripped and
+        #: no explicit pass has happened for a while.
+        #:
+        #: Collected objects are examined and summarized only if the
+        #: :attr:`~bacommon.logging.ClientLoggerName.GARBAGE_COLLECTION`
+        #: logger is set to show :obj:`~logging.INFO` messages;
+        #: otherwise passes free objects directly and only report
+        #: counts, which keeps each pass as cheap as possible.
+        INCREMENTAL = 'incremental'
+
         #: In this mode, Python's garbage-collector is set to the
         #: :obj:`gc.DEBUG_LEAK` flag, which causes information on all
         #: objects handled by the garbage-collector to be printed and
@@ -161,9 +251,40 @@ class GarbageCollectionSubsystem(AppSubsystem):
         #: have already been made by other modes.
         DISABLED = 'disabled'
 
+    class PassType(Enum):
+        """Types of garbage-collection passes we time."""
+
+        #: Incremental steps collecting generation 0.
+        GEN0 = 'gen0'
+
+        #: Incremental steps collecting generations 0 and 1.
+        GEN1 = 'gen1'
+
+        #: Full collections (including explicit passes).
+        FULL = 'full'
+
     _MODE_CONFIG_KEY = 'Garbage Collection Mode'
     _SCREEN_MSG_COLOR = (1.0, 0.8, 0.4)
 
+    # How often (in seconds) we consider taking an incremental step.
+    _STEP_INTERVAL = 0.1
+
+    # Rough per-step time budget (in seconds). Ticks arriving later than
+    # this are taken as a sign the logic thread is busy, and generation-1
+    # steps averaging longer than this get put off when possible.
+    _STEP_BUDGET = 0.004
+
+    # Steps put off because the logic thread is busy are forced anyway
+    # once generation-0 gets this many times past its threshold.
+    _MAX_GEN0_BACKLOG = 4
+
+    # Maximum ticks in a row a generation-1 step can be put off.
+    _MAX_GEN1_DEFERS = 10
+
+    # Minimum time (in seconds) since the last full pass before
+    # incremental stepping will run a full pass itself.
+    _MIN_FULL_PASS_INTERVAL = 60.0
+
     def __init__(self) -> None:
 
         #: A :func:`time.monotonic()` value updated whenever we do an
@@ -177,6 +298,16 @@ class GarbageCollectionSubsystem(AppSubsystem):
         self._last_collection_time: float | None = None
         self._showed_standard_mode_warning = False
         self._mode: GarbageCollectionSubsystem.Mode | None = None
+        self._app_running = False
+        self._step_timer: babase.AppTimer | None = None
+        self._last_step_time: float | None = None
+        self._gen1_step_avg: float | None = None
+        self._gen1_defers = 0
+        self._step_count = 0
+        self._step_num_gc_objects = 0
+        self._pass_histograms = {
+            passtype: GCPassHistogram() for passtype in self.PassType
+        }
 
         # Optional override for the warning-threshold object count;
         # default is 50. Useful when iterating on cycle hunts (lower
@@ -206,9 +337,15 @@ class GarbageCollectionSubsystem(AppSubsystem):
     @override
     def on_app_running(self) -> None:
         """:meta private:"""
-        # Inform the user if we're set to something besides standard
-        # (so they don't forget to switch it back when done).
-        if self._mode is not None and self._mode is not self.Mode.STANDARD:
+        self._app_running = True
+        self._update_step_timer()
+
+        # Inform the user if we're set to a debugging mode (so they
+        # don't forget to switch it back when done).
+        if self._mode is not None and self._mode not in {
+            self.Mode.STANDARD,
+            self.Mode.INCREMENTAL,
+        }:
             _babase.screenmessage(
                 f'Garbage-gollection mode is {self._mode.name}.',
                 color=self._SCREEN_MSG_COLOR,
@@ -229,6 +366,20 @@ class GarbageCollectionSubsystem(AppSubsystem):
                 bacommon.logging.ClientLoggerName.GARBAGE_COLLECTION.value,
             )
 
+    @override
+    def on_app_shutdown(self) -> None:
+        """:meta private:"""
+        self._app_running = False
+        self._update_step_timer()
+        if gc_log.isEnabledFor(logging.INFO):
+            gc_log.info(
+                'Garbage-collection pass durations:%s',
+                ''.join(
+                    f'\n  {passtype.value}: {histogram.describe()}'
+                    for passtype, histogram in self._pass_histograms.items()
+                ),
+            )
+
     @property
     def mode(self) -> Mode:
         """The app's current garbage-collection mode.
@@ -249,6 +400,7 @@ class GarbageCollectionSubsystem(AppSubsystem):
             f'Garbage-gollection mode is now {mode.name}.',
             color=self._SCREEN_MSG_COLOR,
         )
+        self._mode = mode
         self._apply_mode(mode)
 
         # Store to app config.
@@ -318,6 +470,8 @@ class GarbageCollectionSubsystem(AppSubsystem):
 
         if self._mode is self.Mode.STANDARD:
             self._collect_standard(now)
+        elif self._mode is self.Mode.INCREMENTAL:
+            self._collect_incremental(now)
         elif self._mode is self.Mode.LEAK_DEBUG:
             self._collect_leak_debug(now)
         else:
@@ -325,6 +479,22 @@ class GarbageCollectionSubsystem(AppSubsystem):
 
         self._last_collection_time = now
 
+    def get_pass_histograms(self) -> dict[PassType, GCPassHistogram]:
+        """Return the distribution of durations for each type of pass.
+
+        Explicit passes are included in :attr:`PassType.FULL`. Passes
+        are timed in all modes except :attr:`Mode.DISABLED`.
+        """
+        return {
+            passtype: GCPassHistogram(
+                bucket_bounds=histogram.bucket_bounds,
+                bucket_counts=list(histogram.bucket_counts),
+                total_duration=histogram.total_duration,
+                max_duration=histogram.max_duration,
+            )
+            for passtype, histogram in self._pass_histograms.items()
+        }
+
     def set_initial_mode(self) -> None:
         """:meta private:"""
 
@@ -343,15 +513,20 @@ class GarbageCollectionSubsystem(AppSubsystem):
 
         self._apply_mode(self._mode)
 
-    def _collect_standard(self, now: float) -> None:
-
-        # ``DEBUG_SAVEALL`` is required (the cycle-inspection logic
-        # below relies on freshly-collected objects landing in
-        # ``gc.garbage``), but additional debug flags such as
-        # ``DEBUG_STATS`` are allowed — used by
-        # ``_pre_interpreter_shutdown`` to trace which generation
-        # of the final collect is hanging.
-        assert gc.get_debug() & gc.DEBUG_SAVEALL
+    def _collect_standard(
+        self, now: float, summarize: bool = True, explicit: bool = True
+    ) -> None:
+        # When summarizing, ``DEBUG_SAVEALL`` is required (the
+        # cycle-inspection logic below relies on freshly-collected
+        # objects landing in ``gc.garbage``), but additional debug flags
+        # such as ``DEBUG_STATS`` are allowed — used by
+        # ``_pre_interpreter_shutdown`` to trace which generation of the
+        # final collect is hanging. When not summarizing, a single pass
+        # frees everything directly.
+        if summarize:
+            assert gc.get_debug() & gc.DEBUG_SAVEALL
+        else:
+            assert not gc.get_debug() & gc.DEBUG_SAVEALL
 
         # Make more noise (warning instead of info) if there's a
         # substantial number of collections in a single cycle.
@@ -378,7 +553,7 @@ class GarbageCollectionSubsystem(AppSubsystem):
         # objects, print stats or warnings as necessary, and then clear
         # the list and run another gc pass without DEBUG_SAVEALL to
         # *actually* kill them.
-        if num_affected_objs > 0:
+        if num_affected_objs > 0 and summarize:
 
             # Build our summary of collected stuff ONLY if we'll actually
             # be showing it.
@@ -406,6 +581,15 @@ class GarbageCollectionSubsystem(AppSubsystem):
                 gc.garbage.clear()
                 gc.collect()
                 gc.set_debug(gc.DEBUG_SAVEALL)
+        elif loglevel == logging.WARNING:
+            obj_summary = (
+                f'\nSet {gc_log.name} logger to INFO'
+                f' to see what is being collected.'
+            )
+
+        self._pass_histograms[self.PassType.FULL].add(
+            time.monotonic() - starttime
+        )
 
         # We should have no garbage left at this point.
         if gc.garbage:
@@ -423,21 +607,119 @@ class GarbageCollectionSubsystem(AppSubsystem):
             if self._last_collection_time is None
             else f' from last {now - self._last_collection_time:.1f}s'
         )
+        from_steps = (
+            ''
+            if not self._step_count
+            else (
+                f' (plus {self._step_num_gc_objects} in'
+                f' {self._step_count} incremental steps)'
+            )
+        )
+        self._step_count = self._step_num_gc_objects = 0
         gc_log.log(
             loglevel,
-            'Explicit gc pass handled %d objects%s in %.3fs (total: %d).%s',
+            '%s gc pass handled %d objects%s%s in %.3fs (total: %d).%s',
+            'Explicit' if explicit else 'Fallback',
             num_affected_objs,
+            from_steps,
             from_last,
             duration,
             self._total_num_gc_objects,
             obj_summary,
         )
 
+    def _collect_incremental(self, now: float, explicit: bool = True) -> None:
+        # Only go through the save-all dance if we'd actually show a
+        # summary of what was collected.
+        if gc_log.isEnabledFor(logging.INFO):
+            prev_debug = gc.get_debug()
+            gc.set_debug(prev_debug | gc.DEBUG_SAVEALL)
+            try:
+                self._collect_standard(now, explicit=explicit)
+            finally:
+                gc.set_debug(prev_debug)
+        else:
+            self._collect_standard(now, summarize=False, explicit=explicit)
+        self._last_collection_time = now
+
+    def _update_step_timer(self) -> None:
+        want_timer = self._app_running and self._mode is self.Mode.INCREMENTAL
+        if want_timer and self._step_timer is None:
+            self._last_step_time = time.monotonic()
+            self._step_timer = _babase.AppTimer(
+                self._STEP_INTERVAL, self._step, repeat=True
+            )
+        elif not want_timer:
+            self._step_timer = None
+
+    def _step(self) -> None:
+        """Possibly collect some garbage incrementally."""
+        now = time.monotonic()
+        last_step_time = self._last_step_time
+        self._last_step_time = now
+
+        # Bail if someone has since switched automatic collection on.
+        if gc.isenabled():
+            return
+
+        count0, count1, count2 = gc.get_count()
+        threshold0, threshold1, threshold2 = gc.get_threshold()
+        if threshold0 <= 0 or count0 < threshold0:
+            return
+
+        # If our tick came in late, the logic thread is busy; put off
+        # stepping unless things are starting to pile up.
+        if (
+            last_step_time is not None
+            and now - last_step_time > self._STEP_INTERVAL + self._STEP_BUDGET
+            and count0 < threshold0 * self._MAX_GEN0_BACKLOG
+        ):
+            return
+
+        # Fall back to a full pass if the collector would want one and
+        # we haven't had an explicit one in a while.
+        if count2 >= threshold2 and (
+            self._last_collection_time is None
+            or now - self._last_collection_time > self._MIN_FULL_PASS_INTERVAL
+        ):
+            self._collect_incremental(now, explicit=False)
+            return
+
+        # Generation 1 is bigger so put it off if it has been running
+        # long; just not forever.
+        passtype = self.PassType.GEN0
+        if count1 >= threshold1:
+            if (
+                self._gen1_step_avg is None
+                or self._gen1_step_avg <= self._STEP_BUDGET
+                or self._gen1_defers >= self._MAX_GEN1_DEFERS
+            ):
+                passtype = self.PassType.GEN1
+                self._gen1_defers = 0
+            else:
+                self._gen1_defers += 1
+
+        num_affected_objs = gc.collect(
+            1 if passtype is self.PassType.GEN1 else 0
+        )
+        duration = time.monotonic() - now
+        self._pass_histograms[passtype].add(duration)
+        if passtype is self.PassType.GEN1:
+            self._gen1_step_avg = (
+                duration
+                if self._gen1_step_avg is None
+                else self._gen1_step_avg * 0.8 + duration * 0.2
+            )
+        self._step_count += 1
+        self._step_num_gc_objects += num_affected_objs
+        self._total_num_gc_objects += num_affected_objs
+
     def _collect_leak_debug(self, now: float) -> None:
         starttime = now
         num_affected_objs = gc.collect()
         now2 = self.last_actual_collect_time = time.monotonic()
         duration = now2 - starttime
+        self._pass_histograms[self.PassType.FULL].add(duration)
         self._total_num_gc_objects += num_affected_objs
 
         # Just report some general stats on what we collected. The
@@ -474,8 +756,14 @@ class GarbageCollectionSubsystem(AppSubsystem):
             # delete collected stuff after examining/reporting it.
             gc.disable()
             gc.set_debug(gc.DEBUG_SAVEALL)
+        elif mode is cls.INCREMENTAL:
+            # In this mode we turn off collect and leave save-all off;
+            # our own passes turn it on only when they need it.
+            gc.disable()
+            gc.set_debug(0)
         else:
             assert_never(mode)
+        self._update_step_timer()
 
     def _mode_from_config(self) -> Mode:
         cfg = _babase.app.config
@@ -6,7 +6,9 @@ from __future__ import annotations
 
 import os
 import json
+import marshal
 from functools import partial
+from collections import OrderedDict
 from typing import TYPE_CHECKING, overload, override
 
 import _babase
@@ -37,8 +39,19 @@ class LanguageSubsystem(AppSubsystem):
         self._language: str | None = None
         self._language_target: AttrDict | None = None
         self._language_merged: AttrDict | None = None
+
+        # Flattened 'a.b.c' -> value tables for the above, along with
+        # translations by (category, name).
+        self._target_resources: dict[str, Any] = {}
+        self._resources: dict[str, Any] | None = None
+        self._translations: dict[tuple[str, str], Any] = {}
         self._test_timer: babase.AppTimer | None = None
 
+    @property
+    def lstr_cache(self) -> LstrCache:
+        """The cache used for :class:`Lstr` evaluation."""
+        return _g_lstr_cache
+
     @property
     def locale(self) -> str:
         """Raw country/language code detected by the game (such as "en_US").
@@ -131,56 +144,28 @@ class LanguageSubsystem(AppSubsystem):
         if ignore_redundant and language == self._language:
             return
 
-        with open(
-            os.path.join(
-                _babase.app.env.data_directory,
-                'ba_data',
-                'data',
-                'languages',
-                'english.json',
-            ),
-            encoding='utf-8',
-        ) as infile:
-            lenglishvalues = json.loads(infile.read())
-
         # Special case - passing a complete dict for testing.
         if isinstance(language, dict):
             self._language = 'Custom'
-            lmodvalues = language
             switched = False
             print_change = False
             store_to_config = False
+            target, merged = _merge_language_values(
+                _read_language_file('English'), language
+            )
         else:
             # Ok, we're setting a real language.
 
             # Store this in the config if its changing.
             if language != cur_language and store_to_config:
-                # if language is None:
-                #     if 'Lang' in cfg:
-                #         del cfg['Lang']  # Clear it out for default.
-                # else:
                 cfg['Lang'] = language
                 cfg.commit()
                 switched = True
             else:
                 switched = False
 
-            # None implies default.
-            # if language is None:
-            #     language = self.default_language
             try:
-                if language == 'English':
-                    lmodvalues = None
-                else:
-                    lmodfile = os.path.join(
-                        _babase.app.env.data_directory,
-                        'ba_data',
-                        'data',
-                        'languages',
-                        language.lower() + '.json',
-                    )
-                    with open(lmodfile, encoding='utf-8') as infile:
-                        lmodvalues = json.loads(infile.read())
+                target, merged = _load_language_values(language)
             except Exception:
                 applog.exception("Error importing language '%s'.", language)
                 _babase.screenmessage(
@@ -189,27 +174,32 @@ class LanguageSubsystem(AppSubsystem):
                     color=(1, 0, 0),
                 )
                 switched = False
-                lmodvalues = None
+                target, merged = _load_language_values('English')
 
             self._language = language
 
-        # Create an attrdict of *just* our target language.
-        self._language_target = AttrDict()
-        langtarget = self._language_target
-        assert langtarget is not None
-        _add_to_attr_dict(
-            langtarget, lmodvalues if lmodvalues is not None else lenglishvalues
-        )
-
-        # Create an attrdict of our target language overlaid on our base
+        # Compile attr-dicts and flat lookup tables for both *just* our
+        # target language and our target language overlaid on our base
         # (english).
-        languages = [lenglishvalues]
-        if lmodvalues is not None:
-            languages.append(lmodvalues)
-        lfull = AttrDict()
-        for lmod in languages:
-            _add_to_attr_dict(lfull, lmod)
+        self._target_resources = {}
+        self._language_target = _compile_language_values(
+            target, self._target_resources, ''
+        )
+        resources: dict[str, Any] = {}
+        lfull = _compile_language_values(merged, resources, '')
         self._language_merged = lfull
+        self._translations = {
+            (category, name): value
+            for category, values in lfull.get('translations', {}).items()
+            if isinstance(values, dict)
+            for name, value in values.items()
+        }
+
+        # Set this last; its presence means we've got a language.
+        self._resources = resources
+
+        # Anything already evaluated is now out of date.
+        _g_lstr_cache.clear()
 
         # Pass some keys/values in for low level code to use; start with
         # everything in their 'internal' section.
@@ -264,85 +254,61 @@ class LanguageSubsystem(AppSubsystem):
           possible, as it will gracefully handle displaying correctly
           across multiple clients in multiple languages simultaneously.
         """
-        try:
-            # If we have no language set, try and set it to english.
-            # Also make a fuss because we should try to avoid this.
-            if self._language_merged is None:
-                try:
-                    if _babase.do_once():
-                        applog.warning(
-                            'get_resource() called before language'
-                            ' set; falling back to english.'
-                        )
-                    self.setlanguage(
-                        'English', print_change=False, store_to_config=False
-                    )
-                except Exception:
-                    applog.exception('Error setting fallback english language.')
-                    raise
-
-            # If they provided a fallback_resource value, try the
-            # target-language-only dict first and then fall back to
-            # trying the fallback_resource value in the merged dict.
-            if fallback_resource is not None:
-                try:
-                    values = self._language_target
-                    splits = resource.split('.')
-                    dicts = splits[:-1]
-                    key = splits[-1]
-                    for dct in dicts:
-                        assert values is not None
-                        values = values[dct]
-                    assert values is not None
-                    val = values[key]
-                    return val
-                except Exception:
-                    # FIXME: Shouldn't we try the fallback resource in
-                    #  the merged dict AFTER we try the main resource in
-                    #  the merged dict?
-                    try:
-                        values = self._language_merged
-                        splits = fallback_resource.split('.')
-                        dicts = splits[:-1]
-                        key = splits[-1]
-                        for dct in dicts:
-                            assert values is not None
-                            values = values[dct]
-                        assert values is not None
-                        val = values[key]
-                        return val
-
-                    except Exception:
-                        # If we got nothing for fallback_resource,
-                        # default to the normal code which checks or
-                        # primary value in the merge dict; there's a
-                        # chance we can get an english value for it
-                        # (which we weren't looking for the first time
-                        # through).
-                        pass
-
-            values = self._language_merged
-            splits = resource.split('.')
-            dicts = splits[:-1]
-            key = splits[-1]
-            for dct in dicts:
-                assert values is not None
-                values = values[dct]
-            assert values is not None
-            val = values[key]
+        resources = self._resources
+        if resources is None:
+            resources = self._set_fallback_language()
+
+        # If they provided a fallback_resource value, try the
+        # target-language-only table first and then fall back to trying
+        # the fallback_resource value in the merged one.
+        #
+        # FIXME: Shouldn't we try the fallback resource in the merged
+        #  table AFTER we try the main resource in the merged table?
+        if fallback_resource is not None:
+            val = self._target_resources.get(resource, _MISSING)
+            if val is _MISSING:
+                val = resources.get(fallback_resource, _MISSING)
+            if val is not _MISSING:
+                return val
+
+            # If we got nothing for fallback_resource, default to the
+            # normal lookup in the merged table; there's a chance we can
+            # get an english value for it (which we weren't looking for
+            # the first time through).
+
+        val = resources.get(resource, _MISSING)
+        if val is not _MISSING:
             return val
 
-        except Exception:
-            # Ok, looks like we couldn't find our main or fallback
-            # resource anywhere. Now if we've been given a fallback
-            # value, return it; otherwise fail.
-            from babase import _error
+        # Ok, looks like we couldn't find our main or fallback resource
+        # anywhere. Now if we've been given a fallback value, return it;
+        # otherwise fail.
+        if fallback_value is not None:
+            return fallback_value
+
+        # pylint: disable=cyclic-import
+        from babase import _error
+
+        raise _error.NotFoundError(f"Resource not found: '{resource}'")
 
-            if fallback_value is not None:
-                return fallback_value
-            raise _error.NotFoundError(
-                f"Resource not found: '{resource}'"
-            ) from None
+    def _set_fallback_language(self) -> dict[str, Any]:
+        """Set english when resources are needed before a language is set.
+
+        Returns an empty table if that fails.
+        """
+        # Make a fuss because we should try to avoid this.
+        if _babase.do_once():
+            applog.warning(
+                'get_resource() called before language'
+                ' set; falling back to english.'
+            )
+        try:
+            self.setlanguage(
+                'English', print_change=False, store_to_config=False
+            )
+        except Exception:
+            applog.exception('Error setting fallback english language.')
+        return {} if self._resources is None else self._resources
 
     def translate(
         self,
@@ -359,8 +325,10 @@ class LanguageSubsystem(AppSubsystem):
           possible, as it will gracefully handle displaying correctly
           across multiple clients in multiple languages simultaneously.
         """
+        if self._resources is None:
+            self._set_fallback_language()
         try:
-            translated = self.get_resource('translations')[category][strval]
+            translated = self._translations[category, strval]
         except Exception as exc:
             if raise_exceptions:
                 raise
@@ -559,7 +527,7 @@ class Lstr:
         You should avoid doing this as much as possible and instead pass
         and store ``Lstr`` values.
         """
-        return _babase.evaluate_lstr(self.as_json())
+        return _g_lstr_cache.evaluate(self.args)
 
     def is_flat_value(self) -> bool:
         """Return whether this instance represents a 'flat' value.
@@ -573,7 +541,7 @@ class Lstr:
 
     def as_json(self) -> str:
         """Return the json dict representation of the Lstr."""
-        return json.dumps(self.args, separators=(',', ':'))
+        return _args_to_json(self.args)
 
     @override
     def __repr__(self) -> str:
@@ -590,20 +558,160 @@ class Lstr:
         return lstr
 
 
-def _add_to_attr_dict(dst: AttrDict, src: dict) -> None:
+class LstrCache:
+    """Bounded LRU cache of :class:`Lstr` evaluations.
+
+    Identical Lstrs tend to get evaluated over and over (score
+    displays, popup texts, UI lists, etc.), so we hold on to results
+    keyed by their json. Everything is dropped whenever the app
+    language is set. Only used from the logic thread; calls from
+    elsewhere just bypass it.
+
+    Access the single shared instance via
+    :attr:`~babase.LanguageSubsystem.lstr_cache`.
+    """
+
+    def __init__(self, max_entries: int = 1000) -> None:
+        #: Max entries to keep; least recently used ones are dropped
+        #: beyond this. Set to 0 to disable caching.
+        self.max_entries = max_entries
+
+        #: Evaluations that were/weren't served from the cache.
+        self.hits = 0
+        self.misses = 0
+
+        # Lstr json -> evaluated value.
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of evaluations served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        """Drop all cached values (stats are kept)."""
+        self._entries.clear()
+
+    def evaluate(self, args: dict[str, Any]) -> str:
+        """Evaluate a set of Lstr args in the current language."""
+        json_str = _args_to_json(args)
+        if self.max_entries <= 0 or not _babase.in_logic_thread():
+            return _babase.evaluate_lstr(json_str)
+        val = self._entries.get(json_str)
+        if val is not None:
+            self.hits += 1
+            self._entries.move_to_end(json_str)
+            return val
+        self.misses += 1
+        val = self._entries[json_str] = _babase.evaluate_lstr(json_str)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return val
+
+
+_g_lstr_cache = LstrCache()
+
+
+def _args_to_json(args: dict[str, Any]) -> str:
+    return json.dumps(args, separators=(',', ':'))
+
+
+# Bump this when changing what gets stored in language caches.
+_LANGUAGE_CACHE_VERSION = 1
+
+_MISSING = object()
+
+
+def _language_file_path(language: str) -> str:
+    return os.path.join(
+        _babase.app.env.data_directory,
+        'ba_data',
+        'data',
+        'languages',
+        language.lower() + '.json',
+    )
+
+
+def _read_language_file(language: str) -> dict:
+    with open(_language_file_path(language), encoding='utf-8') as infile:
+        values = json.loads(infile.read())
+    assert isinstance(values, dict)
+    return values
+
+
+def _load_language_values(language: str) -> tuple[dict, dict]:
+    """Return target-only and merged values for a language.
+
+    Results are cached on disk and reused as long as the language files
+    they came from are unchanged.
+    """
+    sources = ['English'] if language == 'English' else ['English', language]
+    stats = [os.stat(_language_file_path(source)) for source in sources]
+    cachekey = (
+        _LANGUAGE_CACHE_VERSION,
+        _babase.app.env.engine_build_number,
+        tuple((stat.st_mtime_ns, stat.st_size) for stat in stats),
+    )
+    cachepath = os.path.join(
+        _babase.app.env.cache_directory, 'languages', language.lower()
+    )
+    try:
+        with open(cachepath, 'rb') as infile:
+            cached = marshal.loads(infile.read())
+        if cached[0] == cachekey:
+            return cached[1], cached[2]
+    except FileNotFoundError:
+        pass
+    except Exception:
+        applog.warning('Error reading language cache %s.', cachepath)
+
+    values = [_read_language_file(source) for source in sources]
+    target, merged = _merge_language_values(
+        values[0], values[1] if len(values) > 1 else None
+    )
+    try:
+        os.makedirs(os.path.dirname(cachepath), exist_ok=True)
+        tmppath = f'{cachepath}.tmp'
+        with open(tmppath, 'wb') as outfile:
+            outfile.write(marshal.dumps((cachekey, target, merged)))
+        os.replace(tmppath, cachepath)
+    except Exception:
+        applog.warning(
+            'Error writing language cache %s.', cachepath, exc_info=True
+        )
+    return target, merged
+
+
+def _merge_language_values(
+    english: dict, values: dict | None
+) -> tuple[dict, dict]:
+    """Return target-only and merged (over english) language values."""
+    target: dict = {}
+    _add_language_values(target, english if values is None else values)
+    merged: dict = {}
+    _add_language_values(merged, english)
+    if values is not None:
+        _add_language_values(merged, values)
+    return target, merged
+
+
+def _add_language_values(dst: dict, src: dict) -> None:
     for key, value in list(src.items()):
         if isinstance(value, dict):
-            try:
-                dst_dict = dst[key]
-            except Exception:
-                dst_dict = dst[key] = AttrDict()
-            if not isinstance(dst_dict, AttrDict):
+            dst_dict = dst.get(key)
+            if dst_dict is None:
+                dst_dict = dst[key] = {}
+            if not isinstance(dst_dict, dict):
                 raise RuntimeError(
                     "language key '"
                     + key
                     + "' is defined both as a dict and value"
                 )
-            _add_to_attr_dict(dst_dict, value)
+            _add_language_values(dst_dict, value)
         else:
             if not isinstance(value, float | int | bool | str | None):
                 raise TypeError(
@@ -615,6 +723,28 @@ def _add_to_attr_dict(dst: AttrDict, src: dict) -> None:
             dst[key] = value
 
 
+def _compile_language_values(
+    src: dict, table: dict[str, Any], prefix: str | None
+) -> AttrDict:
+    """Build an AttrDict from language values, adding to a flat table.
+
+    Table keys are dotted resource paths. Values with dots in their
+    keys can't be reached by such paths, so those (and anything under
+    them) are skipped; pass a None prefix to skip everything.
+    """
+    out = AttrDict()
+    for key, value in src.items():
+        path = None if prefix is None or '.' in key else prefix + key
+        if isinstance(value, dict):
+            value = _compile_language_values(
+                value, table, None if path is None else path + '.'
+            )
+        out[key] = value
+        if path is not None:
+            table[path] = value
+    return out
+
+
 class AttrDict(dict):
     """A dict that can be accessed with dot notation.
 
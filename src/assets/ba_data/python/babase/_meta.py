@@ -8,7 +8,7 @@ import os
 import time
 import logging
 from pathlib import Path
-from threading import Thread
+from threading import Lock, Thread
 from functools import partial
 from typing import TYPE_CHECKING
 from dataclasses import dataclass, field
@@ -87,7 +87,8 @@ class MetadataSubsystem:
                     env.python_directory_user,
                 ]
                 if path is not None
-            ]
+            ],
+            cache_path=os.path.join(env.cache_directory, 'metascan.json'),
         )
 
         lifecyclelog.info('meta-scan bg thread kicked off')
@@ -253,14 +254,33 @@ class MetadataSubsystem:
         self._scan_complete_cb()
 
 
+@dataclass
+class _ModuleMeta:
+    """Meta info parsed out of a single module file."""
+
+    # Split '# ba_meta' lines by line index.
+    lines: dict[int, list[str]]
+
+    # Class names found below 'ba_meta export' lines by line index (None
+    # where no class definition was found).
+    export_classes: dict[int, str | None]
+
+
 class DirectoryScan:
     """Scans directories for metadata."""
 
-    def __init__(self, paths: list[str]):
+    # Bump this when changing what gets stored in the cache.
+    _CACHE_VERSION = 1
+
+    def __init__(self, paths: list[str], cache_path: str | None = None):
         """Given one or more paths, parses available meta information.
 
         It is assumed that these paths are also in PYTHONPATH.
         It is also assumed that any subdirectories are Python packages.
+
+        If cache_path is provided, info parsed from module files is
+        stored there and reused on later scans for files whose
+        modification time and size have not changed.
         """
 
         # Skip non-existent paths completely.
@@ -268,6 +288,15 @@ class DirectoryScan:
         self.extra_paths: list[Path] = []
         self.extra_paths_set = False
         self.results = ScanResults()
+        self._cache_path = cache_path
+
+        # Cached module info by file path; what we loaded and what we
+        # will write back (only files we visit this time around).
+        self._cache: dict[str, tuple[int, int, _ModuleMeta]] = {}
+        self._new_cache: dict[str, tuple[int, int, _ModuleMeta]] = {}
+        self._scanned_count = 0
+        self._reused_count = 0
+        self._lock = Lock()
 
     def set_extras(self, paths: list[str]) -> None:
         """Set extra portion."""
@@ -277,27 +306,126 @@ class DirectoryScan:
 
     def run(self) -> None:
         """Do the thing."""
+        duration = 0.0
+        starttime = time.monotonic()
+        self._load_cache()
         for pathlist in [self.base_paths, self.extra_paths]:
             # Spin and wait until extra paths are provided before doing them.
             if pathlist is self.extra_paths:
+                duration += time.monotonic() - starttime
                 while not self.extra_paths_set:
                     time.sleep(0.001)
+                starttime = time.monotonic()
 
             modules: list[tuple[Path, Path]] = []
             for path in pathlist:
-                self._get_path_module_entries(path, '', modules)
-            for moduledir, subpath in modules:
-                try:
-                    self._scan_module(moduledir, subpath)
-                except Exception:
-                    logging.exception("metascan: Error scanning '%s'.", subpath)
+                self._get_path_module_entries(path, '', modules, self.results)
+
+            # Scan top level modules in parallel, each into its own
+            # results, and then merge those in order.
+            for results in _babase.app.threadpool.map(
+                self._scan_top_level_module, modules
+            ):
+                for exporttype, classnames in results.exports.items():
+                    self.results.exports.setdefault(exporttype, []).extend(
+                        classnames
+                    )
+                self.results.incorrect_api_modules += (
+                    results.incorrect_api_modules
+                )
+                if results.announce_errors_occurred:
+                    self.results.announce_errors_occurred = True
 
         # Sort our results.
         for exportlist in self.results.exports.values():
             exportlist.sort()
 
+        self._save_cache()
+        duration += time.monotonic() - starttime
+        lifecyclelog.info(
+            'meta-scan: scanned %d modules and reused %d cached in %.3fs.',
+            self._scanned_count,
+            self._reused_count,
+            duration,
+        )
+
+    def _scan_top_level_module(self, entry: tuple[Path, Path]) -> ScanResults:
+        moduledir, subpath = entry
+        results = ScanResults()
+        try:
+            self._scan_module(moduledir, subpath, results)
+        except Exception:
+            logging.exception("metascan: Error scanning '%s'.", subpath)
+        return results
+
+    def _load_cache(self) -> None:
+        import json
+
+        if self._cache_path is None or not os.path.exists(self._cache_path):
+            return
+        try:
+            with open(self._cache_path, encoding='utf-8') as infile:
+                data = json.load(infile)
+            if data.get('version') != self._CACHE_VERSION:
+                return
+            self._cache = {
+                fpath: (
+                    mtime,
+                    size,
+                    _ModuleMeta(
+                        lines={int(k): v for k, v in lines.items()},
+                        export_classes={
+                            int(k): v for k, v in export_classes.items()
+                        },
+                    ),
+                )
+                for fpath, (mtime, size, lines, export_classes) in data[
+                    'entries'
+                ].items()
+            }
+        except Exception:
+            # Not a big deal; we'll just scan everything.
+            logging.warning(
+                'metascan: Error loading cache at %s.',
+                self._cache_path,
+                exc_info=True,
+            )
+            self._cache = {}
+
+    def _save_cache(self) -> None:
+        import json
+
+        if self._cache_path is None or (
+            self._scanned_count == 0
+            and len(self._new_cache) == len(self._cache)
+        ):
+            return
+        data = {
+            'version': self._CACHE_VERSION,
+            'entries': {
+                fpath: [mtime, size, meta.lines, meta.export_classes]
+                for fpath, (mtime, size, meta) in self._new_cache.items()
+            },
+        }
+        try:
+            os.makedirs(os.path.dirname(self._cache_path), exist_ok=True)
+            tmppath = f'{self._cache_path}.tmp'
+            with open(tmppath, 'w', encoding='utf-8') as outfile:
+                json.dump(data, outfile, separators=(',', ':'))
+            os.replace(tmppath, self._cache_path)
+        except Exception:
+            logging.warning(
+                'metascan: Error saving cache at %s.',
+                self._cache_path,
+                exc_info=True,
+            )
+
     def _get_path_module_entries(
-        self, path: Path, subpath: str | Path, modules: list[tuple[Path, Path]]
+        self,
+        path: Path,
+        subpath: str | Path,
+        modules: list[tuple[Path, Path]],
+        results: ScanResults,
     ) -> None:
         """Scan provided path and add module entries to provided list."""
         try:
@@ -314,7 +442,7 @@ class DirectoryScan:
         except Exception:
             # Unexpected; report this.
             logging.exception('metascan: Error in _get_path_module_entries.')
-            self.results.announce_errors_occurred = True
+            results.announce_errors_occurred = True
             entries = []
 
         # Now identify python packages/modules out of what we found.
@@ -327,7 +455,9 @@ class DirectoryScan:
             ):
                 modules.append(entry)
 
-    def _scan_module(self, moduledir: Path, subpath: Path) -> None:
+    def _scan_module(
+        self, moduledir: Path, subpath: Path, results: ScanResults
+    ) -> None:
         """Scan an individual module and add the findings to results."""
         if subpath.name.endswith('.py'):
             fpath = Path(moduledir, subpath)
@@ -335,20 +465,10 @@ class DirectoryScan:
         else:
             fpath = Path(moduledir, subpath, '__init__.py')
             ispackage = True
-        with fpath.open(encoding='utf-8') as infile:
-            flines = infile.readlines()
-        meta_lines = {
-            lnum: l[1:].split()
-            for lnum, l in enumerate(flines)
-            # Do a simple 'in' check for speed but then make sure its
-            # also at the beginning of the line. This allows disabling
-            # meta-lines and avoids false positives from code that
-            # wrangles them.
-            if ('# ba_meta' in l and l.strip().startswith('# ba_meta '))
-        }
+        meta = self._get_module_meta(fpath)
         is_top_level = len(subpath.parts) <= 1
         required_api = self._get_api_requirement(
-            subpath, meta_lines, is_top_level
+            subpath, meta.lines, is_top_level, results
         )
 
         # Top level modules with no discernible api version get ignored.
@@ -368,25 +488,70 @@ class DirectoryScan:
                 required_api,
                 _babase.app.env.api_version,
             )
-            self.results.incorrect_api_modules.append(
+            results.incorrect_api_modules.append(
                 self._module_name_for_subpath(subpath)
             )
             return
 
         # Ok; can proceed with a full scan of this module.
-        self._process_module_meta_tags(subpath, flines, meta_lines)
+        self._process_module_meta_tags(subpath, meta, results)
 
         # If its a package, recurse into its subpackages.
         if ispackage:
             try:
                 submodules: list[tuple[Path, Path]] = []
-                self._get_path_module_entries(moduledir, subpath, submodules)
+                self._get_path_module_entries(
+                    moduledir, subpath, submodules, results
+                )
                 for submodule in submodules:
                     if submodule[1].name != '__init__.py':
-                        self._scan_module(submodule[0], submodule[1])
+                        self._scan_module(submodule[0], submodule[1], results)
             except Exception:
                 logging.exception('metascan: Error scanning %s.', subpath)
 
+    def _get_module_meta(self, fpath: Path) -> _ModuleMeta:
+        """Return meta info for a module file, using our cache if possible."""
+        fpathstr = str(fpath)
+        stat = fpath.stat()
+        cached = self._cache.get(fpathstr)
+        if (
+            cached is not None
+            and cached[0] == stat.st_mtime_ns
+            and cached[1] == stat.st_size
+        ):
+            meta = cached[2]
+            scanned = False
+        else:
+            with fpath.open(encoding='utf-8') as infile:
+                flines = infile.readlines()
+            meta_lines = {
+                lnum: l[1:].split()
+                for lnum, l in enumerate(flines)
+                # Do a simple 'in' check for speed but then make sure its
+                # also at the beginning of the line. This allows disabling
+                # meta-lines and avoids false positives from code that
+                # wrangles them.
+                if ('# ba_meta' in l and l.strip().startswith('# ba_meta '))
+            }
+            meta = _ModuleMeta(
+                lines=meta_lines,
+                export_classes={
+                    lindex: self._find_export_class_name(flines, lindex)
+                    for lindex, mline in meta_lines.items()
+                    if len(mline) == 3
+                    and mline[0] == 'ba_meta'
+                    and mline[1] == 'export'
+                },
+            )
+            scanned = True
+        with self._lock:
+            self._new_cache[fpathstr] = (stat.st_mtime_ns, stat.st_size, meta)
+            if scanned:
+                self._scanned_count += 1
+            else:
+                self._reused_count += 1
+        return meta
+
     def _module_name_for_subpath(self, subpath: Path) -> str:
         # (should not be getting these)
         assert '__init__.py' not in str(subpath)
@@ -394,11 +559,11 @@ class DirectoryScan:
         return '.'.join(subpath.parts).removesuffix('.py')
 
     def _process_module_meta_tags(
-        self, subpath: Path, flines: list[str], meta_lines: dict[int, list[str]]
+        self, subpath: Path, meta: _ModuleMeta, results: ScanResults
     ) -> None:
         """Pull data from a module based on its ba_meta tags."""
-        for lindex, mline in meta_lines.items():
-            # meta_lines is just anything containing '# ba_meta '; make sure
+        for lindex, mline in meta.lines.items():
+            # meta.lines is just anything containing '# ba_meta '; make sure
             # the ba_meta is in the right place.
             if mline[0] != 'ba_meta':
                 # Make an exception for this specific file, otherwise we
@@ -410,7 +575,7 @@ class DirectoryScan:
                         subpath,
                         lindex + 1,
                     )
-                    self.results.announce_errors_occurred = True
+                    results.announce_errors_occurred = True
             elif (
                 len(mline) == 4 and mline[1] == 'require' and mline[2] == 'api'
             ):
@@ -424,15 +589,21 @@ class DirectoryScan:
                     subpath,
                     lindex + 1,
                 )
-                self.results.announce_errors_occurred = True
+                results.announce_errors_occurred = True
             else:
                 # Looks like we've got a valid export line!
                 modulename = self._module_name_for_subpath(subpath)
                 exporttypestr = mline[2]
-                export_class_name = self._get_export_class_name(
-                    subpath, flines, lindex
-                )
-                if export_class_name is not None:
+                export_class_name = meta.export_classes.get(lindex)
+                if export_class_name is None:
+                    logging.warning(
+                        'metascan: %s:%d: class definition not found below'
+                        " 'ba_meta export' statement.",
+                        subpath,
+                        lindex + 1,
+                    )
+                    results.announce_errors_occurred = True
+                else:
                     classname = modulename + '.' + export_class_name
 
                     # Migrating away from the 'plugin' name shortcut;
@@ -445,7 +616,7 @@ class DirectoryScan:
                             subpath,
                             lindex + 1,
                         )
-                        self.results.announce_errors_occurred = True
+                        results.announce_errors_occurred = True
 
                     # Migrating away from the 'keyboard' name shortcut;
                     # warn if we find it.
@@ -457,7 +628,7 @@ class DirectoryScan:
                             subpath,
                             lindex + 1,
                         )
-                        self.results.announce_errors_occurred = True
+                        results.announce_errors_occurred = True
 
                     # If export type is one of our shortcuts, sub in the
                     # actual class path. Otherwise assume its a classpath
@@ -465,15 +636,12 @@ class DirectoryScan:
                     exporttype = EXPORT_CLASS_NAME_SHORTCUTS.get(exporttypestr)
                     if exporttype is None:
                         exporttype = exporttypestr
-                    self.results.exports.setdefault(exporttype, []).append(
-                        classname
-                    )
+                    results.exports.setdefault(exporttype, []).append(classname)
 
-    def _get_export_class_name(
-        self, subpath: Path, lines: list[str], lindex: int
+    def _find_export_class_name(
+        self, lines: list[str], lindex: int
     ) -> str | None:
         """Given line num of an export tag, returns its operand class name."""
-        lindexorig = lindex
         classname = None
         while True:
             lindex += 1
@@ -489,14 +657,6 @@ class DirectoryScan:
                 if len(cbits) > 1 and cbits[0].isidentifier():
                     classname = cbits[0]
                     break  # Success!
-        if classname is None:
-            logging.warning(
-                'metascan: %s:%d: class definition not found below'
-                " 'ba_meta export' statement.",
-                subpath,
-                lindexorig + 1,
-            )
-            self.results.announce_errors_occurred = True
         return classname
 
     def _get_api_requirement(
@@ -504,6 +664,7 @@ class DirectoryScan:
         subpath: Path,
         meta_lines: dict[int, list[str]],
         toplevel: bool,
+        results: ScanResults,
     ) -> int | None:
         """Return an API requirement integer or None if none present.
 
@@ -531,7 +692,7 @@ class DirectoryScan:
                 ' lines found; ignoring module.',
                 subpath,
             )
-            self.results.announce_errors_occurred = True
+            results.announce_errors_occurred = True
         elif not lines and toplevel and meta_lines:
             # If we're a top-level module containing meta lines but no
             # valid "require api" line found, complain.
@@ -540,5 +701,5 @@ class DirectoryScan:
                 ' line found; ignoring module.',
                 subpath,
             )
-            self.results.announce_errors_occurred = True
+            results.announce_errors_occurred = True
         return None
@@ -15,7 +15,7 @@ from typing import TYPE_CHECKING
 from efro.error import CleanError
 import _babase
 import bacommon.cloud
-from bacommon.transfer import DirectoryManifest
+from bacommon.transfer import DirectoryManifest, FileHashCache
 
 if TYPE_CHECKING:
     from typing import Callable
@@ -96,7 +96,19 @@ class WorkspaceSubsystem:
 
             _log.info("Syncing workspace '%s'...", workspacename)
 
-            manifest = DirectoryManifest.create_from_disk(wspath)
+            # Keep hashes around between syncs so we only need to
+            # re-hash files that have changed.
+            hash_cache = FileHashCache(
+                Path(
+                    _babase.app.env.cache_directory,
+                    'workspaces',
+                    f'{workspaceid}.hashcache',
+                )
+            )
+            manifest = DirectoryManifest.create_from_disk(
+                wspath, hash_cache=hash_cache
+            )
+            hash_cache.save()
 
             # FIXME: Should implement a way to pass account credentials
             # in from the logic thread.
@@ -38,6 +38,7 @@ if TYPE_CHECKING:
     from bauiv1lib.party import PartyWindow
 
     from baclassic._servermode import ServerController
+    from baclassic._benchmark import LoadBenchmarkReport
     from baclassic._net import MasterServerCallback
 
 
@@ -147,7 +148,6 @@ class ClassicAppSubsystem(babase.AppSubsystem):
         self.stress_test_update_timer: babase.AppTimer | None = None
         self.stress_test_update_timer_2: babase.AppTimer | None = None
         self.value_test_defaults: dict = {}
-        self.ping_thread_count = 0
         self.allow_ticket_purchases: bool = True
 
         # Classic-specific account state.
@@ -710,6 +710,51 @@ class ClassicAppSubsystem(babase.AppSubsystem):
 
         run_cpu_benchmark()
 
+    def run_bot_benchmark(
+        self, bot_count: int = 30, target_count: int = 8, duration: float = 20.0
+    ) -> None:
+        """Kick off a benchmark to test bot AI update costs."""
+        from baclassic._benchmark import run_bot_benchmark
+
+        run_bot_benchmark(
+            bot_count=bot_count, target_count=target_count, duration=duration
+        )
+
+    def run_load_benchmark(
+        self,
+        *,
+        session_type: type[bascenev1.Session] | None = None,
+        playlist_name: str = '__default__',
+        player_count: int = 8,
+        game_count: int = 5,
+        game_duration: float = 30.0,
+        report_path: str | None = None,
+        profile: bool = False,
+        on_complete: Callable[[LoadBenchmarkReport], None] | None = None,
+    ) -> None:
+        """Run a playlist with synthetic players and record performance.
+
+        Runs game_count games of a free-for-all (or other multi-team
+        session type) playlist, recording logic-thread step intervals,
+        garbage-collection pauses, Python allocations, activity
+        transition times, and optionally profiled per-module logic
+        thread times. The report is printed in brief, written as json to
+        report_path if provided, and passed to on_complete if provided.
+        Works on headless builds.
+        """
+        from baclassic._benchmark import run_load_benchmark
+
+        run_load_benchmark(
+            session_type=session_type,
+            playlist_name=playlist_name,
+            player_count=player_count,
+            game_count=game_count,
+            game_duration=game_duration,
+            report_path=report_path,
+            profile=profile,
+            on_complete=on_complete,
+        )
+
     def run_media_reload_benchmark(self) -> None:
         """Kick off a benchmark to test media reloading speeds."""
         from baclassic._benchmark import run_media_reload_benchmark
@@ -4,16 +4,24 @@
 
 from __future__ import annotations
 
+import os
+import gc
+import sys
+import time
 import random
-from dataclasses import dataclass
+import logging
+import weakref
+import cProfile
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, override
 
+from efro.dataclassio import ioprepped, dataclass_to_json
 import babase
 import bascenev1
 import _baclassic
 
 if TYPE_CHECKING:
-    from typing import Any, Sequence
+    from typing import Any, Callable, Sequence
 
 
 def run_cpu_benchmark() -> None:
@@ -54,6 +62,605 @@ def run_cpu_benchmark() -> None:
     bascenev1.new_host_session(BenchmarkSession, benchmark_type='cpu')
 
 
+def run_bot_benchmark(
+    bot_count: int = 30, target_count: int = 8, duration: float = 20.0
+) -> None:
+    """Run a benchmark of bot AI update costs.
+
+    Spawns bot_count bots chasing target_count invincible dummy
+    targets and, after duration seconds, prints how long bot-set update
+    ticks took. This needs no UI or players so can be run on headless
+    builds (via an exec command or the like).
+    """
+    # pylint: disable=cyclic-import
+    from bascenev1lib.actor.spaz import Spaz
+    from bascenev1lib.actor.spazbot import BrawlerBot, DemoSpazBotSet
+
+    # Let things settle for a moment before we start measuring.
+    warmup_time = 3.0
+
+    class TimedBotSet(DemoSpazBotSet):
+        """Bot-set that records how long each update tick takes."""
+
+        def __init__(self) -> None:
+            super().__init__()
+            self.tick_times: list[float] = []
+
+        @override
+        def _update(self) -> None:
+            starttime = time.perf_counter()
+            super()._update()
+            self.tick_times.append(time.perf_counter() - starttime)
+
+    class BotBenchmarkActivity(
+        bascenev1.GameActivity[bascenev1.EmptyPlayer, bascenev1.EmptyTeam]
+    ):
+        """Activity for the bot benchmark."""
+
+        name = 'Bot Benchmark'
+
+        def __init__(self, settings: dict):
+            settings['map'] = 'Doom Shroom'
+            super().__init__(settings)
+            self._bots: TimedBotSet | None = None
+            self._targets: list[Spaz] = []
+            self._timers: list[bascenev1.Timer] = []
+
+        @override
+        def on_begin(self) -> None:
+            super().on_begin()
+            for _i in range(target_count):
+                target = Spaz(start_invincible=False, can_accept_powerups=False)
+                assert target.node
+                target.node.invincible = True
+                target.handlemessage(
+                    bascenev1.StandMessage(
+                        self.map.get_start_position(0), random.uniform(0, 360)
+                    )
+                )
+                self._targets.append(target)
+            self._bots = TimedBotSet()
+            for _i in range(bot_count):
+                self._bots.spawn_bot(
+                    BrawlerBot, self.map.get_start_position(1), spawn_time=0.1
+                )
+            self._timers = [
+                bascenev1.Timer(
+                    warmup_time, bascenev1.WeakCallStrict(self._start_measuring)
+                ),
+                bascenev1.Timer(
+                    warmup_time + duration,
+                    bascenev1.WeakCallStrict(self._report),
+                ),
+            ]
+
+        def _start_measuring(self) -> None:
+            assert self._bots is not None
+            self._bots.tick_times.clear()
+
+        def _report(self) -> None:
+            assert self._bots is not None
+            times = sorted(self._bots.tick_times)
+            self._bots.stop_moving()
+            if times:
+                print(
+                    f'Bot benchmark ({bot_count} bots,'
+                    f' {target_count} targets): {len(times)} ticks;'
+                    f' avg {1000.0 * sum(times) / len(times):.3f}ms,'
+                    f' median {1000.0 * times[len(times) // 2]:.3f}ms,'
+                    f' max {1000.0 * times[-1]:.3f}ms per tick.'
+                )
+            if babase.app.classic is not None:
+                babase.app.classic.return_to_main_menu_session_gracefully(
+                    reset_ui=False
+                )
+
+    class BotBenchmarkSession(bascenev1.Session):
+        """Session type for the bot benchmark."""
+
+        def __init__(self) -> None:
+            super().__init__([])
+            self.setactivity(bascenev1.newactivity(BotBenchmarkActivity))
+
+        @override
+        def on_player_request(self, player: bascenev1.SessionPlayer) -> bool:
+            return False
+
+    bascenev1.new_host_session(BotBenchmarkSession)
+
+
+@ioprepped
+@dataclass
+class LoadBenchmarkSummary:
+    """Distribution of a set of timing samples (in seconds)."""
+
+    count: int = 0
+    mean: float = 0.0
+    p50: float = 0.0
+    p90: float = 0.0
+    p99: float = 0.0
+    max: float = 0.0
+
+
+@ioprepped
+@dataclass
+class LoadBenchmarkTransition:
+    """Timings for one activity transition in a load benchmark."""
+
+    #: Type of the activity being transitioned to.
+    activity_type: str
+
+    #: Time spent in the setactivity() call (transitioning in).
+    set_time: float
+
+    #: Time spent beginning the activity once the previous one died.
+    begin_time: float
+
+    #: Total time from the setactivity() call until the activity began
+    #: (includes the fade between activities).
+    total_time: float
+
+
+@ioprepped
+@dataclass
+class LoadBenchmarkHotSpot:
+    """Profiled time for a module or function in a load benchmark."""
+
+    name: str
+
+    #: Time spent in the code itself (not including calls out of it).
+    self_time: float
+
+    calls: int
+
+
+@ioprepped
+@dataclass
+class LoadBenchmarkReport:
+    """Results of a load benchmark run.
+
+    See :meth:`baclassic.ClassicAppSubsystem.run_load_benchmark()`.
+    """
+
+    engine_version: str
+    engine_build_number: int
+    session_type: str
+    playlist_name: str
+    player_count: int
+
+    #: Number of games that ran to completion.
+    game_count: int
+
+    #: Wall-clock time for the whole run.
+    duration: float
+
+    #: Intervals between logic-thread steps, as measured by a rapidly
+    #: repeating app-timer. Long intervals mean hitches.
+    step_intervals: LoadBenchmarkSummary
+
+    #: Python garbage-collection pauses.
+    gc_pauses: LoadBenchmarkSummary
+
+    #: Objects freed by the garbage collector.
+    gc_collected: int
+
+    #: Python memory blocks allocated at the start, end, and peak of
+    #: the run (see :func:`sys.getallocatedblocks()`).
+    allocated_blocks_start: int
+    allocated_blocks_end: int
+    allocated_blocks_peak: int
+
+    transitions: list[LoadBenchmarkTransition] = field(default_factory=list)
+
+    #: Modules taking the most logic-thread time (when profiling).
+    hot_modules: list[LoadBenchmarkHotSpot] = field(default_factory=list)
+
+    #: Functions taking the most logic-thread time (when profiling).
+    hot_functions: list[LoadBenchmarkHotSpot] = field(default_factory=list)
+
+
+# The load benchmark currently running (if any).
+_g_load_benchmark: _LoadBenchmark | None = None
+
+
+def run_load_benchmark(
+    *,
+    session_type: type[bascenev1.Session] | None = None,
+    playlist_name: str = '__default__',
+    player_count: int = 8,
+    game_count: int = 5,
+    game_duration: float = 30.0,
+    report_path: str | None = None,
+    profile: bool = False,
+    on_complete: Callable[[LoadBenchmarkReport], None] | None = None,
+) -> None:
+    """Run a playlist with synthetic players and measure how it goes.
+
+    Runs game_count games from the given free-for-all or teams playlist
+    (ending each after game_duration seconds if it hasn't ended itself)
+    while recording logic-thread step intervals, garbage-collection
+    pauses, Python memory allocation, and activity transition times.
+    If profile is True, the logic thread is also profiled to find the
+    modules and functions taking the most time (this slows things down,
+    so other numbers should not be compared against unprofiled runs).
+
+    The resulting :class:`LoadBenchmarkReport` is printed in brief,
+    written as json to report_path if provided, and passed to
+    on_complete if provided. This needs no UI so can be run on headless
+    builds.
+    """
+    # pylint: disable=global-statement
+    global _g_load_benchmark
+
+    if session_type is None:
+        session_type = bascenev1.FreeForAllSession
+    if not issubclass(session_type, bascenev1.MultiTeamSession):
+        raise ValueError('session_type must be a MultiTeamSession type.')
+    if _g_load_benchmark is not None:
+        raise RuntimeError('A load benchmark is already running.')
+
+    _g_load_benchmark = _LoadBenchmark(
+        session_type=session_type,
+        playlist_name=playlist_name,
+        player_count=player_count,
+        game_count=game_count,
+        game_duration=game_duration,
+        report_path=report_path,
+        profile=profile,
+        on_complete=on_complete,
+    )
+    _g_load_benchmark.start()
+
+
+class _LoadBenchmark:
+    """State for a running load benchmark."""
+
+    # How often we sample logic-thread step intervals.
+    _STEP_SAMPLE_INTERVAL = 0.005
+
+    # How many hot modules/functions we report.
+    _HOT_SPOT_COUNT = 25
+
+    def __init__(
+        self,
+        *,
+        session_type: type[bascenev1.MultiTeamSession],
+        playlist_name: str,
+        player_count: int,
+        game_count: int,
+        game_duration: float,
+        report_path: str | None,
+        profile: bool,
+        on_complete: Callable[[LoadBenchmarkReport], None] | None,
+    ) -> None:
+        self._session_type = session_type
+        self._playlist_name = playlist_name
+        self._player_count = player_count
+        self._game_count = game_count
+        self._game_duration = game_duration
+        self._report_path = report_path
+        self._on_complete = on_complete
+        self._profiler: cProfile.Profile | None = (
+            cProfile.Profile() if profile else None
+        )
+        self._start_time = 0.0
+        self._games_completed = 0
+        self._step_intervals: list[float] = []
+        self._last_step_time: float | None = None
+        self._step_timer: babase.AppTimer | None = None
+        self._game_timer: babase.AppTimer | None = None
+        self._gc_pauses: list[float] = []
+        self._gc_start_time: float | None = None
+        self._gc_collected = 0
+        self._blocks_start = 0
+        self._blocks_peak = 0
+        self._transitions: list[LoadBenchmarkTransition] = []
+        self._set_activity_time: float | None = None
+        self._set_activity_duration = 0.0
+        self._old_config: dict[str, Any] = {}
+        self._done = False
+
+    @property
+    def done(self) -> bool:
+        """Whether we have finished."""
+        return self._done
+
+    def start(self) -> None:
+        """Kick things off."""
+        appconfig = babase.app.config
+        if issubclass(self._session_type, bascenev1.DualTeamSession):
+            selection_key = 'Team Tournament Playlist Selection'
+            randomize_key = 'Team Tournament Playlist Randomize'
+        else:
+            selection_key = 'Free-for-All Playlist Selection'
+            randomize_key = 'Free-for-All Playlist Randomize'
+        for key in (selection_key, randomize_key):
+            self._old_config[key] = appconfig.get(key)
+        started = False
+        try:
+            appconfig[selection_key] = self._playlist_name
+            appconfig[randomize_key] = False
+
+            self._start_time = time.monotonic()
+            self._blocks_start = self._blocks_peak = sys.getallocatedblocks()
+            gc.callbacks.append(self._on_gc)
+            self._step_timer = babase.AppTimer(
+                self._STEP_SAMPLE_INTERVAL, self._sample_step, repeat=True
+            )
+            if self._profiler is not None:
+                try:
+                    self._profiler.enable()
+                except ValueError:
+                    logging.warning(
+                        'Unable to profile load benchmark'
+                        ' (another profiler is active).'
+                    )
+                    self._profiler = None
+
+            _baclassic.set_stress_testing(True, self._player_count, False)
+            with babase.ContextRef.empty():
+                bascenev1.new_host_session(
+                    _make_load_benchmark_session_type(self._session_type)
+                )
+            started = True
+        finally:
+            # Put things back (and allow new runs) if we couldn't start.
+            if not started:
+                self._restore()
+
+    def on_set_activity_start(self) -> None:
+        """Called as a session begins setting a new activity."""
+        self._set_activity_time = time.monotonic()
+
+    def on_set_activity_end(self) -> None:
+        """Called as a session finishes setting a new activity."""
+        if self._set_activity_time is not None:
+            self._set_activity_duration = (
+                time.monotonic() - self._set_activity_time
+            )
+
+    def on_begin_activity(
+        self, activity: bascenev1.Activity | None, begin_time: float
+    ) -> None:
+        """Called after a session begins an activity."""
+        now = time.monotonic()
+        if activity is not None and self._set_activity_time is not None:
+            self._transitions.append(
+                LoadBenchmarkTransition(
+                    activity_type=type(activity).__qualname__,
+                    set_time=self._set_activity_duration,
+                    begin_time=now - begin_time,
+                    total_time=now - self._set_activity_time,
+                )
+            )
+        self._set_activity_time = None
+
+        # Make sure games don't run longer than we want.
+        if isinstance(activity, bascenev1.GameActivity):
+            self._game_timer = babase.AppTimer(
+                self._game_duration,
+                babase.CallStrict(self._end_game, weakref.ref(activity)),
+            )
+
+    def on_activity_end(self, activity: bascenev1.Activity) -> bool:
+        """Called when a session's activity ends.
+
+        Returns whether the run is complete.
+        """
+        if isinstance(activity, bascenev1.GameActivity):
+            self._game_timer = None
+            self._games_completed += 1
+            if self._games_completed >= self._game_count:
+                self._finish()
+                return True
+        return False
+
+    def _end_game(self, activityref: weakref.ref[bascenev1.Activity]) -> None:
+        activity = activityref()
+        if (
+            isinstance(activity, bascenev1.GameActivity)
+            and not activity.expired
+            and not activity.has_ended()
+        ):
+            with activity.context:
+                activity.end_game()
+
+    def _sample_step(self) -> None:
+        now = time.monotonic()
+        if self._last_step_time is not None:
+            self._step_intervals.append(now - self._last_step_time)
+        self._last_step_time = now
+        self._blocks_peak = max(self._blocks_peak, sys.getallocatedblocks())
+
+    def _on_gc(self, phase: str, info: dict[str, int]) -> None:
+        if phase == 'start':
+            self._gc_start_time = time.perf_counter()
+        elif phase == 'stop' and self._gc_start_time is not None:
+            self._gc_pauses.append(time.perf_counter() - self._gc_start_time)
+            self._gc_collected += info.get('collected', 0)
+            self._gc_start_time = None
+
+    def _restore(self) -> None:
+        """Undo everything we set up for the run."""
+        # pylint: disable=global-statement
+        global _g_load_benchmark
+
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        self._step_timer = None
+        self._game_timer = None
+        _baclassic.set_stress_testing(False, self._player_count, False)
+        appconfig = babase.app.config
+        for key, val in self._old_config.items():
+            if val is None:
+                appconfig.pop(key, None)
+            else:
+                appconfig[key] = val
+        if _g_load_benchmark is self:
+            _g_load_benchmark = None
+
+    def _finish(self) -> None:
+        self._restore()
+        self._done = True
+
+        env = babase.app.env
+        report = LoadBenchmarkReport(
+            engine_version=env.engine_version,
+            engine_build_number=env.engine_build_number,
+            session_type=self._session_type.__qualname__,
+            playlist_name=self._playlist_name,
+            player_count=self._player_count,
+            game_count=self._games_completed,
+            duration=time.monotonic() - self._start_time,
+            step_intervals=_summarize_samples(self._step_intervals),
+            gc_pauses=_summarize_samples(self._gc_pauses),
+            gc_collected=self._gc_collected,
+            allocated_blocks_start=self._blocks_start,
+            allocated_blocks_end=sys.getallocatedblocks(),
+            allocated_blocks_peak=self._blocks_peak,
+            transitions=self._transitions,
+        )
+        if self._profiler is not None:
+            report.hot_modules, report.hot_functions = _get_hot_spots(
+                self._profiler, self._HOT_SPOT_COUNT
+            )
+
+        steps = report.step_intervals
+        print(
+            f'Load benchmark ({report.game_count} games,'
+            f' {report.player_count} players) took'
+            f' {report.duration:.1f}s; step interval'
+            f' p50 {1000.0 * steps.p50:.1f}ms,'
+            f' p99 {1000.0 * steps.p99:.1f}ms,'
+            f' max {1000.0 * steps.max:.1f}ms;'
+            f' {report.gc_pauses.count} gc pauses'
+            f' (max {1000.0 * report.gc_pauses.max:.1f}ms).'
+        )
+        if self._report_path is not None:
+            try:
+                with open(self._report_path, 'w', encoding='utf-8') as outfile:
+                    outfile.write(dataclass_to_json(report, pretty=True))
+                print(f'Load benchmark report written to {self._report_path}.')
+            except Exception:
+                logging.exception(
+                    'Error writing load benchmark report to %s.',
+                    self._report_path,
+                )
+        if self._on_complete is not None:
+            self._on_complete(report)
+
+
+def _make_load_benchmark_session_type(
+    basetype: type[bascenev1.MultiTeamSession],
+) -> type[bascenev1.MultiTeamSession]:
+    """Return a session type reporting to the running load benchmark."""
+
+    class LoadBenchmarkSession(basetype):  # type: ignore[valid-type, misc]
+        """Session type for the load benchmark."""
+
+        @override
+        def setactivity(self, activity: bascenev1.Activity) -> None:
+            """Set an activity, timing the transition."""
+            bench = _g_load_benchmark
+            if bench is not None:
+                bench.on_set_activity_start()
+            super().setactivity(activity)
+            if bench is not None:
+                bench.on_set_activity_end()
+
+        @override
+        def begin_next_activity(self) -> None:
+            """Begin an activity, timing the transition."""
+            begin_time = time.monotonic()
+            super().begin_next_activity()
+            bench = _g_load_benchmark
+            if bench is not None:
+                bench.on_begin_activity(self.getactivity(), begin_time)
+
+        @override
+        def on_activity_end(
+            self, activity: bascenev1.Activity, results: Any
+        ) -> None:
+            """Move on to the next activity unless we're done."""
+            bench = _g_load_benchmark
+            if bench is not None and bench.on_activity_end(activity):
+                self.end()
+                return
+            super().on_activity_end(activity, results)
+
+    return LoadBenchmarkSession
+
+
+def _summarize_samples(samples: list[float]) -> LoadBenchmarkSummary:
+    if not samples:
+        return LoadBenchmarkSummary()
+    ordered = sorted(samples)
+    count = len(ordered)
+
+    def _percentile(pct: float) -> float:
+        return ordered[min(count - 1, int(count * pct))]
+
+    return LoadBenchmarkSummary(
+        count=count,
+        mean=sum(ordered) / count,
+        p50=_percentile(0.5),
+        p90=_percentile(0.9),
+        p99=_percentile(0.99),
+        max=ordered[-1],
+    )
+
+
+def _get_hot_spots(
+    profiler: cProfile.Profile, count: int
+) -> tuple[list[LoadBenchmarkHotSpot], list[LoadBenchmarkHotSpot]]:
+    """Return the top modules and functions by self-time."""
+    import pstats
+
+    # Map source files back to module names where we can.
+    modules_by_path: dict[str, str] = {}
+    for modname, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+        if isinstance(path, str):
+            modules_by_path[os.path.abspath(path)] = modname
+
+    stats: dict[tuple[str, int, str], tuple[Any, ...]] = pstats.Stats(
+        profiler
+    ).stats  # type: ignore[attr-defined]
+    modules: dict[str, LoadBenchmarkHotSpot] = {}
+    functions: list[LoadBenchmarkHotSpot] = []
+    for (filename, lineno, funcname), funcstats in stats.items():
+        calls, self_time = funcstats[1], funcstats[2]
+        if filename == '~':
+            # Built-in functions.
+            modname = '(builtins)'
+            funcdesc = f'{modname}:{funcname}'
+        else:
+            modname = modules_by_path.get(os.path.abspath(filename), filename)
+            funcdesc = f'{modname}:{lineno}({funcname})'
+        functions.append(
+            LoadBenchmarkHotSpot(
+                name=funcdesc, self_time=self_time, calls=calls
+            )
+        )
+        modspot = modules.get(modname)
+        if modspot is None:
+            modspot = modules[modname] = LoadBenchmarkHotSpot(
+                name=modname, self_time=0.0, calls=0
+            )
+        modspot.self_time += self_time
+        modspot.calls += calls
+
+    def _key(spot: LoadBenchmarkHotSpot) -> float:
+        return -spot.self_time
+
+    return (
+        sorted(modules.values(), key=_key)[:count],
+        sorted(functions, key=_key)[:count],
+    )
+
+
 @dataclass
 class _StressTestArgs:
     playlist_type: str
@@ -4,6 +4,7 @@
 
 from __future__ import annotations
 
+import os
 import sys
 import time
 import logging
@@ -19,72 +20,207 @@ from bacommon.servermanager import (
     ScreenMessageCommand,
     ClientListCommand,
     KickCommand,
+    ExecCommand,
+    LogQueryCommand,
+    ServerControlChannel,
+    ServerControlRequest,
+    ServerControlResponse,
 )
 import babase
 import bascenev1
 
 if TYPE_CHECKING:
-    from typing import Any
+    from typing import Any, Callable
 
     from bacommon.servermanager import ServerConfig
 
 
 def _cmd(command_data: bytes) -> None:
-    """Handle commands coming in from our server manager parent process."""
-    import pickle
+    """Handle commands coming in from our server manager parent process.
 
-    assert babase.app.classic is not None
+    This is the legacy path where commands arrive as Python statements
+    via stdin; it is used only where a control channel is unavailable.
+    """
+    import pickle
 
     command = pickle.loads(command_data)
     assert isinstance(command, ServerCommand)
 
-    if isinstance(command, StartServerModeCommand):
-        assert babase.app.classic.server is None
-        babase.app.classic.server = ServerController(command.config)
-        return
+    result = _run_command(command)
+    if isinstance(command, (ClientListCommand, LogQueryCommand)):
+        print(result)
+
+
+def _start_control_channel(fd: int) -> None:
+    """Begin servicing the control channel from our server manager.
+
+    The manager passes us one end of a connected socket-pair; requests
+    are read on a background thread and run in the logic thread, with
+    each getting a response sent back once it completes.
+    """
+    import socket
+    from threading import Thread
+
+    channel = ServerControlChannel(socket.socket(fileno=fd))
+    Thread(
+        target=_control_channel_thread_main,
+        args=(channel,),
+        name='ServerControlChannel',
+        daemon=True,
+    ).start()
+
+
+def _control_channel_thread_main(channel: ServerControlChannel) -> None:
+    from functools import partial
+
+    while True:
+        try:
+            request = channel.recv()
+        except Exception:
+            logging.exception('Error reading server control channel.')
+            break
+        if request is None:
+            # Our manager went away.
+            break
+        if not isinstance(request, ServerControlRequest):
+            logging.error(
+                'Got unexpected server control message %s.', type(request)
+            )
+            continue
+        babase.pushcall(
+            partial(_handle_control_request, channel, request),
+            from_other_thread=True,
+        )
+
 
-    if isinstance(command, ShutdownCommand):
-        assert babase.app.classic.server is not None
-        babase.app.classic.server.shutdown(
-            reason=command.reason, immediate=command.immediate
+def _handle_control_request(
+    channel: ServerControlChannel, request: ServerControlRequest
+) -> None:
+    """Run a single control request and send its response."""
+    try:
+        response = ServerControlResponse(
+            request_id=request.request_id,
+            result=_run_command(request.command),
         )
-        return
-
-    if isinstance(command, ChatMessageCommand):
-        assert babase.app.classic.server is not None
-        bascenev1.chatmessage(command.message, clients=command.clients)
-        return
-
-    if isinstance(command, ScreenMessageCommand):
-        assert babase.app.classic.server is not None
-
-        # Note: we have to do transient messages if
-        # clients is specified, so they won't show up
-        # in replays.
-        bascenev1.broadcastmessage(
-            command.message,
-            color=command.color,
-            clients=command.clients,
-            transient=command.clients is not None,
+    except Exception as exc:
+        logging.exception(
+            'Error running server command %s.', type(request.command)
         )
-        return
+        response = ServerControlResponse(
+            request_id=request.request_id, error=f'{type(exc).__name__}: {exc}'
+        )
+    try:
+        channel.send(response)
+    except Exception:
+        logging.exception('Error sending server control response.')
 
-    if isinstance(command, ClientListCommand):
-        assert babase.app.classic.server is not None
-        babase.app.classic.server.print_client_list()
-        return
 
-    if isinstance(command, KickCommand):
-        assert babase.app.classic.server is not None
-        babase.app.classic.server.kick(
-            client_id=command.client_id, ban_time=command.ban_time
-        )
-        return
+def _run_command(command: ServerCommand) -> Any:
+    """Run a command from our server manager; return its result."""
+    assert babase.app.classic is not None
+
+    handler = _COMMAND_HANDLERS.get(type(command))
+    if handler is None:
+        raise TypeError(f'Server process got unknown command: {type(command)}.')
+    return handler(command)
+
+
+def _get_server() -> ServerController:
+    assert babase.app.classic is not None
+    server = babase.app.classic.server
+    assert server is not None
+    return server
+
+
+def _run_start_server_mode(command: StartServerModeCommand) -> None:
+    assert babase.app.classic is not None
+    assert babase.app.classic.server is None
+    babase.app.classic.server = ServerController(command.config)
+
+
+def _run_shutdown(command: ShutdownCommand) -> None:
+    _get_server().shutdown(reason=command.reason, immediate=command.immediate)
+
+
+def _run_chat_message(command: ChatMessageCommand) -> None:
+    _get_server()
+    bascenev1.chatmessage(command.message, clients=command.clients)
+
+
+def _run_screen_message(command: ScreenMessageCommand) -> None:
+    _get_server()
+
+    # Note: we have to do transient messages if clients is specified,
+    # so they won't show up in replays.
+    bascenev1.broadcastmessage(
+        command.message,
+        color=command.color,
+        clients=command.clients,
+        transient=command.clients is not None,
+    )
+
+
+def _run_client_list(command: ClientListCommand) -> str:
+    del command  # Unused.
+    return _get_server().get_client_list_str()
+
+
+def _run_kick(command: KickCommand) -> None:
+    _get_server().kick(client_id=command.client_id, ban_time=command.ban_time)
+
 
-    print(
-        f'{Clr.SRED}ERROR: server process'
-        f' got unknown command: {type(command)}{Clr.RST}'
+def _run_exec(command: ExecCommand) -> None:
+    # Behave like the interactive interpreter would (echoing expression
+    # values) when given a single statement.
+    try:
+        code = compile(command.statement, '<server-manager>', 'single')
+    except SyntaxError:
+        code = compile(command.statement, '<server-manager>', 'exec')
+    # pylint: disable=exec-used
+    exec(code, vars(sys.modules['__main__']))
+
+
+def _query_logs(command: LogQueryCommand) -> str:
+    """Return matching entries from our log cache as text."""
+    import datetime
+
+    import baenv
+    from efro.util import utc_now
+
+    envconfig = baenv.get_env_config()
+    if envconfig.log_handler is None:
+        return 'Not available; standard engine logging is not enabled.'
+
+    entries = envconfig.log_handler.query_cached(
+        since=(
+            None
+            if command.since_seconds is None
+            else utc_now() - datetime.timedelta(seconds=command.since_seconds)
+        ),
+        min_level=command.min_level,
+        name_prefix=command.name_prefix,
+        max_entries=command.max_entries,
     )
+    stdnames = ('stdout', 'stderr')
+    lines: list[str] = []
+    for entry in entries:
+        timestamp = entry.time.strftime('%Y-%m-%d %H:%M:%S')
+        level_ex = '' if entry.name in stdnames else f' {entry.level.name}'
+        lines.append(f'{timestamp}{level_ex} {entry.name}: {entry.message}')
+    return '\n'.join(lines)
+
+
+# How we run each command type we can receive.
+_COMMAND_HANDLERS: dict[type[ServerCommand], Callable[[Any], Any]] = {
+    StartServerModeCommand: _run_start_server_mode,
+    ShutdownCommand: _run_shutdown,
+    ChatMessageCommand: _run_chat_message,
+    ScreenMessageCommand: _run_screen_message,
+    ClientListCommand: _run_client_list,
+    KickCommand: _run_kick,
+    ExecCommand: _run_exec,
+    LogQueryCommand: _query_logs,
+}
 
 
 class ServerController:
@@ -101,6 +237,16 @@ class ServerController:
         self._shutdown_reason: ShutdownReason | None = None
         self._executing_shutdown = False
 
+        # Persistent player stats, if enabled.
+        self.player_stats: bascenev1.PlayerStatsStore | None = None
+        if self._config.player_stats_file is not None:
+            self.player_stats = bascenev1.PlayerStatsStore(
+                os.path.join(
+                    os.path.dirname(babase.app.env.config_file_path),
+                    os.path.expanduser(self._config.player_stats_file),
+                )
+            )
+
         # Make note if they want us to import a playlist; we'll need to
         # do that first if so.
         self._playlist_fetch_running = self._config.playlist_code is not None
@@ -124,6 +270,10 @@ class ServerController:
 
     def print_client_list(self) -> None:
         """Print info about all connected clients."""
+        print(self.get_client_list_str())
+
+    def get_client_list_str(self) -> str:
+        """Return a table of info about all connected clients."""
         import json
 
         roster = bascenev1.get_game_roster()
@@ -145,7 +295,7 @@ class ServerController:
             players = ', '.join(n['name'] for n in client['players'])
             clientid = client['client_id']
             out += f'\n{clientid:<{col1}} {name:<{col2}} {players}'
-        print(out)
+        return out
 
     def kick(self, client_id: int, ban_time: int | None) -> None:
         """Kick the provided client id.
@@ -227,8 +377,6 @@ class ServerController:
         )
 
     def _access_check_response(self, data: dict[str, Any] | None) -> None:
-        import os
-
         if data is None:
             print('error on UDP port access check (internet down?)')
         else:
@@ -335,6 +483,38 @@ class ServerController:
         self._config.session_type = typename
         self._playlist_name = result['playlistName']
 
+    def _run_load_benchmark(self, sessiontype: type[bascenev1.Session]) -> None:
+        assert babase.app.classic is not None
+        assert self._config.stress_test_games is not None
+
+        # Benchmarks only know how to run team/ffa games.
+        if not issubclass(sessiontype, bascenev1.MultiTeamSession):
+            logging.error(
+                'stress_test_games is not supported with session_type'
+                ' "%s"; starting a regular session instead.',
+                self._config.session_type,
+            )
+            bascenev1.new_host_session(sessiontype)
+            return
+
+        babase.app.classic.run_load_benchmark(
+            session_type=sessiontype,
+            playlist_name=self._playlist_name,
+            player_count=(
+                8
+                if self._config.stress_test_players is None
+                else self._config.stress_test_players
+            ),
+            game_count=self._config.stress_test_games,
+            report_path=os.path.join(
+                os.path.dirname(babase.app.env.config_file_path),
+                os.path.expanduser(self._config.stress_test_report_file),
+            ),
+            on_complete=lambda _report: self.shutdown(
+                ShutdownReason.NONE, immediate=True
+            ),
+        )
+
     def _get_session_type(self) -> type[bascenev1.Session]:
         # Convert string session type to the class.
         # Hmm should we just keep this as a string?
@@ -455,7 +635,10 @@ class ServerController:
         )
 
         # And here.. we.. go.
-        if self._config.stress_test_players is not None:
+        if self._config.stress_test_games is not None:
+            # Special case: run a load benchmark and then exit.
+            self._run_load_benchmark(sessiontype)
+        elif self._config.stress_test_players is not None:
             # Special case: run a stress test.
             assert babase.app.classic is not None
             babase.app.classic.run_stress_test(
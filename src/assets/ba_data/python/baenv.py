@@ -22,13 +22,17 @@ import sys
 import time
 import random
 import logging
+import threading
 from pathlib import Path
+from functools import partial
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, cast
 import __main__
 
 if TYPE_CHECKING:
-    from typing import Any, Callable
+    from types import ModuleType
+    from typing import Any, Callable, Sequence
+    from importlib.machinery import ModuleSpec
 
     from efro.logging import LogHandler
 
@@ -102,6 +106,128 @@ class EnvConfig:
     #: Timestamp when we first started doing stuff.
     launch_time: float
 
+    #: Records module import times if the ``BA_IMPORT_TIMES`` env var
+    #: was set to ``1``.
+    import_timer: ImportTimer | None = None
+
+
+@dataclass
+class ImportTime:
+    """How long a single module took to import."""
+
+    #: Full name of the module.
+    name: str
+
+    #: Seconds spent running the module, including imports it triggered.
+    cumulative: float
+
+    #: Seconds spent running the module, excluding imports it triggered.
+    own: float
+
+
+class ImportTimer:
+    """Records how long each module takes to import.
+
+    This works by sitting at the front of :data:`sys.meta_path` and
+    timing the execution of each module that gets loaded. Modules loaded
+    before :meth:`install()` is called (or built-in/frozen ones) are not
+    covered.
+    """
+
+    def __init__(self) -> None:
+        #: Recorded times, in the order imports completed.
+        self.times: list[ImportTime] = []
+
+        # Per-thread stacks of time spent in nested imports.
+        self._nested = threading.local()
+
+    def install(self) -> None:
+        """Start timing imports."""
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        """Stop timing imports."""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Sequence[str] | None,
+        target: ModuleType | None = None,
+    ) -> ModuleSpec | None:
+        """Find a spec via the other finders and time its loading.
+
+        :meta private:
+        """
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, 'find_spec', None)
+            if find_spec is None:
+                continue
+            spec = cast('ModuleSpec | None', find_spec(fullname, path, target))
+            if spec is not None:
+                break
+        else:
+            return None
+
+        # Wrap the loader's exec_module() unless it has already been.
+        # Loaders for built-in and frozen modules are classes shared by
+        # all such modules, so we leave those alone.
+        loader = spec.loader
+        if loader is not None and not isinstance(loader, type):
+            try:
+                if 'exec_module' not in vars(loader):
+                    loader.exec_module = partial(  # type: ignore[method-assign]
+                        self._exec_module, loader.exec_module
+                    )
+            except TypeError:
+                # Loader without a __dict__; can't time it.
+                pass
+        return spec
+
+    def get_report(self, limit: int = 40) -> str:
+        """Return a readable summary of the slowest imports."""
+        total = sum(t.own for t in self.times)
+        lines = [
+            f'Imported {len(self.times)} modules in {total * 1000.0:.1f} ms;'
+            f' slowest {min(limit, len(self.times))}'
+            f' (cumulative ms, own ms, module):'
+        ]
+        for itime in sorted(
+            self.times, key=lambda t: t.cumulative, reverse=True
+        )[:limit]:
+            lines.append(
+                f'{itime.cumulative * 1000.0:9.1f}'
+                f' {itime.own * 1000.0:9.1f}  {itime.name}'
+            )
+        return '\n'.join(lines)
+
+    def _exec_module(
+        self, exec_module: Callable[[ModuleType], None], module: ModuleType
+    ) -> None:
+        nested: list[float] | None = getattr(self._nested, 'stack', None)
+        if nested is None:
+            nested = self._nested.stack = []
+        nested.append(0.0)
+        starttime = time.perf_counter()
+        try:
+            exec_module(module)
+        finally:
+            duration = time.perf_counter() - starttime
+            nested_duration = nested.pop()
+            if nested:
+                nested[-1] += duration
+            self.times.append(
+                ImportTime(
+                    name=module.__name__,
+                    cumulative=duration,
+                    own=duration - nested_duration,
+                )
+            )
+
 
 @dataclass
 class _EnvGlobals:
@@ -208,6 +334,13 @@ def configure(
         )
     envglobals.called_configure = True
 
+    # If asked, start timing imports before we do anything else so we
+    # see as much of startup as possible.
+    import_timer: ImportTimer | None = None
+    if os.environ.get('BA_IMPORT_TIMES') == '1':
+        import_timer = ImportTimer()
+        import_timer.install()
+
     # The very first thing we do is setup Python paths (while also
     # calculating some engine paths). This code needs to be bulletproof
     # since we have no logging yet at this point. We used to set up
@@ -258,6 +391,12 @@ def configure(
     if setup_logging:
         _set_log_levels(app_config)
 
+        # Make sure the import-time report we were asked for shows up.
+        if import_timer is not None:
+            perflogger = logging.getLogger('ba.perf')
+            if not perflogger.isEnabledFor(logging.INFO):
+                perflogger.setLevel(logging.INFO)
+
     # We want to always be run in UTF-8 mode; complain if we're not.
     if sys.flags.utf8_mode != 1:
         logger.warning(
@@ -315,6 +454,7 @@ def configure(
         is_user_app_python_dir=is_user_app_python_dir,
         initial_app_config=app_config,
         launch_time=launch_time,
+        import_timer=import_timer,
     )
 
 
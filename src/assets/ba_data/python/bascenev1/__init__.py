@@ -10,63 +10,15 @@
 # dependency loops. The exception is TYPE_CHECKING blocks and
 # annotations since those aren't evaluated at runtime.
 
-import logging
-
-# Aside from our own stuff, we also bundle a number of things from ba or
-# other modules; the goal is to let most simple mods rely solely on this
-# module to keep things simple.
+# To keep startup quick, names from our submodules (and those we bundle
+# from babase) are imported only when first accessed. To expose a new
+# one, import it in the lazy-import block below, add it to __all__,
+# and run 'make update' to regenerate the lookup table.
 
-from babase import (
-    ActivityNotFoundError,
-    add_clean_frame_callback,
-    app,
-    App,
-    AppIntent,
-    AppIntentDefault,
-    AppIntentExec,
-    AppMode,
-    AppState,
-    apptime,
-    AppTime,
-    apptimer,
-    AppTimer,
-    Call,
-    CallPartial,
-    CallStrict,
-    ContextError,
-    ContextRef,
-    displaytime,
-    DisplayTime,
-    displaytimer,
-    DisplayTimer,
-    existing,
-    fade_screen,
-    get_remote_app_name,
-    increment_analytics_count,
-    InputType,
-    is_point_in_box,
-    lock_all_input,
-    Lstr,
-    NodeNotFoundError,
-    normalized_color,
-    NotFoundError,
-    PlayerNotFoundError,
-    Plugin,
-    pushcall,
-    safecolor,
-    screenmessage,
-    set_analytics_screen,
-    SessionNotFoundError,
-    SessionTeamNotFoundError,
-    storagename,
-    timestring,
-    UIScale,
-    unlock_all_input,
-    Vec3,
-    WeakCall,
-    WeakCallPartial,
-    WeakCallStrict,
-)
+import logging
+import os
+import importlib
+from typing import TYPE_CHECKING
 
 from _bascenev1 import (
     ActivityData,
@@ -157,101 +109,345 @@ from _bascenev1 import (
     timer,
     Timer,
 )
-from bascenev1._activity import Activity
-from bascenev1._activitytypes import JoinActivity, ScoreScreenActivity
-from bascenev1._actor import Actor
-from bascenev1._campaign import init_campaigns, Campaign
-from bascenev1._collision import Collision, getcollision
-from bascenev1._coopgame import CoopGameActivity
-from bascenev1._coopsession import CoopSession
-from bascenev1._debug import print_live_object_warnings
-from bascenev1._dependency import (
-    Dependency,
-    DependencyComponent,
-    DependencySet,
-    AssetPackage,
-)
-from bascenev1._dualteamsession import DualTeamSession
-from bascenev1._freeforallsession import FreeForAllSession
-from bascenev1._gameactivity import GameActivity
-from bascenev1._gameresults import GameResults, WinnerGroup
-from bascenev1._gameutils import (
-    animate,
-    animate_array,
-    BaseTime,
-    cameraflash,
-    GameTip,
-    get_trophy_string,
-    show_damage_count,
-    Time,
-)
-from bascenev1._level import Level
-from bascenev1._lobby import Lobby, Chooser, JoinInfo
-from bascenev1._map import (
-    get_filtered_map_name,
-    get_map_class,
-    get_map_display_string,
-    Map,
-    register_map,
-)
-from bascenev1._messages import (
-    CelebrateMessage,
-    DeathType,
-    DieMessage,
-    DropMessage,
-    DroppedMessage,
-    FreezeMessage,
-    HitMessage,
-    ImpactDamageMessage,
-    OutOfBoundsMessage,
-    PickedUpMessage,
-    PickUpMessage,
-    PlayerDiedMessage,
-    PlayerProfilesChangedMessage,
-    ShouldShatterMessage,
-    StandMessage,
-    ThawMessage,
-    UNHANDLED,
-)
-from bascenev1._multiteamsession import (
-    MultiTeamSession,
-    DEFAULT_TEAM_COLORS,
-    DEFAULT_TEAM_NAMES,
-)
-from bascenev1._music import MusicType, setmusic
-from bascenev1._net import HostInfo
-from bascenev1._nodeactor import NodeActor
-from bascenev1._powerup import get_default_powerup_distribution
-from bascenev1._profile import (
-    get_player_colors,
-    get_player_profile_icon,
-    get_player_profile_colors,
-)
-from bascenev1._player import PlayerInfo, Player, EmptyPlayer, StandLocation
-from bascenev1._playlist import (
-    get_default_free_for_all_playlist,
-    get_default_teams_playlist,
-    filter_playlist,
-)
-from bascenev1._powerup import PowerupMessage, PowerupAcceptMessage
-from bascenev1._score import ScoreType, ScoreConfig
-from bascenev1._settings import (
-    BoolSetting,
-    ChoiceSetting,
-    FloatChoiceSetting,
-    FloatSetting,
-    IntChoiceSetting,
-    IntSetting,
-    Setting,
-)
-from bascenev1._session import (
-    Session,
-    set_player_rejoin_cooldown,
-    set_max_players_override,
-)
-from bascenev1._stats import PlayerScoredMessage, PlayerRecord, Stats
-from bascenev1._team import SessionTeam, Team, EmptyTeam
-from bascenev1._teamgame import TeamGameActivity
+
+# Set BA_EAGER_IMPORTS=1 to import everything up front instead (handy
+# for tracking down import problems or comparing startup times).
+_LAZY_IMPORTS = os.environ.get('BA_EAGER_IMPORTS') != '1'
+
+if TYPE_CHECKING or not _LAZY_IMPORTS:
+    # Aside from our own stuff, we also bundle a number of things from ba or
+    # other modules; the goal is to let most simple mods rely solely on this
+    # module to keep things simple.
+
+    from babase import (
+        ActivityNotFoundError,
+        add_clean_frame_callback,
+        app,
+        App,
+        AppIntent,
+        AppIntentDefault,
+        AppIntentExec,
+        AppMode,
+        AppState,
+        apptime,
+        AppTime,
+        apptimer,
+        AppTimer,
+        Call,
+        CallPartial,
+        CallStrict,
+        ContextError,
+        ContextRef,
+        displaytime,
+        DisplayTime,
+        displaytimer,
+        DisplayTimer,
+        existing,
+        fade_screen,
+        get_remote_app_name,
+        increment_analytics_count,
+        InputType,
+        is_point_in_box,
+        lock_all_input,
+        Lstr,
+        NodeNotFoundError,
+        normalized_color,
+        NotFoundError,
+        PlayerNotFoundError,
+        Plugin,
+        pushcall,
+        safecolor,
+        screenmessage,
+        set_analytics_screen,
+        SessionNotFoundError,
+        SessionTeamNotFoundError,
+        storagename,
+        timestring,
+        UIScale,
+        unlock_all_input,
+        Vec3,
+        WeakCall,
+        WeakCallPartial,
+        WeakCallStrict,
+    )
+
+    from bascenev1._activity import Activity
+    from bascenev1._activitytypes import JoinActivity, ScoreScreenActivity
+    from bascenev1._actor import Actor
+    from bascenev1._campaign import init_campaigns, Campaign
+    from bascenev1._collision import Collision, getcollision
+    from bascenev1._coopgame import CoopGameActivity
+    from bascenev1._coopsession import CoopSession
+    from bascenev1._debug import print_live_object_warnings
+    from bascenev1._dependency import (
+        Dependency,
+        DependencyComponent,
+        DependencySet,
+        AssetPackage,
+    )
+    from bascenev1._dualteamsession import DualTeamSession
+    from bascenev1._freeforallsession import FreeForAllSession
+    from bascenev1._gameactivity import GameActivity
+    from bascenev1._gameresults import GameResults, WinnerGroup
+    from bascenev1._gameutils import (
+        animate,
+        animate_array,
+        BaseTime,
+        cameraflash,
+        GameTip,
+        get_trophy_string,
+        show_damage_count,
+        Time,
+    )
+    from bascenev1._level import Level
+    from bascenev1._lobby import Lobby, Chooser, JoinInfo
+    from bascenev1._map import (
+        get_filtered_map_name,
+        get_map_class,
+        get_map_display_string,
+        Map,
+        register_map,
+    )
+    from bascenev1._messages import (
+        CelebrateMessage,
+        DeathType,
+        DieMessage,
+        DropMessage,
+        DroppedMessage,
+        FreezeMessage,
+        HitMessage,
+        ImpactDamageMessage,
+        OutOfBoundsMessage,
+        PickedUpMessage,
+        PickUpMessage,
+        PlayerDiedMessage,
+        PlayerProfilesChangedMessage,
+        ShouldShatterMessage,
+        StandMessage,
+        ThawMessage,
+        UNHANDLED,
+    )
+    from bascenev1._multiteamsession import (
+        MultiTeamSession,
+        DEFAULT_TEAM_COLORS,
+        DEFAULT_TEAM_NAMES,
+    )
+    from bascenev1._music import MusicType, setmusic
+    from bascenev1._net import HostInfo
+    from bascenev1._nodeactor import NodeActor
+    from bascenev1._powerup import get_default_powerup_distribution
+    from bascenev1._profile import (
+        get_player_colors,
+        get_player_profile_icon,
+        get_player_profile_colors,
+    )
+    from bascenev1._player import PlayerInfo, Player, EmptyPlayer, StandLocation
+    from bascenev1._playerstats import (
+        LeaderboardEntry,
+        PlayerStat,
+        PlayerStatsStore,
+    )
+    from bascenev1._playlist import (
+        clear_playlist_cache,
+        get_default_free_for_all_playlist,
+        get_default_teams_playlist,
+        filter_playlist,
+    )
+    from bascenev1._powerup import PowerupMessage, PowerupAcceptMessage
+    from bascenev1._score import ScoreType, ScoreConfig
+    from bascenev1._settings import (
+        BoolSetting,
+        ChoiceSetting,
+        FloatChoiceSetting,
+        FloatSetting,
+        IntChoiceSetting,
+        IntSetting,
+        Setting,
+    )
+    from bascenev1._session import (
+        Session,
+        set_player_rejoin_cooldown,
+        set_max_players_override,
+    )
+    from bascenev1._spatial import SpatialIndex
+    from bascenev1._stats import PlayerScoredMessage, PlayerRecord, Stats
+    from bascenev1._team import SessionTeam, Team, EmptyTeam
+    from bascenev1._teamgame import TeamGameActivity
+
+# __LAZY_IMPORTS_BEGIN__
+# This section generated by batools.lazyimports; do not edit.
+
+# Names we provide but only import from their modules when
+# first accessed (see lazy-import block above).
+_LAZY_ATTRS: dict[str, str] = {
+    'Activity': 'bascenev1._activity',
+    'ActivityNotFoundError': 'babase',
+    'Actor': 'bascenev1._actor',
+    'App': 'babase',
+    'AppIntent': 'babase',
+    'AppIntentDefault': 'babase',
+    'AppIntentExec': 'babase',
+    'AppMode': 'babase',
+    'AppState': 'babase',
+    'AppTime': 'babase',
+    'AppTimer': 'babase',
+    'AssetPackage': 'bascenev1._dependency',
+    'BaseTime': 'bascenev1._gameutils',
+    'BoolSetting': 'bascenev1._settings',
+    'Call': 'babase',
+    'CallPartial': 'babase',
+    'CallStrict': 'babase',
+    'Campaign': 'bascenev1._campaign',
+    'CelebrateMessage': 'bascenev1._messages',
+    'ChoiceSetting': 'bascenev1._settings',
+    'Chooser': 'bascenev1._lobby',
+    'Collision': 'bascenev1._collision',
+    'ContextError': 'babase',
+    'ContextRef': 'babase',
+    'CoopGameActivity': 'bascenev1._coopgame',
+    'CoopSession': 'bascenev1._coopsession',
+    'DEFAULT_TEAM_COLORS': 'bascenev1._multiteamsession',
+    'DEFAULT_TEAM_NAMES': 'bascenev1._multiteamsession',
+    'DeathType': 'bascenev1._messages',
+    'Dependency': 'bascenev1._dependency',
+    'DependencyComponent': 'bascenev1._dependency',
+    'DependencySet': 'bascenev1._dependency',
+    'DieMessage': 'bascenev1._messages',
+    'DisplayTime': 'babase',
+    'DisplayTimer': 'babase',
+    'DropMessage': 'bascenev1._messages',
+    'DroppedMessage': 'bascenev1._messages',
+    'DualTeamSession': 'bascenev1._dualteamsession',
+    'EmptyPlayer': 'bascenev1._player',
+    'EmptyTeam': 'bascenev1._team',
+    'FloatChoiceSetting': 'bascenev1._settings',
+    'FloatSetting': 'bascenev1._settings',
+    'FreeForAllSession': 'bascenev1._freeforallsession',
+    'FreezeMessage': 'bascenev1._messages',
+    'GameActivity': 'bascenev1._gameactivity',
+    'GameResults': 'bascenev1._gameresults',
+    'GameTip': 'bascenev1._gameutils',
+    'HitMessage': 'bascenev1._messages',
+    'HostInfo': 'bascenev1._net',
+    'ImpactDamageMessage': 'bascenev1._messages',
+    'InputType': 'babase',
+    'IntChoiceSetting': 'bascenev1._settings',
+    'IntSetting': 'bascenev1._settings',
+    'JoinActivity': 'bascenev1._activitytypes',
+    'JoinInfo': 'bascenev1._lobby',
+    'LeaderboardEntry': 'bascenev1._playerstats',
+    'Level': 'bascenev1._level',
+    'Lobby': 'bascenev1._lobby',
+    'Lstr': 'babase',
+    'Map': 'bascenev1._map',
+    'MultiTeamSession': 'bascenev1._multiteamsession',
+    'MusicType': 'bascenev1._music',
+    'NodeActor': 'bascenev1._nodeactor',
+    'NodeNotFoundError': 'babase',
+    'NotFoundError': 'babase',
+    'OutOfBoundsMessage': 'bascenev1._messages',
+    'PickUpMessage': 'bascenev1._messages',
+    'PickedUpMessage': 'bascenev1._messages',
+    'Player': 'bascenev1._player',
+    'PlayerDiedMessage': 'bascenev1._messages',
+    'PlayerInfo': 'bascenev1._player',
+    'PlayerNotFoundError': 'babase',
+    'PlayerProfilesChangedMessage': 'bascenev1._messages',
+    'PlayerRecord': 'bascenev1._stats',
+    'PlayerScoredMessage': 'bascenev1._stats',
+    'PlayerStat': 'bascenev1._playerstats',
+    'PlayerStatsStore': 'bascenev1._playerstats',
+    'Plugin': 'babase',
+    'PowerupAcceptMessage': 'bascenev1._powerup',
+    'PowerupMessage': 'bascenev1._powerup',
+    'ScoreConfig': 'bascenev1._score',
+    'ScoreScreenActivity': 'bascenev1._activitytypes',
+    'ScoreType': 'bascenev1._score',
+    'Session': 'bascenev1._session',
+    'SessionNotFoundError': 'babase',
+    'SessionTeam': 'bascenev1._team',
+    'SessionTeamNotFoundError': 'babase',
+    'Setting': 'bascenev1._settings',
+    'ShouldShatterMessage': 'bascenev1._messages',
+    'SpatialIndex': 'bascenev1._spatial',
+    'StandLocation': 'bascenev1._player',
+    'StandMessage': 'bascenev1._messages',
+    'Stats': 'bascenev1._stats',
+    'Team': 'bascenev1._team',
+    'TeamGameActivity': 'bascenev1._teamgame',
+    'ThawMessage': 'bascenev1._messages',
+    'Time': 'bascenev1._gameutils',
+    'UIScale': 'babase',
+    'UNHANDLED': 'bascenev1._messages',
+    'Vec3': 'babase',
+    'WeakCall': 'babase',
+    'WeakCallPartial': 'babase',
+    'WeakCallStrict': 'babase',
+    'WinnerGroup': 'bascenev1._gameresults',
+    'add_clean_frame_callback': 'babase',
+    'animate': 'bascenev1._gameutils',
+    'animate_array': 'bascenev1._gameutils',
+    'app': 'babase',
+    'apptime': 'babase',
+    'apptimer': 'babase',
+    'cameraflash': 'bascenev1._gameutils',
+    'clear_playlist_cache': 'bascenev1._playlist',
+    'displaytime': 'babase',
+    'displaytimer': 'babase',
+    'existing': 'babase',
+    'fade_screen': 'babase',
+    'filter_playlist': 'bascenev1._playlist',
+    'get_default_free_for_all_playlist': 'bascenev1._playlist',
+    'get_default_powerup_distribution': 'bascenev1._powerup',
+    'get_default_teams_playlist': 'bascenev1._playlist',
+    'get_filtered_map_name': 'bascenev1._map',
+    'get_map_class': 'bascenev1._map',
+    'get_map_display_string': 'bascenev1._map',
+    'get_player_colors': 'bascenev1._profile',
+    'get_player_profile_colors': 'bascenev1._profile',
+    'get_player_profile_icon': 'bascenev1._profile',
+    'get_remote_app_name': 'babase',
+    'get_trophy_string': 'bascenev1._gameutils',
+    'getcollision': 'bascenev1._collision',
+    'increment_analytics_count': 'babase',
+    'init_campaigns': 'bascenev1._campaign',
+    'is_point_in_box': 'babase',
+    'lock_all_input': 'babase',
+    'normalized_color': 'babase',
+    'print_live_object_warnings': 'bascenev1._debug',
+    'pushcall': 'babase',
+    'register_map': 'bascenev1._map',
+    'safecolor': 'babase',
+    'screenmessage': 'babase',
+    'set_analytics_screen': 'babase',
+    'set_max_players_override': 'bascenev1._session',
+    'set_player_rejoin_cooldown': 'bascenev1._session',
+    'setmusic': 'bascenev1._music',
+    'show_damage_count': 'bascenev1._gameutils',
+    'storagename': 'babase',
+    'timestring': 'babase',
+    'unlock_all_input': 'babase',
+}
+
+if not TYPE_CHECKING:
+
+    def __getattr__(name: str) -> object:
+        modname = _LAZY_ATTRS.get(name)
+        if modname is None:
+            raise AttributeError(
+                f'module {__name__!r} has no attribute {name!r}'
+            )
+        value = getattr(importlib.import_module(modname), name)
+
+        # Store it so we don't come through here next time.
+        globals()[name] = value
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(globals()) | _LAZY_ATTRS.keys())
+
+
+# __LAZY_IMPORTS_END__
 
 __all__ = [
     'Activity',
@@ -290,6 +486,7 @@ __all__ = [
     'chatmessage',
     'ChoiceSetting',
     'Chooser',
+    'clear_playlist_cache',
     'client_info_query_response',
     'Collision',
     'CollisionMesh',
@@ -382,6 +579,7 @@ __all__ = [
     'is_replay_paused',
     'JoinActivity',
     'JoinInfo',
+    'LeaderboardEntry',
     'Level',
     'Lobby',
     'lock_all_input',
@@ -413,6 +611,8 @@ __all__ = [
     'PlayerNotFoundError',
     'PlayerRecord',
     'PlayerScoredMessage',
+    'PlayerStat',
+    'PlayerStatsStore',
     'Plugin',
     'PowerupAcceptMessage',
     'PowerupMessage',
@@ -464,6 +664,7 @@ __all__ = [
     'ShouldShatterMessage',
     'show_damage_count',
     'Sound',
+    'SpatialIndex',
     'StandLocation',
     'StandMessage',
     'Stats',
@@ -12,6 +12,7 @@ import babase
 import _bascenev1
 from bascenev1._dependency import DependencyComponent
 from bascenev1._messages import UNHANDLED
+from bascenev1._spatial import SpatialIndex
 
 if TYPE_CHECKING:
     from typing import Any, Self
@@ -172,6 +173,7 @@ class Activity[PlayerT: bascenev1.Player, TeamT: bascenev1.Team](
         self._actor_weak_refs: list[weakref.ref[bascenev1.Actor]] = []
         self._last_prune_dead_actors_time = babase.apptime()
         self._prune_dead_actors_timer: bascenev1.Timer | None = None
+        self._spatial_index = SpatialIndex()
 
         self.teams = []
         self.players = []
@@ -214,6 +216,17 @@ class Activity[PlayerT: bascenev1.Player, TeamT: bascenev1.Team](
             raise babase.NodeNotFoundError()
         return node
 
+    @property
+    def spatial_index(self) -> bascenev1.SpatialIndex:
+        """A :class:`~bascenev1.SpatialIndex` of nodes in the activity.
+
+        Use this for proximity queries (nearest nodes, nodes within a
+        radius, etc.) instead of walking node lists. Spaz actors add
+        their nodes here automatically; anything else can add nodes it
+        wants included.
+        """
+        return self._spatial_index
+
     @property
     def stats(self) -> bascenev1.Stats:
         """The stats instance accessible while the activity is running.
@@ -777,6 +790,7 @@ class Activity[PlayerT: bascenev1.Player, TeamT: bascenev1.Team](
         self._expire_actors()
         self._expire_players()
         self._expire_teams()
+        self._spatial_index.clear()
 
         # This will kill all low level stuff: Timers, Nodes, etc., which
         # should clear up any remaining refs to our Activity and allow us
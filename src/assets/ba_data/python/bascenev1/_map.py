@@ -290,11 +290,14 @@ class Map(Actor):
         will be as far from these players as possible.
         """
 
-        # Get positions for existing players.
-        player_pts = []
+        # Spaz actors keep their nodes in the activity's spatial index;
+        # we measure against the ones belonging to live players.
+        player_nodes: set[bascenev1.Node] = set()
         for player in players:
             if player.is_alive():
-                player_pts.append(player.position)
+                node = getattr(player.actor, 'node', None)
+                if node:
+                    player_nodes.add(node)
 
         def _getpt() -> Sequence[float]:
             point = self.ffa_spawn_points[self._next_ffa_start_index]
@@ -310,24 +313,17 @@ class Map(Actor):
             )
             return point
 
-        if not player_pts:
+        if not player_nodes:
             return _getpt()
 
         # Let's calc several start points and then pick whichever is
         # farthest from all existing players.
-        farthestpt_dist = -1.0
-        farthestpt = None
-        for _i in range(10):
-            testpt = babase.Vec3(_getpt())
-            closest_player_dist = 9999.0
-            for ppt in player_pts:
-                dist = (ppt - testpt).length()
-                closest_player_dist = min(dist, closest_player_dist)
-            if closest_player_dist > farthestpt_dist:
-                farthestpt_dist = closest_player_dist
-                farthestpt = testpt
-        assert farthestpt is not None
-        return tuple(farthestpt)
+        testpts = [_getpt() for _i in range(10)]
+        return testpts[
+            self.activity.spatial_index.farthest_from(
+                testpts, predicate=lambda node: node in player_nodes
+            )
+        ]
 
     def get_flag_position(
         self, team_index: int | None = None
@@ -359,7 +355,13 @@ class Map(Actor):
 
 def register_map(maptype: type[Map]) -> None:
     """Register a map class with the game."""
+    # pylint: disable=cyclic-import
+    from bascenev1._playlist import clear_playlist_cache
+
     assert babase.app.classic is not None
     if maptype.name in babase.app.classic.maps:
         raise RuntimeError(f'Map "{maptype.name}" is already registered.')
     babase.app.classic.maps[maptype.name] = maptype
+
+    # Playlists may resolve differently now.
+    clear_playlist_cache()
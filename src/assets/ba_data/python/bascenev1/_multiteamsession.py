@@ -4,7 +4,6 @@
 
 from __future__ import annotations
 
-import copy
 import random
 import logging
 from typing import TYPE_CHECKING, override
@@ -101,9 +100,9 @@ class MultiTeamSession(Session):
             self._playlist_name != '__default__'
             and self._playlist_name in playlists
         ):
-            # Make sure to copy this, as we muck with it in place once we've
-            # got it and we don't want that to affect our config.
-            playlist = copy.deepcopy(playlists[self._playlist_name])
+            # No need to copy this; filtering gives us a fresh copy to
+            # muck with.
+            playlist = playlists[self._playlist_name]
         else:
             if self.use_teams:
                 playlist = _playlist.get_default_teams_playlist()
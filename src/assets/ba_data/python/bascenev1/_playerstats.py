@@ -0,0 +1,351 @@
+# Released under the MIT License. See LICENSE for details.
+#
+"""Persistent player stats storage."""
+
+from __future__ import annotations
+
+import time
+import queue
+import asyncio
+import sqlite3
+import logging
+import threading
+from enum import Enum
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import babase
+
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+
+class PlayerStat(Enum):
+    """A stat tracked by a :class:`PlayerStatsStore`."""
+
+    KILLS = 'kills'
+    DEATHS = 'deaths'
+    SCORE = 'score'
+    GAMES = 'games'
+    WINS = 'wins'
+
+
+@dataclass
+class LeaderboardEntry:
+    """A single player's standing on a leaderboard."""
+
+    name: str
+    value: int
+
+
+@dataclass
+class _Record:
+    name: str
+    stat: PlayerStat
+    amount: int
+    time: float
+
+
+@dataclass
+class _Query:
+    stat: PlayerStat
+    count: int
+    days: int | None
+    call: Callable[[list[LeaderboardEntry]], Any]
+
+
+class _Stop:
+    pass
+
+
+_SECONDS_PER_DAY = 86400
+
+_STATS = list(PlayerStat)
+_COLUMNS = ', '.join(stat.value for stat in _STATS)
+_ADD_COLUMNS = ', '.join(
+    f'{stat.value} = {stat.value} + excluded.{stat.value}' for stat in _STATS
+)
+_PLACEHOLDERS = ', '.join('?' for _ in _STATS)
+
+
+class PlayerStatsStore:
+    """Persistent player stats backed by an SQLite database.
+
+    Servers get one of these when ``player_stats_file`` is set in their
+    config; it is fed automatically by :class:`~bascenev1.Stats` and
+    can be accessed as ``babase.app.classic.server.player_stats``.
+
+    Everything touching the database happens in a background thread;
+    records are just queued from the logic thread and written in
+    batches, with a commit at most every commit_interval seconds. The
+    database uses write-ahead logging so outside tools can read it
+    while the server runs.
+
+    All-time top-N leaderboards are kept in memory and refreshed after
+    each commit, so :meth:`get_leaderboard()` costs nothing. Other
+    queries go through :meth:`query_leaderboard()`, which runs them in
+    the background thread and delivers results to the logic thread.
+
+    Players are keyed by their full display name.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        leaderboard_size: int = 10,
+        commit_interval: float = 5.0,
+    ) -> None:
+        self._path = path
+        self._leaderboard_size = leaderboard_size
+        self._commit_interval = commit_interval
+        self._queue: queue.SimpleQueue[_Record | _Query | _Stop] = (
+            queue.SimpleQueue()
+        )
+        self._closing = False
+
+        # Snapshots published by our thread; only ever replaced
+        # wholesale so they are safe to read from anywhere.
+        self._leaderboards: dict[PlayerStat, list[LeaderboardEntry]] = {
+            stat: [] for stat in _STATS
+        }
+
+        self._stopped_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._thread_main, name='PlayerStatsStore', daemon=True
+        )
+        self._thread.start()
+
+        # Make sure everything gets written out as part of app shutdown.
+        babase.app.add_shutdown_task(self._shutdown())
+
+    def record(self, name: str, stat: PlayerStat, amount: int = 1) -> None:
+        """Add an amount to a player's stat."""
+        if self._closing or amount == 0:
+            return
+        self._queue.put(_Record(name, stat, amount, time.time()))
+
+    def get_leaderboard(self, stat: PlayerStat) -> list[LeaderboardEntry]:
+        """Return the all-time top players for a stat, best first.
+
+        This reflects the last commit, so it can lag recent records by
+        up to the commit interval.
+        """
+        return self._leaderboards[stat]
+
+    def query_leaderboard(
+        self,
+        stat: PlayerStat,
+        call: Callable[[list[LeaderboardEntry]], Any],
+        *,
+        count: int = 10,
+        days: int | None = None,
+    ) -> None:
+        """Look up the top players for a stat, best first.
+
+        If days is provided, only stats recorded within that many days
+        (counting today, in UTC) are considered; otherwise stats for all
+        time are. The result is passed to call in the current context;
+        if the context dies before then, call is not run.
+        """
+        if self._closing:
+            raise RuntimeError('PlayerStatsStore is closed.')
+        if days is not None and days < 1:
+            raise ValueError('days must be at least 1.')
+        self._queue.put(_Query(stat, count, days, babase.ContextCall(call)))
+
+    def close(self) -> None:
+        """Write out any pending records and stop.
+
+        This happens automatically at app shutdown.
+        """
+        if not self._closing:
+            self._closing = True
+            self._queue.put(_Stop())
+
+    async def _shutdown(self) -> None:
+        self.close()
+        while not self._stopped_event.is_set():
+            await asyncio.sleep(0.05)
+
+    def _thread_main(self) -> None:
+        try:
+            conn = self._connect()
+        except Exception:
+            logging.exception(
+                'Error opening player stats database at %s.', self._path
+            )
+            self._closing = True
+            self._stopped_event.set()
+            return
+        try:
+            self._refresh_leaderboards(conn, set(_STATS))
+            self._run(conn)
+        except Exception:
+            logging.exception('Error in PlayerStatsStore thread.')
+        finally:
+            conn.close()
+            self._stopped_event.set()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+
+        # With WAL, this can only lose the last commit or two on power
+        # loss; never corrupt things.
+        conn.execute('PRAGMA synchronous=NORMAL')
+        columns = ', '.join(
+            f'{stat.value} INTEGER NOT NULL DEFAULT 0' for stat in _STATS
+        )
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS totals (name TEXT PRIMARY KEY,'
+            f' {columns}, last_seen REAL NOT NULL DEFAULT 0)'
+        )
+        for stat in _STATS:
+            conn.execute(
+                f'CREATE INDEX IF NOT EXISTS totals_{stat.value}'
+                f' ON totals ({stat.value})'
+            )
+
+        # Per-day totals make windowed queries ('this week') cheap
+        # without keeping every individual event around.
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS daily (day INTEGER NOT NULL,'
+            f' name TEXT NOT NULL, {columns}, PRIMARY KEY (day, name))'
+        )
+        return conn
+
+    def _run(self, conn: sqlite3.Connection) -> None:
+        # Pending per-(day, name) deltas, in _STATS order.
+        pending: dict[tuple[int, str], list[int]] = {}
+        last_seen: dict[str, float] = {}
+        flush_time: float | None = None
+        while True:
+            timeout = (
+                None
+                if flush_time is None
+                else max(0.0, flush_time - time.monotonic())
+            )
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, _Record):
+                key = (int(item.time) // _SECONDS_PER_DAY, item.name)
+                deltas = pending.get(key)
+                if deltas is None:
+                    deltas = pending[key] = [0] * len(_STATS)
+                deltas[_STATS.index(item.stat)] += item.amount
+                last_seen[item.name] = item.time
+                if flush_time is None:
+                    flush_time = time.monotonic() + self._commit_interval
+
+            # Write out pending records when it's time, or before
+            # anything that needs to see them.
+            if flush_time is not None and (
+                (item is not None and not isinstance(item, _Record))
+                or time.monotonic() >= flush_time
+            ):
+                self._flush(conn, pending, last_seen)
+                pending = {}
+                last_seen = {}
+                flush_time = None
+
+            if isinstance(item, _Query):
+                self._run_query(conn, item)
+            elif isinstance(item, _Stop):
+                return
+
+    def _flush(
+        self,
+        conn: sqlite3.Connection,
+        pending: dict[tuple[int, str], list[int]],
+        last_seen: dict[str, float],
+    ) -> None:
+        totals: dict[str, list[int]] = {}
+        touched: set[PlayerStat] = set()
+        for (_day, name), deltas in pending.items():
+            total = totals.get(name)
+            if total is None:
+                totals[name] = list(deltas)
+            else:
+                for i, delta in enumerate(deltas):
+                    total[i] += delta
+            for i, delta in enumerate(deltas):
+                if delta:
+                    touched.add(_STATS[i])
+        try:
+            conn.execute('BEGIN')
+            conn.executemany(
+                f'INSERT INTO daily (day, name, {_COLUMNS})'
+                f' VALUES (?, ?, {_PLACEHOLDERS})'
+                f' ON CONFLICT (day, name) DO UPDATE SET {_ADD_COLUMNS}',
+                [
+                    (day, name, *deltas)
+                    for (day, name), deltas in pending.items()
+                ],
+            )
+            conn.executemany(
+                f'INSERT INTO totals (name, {_COLUMNS}, last_seen)'
+                f' VALUES (?, {_PLACEHOLDERS}, ?)'
+                f' ON CONFLICT (name) DO UPDATE SET {_ADD_COLUMNS},'
+                f' last_seen = excluded.last_seen',
+                [
+                    (name, *deltas, last_seen[name])
+                    for name, deltas in totals.items()
+                ],
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            logging.exception('Error writing player stats.')
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            return
+        self._refresh_leaderboards(conn, touched)
+
+    def _refresh_leaderboards(
+        self, conn: sqlite3.Connection, stats: set[PlayerStat]
+    ) -> None:
+        if not stats:
+            return
+        leaderboards = dict(self._leaderboards)
+        for stat in stats:
+            leaderboards[stat] = self._select_top(
+                conn, stat, self._leaderboard_size, None
+            )
+        self._leaderboards = leaderboards
+
+    def _select_top(
+        self,
+        conn: sqlite3.Connection,
+        stat: PlayerStat,
+        count: int,
+        days: int | None,
+    ) -> list[LeaderboardEntry]:
+        column = stat.value
+        if days is None:
+            rows = conn.execute(
+                f'SELECT name, {column} FROM totals'
+                f' ORDER BY {column} DESC LIMIT ?',
+                (count,),
+            )
+        else:
+            first_day = int(time.time()) // _SECONDS_PER_DAY - (days - 1)
+            rows = conn.execute(
+                f'SELECT name, SUM({column}) AS value FROM daily'
+                f' WHERE day >= ? GROUP BY name'
+                f' ORDER BY value DESC LIMIT ?',
+                (first_day, count),
+            )
+        return [LeaderboardEntry(name, value) for name, value in rows]
+
+    def _run_query(self, conn: sqlite3.Connection, query: _Query) -> None:
+        try:
+            result = self._select_top(conn, query.stat, query.count, query.days)
+        except Exception:
+            logging.exception('Error querying player stats.')
+            result = []
+        babase.pushcall(
+            babase.CallStrict(query.call, result), from_other_thread=True
+        )
@@ -5,7 +5,9 @@
 from __future__ import annotations
 
 import copy
+import hashlib
 import logging
+from collections import OrderedDict
 from typing import Any, TYPE_CHECKING
 
 import babase
@@ -14,6 +16,11 @@ if TYPE_CHECKING:
     from typing import Sequence
 
     from bascenev1._session import Session
+    from bascenev1._gameactivity import GameActivity
+
+    # A resolved playlist entry: a template entry with map names
+    # filtered and all settings filled in, plus its game class.
+    CompiledEntry = tuple[dict[str, Any], type[GameActivity]]
 
 PlaylistType = list[dict[str, Any]]
 
@@ -27,22 +34,19 @@ def filter_playlist(
     mark_unowned: bool = False,
     name: str = '?',
 ) -> PlaylistType:
-    # pylint: disable=too-many-statements
     """Return a filtered version of a playlist.
 
     Strips out or replaces invalid or unowned game types, makes sure all
     settings are present, and adds in a 'resolved_type' which is the actual
     type.
-    """
-    # pylint: disable=too-many-branches
-    from bascenev1._map import get_filtered_map_name
-    from bascenev1._gameactivity import GameActivity
 
+    Resolved playlists are cached by content and session type, so
+    filtering the same playlist repeatedly is cheap. The returned list
+    is always a fresh copy which callers are free to modify.
+    """
     assert babase.app.classic is not None
 
-    goodlist: list[dict] = []
     unowned_maps: Sequence[str]
-    available_maps: list[str] = list(babase.app.classic.maps.keys())
     if (remove_unowned or mark_unowned) and babase.app.classic is not None:
         unowned_maps = babase.app.classic.store.get_unowned_maps()
         unowned_game_types = babase.app.classic.store.get_unowned_game_types()
@@ -50,6 +54,124 @@ def filter_playlist(
         unowned_maps = []
         unowned_game_types = set()
 
+    goodlist: list[dict] = []
+    for template, gameclass in _g_playlist_cache.get(
+        playlist, sessiontype, name
+    ):
+        mapname = template['settings']['map']
+        if remove_unowned and (
+            mapname in unowned_maps or gameclass in unowned_game_types
+        ):
+            continue
+        entry = _copy_value(template)
+        if add_resolved_type:
+            entry['resolved_type'] = gameclass
+        if mark_unowned and mapname in unowned_maps:
+            entry['is_unowned_map'] = True
+        if mark_unowned and gameclass in unowned_game_types:
+            entry['is_unowned_game'] = True
+        goodlist.append(entry)
+
+    return goodlist
+
+
+def clear_playlist_cache() -> None:
+    """Drop all cached resolved playlists.
+
+    This happens automatically when maps are registered or a meta-scan
+    completes; it should only be necessary to call this when game
+    types change in some other way.
+    """
+    _g_playlist_cache.clear()
+
+
+class _PlaylistCache:
+    """LRU cache of resolved playlists.
+
+    Keyed by a hash of playlist contents plus session type. Playlists
+    containing entries which fail to resolve are not cached, so those
+    entries get retried (and complained about) each time, as game types
+    may become importable later.
+    """
+
+    def __init__(self, max_entries: int = 32) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[
+            tuple[bytes, type[Session]], list[CompiledEntry]
+        ] = OrderedDict()
+        self._scanresults: object = None
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    def get(
+        self, playlist: PlaylistType, sessiontype: type[Session], name: str
+    ) -> list[CompiledEntry]:
+        """Return a resolved playlist, compiling it if need be."""
+
+        # Game types can appear when meta-scans complete.
+        scanresults = babase.app.meta.scanresults
+        if scanresults is not self._scanresults:
+            self._scanresults = scanresults
+            self._entries.clear()
+
+        key = (
+            hashlib.blake2b(repr(playlist).encode(), digest_size=16).digest(),
+            sessiontype,
+        )
+        compiled = self._entries.get(key)
+        if compiled is not None:
+            self._entries.move_to_end(key)
+            return compiled
+
+        compiled, complete = _compile_playlist(playlist, sessiontype, name)
+        if complete:
+            self._entries[key] = compiled
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return compiled
+
+
+_g_playlist_cache = _PlaylistCache()
+
+
+# Types we can skip copying.
+_IMMUTABLE_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+def _copy_value(value: Any) -> Any:
+    # A cheaper deepcopy for the json-ish stuff in playlists.
+    immutable = _IMMUTABLE_TYPES
+    if isinstance(value, dict):
+        return {
+            key: val if type(val) in immutable else _copy_value(val)
+            for key, val in value.items()
+        }
+    if isinstance(value, list):
+        return [
+            val if type(val) in immutable else _copy_value(val) for val in value
+        ]
+    return value
+
+
+def _compile_playlist(
+    playlist: PlaylistType, sessiontype: type[Session], name: str
+) -> tuple[list[CompiledEntry], bool]:
+    """Resolve a playlist.
+
+    Returns resolved entries and whether all entries resolved.
+    """
+    # pylint: disable=too-many-branches
+    from bascenev1._map import get_filtered_map_name
+    from bascenev1._gameactivity import GameActivity
+
+    assert babase.app.classic is not None
+
+    compiled: list[CompiledEntry] = []
+    complete = True
+    available_maps = babase.app.classic.maps
+
     for entry in copy.deepcopy(playlist):
         # 'map' used to be called 'level' here.
         if 'level' in entry:
@@ -65,8 +187,6 @@ def filter_playlist(
         entry['settings']['map'] = get_filtered_map_name(
             entry['settings']['map']
         )
-        if remove_unowned and entry['settings']['map'] in unowned_maps:
-            continue
 
         # Ok, for each game in our list, try to import the module and grab
         # the actual game class. add successful ones to our initial list
@@ -188,37 +308,31 @@ def filter_playlist(
             if entry['settings']['map'] not in available_maps:
                 raise babase.MapNotFoundError()
 
-            if remove_unowned and gameclass in unowned_game_types:
-                continue
-            if add_resolved_type:
-                entry['resolved_type'] = gameclass
-            if mark_unowned and entry['settings']['map'] in unowned_maps:
-                entry['is_unowned_map'] = True
-            if mark_unowned and gameclass in unowned_game_types:
-                entry['is_unowned_game'] = True
-
             # Make sure all settings the game defines are present.
             neededsettings = gameclass.get_available_settings(sessiontype)
             for setting in neededsettings:
                 if setting.name not in entry['settings']:
                     entry['settings'][setting.name] = setting.default
 
-            goodlist.append(entry)
+            compiled.append((entry, gameclass))
 
         except babase.MapNotFoundError:
+            complete = False
             logging.warning(
                 'Map \'%s\' not found while scanning playlist \'%s\'.',
                 entry['settings']['map'],
                 name,
             )
         except ImportError as exc:
+            complete = False
             logging.warning(
                 'Import failed while scanning playlist \'%s\': %s', name, exc
             )
         except Exception:
+            complete = False
             logging.exception('Error in filter_playlist.')
 
-    return goodlist
+    return compiled, complete
 
 
 def get_default_free_for_all_playlist() -> PlaylistType:
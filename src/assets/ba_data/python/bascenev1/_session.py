@@ -617,6 +617,15 @@ class Session:
     def _complete_end_activity(
         self, activity: bascenev1.Activity, results: Any
     ) -> None:
+        # pylint: disable=cyclic-import
+        from bascenev1._gameresults import GameResults
+
+        if isinstance(results, GameResults):
+            try:
+                self.stats.record_game_results(results)
+            except Exception:
+                logging.exception('Error recording game results.')
+
         # Run the subclass callback in the session context.
         try:
             with self.context:
@@ -0,0 +1,367 @@
+# Released under the MIT License. See LICENSE for details.
+#
+"""Spatial indexing of node positions."""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import babase
+
+if TYPE_CHECKING:
+    from typing import Callable, Iterable, Iterator, Sequence
+
+    import bascenev1
+
+
+class _Entry:
+    """Last known position and grid cell of an indexed node."""
+
+    __slots__ = ('x', 'y', 'z', 'cell')
+
+    def __init__(
+        self, x: float, y: float, z: float, cell: tuple[int, int]
+    ) -> None:
+        self.x = x
+        self.y = y
+        self.z = z
+        self.cell = cell
+
+
+class SpatialIndex:
+    """An index of node positions for fast proximity queries.
+
+    Each :class:`~bascenev1.Activity` provides one of these as its
+    :attr:`~bascenev1.Activity.spatial_index`, so games, actors, and
+    bots can share a single structure instead of each walking node
+    lists.
+
+    Nodes are bucketed in a uniform grid over the horizontal (x/z)
+    plane; query distances are full 3d ones. Node positions are re-read
+    lazily, at most once per app-time step, when the index is next
+    queried; only nodes which have moved to a different grid cell get
+    re-bucketed. Nodes that die are dropped automatically.
+
+    Any node type with a ``position`` attribute can be indexed.
+    """
+
+    #: Default grid cell size. This should be on the order of typical
+    #: query radii.
+    DEFAULT_CELL_SIZE = 4.0
+
+    # Below this many nodes, plain scans beat walking grid cells.
+    _SCAN_THRESHOLD = 16
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE) -> None:
+        if cell_size <= 0.0:
+            raise ValueError('cell_size must be positive.')
+        self._inv_cell_size = 1.0 / cell_size
+        self._cell_size = cell_size
+        self._entries: dict[bascenev1.Node, _Entry] = {}
+        self._cells: dict[tuple[int, int], set[bascenev1.Node]] = {}
+
+        # Bounds of occupied cells (min x, min z, max x, max z). These
+        # may be loose between refreshes, which just costs a bit of
+        # extra searching.
+        self._bounds: tuple[int, int, int, int] | None = None
+        self._refresh_time: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._entries
+
+    def add(self, node: bascenev1.Node) -> None:
+        """Add a node to the index.
+
+        Does nothing if the node is already present or no longer exists.
+        """
+        if node in self._entries or not node:
+            return
+        x, y, z = node.position
+        cell = self._get_cell(x, z)
+        self._entries[node] = _Entry(x, y, z, cell)
+        self._add_to_cell(node, cell)
+
+        # Nodes often get moved into place right after being created,
+        # so make sure we see where they end up.
+        self._refresh_time = None
+
+    def remove(self, node: bascenev1.Node) -> None:
+        """Remove a node from the index if present."""
+        entry = self._entries.pop(node, None)
+        if entry is not None:
+            self._remove_from_cell(node, entry.cell)
+
+    def clear(self) -> None:
+        """Remove all nodes from the index."""
+        self._entries.clear()
+        self._cells.clear()
+        self._bounds = None
+
+    def refresh(self, force: bool = False) -> None:
+        """Update node positions and drop dead nodes.
+
+        Queries call this automatically. It does nothing if it has
+        already run during the current app-time step unless force is
+        True.
+        """
+        now = babase.apptime()
+        if not force and now == self._refresh_time:
+            return
+        self._refresh_time = now
+        inv_cell_size = self._inv_cell_size
+        dead: list[bascenev1.Node] = []
+        for node, entry in self._entries.items():
+            if not node:
+                dead.append(node)
+                continue
+            x, y, z = node.position
+            entry.x = x
+            entry.y = y
+            entry.z = z
+            cell = (
+                math.floor(x * inv_cell_size),
+                math.floor(z * inv_cell_size),
+            )
+            if cell != entry.cell:
+                self._remove_from_cell(node, entry.cell)
+                self._add_to_cell(node, cell)
+                entry.cell = cell
+        for node in dead:
+            self.remove(node)
+        self._update_bounds()
+
+    def items(
+        self,
+    ) -> Iterator[tuple[bascenev1.Node, tuple[float, float, float]]]:
+        """Iterate over indexed nodes and their positions."""
+        self.refresh()
+        for node, entry in list(self._entries.items()):
+            if node:
+                yield node, (entry.x, entry.y, entry.z)
+
+    def nearest(
+        self,
+        point: Sequence[float],
+        count: int = 1,
+        *,
+        max_distance: float | None = None,
+        predicate: Callable[[bascenev1.Node], bool] | None = None,
+    ) -> list[bascenev1.Node]:
+        """Return up to count nodes nearest to a point, nearest first.
+
+        Nodes farther away than max_distance are skipped, as are nodes
+        for which predicate (if provided) returns False.
+        """
+        self.refresh()
+        return [
+            node
+            for _dist_sq, node in self._find_nearest(
+                point,
+                count,
+                (
+                    math.inf
+                    if max_distance is None
+                    else max_distance * max_distance
+                ),
+                predicate,
+            )
+        ]
+
+    def within(
+        self,
+        point: Sequence[float],
+        radius: float,
+        *,
+        predicate: Callable[[bascenev1.Node], bool] | None = None,
+    ) -> list[bascenev1.Node]:
+        """Return nodes within radius of a point, nearest first.
+
+        Nodes for which predicate (if provided) returns False are
+        skipped.
+        """
+        self.refresh()
+        px, py, pz = point[0], point[1], point[2]
+        radius_sq = radius * radius
+        inv_cell_size = self._inv_cell_size
+        minx = math.floor((px - radius) * inv_cell_size)
+        maxx = math.floor((px + radius) * inv_cell_size)
+        minz = math.floor((pz - radius) * inv_cell_size)
+        maxz = math.floor((pz + radius) * inv_cell_size)
+
+        # Visit whichever is fewer; cells in range or occupied cells.
+        cells: list[set[bascenev1.Node]]
+        if (maxx - minx + 1) * (maxz - minz + 1) > len(self._cells):
+            cells = [
+                nodes
+                for (cx, cz), nodes in self._cells.items()
+                if minx <= cx <= maxx and minz <= cz <= maxz
+            ]
+        else:
+            cells = []
+            for cx in range(minx, maxx + 1):
+                for cz in range(minz, maxz + 1):
+                    nodes = self._cells.get((cx, cz))
+                    if nodes is not None:
+                        cells.append(nodes)
+
+        found: list[tuple[float, bascenev1.Node]] = []
+        for nodes in cells:
+            for node in nodes:
+                entry = self._entries[node]
+                dx = entry.x - px
+                dy = entry.y - py
+                dz = entry.z - pz
+                dist_sq = dx * dx + dy * dy + dz * dz
+                if dist_sq <= radius_sq and (
+                    predicate is None or predicate(node)
+                ):
+                    found.append((dist_sq, node))
+        found.sort(key=lambda f: f[0])
+        return [node for _dist_sq, node in found]
+
+    def farthest_from(
+        self,
+        points: Sequence[Sequence[float]],
+        *,
+        predicate: Callable[[bascenev1.Node], bool] | None = None,
+    ) -> int:
+        """Return the index of the point farthest from indexed nodes.
+
+        This is the point whose nearest node is farthest away, which is
+        handy for picking spawn points away from players and the like.
+        Nodes for which predicate (if provided) returns False are
+        ignored. If there are no nodes to consider, returns 0.
+        """
+        if not points:
+            raise ValueError('No points provided.')
+        self.refresh()
+        best_index = 0
+        best_dist_sq = -1.0
+        for i, point in enumerate(points):
+            found = self._find_nearest(point, 1, math.inf, predicate)
+            if not found:
+                return best_index
+            if found[0][0] > best_dist_sq:
+                best_dist_sq = found[0][0]
+                best_index = i
+        return best_index
+
+    def _get_cell(self, x: float, z: float) -> tuple[int, int]:
+        return (
+            math.floor(x * self._inv_cell_size),
+            math.floor(z * self._inv_cell_size),
+        )
+
+    def _add_to_cell(self, node: bascenev1.Node, cell: tuple[int, int]) -> None:
+        nodes = self._cells.get(cell)
+        if nodes is None:
+            nodes = self._cells[cell] = set()
+        nodes.add(node)
+        bounds = self._bounds
+        if bounds is None:
+            self._bounds = (cell[0], cell[1], cell[0], cell[1])
+        elif not (
+            bounds[0] <= cell[0] <= bounds[2]
+            and bounds[1] <= cell[1] <= bounds[3]
+        ):
+            self._bounds = (
+                min(bounds[0], cell[0]),
+                min(bounds[1], cell[1]),
+                max(bounds[2], cell[0]),
+                max(bounds[3], cell[1]),
+            )
+
+    def _remove_from_cell(
+        self, node: bascenev1.Node, cell: tuple[int, int]
+    ) -> None:
+        nodes = self._cells[cell]
+        nodes.discard(node)
+        if not nodes:
+            del self._cells[cell]
+
+    def _update_bounds(self) -> None:
+        if not self._cells:
+            self._bounds = None
+            return
+        xs = [cell[0] for cell in self._cells]
+        zs = [cell[1] for cell in self._cells]
+        self._bounds = (min(xs), min(zs), max(xs), max(zs))
+
+    def _find_nearest(
+        self,
+        point: Sequence[float],
+        count: int,
+        max_dist_sq: float,
+        predicate: Callable[[bascenev1.Node], bool] | None,
+    ) -> list[tuple[float, bascenev1.Node]]:
+        """Return (distance-squared, node) pairs, nearest first."""
+        if count <= 0 or self._bounds is None:
+            return []
+        px, py, pz = point[0], point[1], point[2]
+        found: list[tuple[float, bascenev1.Node]] = []
+
+        def _check(nodes: Iterable[bascenev1.Node]) -> None:
+            for node in nodes:
+                entry = self._entries[node]
+                dx = entry.x - px
+                dy = entry.y - py
+                dz = entry.z - pz
+                dist_sq = dx * dx + dy * dy + dz * dz
+                if dist_sq <= max_dist_sq and (
+                    predicate is None or predicate(node)
+                ):
+                    found.append((dist_sq, node))
+
+        if len(self._entries) <= self._SCAN_THRESHOLD:
+            _check(self._entries)
+            found.sort(key=lambda f: f[0])
+            return found[:count]
+
+        # Search outward ring by ring (squares of cells around the
+        # point's cell) until nothing unvisited could be closer than
+        # what we've got.
+        ccx, ccz = self._get_cell(px, pz)
+        minx, minz, maxx, maxz = self._bounds
+        max_ring = max(ccx - minx, maxx - ccx, ccz - minz, maxz - ccz)
+        for ring in range(max_ring + 1):
+            if 8 * ring > len(self._cells):
+                # Cheaper to pick this ring's cells out of those that
+                # are occupied.
+                for (cx, cz), nodes in self._cells.items():
+                    if max(abs(cx - ccx), abs(cz - ccz)) == ring:
+                        _check(nodes)
+            else:
+                for cell in _ring_cells(ccx, ccz, ring):
+                    cellnodes = self._cells.get(cell)
+                    if cellnodes is not None:
+                        _check(cellnodes)
+
+            # Anything in further rings is at least this far away.
+            reach = ring * self._cell_size
+            reach_sq = reach * reach
+            if reach_sq > max_dist_sq:
+                break
+            if len(found) >= count:
+                found.sort(key=lambda f: f[0])
+                del found[count:]
+                if found[-1][0] <= reach_sq:
+                    break
+        found.sort(key=lambda f: f[0])
+        return found[:count]
+
+
+def _ring_cells(ccx: int, ccz: int, ring: int) -> Iterator[tuple[int, int]]:
+    """Iterate over cells forming a square ring around a cell."""
+    if ring == 0:
+        yield ccx, ccz
+        return
+    for cx in range(ccx - ring, ccx + ring + 1):
+        yield cx, ccz - ring
+        yield cx, ccz + ring
+    for cz in range(ccz - ring + 1, ccz + ring):
+        yield ccx - ring, cz
+        yield ccx + ring, cz
@@ -13,6 +13,7 @@ from dataclasses import dataclass
 import babase
 
 import _bascenev1
+from bascenev1._playerstats import PlayerStat
 
 if TYPE_CHECKING:
     from typing import Any, Sequence
@@ -257,6 +258,14 @@ class Stats:
         self.orchestrahitsound3: bascenev1.Sound | None = None
         self.orchestrahitsound4: bascenev1.Sound | None = None
 
+        # Where we persist stats to, if anywhere.
+        classic = babase.app.classic
+        self._store: bascenev1.PlayerStatsStore | None = (
+            None
+            if classic is None or classic.server is None
+            else classic.server.player_stats
+        )
+
     def setactivity(self, activity: bascenev1.Activity | None) -> None:
         """Set the current activity for this instance."""
 
@@ -329,6 +338,26 @@ class Stats:
                 records[record_id] = record
         return records
 
+    def record_game_results(self, results: bascenev1.GameResults) -> None:
+        """Persist games-played and wins for a finished game.
+
+        Only does anything if a persistent stats store is enabled.
+        """
+        if self._store is None:
+            return
+        # Credit everyone who played in the game (even if they have
+        # since left); wins go to those still on the winning team.
+        winner = results.winning_sessionteam
+        winner_names = (
+            set()
+            if winner is None
+            else {player.getname(full=True) for player in winner.players}
+        )
+        for playerinfo in results.playerinfos:
+            self._store.record(playerinfo.name, PlayerStat.GAMES)
+            if playerinfo.name in winner_names:
+                self._store.record(playerinfo.name, PlayerStat.WINS)
+
     def player_scored(
         self,
         player: bascenev1.Player,
@@ -425,6 +454,8 @@ class Stats:
         if kill:
             s_player.accum_kill_count += 1
             s_player.kill_count += 1
+            if self._store is not None:
+                self._store.record(s_player.name_full, PlayerStat.KILLS)
 
         # Report non-kill scorings.
         try:
@@ -442,6 +473,8 @@ class Stats:
 
         s_player.score += points
         s_player.accumscore += points
+        if self._store is not None:
+            self._store.record(s_player.name_full, PlayerStat.SCORE, points)
 
         # Inform a running game of the score.
         if points != 0:
@@ -464,6 +497,8 @@ class Stats:
         if killed:
             prec.accum_killed_count += 1
             prec.killed_count += 1
+            if self._store is not None:
+                self._store.record(prec.name_full, PlayerStat.DEATHS)
         try:
             if killed and _bascenev1.getactivity().announce_player_deaths:
                 if killer is player:
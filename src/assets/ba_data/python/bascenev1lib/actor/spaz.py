@@ -174,6 +174,7 @@ class Spaz(bs.Actor):
             },
         )
         self.shield: bs.Node | None = None
+        activity.spatial_index.add(self.node)
 
         if start_invincible:
 
@@ -9,13 +9,14 @@ from __future__ import annotations
 import random
 import weakref
 import logging
+from functools import partial
 from typing import TYPE_CHECKING, override
 
 import bascenev1 as bs
 from bascenev1lib.actor.spaz import Spaz
 
 if TYPE_CHECKING:
-    from typing import Any, Sequence, Callable
+    from typing import Any, Sequence, Callable, Mapping
     from bascenev1lib.actor.flag import Flag
 
 LITE_BOT_COLOR = (1.2, 0.9, 0.2)
@@ -25,6 +26,78 @@ DEFAULT_BOT_HIGHLIGHT = (0.1, 0.3, 0.1)
 PRO_BOT_COLOR = (1.0, 0.2, 0.1)
 PRO_BOT_HIGHLIGHT = (0.6, 0.1, 0.05)
 
+# Bots ignore targets more than this far below them (keeps them from
+# following players off cliffs).
+TARGET_MAX_DROP = 5.0
+
+
+def select_targets(
+    bot_positions: Sequence[Sequence[float]],
+    target_positions: Sequence[Sequence[float]],
+) -> list[int]:
+    """Pick the nearest valid target for each of a set of bots.
+
+    Returns the index in target_positions of each bot's target, or -1
+    for bots with no valid target. Targets more than TARGET_MAX_DROP
+    below a bot are not valid for it.
+
+    This does all bots in a single pass over flattened coordinates
+    (comparing squared distances) so is much cheaper than having each
+    bot work out its own target with Vec3 math.
+    """
+    targets = [
+        (i, pos[0], pos[1], pos[2]) for i, pos in enumerate(target_positions)
+    ]
+    out: list[int] = []
+    for botpos in bot_positions:
+        botx, boty, botz = botpos[0], botpos[1], botpos[2]
+        min_y = boty - TARGET_MAX_DROP
+        closest = -1
+        closest_dist_sq = 0.0
+        for i, tx, ty, tz in targets:
+            if ty <= min_y:
+                continue
+            dx = tx - botx
+            dy = ty - boty
+            dz = tz - botz
+            dist_sq = dx * dx + dy * dy + dz * dz
+            if closest == -1 or dist_sq < closest_dist_sq:
+                closest = i
+                closest_dist_sq = dist_sq
+        out.append(closest)
+    return out
+
+
+def select_indexed_targets(
+    index: bs.SpatialIndex,
+    bot_positions: Sequence[Sequence[float]],
+    targets: Mapping[bs.Node, Sequence[float]],
+) -> list[bs.Node | None]:
+    """Pick the nearest valid target node for each of a set of bots.
+
+    Like select_targets(), but uses a spatial index to find targets
+    instead of comparing each bot against every target. Targets are
+    nodes in the index mapped to their positions; other nodes in the
+    index are ignored. Returns None for bots with no valid target.
+    """
+    out: list[bs.Node | None] = []
+    for botpos in bot_positions:
+        found = index.nearest(
+            botpos,
+            predicate=partial(
+                _is_valid_target, targets, botpos[1] - TARGET_MAX_DROP
+            ),
+        )
+        out.append(found[0] if found else None)
+    return out
+
+
+def _is_valid_target(
+    targets: Mapping[bs.Node, Sequence[float]], min_y: float, node: bs.Node
+) -> bool:
+    pos = targets.get(node)
+    return pos is not None and pos[1] > min_y
+
 
 class SpazBotPunchedMessage:
     """A message saying a bs.SpazBot got punched."""
@@ -140,7 +213,10 @@ class SpazBot(Spaz):
 
         self._throw_release_time: float | None = None
         self._have_dropped_throw_bomb: bool | None = None
-        self._player_pts: list[tuple[bs.Vec3, bs.Vec3]] | None = None
+        self._player_pts: (
+            Sequence[tuple[Sequence[float], Sequence[float]]] | None
+        ) = None
+        self._target_index: int | None = None
 
         # These cooldowns didn't exist when these bots were calibrated,
         # so take them out of the equation.
@@ -164,35 +240,32 @@ class SpazBot(Spaz):
 
         Both values will be None in the case of no target.
         """
-        assert self.node
-        botpt = bs.Vec3(self.node.position)
-        closest_dist: float | None = None
-        closest_vel: bs.Vec3 | None = None
-        closest: bs.Vec3 | None = None
         assert self._player_pts is not None
-        for plpt, plvel in self._player_pts:
-            dist = (plpt - botpt).length()
-
-            # Ignore player-points that are significantly below the bot
-            # (keeps bots from following players off cliffs).
-            if (closest_dist is None or dist < closest_dist) and (
-                plpt[1] > botpt[1] - 5.0
-            ):
-                closest_dist = dist
-                closest_vel = plvel
-                closest = plpt
-        if closest_dist is not None:
-            assert closest_vel is not None
-            assert closest is not None
-            return (
-                bs.Vec3(closest[0], closest[1], closest[2]),
-                bs.Vec3(closest_vel[0], closest_vel[1], closest_vel[2]),
-            )
-        return None, None
+        index = self._target_index
+        if index is None:
+            assert self.node
+            index = select_targets(
+                [self.node.position], [pt for pt, _vel in self._player_pts]
+            )[0]
+        if index == -1:
+            return None, None
+        plpt, plvel = self._player_pts[index]
+        return bs.Vec3(plpt), bs.Vec3(plvel)
+
+    def set_player_points(
+        self,
+        pts: Sequence[tuple[Sequence[float], Sequence[float]]],
+        target_index: int | None = None,
+    ) -> None:
+        """Provide the spaz-bot with the locations of its enemies.
 
-    def set_player_points(self, pts: list[tuple[bs.Vec3, bs.Vec3]]) -> None:
-        """Provide the spaz-bot with the locations of its enemies."""
+        Each entry is a position and velocity. If target_index is
+        passed, it is the index of the bot's target in pts (or -1 for
+        none) as chosen by select_targets(); otherwise the bot picks its
+        own target when updating.
+        """
         self._player_pts = pts
+        self._target_index = target_index
 
     def update_ai(self) -> None:
         # pylint: disable=too-many-statements
@@ -1062,8 +1135,29 @@ class SpazBotSet:
             self._bot_update_list + 1
         ) % self._bot_list_count
 
-        # Update our list of player points for the bots to use.
-        player_pts = []
+        # Gather our targets once and then look up one for each bot in
+        # the activity's spatial index before running their updates.
+        target_nodes = self._get_target_nodes()
+        target_pts = [(node.position, node.velocity) for node in target_nodes]
+        target_indices = {node: i for i, node in enumerate(target_nodes)}
+        targets = select_indexed_targets(
+            bs.getactivity().spatial_index,
+            [bot.node.position for bot in bot_list],
+            {node: pt for node, (pt, _vel) in zip(target_nodes, target_pts)},
+        )
+        for bot, target in zip(bot_list, targets):
+            bot.set_player_points(
+                target_pts, -1 if target is None else target_indices[target]
+            )
+            bot.update_ai()
+
+    def _get_target_nodes(self) -> list[bs.Node]:
+        """Return spaz nodes of things our bots attack.
+
+        These need to be in the activity's spatial index (spazzes add
+        themselves there).
+        """
+        nodes: list[bs.Node] = []
         for player in bs.getactivity().players:
             assert isinstance(player, bs.Player)
             try:
@@ -1073,18 +1167,10 @@ class SpazBotSet:
                 if player.is_alive():
                     assert isinstance(player.actor, Spaz)
                     assert player.actor.node
-                    player_pts.append(
-                        (
-                            bs.Vec3(player.actor.node.position),
-                            bs.Vec3(player.actor.node.velocity),
-                        )
-                    )
+                    nodes.append(player.actor.node)
             except Exception:
                 logging.exception('Error on bot-set _update.')
-
-        for bot in bot_list:
-            bot.set_player_points(player_pts)
-            bot.update_ai()
+        return nodes
 
     def clear(self) -> None:
         """Immediately clear out any bots in the set."""
@@ -1180,33 +1266,14 @@ class DemoSpazBotSet(SpazBotSet):
     """
 
     @override
-    def _update(self) -> None:
-        # Update one of our bot lists each time through.
-        # First off, remove no-longer-existing bots from the list.
-        try:
-            bot_list = self._bot_lists[self._bot_update_list] = [
-                b for b in self._bot_lists[self._bot_update_list] if b
-            ]
-        except Exception:
-            bot_list = []
-            logging.exception(
-                'Error updating bot list: %s',
-                self._bot_lists[self._bot_update_list],
-            )
-        self._bot_update_list = (
-            self._bot_update_list + 1
-        ) % self._bot_list_count
+    def _get_target_nodes(self) -> list[bs.Node]:
+        nodes: list[bs.Node] = []
+        our_bots = set(self.get_living_bots())
 
-        # Update our list of player points for the bots to use.
-        spaz_pts = []
-        our_bots = self.get_living_bots()
-        for node in bs.getnodes():
+        # Spazzes keep their nodes in the activity's spatial index, so
+        # we don't need to walk every node in the scene.
+        for node, _pos in bs.getactivity().spatial_index.items():
             spaz = node.getdelegate(Spaz)
             if spaz and spaz.is_alive() and spaz not in our_bots:
-                spaz_pts.append(
-                    (bs.Vec3(node.position), bs.Vec3(node.velocity))
-                )
-
-        for bot in bot_list:
-            bot.set_player_points(spaz_pts)
-            bot.update_ai()
+                nodes.append(node)
+        return nodes
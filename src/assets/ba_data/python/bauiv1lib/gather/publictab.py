@@ -7,6 +7,9 @@ from __future__ import annotations
 
 import copy
 import time
+import bisect
+import asyncio
+import itertools
 from threading import Thread
 from enum import Enum
 from dataclasses import dataclass
@@ -18,10 +21,13 @@ import bauiv1 as bui
 import bascenev1 as bs
 
 if TYPE_CHECKING:
-    from typing import Callable, Any
+    from typing import Callable, Any, Iterator, ValuesView
 
     from bauiv1lib.gather import GatherWindow
 
+    # Ping, entry index, and key; the order parties are displayed in.
+    _SortKey = tuple[float, int, str]
+
 # Print a bit of info about pings, queries, etc.
 DEBUG_SERVER_COMMUNICATION = False
 DEBUG_PROCESSING = False
@@ -59,6 +65,205 @@ class PartyEntry:
         return f'{self.address}_{self.port}'
 
 
+class PartyIndex:
+    """Public parties kept in display order.
+
+    Parties are sorted by ping (unpinged ones last) and then by the
+    order we first heard about them, and the subset matching the
+    current filter is kept in that same order for display. Adding,
+    removing, or updating a single party costs a binary search and a
+    list insert/delete instead of a full re-sort, and the index tracks
+    which display rows have changed so the UI only needs to redraw
+    those.
+    """
+
+    def __init__(self) -> None:
+        self._parties: dict[str, PartyEntry] = {}
+        self._sort_keys: dict[str, _SortKey] = {}
+        self._sorted: list[_SortKey] = []
+        self._displayed: list[_SortKey] = []
+        self._displayed_keys: set[str] = set()
+        self._filter_value = ''
+        self._show = True
+        self._dirty_rows: tuple[int, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._parties)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._parties
+
+    @property
+    def displayed_count(self) -> int:
+        """How many parties are currently displayed."""
+        return len(self._displayed)
+
+    def get(self, key: str) -> PartyEntry | None:
+        """Return the party with the given key, if any."""
+        return self._parties.get(key)
+
+    def values(self) -> ValuesView[PartyEntry]:
+        """Return all parties in no particular order."""
+        return self._parties.values()
+
+    def items(self) -> Iterator[tuple[str, PartyEntry]]:
+        """Iterate over all parties (filtered or not) in sorted order."""
+        for sort_key in self._sorted:
+            yield sort_key[2], self._parties[sort_key[2]]
+
+    def get_displayed(self, row: int) -> PartyEntry:
+        """Return the party displayed at a row."""
+        return self._parties[self._displayed[row][2]]
+
+    def is_displayed(self, key: str) -> bool:
+        """Return whether the party with the given key is displayed."""
+        return key in self._displayed_keys
+
+    def add(self, key: str, party: PartyEntry) -> None:
+        """Add a new party."""
+        if key in self._parties:
+            raise ValueError(f'Party {key!r} is already present.')
+        sort_key = _get_sort_key(key, party)
+        self._parties[key] = party
+        self._sort_keys[key] = sort_key
+        bisect.insort(self._sorted, sort_key)
+        if self._matches(party):
+            self._insert_displayed(sort_key)
+
+    def update(self, key: str) -> None:
+        """Account for changes to a party's values.
+
+        Call this whenever a party's ping or other displayed values
+        change.
+        """
+        party = self._parties[key]
+        old_sort_key = self._sort_keys[key]
+        sort_key = _get_sort_key(key, party)
+        if sort_key != old_sort_key:
+            del self._sorted[bisect.bisect_left(self._sorted, old_sort_key)]
+            bisect.insort(self._sorted, sort_key)
+            self._sort_keys[key] = sort_key
+
+        was_displayed = key in self._displayed_keys
+        displayed = self._matches(party)
+        if was_displayed and displayed and sort_key == old_sort_key:
+            row = bisect.bisect_left(self._displayed, sort_key)
+            self._mark_dirty(row, row)
+            return
+        if was_displayed:
+            self._remove_displayed(old_sort_key)
+        if displayed:
+            self._insert_displayed(sort_key)
+
+    def remove(self, key: str) -> None:
+        """Remove a party if present."""
+        party = self._parties.pop(key, None)
+        if party is None:
+            return
+        sort_key = self._sort_keys.pop(key)
+        del self._sorted[bisect.bisect_left(self._sorted, sort_key)]
+        if key in self._displayed_keys:
+            self._remove_displayed(sort_key)
+
+    def prune(self, keep: Callable[[PartyEntry], bool]) -> None:
+        """Remove all parties for which keep returns False.
+
+        This rebuilds our lists in one pass, so it is cheaper than
+        individual removes when lots of parties are going away.
+        """
+        removed = {
+            key for key, party in self._parties.items() if not keep(party)
+        }
+        if not removed:
+            return
+        for key in removed:
+            del self._parties[key]
+            del self._sort_keys[key]
+        self._sorted = [k for k in self._sorted if k[2] not in removed]
+        if removed & self._displayed_keys:
+            oldcount = len(self._displayed)
+            first_row = next(
+                row
+                for row, sort_key in enumerate(self._displayed)
+                if sort_key[2] in removed
+            )
+            self._displayed = [
+                k for k in self._displayed if k[2] not in removed
+            ]
+            self._displayed_keys -= removed
+            self._mark_dirty(first_row, oldcount - 1)
+
+    def set_filter(self, value: str, show: bool = True) -> None:
+        """Set the filter text for displayed parties.
+
+        Only parties whose names contain the text (ignoring case) are
+        displayed. If show is False, no parties are displayed at all.
+        """
+        value = value.lower()
+        if value == self._filter_value and show == self._show:
+            return
+        oldcount = len(self._displayed)
+        self._filter_value = value
+        self._show = show
+        self._displayed = [
+            sort_key
+            for sort_key in self._sorted
+            if self._matches(self._parties[sort_key[2]])
+        ]
+        self._displayed_keys = {sort_key[2] for sort_key in self._displayed}
+        self._mark_dirty(0, max(oldcount, len(self._displayed)) - 1)
+
+    def pop_dirty_rows(self) -> tuple[int, int] | None:
+        """Return the range of display rows changed since the last call.
+
+        Returns an inclusive (first, last) range of rows whose parties
+        have changed or moved, or None if nothing has changed.
+        """
+        dirty_rows = self._dirty_rows
+        self._dirty_rows = None
+        if dirty_rows is None:
+            return None
+        first, last = dirty_rows[0], min(
+            dirty_rows[1], len(self._displayed) - 1
+        )
+        return None if first > last else (first, last)
+
+    def _matches(self, party: PartyEntry) -> bool:
+        return self._show and (
+            not self._filter_value or self._filter_value in party.name.lower()
+        )
+
+    def _insert_displayed(self, sort_key: _SortKey) -> None:
+        row = bisect.bisect_left(self._displayed, sort_key)
+        self._displayed.insert(row, sort_key)
+        self._displayed_keys.add(sort_key[2])
+
+        # Everything from here down shifts by one.
+        self._mark_dirty(row, len(self._displayed) - 1)
+
+    def _remove_displayed(self, sort_key: _SortKey) -> None:
+        row = bisect.bisect_left(self._displayed, sort_key)
+        del self._displayed[row]
+        self._displayed_keys.discard(sort_key[2])
+        self._mark_dirty(row, len(self._displayed))
+
+    def _mark_dirty(self, first: int, last: int) -> None:
+        if first > last:
+            return
+        if self._dirty_rows is not None:
+            first = min(first, self._dirty_rows[0])
+            last = max(last, self._dirty_rows[1])
+        self._dirty_rows = (first, last)
+
+
+def _get_sort_key(key: str, party: PartyEntry) -> _SortKey:
+    return (
+        party.ping if party.ping is not None else 999999.0,
+        party.index,
+        key,
+    )
+
+
 class UIRow:
     """Wrangles UI for a row in the party list."""
 
@@ -286,84 +491,214 @@ class AddrFetchThread(Thread):
                 sock.close()
 
 
-class PingThread(Thread):
-    """Thread for sending out game pings."""
+class PartyPinger:
+    """Pings parties, multiplexing any number of pings over few sockets.
 
-    def __init__(
-        self,
-        address: str,
-        port: int,
-        call: Callable[[str, int, float | None], int | None],
-    ):
-        super().__init__()
-        self._address = address
-        self._port = port
-        self._call = call
+    All pings go out through a single non-blocking UDP socket per
+    address family, serviced by one task in the logic thread's asyncio
+    loop, so pinging a long party list doesn't need a thread per ping.
+    Results are passed to the provided call (in the logic thread) as
+    round trip times in milliseconds, or None for parties that never
+    responded.
 
-    @override
-    def run(self) -> None:
-        assert bui.app.classic is not None
-        bui.app.classic.ping_thread_count += 1
-        sock: socket.socket | None = None
+    Games answer pings with a bare pong packet carrying no nonce, so
+    replies are matched to pings by address and port, and times are
+    measured from a ping's first attempt.
+    """
 
-        # Prevent shutdown while our thread is doing its thing.
-        if not bui.shutdown_suppress_begin():
-            # App is already shutting down, so we're a no-op.
-            return
+    # Attempts per ping and how long to wait after each.
+    ATTEMPTS = 3
+    ATTEMPT_INTERVAL = 1.0
 
+    def __init__(self, call: Callable[[str, int, float | None], Any]) -> None:
+        self._call = call
+        self._pending: dict[tuple[bytes, int], _PendingPing] = {}
+        self._transports: dict[int, asyncio.DatagramTransport | None] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._closed = False
+        self._running = False
+
+    @property
+    def pending_count(self) -> int:
+        """Number of pings currently in flight."""
+        return len(self._pending)
+
+    def ping(self, address: str, port: int) -> None:
+        """Ping a party (unless a ping to it is already in flight)."""
+        import socket
+
+        assert bui.in_logic_thread()
+        if self._closed:
+            raise RuntimeError('PartyPinger is closed.')
         try:
-            import socket
+            family = bui.get_ip_address_type(address)
+            key = (socket.inet_pton(family, address), port)
+        except Exception:
+            self._call(address, port, None)
+            return
+        if key in self._pending:
+            return
+        self._pending[key] = _PendingPing(
+            address=address, port=port, family=family
+        )
+        if not self._running:
+            self._running = True
+            self._wakeup = asyncio.Event()
+            bui.app.create_async_task(self._run(), name='party pinger')
+        else:
+            assert self._wakeup is not None
+            self._wakeup.set()
 
-            socket_type = bui.get_ip_address_type(self._address)
-            sock = socket.socket(socket_type, socket.SOCK_DGRAM)
-            sock.connect((self._address, self._port))
+    def close(self) -> None:
+        """Stop pinging and close our sockets.
 
-            accessible = False
-            starttime = time.time()
+        Results for pings still in flight will not be delivered.
+        """
+        self._closed = True
+        self._pending.clear()
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        try:
+            while not self._closed:
+                self._wakeup.clear()
+                timeout = await self._send_due_pings()
 
-            # Send a few pings and wait a second for a response.
-            sock.settimeout(1)
-            for _i in range(3):
-                sock.send(b'\x0b')
-                result: bytes | None
+                # (If we got closed in the meantime, our wakeup is set
+                # so this returns immediately.)
                 try:
-                    # 11: BA_PACKET_SIMPLE_PING
-                    result = sock.recv(10)
-                except Exception:
-                    result = None
-                if result == b'\x0c':
-                    # 12: BA_PACKET_SIMPLE_PONG
-                    accessible = True
-                    break
-                time.sleep(1)
-            ping = (time.time() - starttime) * 1000.0
-            bui.pushcall(
-                bui.CallStrict(
-                    self._call,
-                    self._address,
-                    self._port,
-                    ping if accessible else None,
-                ),
-                from_other_thread=True,
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except TimeoutError:
+                    pass
+        finally:
+            for transport in self._transports.values():
+                if transport is not None:
+                    transport.close()
+            self._transports.clear()
+            self._running = False
+
+    async def _send_due_pings(self) -> float | None:
+        """Send/expire pings; returns time until we next need to."""
+        now = time.monotonic()
+        next_time: float | None = None
+        for key, ping in list(self._pending.items()):
+            if ping.next_time > now:
+                next_time = (
+                    ping.next_time
+                    if next_time is None
+                    else min(next_time, ping.next_time)
+                )
+                continue
+            if ping.attempts >= self.ATTEMPTS:
+                del self._pending[key]
+                self._call(ping.address, ping.port, None)
+                continue
+            transport = await self._get_transport(ping.family)
+
+            # Things may have changed while we waited.
+            if self._closed:
+                return None
+            if self._pending.get(key) is not ping:
+                continue
+            if transport is None:
+                del self._pending[key]
+                self._call(ping.address, ping.port, None)
+                continue
+            if ping.first_send_time is None:
+                ping.first_send_time = time.monotonic()
+            ping.attempts += 1
+            ping.next_time = time.monotonic() + self.ATTEMPT_INTERVAL
+            next_time = (
+                ping.next_time
+                if next_time is None
+                else min(next_time, ping.next_time)
+            )
+
+            # 11: BA_PACKET_SIMPLE_PING
+            transport.sendto(b'\x0b', (ping.address, ping.port))
+        return None if next_time is None else max(0.0, next_time - now)
+
+    async def _get_transport(
+        self, family: int
+    ) -> asyncio.DatagramTransport | None:
+        import socket
+
+        if family in self._transports:
+            return self._transports[family]
+        try:
+            transport, _protocol = (
+                await bui.app.asyncio_loop.create_datagram_endpoint(
+                    lambda: _PingProtocol(self._on_datagram),
+                    local_addr=(
+                        '::' if family == socket.AF_INET6 else '0.0.0.0',
+                        0,
+                    ),
+                    family=family,
+                )
             )
         except Exception as exc:
             from efro.error import is_udp_communication_error
 
-            if is_udp_communication_error(exc):
-                pass
-            else:
-                if bui.do_once():
-                    bui.netlog.exception('Error on gather ping.')
-        finally:
-            try:
-                if sock is not None:
-                    sock.close()
-            except Exception:
-                if bui.do_once():
-                    bui.netlog.exception('Error on gather ping cleanup')
+            if not is_udp_communication_error(exc) and bui.do_once():
+                bui.netlog.exception('Error creating gather ping socket.')
+            transport = None
 
-        bui.app.classic.ping_thread_count -= 1
-        bui.shutdown_suppress_end()
+        # If we were closed while waiting, don't keep the socket around.
+        if transport is not None and self._closed:
+            transport.close()
+            return None
+        self._transports[family] = transport
+        return transport
+
+    def _on_datagram(self, data: bytes, addr: tuple[Any, ...]) -> None:
+        import socket
+
+        # 12: BA_PACKET_SIMPLE_PONG
+        if data != b'\x0c':
+            return
+        host = str(addr[0]).split('%', 1)[0]
+        try:
+            family = socket.AF_INET6 if ':' in host else socket.AF_INET
+            key = (socket.inet_pton(family, host), int(addr[1]))
+        except Exception:
+            return
+        ping = self._pending.pop(key, None)
+        if ping is None or ping.first_send_time is None:
+            return
+        self._call(
+            ping.address,
+            ping.port,
+            (time.monotonic() - ping.first_send_time) * 1000.0,
+        )
+
+
+@dataclass
+class _PendingPing:
+    address: str
+    port: int
+    family: int
+    attempts: int = 0
+    first_send_time: float | None = None
+    next_time: float = 0.0
+
+
+class _PingProtocol(asyncio.DatagramProtocol):
+    """Hands datagrams received on a ping socket to a call."""
+
+    def __init__(self, call: Callable[[bytes, tuple[Any, ...]], None]):
+        self._call = call
+
+    @override
+    def datagram_received(self, data: bytes, addr: tuple[Any, ...]) -> None:
+        self._call(data, addr)
+
+    @override
+    def error_received(self, exc: Exception) -> None:
+        # Unreachable hosts and the like; those pings will just time
+        # out.
+        pass
 
 
 class PublicGatherTab(GatherTab):
@@ -382,6 +717,7 @@ class PublicGatherTab(GatherTab):
         self._selection: Selection | None = None
         self._refreshing_list = False
         self._update_timer: bui.AppTimer | None = None
+        self._pinger: PartyPinger | None = None
         self._host_scrollwidget: bui.Widget | None = None
         self._host_name_text: bui.Widget | None = None
         self._host_toggle_button: bui.Widget | None = None
@@ -395,21 +731,14 @@ class PublicGatherTab(GatherTab):
         self._host_max_party_size_plus_button: bui.Widget | None = None
         self._join_sub_scroll_width: float | None = None
         self._host_status_text: bui.Widget | None = None
-        self._signed_in = False
         self._ui_rows: list[UIRow] = []
-        self._refresh_ui_row = 0
-        self._have_user_selected_row = False
-        self._first_valid_server_list_time: float | None = None
 
-        # Parties indexed by id:
-        self._parties: dict[str, PartyEntry] = {}
-
-        # Parties sorted in display order:
-        self._parties_sorted: list[tuple[str, PartyEntry]] = []
-        self._party_lists_dirty = True
+        # Inclusive range of display rows that may need redrawing.
+        self._dirty_rows: tuple[int, int] | None = None
+        self._have_user_selected_row = False
 
-        # Sorted parties with filter applied:
-        self._parties_displayed: dict[str, PartyEntry] = {}
+        # Parties by id, sorted in display order and filtered:
+        self._party_index = PartyIndex()
 
         self._next_entry_index = 0
         self._have_server_list_response = False
@@ -511,9 +840,16 @@ class PublicGatherTab(GatherTab):
         )
         return self._container
 
+    def __del__(self) -> None:
+        if self._pinger is not None:
+            self._pinger.close()
+
     @override
     def on_deactivate(self) -> None:
         self._update_timer = None
+        if self._pinger is not None:
+            self._pinger.close()
+            self._pinger = None
 
     @override
     def save_state(self) -> None:
@@ -524,7 +860,10 @@ class PublicGatherTab(GatherTab):
         assert bui.app.classic is not None
         bui.app.ui_v1.window_states[type(self)] = State(
             sub_tab=self._sub_tab,
-            parties=[(i, copy.copy(p)) for i, p in self._parties_sorted[:40]],
+            parties=[
+                (i, copy.copy(p))
+                for i, p in itertools.islice(self._party_index.items(), 40)
+            ],
             next_entry_index=self._next_entry_index,
             filter_value=self._filter_value,
             have_server_list_response=self._have_server_list_response,
@@ -542,11 +881,9 @@ class PublicGatherTab(GatherTab):
 
         # Restore the parties we stored.
         if state.parties:
-            self._parties = {
-                key: copy.copy(party) for key, party in state.parties
-            }
-            self._parties_sorted = list(self._parties.items())
-            self._party_lists_dirty = True
+            self._party_index = PartyIndex()
+            for key, party in state.parties:
+                self._party_index.add(key, copy.copy(party))
 
             self._next_entry_index = state.next_entry_index
 
@@ -571,10 +908,8 @@ class PublicGatherTab(GatherTab):
         self._selection = None
         self._have_user_selected_row = False
 
-        # Reset refresh to the top and make sure everything refreshes.
-        self._refresh_ui_row = 0
-        for party in self._parties.values():
-            party.clean_display_index = None
+        # Make sure everything refreshes.
+        self._redisplay_all_rows()
 
         self._sub_tab = value
         active_color = (0.6, 1.0, 0.6)
@@ -911,9 +1246,6 @@ class PublicGatherTab(GatherTab):
             self._have_valid_server_list = False
             return
 
-        if not self._have_valid_server_list:
-            self._first_valid_server_list_time = time.time()
-
         self._have_valid_server_list = True
         parties_in = result['l']
 
@@ -924,7 +1256,7 @@ class PublicGatherTab(GatherTab):
         # these entries incrementally in our _update() method. The one
         # thing we do here is prune parties not contained in this
         # result.
-        for partyval in list(self._parties.values()):
+        for partyval in self._party_index.values():
             partyval.claimed = False
         for party_in in parties_in:
             addr = party_in['a']
@@ -932,14 +1264,10 @@ class PublicGatherTab(GatherTab):
             port = party_in['p']
             assert isinstance(port, int)
             party_key = f'{addr}_{port}'
-            party = self._parties.get(party_key)
+            party = self._party_index.get(party_key)
             if party is not None:
                 party.claimed = True
-        self._parties = {
-            key: val for key, val in list(self._parties.items()) if val.claimed
-        }
-        self._parties_sorted = [p for p in self._parties_sorted if p[1].claimed]
-        self._party_lists_dirty = True
+        self._party_index.prune(lambda p: p.claimed)
 
         if DEBUG_PROCESSING:
             print(
@@ -960,13 +1288,12 @@ class PublicGatherTab(GatherTab):
                 filter_value = cast(str, bui.textwidget(query=text))
                 if filter_value != self._filter_value:
                     self._filter_value = filter_value
-                    self._party_lists_dirty = True
 
-                    # Also wipe out party clean-row states (otherwise if
-                    # a party disappears from a row due to filtering and
+                    # Wipe out party clean-row states (otherwise if a
+                    # party disappears from a row due to filtering and
                     # then reappears on that same row when the filter is
                     # removed it may not update).
-                    for party in self._parties.values():
+                    for party in self._party_index.values():
                         party.clean_display_index = None
 
             self._query_party_list_periodically()
@@ -975,13 +1302,9 @@ class PublicGatherTab(GatherTab):
         # If any new party infos have come in, apply some of them.
         self._process_pending_party_infos()
 
-        # Anytime we sign in/out, make sure we refresh our list.
+        # Update filtering and selection (our party index keeps itself
+        # sorted as pings come in, parties get added, etc.).
         signed_in = plus.get_v1_account_state() == 'signed_in'
-        if self._signed_in != signed_in:
-            self._signed_in = signed_in
-            self._party_lists_dirty = True
-
-        # Update sorting to account for ping updates, new parties, etc.
         self._update_party_lists()
 
         # If we've got a party-name text widget, keep its value plugged
@@ -1038,22 +1361,24 @@ class PublicGatherTab(GatherTab):
         assert self._join_text
         assert self._filter_text
 
+        partycount = self._party_index.displayed_count
+
         # Janky - allow escaping when there's nothing in our list.
         assert self._host_scrollwidget
         bui.containerwidget(
             edit=self._host_scrollwidget,
-            claims_up_down=(len(self._parties_displayed) > 0),
+            claims_up_down=(partycount > 0),
         )
         bui.textwidget(edit=self._no_servers_found_text, text='')
 
         # Clip if we have more UI rows than parties to show.
-        clipcount = len(self._ui_rows) - len(self._parties_displayed)
+        clipcount = len(self._ui_rows) - partycount
         if clipcount > 0:
             clipcount = max(clipcount, 50)
             self._ui_rows = self._ui_rows[:-clipcount]
 
         # If we have no parties to show, we're done.
-        if self._have_valid_server_list and not self._parties_displayed:
+        if self._have_valid_server_list and not partycount:
             bui.textwidget(
                 edit=self._no_servers_found_text,
                 text=bui.Lstr(resource='noServersFoundText'),
@@ -1063,22 +1388,19 @@ class PublicGatherTab(GatherTab):
         assert self._join_sub_scroll_width is not None
         sub_scroll_width = self._join_sub_scroll_width
         lineheight = 42
-        sub_scroll_height = lineheight * len(self._parties_displayed) + 50
+        sub_scroll_height = lineheight * partycount + 50
         bui.containerwidget(
             edit=columnwidget, size=(sub_scroll_width, sub_scroll_height)
         )
 
-        # Any time our height changes, reset the refresh back to the top
-        # so we don't see ugly empty spaces appearing during initial
-        # list filling.
+        # Any time our height changes, we need to redisplay everything
+        # since its pos will have changed.. :(
         if sub_scroll_height != self._last_sub_scroll_height:
-            self._refresh_ui_row = 0
             self._last_sub_scroll_height = sub_scroll_height
+            self._redisplay_all_rows()
 
-            # Also note that we need to redisplay everything since its
-            # pos will have changed.. :(
-            for party in self._parties.values():
-                party.clean_display_index = None
+        if self._dirty_rows is None:
+            return
 
         # Ew; this rebuilding generates deferred selection callbacks so
         # we need to push deferred notices so we know to ignore them.
@@ -1089,39 +1411,32 @@ class PublicGatherTab(GatherTab):
 
         # Ok, now here's the deal: we want to avoid creating/updating
         # this entire list at one time because it will lead to hitches.
-        # So we refresh individual rows quickly in a loop.
-        rowcount = min(12, len(self._parties_displayed))
-
-        party_vals_displayed = list(self._parties_displayed.values())
-        while rowcount > 0:
-            refresh_row = self._refresh_ui_row % len(self._parties_displayed)
-            if refresh_row >= len(self._ui_rows):
-                self._ui_rows.append(UIRow())
-                refresh_row = len(self._ui_rows) - 1
-
-            # For the first few seconds after getting our first
-            # server-list, refresh only the top section of the list;
-            # this allows the lowest ping servers to show up more
-            # quickly.
-            if self._first_valid_server_list_time is not None:
-                if time.time() - self._first_valid_server_list_time < 4.0:
-                    if refresh_row > 40:
-                        refresh_row = 0
-
-            self._ui_rows[refresh_row].update(
-                refresh_row,
-                party_vals_displayed[refresh_row],
-                sub_scroll_width=sub_scroll_width,
-                sub_scroll_height=sub_scroll_height,
-                lineheight=lineheight,
-                columnwidget=columnwidget,
-                join_text=self._join_text,
-                existing_selection=self._selection,
-                filter_text=self._filter_text,
-                tab=self,
-            )
-            self._refresh_ui_row = refresh_row + 1
-            rowcount -= 1
+        # So we redraw a limited number of changed rows each time
+        # through, working down from the top of the list. Rows that
+        # haven't actually changed are skipped for free.
+        row, lastrow = self._dirty_rows
+        lastrow = min(lastrow, partycount - 1)
+        rowcount = 12
+        while row <= lastrow and rowcount > 0:
+            party = self._party_index.get_displayed(row)
+            if party.clean_display_index != row:
+                while len(self._ui_rows) <= row:
+                    self._ui_rows.append(UIRow())
+                self._ui_rows[row].update(
+                    row,
+                    party,
+                    sub_scroll_width=sub_scroll_width,
+                    sub_scroll_height=sub_scroll_height,
+                    lineheight=lineheight,
+                    columnwidget=columnwidget,
+                    join_text=self._join_text,
+                    existing_selection=self._selection,
+                    filter_text=self._filter_text,
+                    tab=self,
+                )
+                rowcount -= 1
+            row += 1
+        self._dirty_rows = None if row > lastrow else (row, lastrow)
 
         # So our selection callbacks can start firing..
         def refresh_off() -> None:
@@ -1143,7 +1458,8 @@ class PublicGatherTab(GatherTab):
             port = party_in['p']
             assert isinstance(port, int)
             party_key = f'{addr}_{port}'
-            party = self._parties.get(party_key)
+            party = self._party_index.get(party_key)
+            is_new = party is None
             if party is None:
                 # If this party is new to us, init it.
                 party = PartyEntry(
@@ -1151,9 +1467,6 @@ class PublicGatherTab(GatherTab):
                     next_ping_time=bui.apptime() + 0.001 * party_in['pd'],
                     index=self._next_entry_index,
                 )
-                self._parties[party_key] = party
-                self._parties_sorted.append((party_key, party))
-                self._party_lists_dirty = True
                 self._next_entry_index += 1
                 assert isinstance(party.address, str)
                 assert isinstance(party.next_ping_time, float)
@@ -1177,6 +1490,10 @@ class PublicGatherTab(GatherTab):
 
             # Make sure the party's UI gets updated.
             party.clean_display_index = None
+            if is_new:
+                self._party_index.add(party_key, party)
+            else:
+                self._party_index.update(party_key)
 
         if DEBUG_PROCESSING and parties_in:
             print(
@@ -1188,56 +1505,48 @@ class PublicGatherTab(GatherTab):
         plus = bui.app.plus
         assert plus is not None
 
-        if not self._party_lists_dirty:
-            return
-        starttime = time.time()
-        assert len(self._parties_sorted) == len(self._parties)
-
-        self._parties_sorted.sort(
-            key=lambda p: (
-                p[1].ping if p[1].ping is not None else 999999.0,
-                p[1].index,
-            )
-        )
-
         # If signed out or errored, show no parties.
-        if (
-            plus.get_v1_account_state() != 'signed_in'
-            or not self._have_valid_server_list
-        ):
-            self._parties_displayed = {}
-        else:
-            if self._filter_value:
-                filterval = self._filter_value.lower()
-                self._parties_displayed = {
-                    k: v
-                    for k, v in self._parties_sorted
-                    if filterval in v.name.lower()
-                }
-            else:
-                self._parties_displayed = dict(self._parties_sorted)
+        self._party_index.set_filter(
+            self._filter_value,
+            show=(
+                plus.get_v1_account_state() == 'signed_in'
+                and self._have_valid_server_list
+            ),
+        )
+        dirty_rows = self._party_index.pop_dirty_rows()
+        if dirty_rows is not None:
+            self._mark_rows_dirty(*dirty_rows)
 
         # Any time our selection disappears from the displayed list, go
         # back to auto-selecting the top entry.
-        if (
-            self._selection is not None
-            and self._selection.entry_key not in self._parties_displayed
+        if self._selection is not None and not self._party_index.is_displayed(
+            self._selection.entry_key
         ):
             self._have_user_selected_row = False
 
         # Whenever the user hasn't selected something, keep the first
         # visible row selected.
-        if not self._have_user_selected_row and self._parties_displayed:
-            firstpartykey = next(iter(self._parties_displayed))
-            self._selection = Selection(firstpartykey, SelectionComponent.NAME)
-
-        self._party_lists_dirty = False
-        if DEBUG_PROCESSING:
-            print(
-                f'Sorted {len(self._parties_sorted)} parties in'
-                f' {time.time()-starttime:.5f}s.'
+        if (
+            not self._have_user_selected_row
+            and self._party_index.displayed_count
+        ):
+            self._selection = Selection(
+                self._party_index.get_displayed(0).get_key(),
+                SelectionComponent.NAME,
             )
 
+    def _mark_rows_dirty(self, first: int, last: int) -> None:
+        if self._dirty_rows is not None:
+            first = min(first, self._dirty_rows[0])
+            last = max(last, self._dirty_rows[1])
+        self._dirty_rows = (first, last)
+
+    def _redisplay_all_rows(self) -> None:
+        for party in self._party_index.values():
+            party.clean_display_index = None
+        if self._party_index.displayed_count:
+            self._mark_rows_dirty(0, self._party_index.displayed_count - 1)
+
     def _query_party_list_periodically(self) -> None:
         now = bui.apptime()
 
@@ -1275,11 +1584,8 @@ class PublicGatherTab(GatherTab):
 
         # Go through our existing public party entries firing off pings
         # for any that have timed out.
-        for party in list(self._parties.values()):
-            if (
-                party.next_ping_time <= now
-                and bui.app.classic.ping_thread_count < 15
-            ):
+        for party in self._party_index.values():
+            if party.next_ping_time <= now:
                 # Crank the interval up for high-latency or
                 # non-responding parties to save us some useless work.
                 mult = 1
@@ -1304,11 +1610,11 @@ class PublicGatherTab(GatherTab):
                 party.next_ping_time = now + party.ping_interval * mult
                 party.ping_attempts += 1
 
-                PingThread(
-                    party.address,
-                    party.port,
-                    bui.WeakCallPartial(self._ping_callback),
-                ).start()
+                if self._pinger is None:
+                    self._pinger = PartyPinger(
+                        bui.WeakCallPartial(self._ping_callback)
+                    )
+                self._pinger.ping(party.address, party.port)
 
     def _ping_callback(
         self, address: str, port: int | None, result: float | None
@@ -1316,7 +1622,7 @@ class PublicGatherTab(GatherTab):
         # Look for a widget corresponding to this target. If we find
         # one, update our list.
         party_key = f'{address}_{port}'
-        party = self._parties.get(party_key)
+        party = self._party_index.get(party_key)
 
         if party is not None:
             # print(f'PING {party.name} {result=} {time.monotonic():.1f}')
@@ -1336,7 +1642,7 @@ class PublicGatherTab(GatherTab):
 
             # Need to re-sort the list and update the row display.
             party.clean_display_index = None
-            self._party_lists_dirty = True
+            self._party_index.update(party_key)
 
     def _fetch_local_addr_cb(self, val: str) -> None:
         self._local_address = str(val)
@@ -11,10 +11,14 @@ import sys
 import time
 import json
 import signal
+import socket
 import tomllib
+import selectors
 import logging
 import subprocess
 from pathlib import Path
+from functools import partial
+from concurrent.futures import Future, wait
 from threading import Lock, Thread, current_thread
 from typing import TYPE_CHECKING
 
@@ -26,19 +30,74 @@ sys.path += [
     str(Path(Path(__file__).parent, 'dist', 'ba_data', 'python-site-packages')),
 ]
 
-from bacommon.servermanager import ServerConfig, StartServerModeCommand
-from efro.dataclassio import dataclass_from_dict, dataclass_validate
+from bacommon.servermanager import (
+    ServerConfig,
+    StartServerModeCommand,
+    ExecCommand,
+    ServerControlChannel,
+    ServerControlRequest,
+    ServerControlResponse,
+)
+from efro.dataclassio import (
+    dataclass_from_dict,
+    dataclass_to_dict,
+    dataclass_validate,
+)
 from efro.error import CleanError
 from efro.terminal import Clr
 
 if TYPE_CHECKING:
     from types import FrameType
+    from typing import Any
+
     from bacommon.servermanager import ServerCommand
 
-VERSION_STR = '1.3.6'
+VERSION_STR = '1.4.1'
 
 # Version history:
 #
+# 1.4.1
+#
+#  - Added mgr.logs() for fetching recent entries from a server's
+#    in-memory log cache, optionally filtered by level, logger name,
+#    and age (for example, mgr.logs(min_level='warning',
+#    name_prefix='ba.net')).
+#
+# 1.4.0
+#
+#  - Added fleet mode: set fleet_instances in the config to run several
+#    server binaries (each with its own port, party name, playlist,
+#    etc. and its own ba_root subdirectory) from a single manager
+#    process and event loop. Restarts due to clean_exit_minutes or
+#    config changes roll through the fleet one server at a time so
+#    parties never all go down at once (see
+#    fleet_restart_stagger_minutes).
+#
+#  - mgr.cmd(), mgr.kick(), mgr.restart(), etc. now accept an optional
+#    'instance' arg (index or name) for targeting a server in a fleet.
+#
+#  - Reloading a broken config no longer blocks the manager while
+#    waiting for fixes; relaunch attempts are simply rescheduled.
+#
+# 1.3.8
+#
+#  - Subprocess supervision is now event-driven instead of polling every
+#    0.25 seconds. The manager sleeps until a command is queued, the
+#    server binary exits (via pidfd where available), the config file
+#    changes (via inotify on Linux; falling back to periodic stat
+#    checks elsewhere), or a timer deadline such as clean_exit_minutes
+#    arrives. Idle wrappers no longer wake up at all.
+#
+# 1.3.7
+#
+#  - Commands are now sent to the server binary over a dedicated
+#    length-prefixed binary control channel (a socket-pair inherited by
+#    the child) instead of being typed into its stdin as Python source.
+#    Each command gets an acknowledgement, so mgr.cmd(), mgr.kick(),
+#    mgr.clientlist(), etc. now block until the server has actually run
+#    them and clientlist() output is returned to the manager. Windows
+#    still uses the old stdin path.
+#
 # 1.3.6
 #
 #  - Minor tweak to disable new native REPL since we rely on the simple old
@@ -124,6 +183,280 @@ VERSION_STR = '1.3.6'
 #  - Initial release.
 
 
+class _ConfigFileWatcher:
+    """Watches the directory containing a config file via inotify.
+
+    Watches the whole directory, since editors commonly save by
+    writing a new file and renaming it into place. Only available on
+    Linux; use :meth:`create()` which returns None elsewhere.
+    """
+
+    _IN_ATTRIB = 0x00000004
+    _IN_CLOSE_WRITE = 0x00000008
+    _IN_MOVED_FROM = 0x00000040
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+
+    def __init__(self, fd: int) -> None:
+        self._fd = fd
+
+    @classmethod
+    def create(cls, path: str) -> _ConfigFileWatcher | None:
+        """Create a watcher for a file path if possible."""
+        import ctypes
+        import ctypes.util
+
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return None
+            mask = (
+                cls._IN_ATTRIB
+                | cls._IN_CLOSE_WRITE
+                | cls._IN_MOVED_FROM
+                | cls._IN_MOVED_TO
+                | cls._IN_CREATE
+                | cls._IN_DELETE
+            )
+            dirpath = os.fsencode(os.path.dirname(os.path.abspath(path)))
+            if libc.inotify_add_watch(fd, dirpath, mask) < 0:
+                os.close(fd)
+                return None
+        except Exception:
+            return None
+        return cls(fd)
+
+    def fileno(self) -> int:
+        """The inotify fd; readable when something has changed."""
+        return self._fd
+
+    def drain(self) -> None:
+        """Discard all pending events."""
+        while True:
+            try:
+                if not os.read(self._fd, 65536):
+                    return
+            except BlockingIOError:
+                return
+
+    def close(self) -> None:
+        """Stop watching."""
+        os.close(self._fd)
+
+
+class _ServerInstance:
+    """State for a single server subprocess run by the manager.
+
+    In the standard setup there is exactly one of these; in fleet mode
+    there is one per entry in the config's fleet_instances list.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        name: str | None,
+        ba_root_path: str,
+        overrides: dict[str, Any],
+    ) -> None:
+        self.index = index
+        self.name = name
+        self.ba_root_path = ba_root_path
+        self.overrides = overrides
+        self.config = ServerConfig()
+        self.commands: list[tuple[ServerCommand, Future[Any]]] = []
+        self.subprocess: subprocess.Popen[bytes] | None = None
+        self.launch_count = 0
+        self.launch_time: float | None = None
+        self.next_launch_time = 0.0
+        self.config_load_failures = 0
+        self.force_kill_time: float | None = None
+        self.sent_clean_exit = False
+        self.sent_unclean_exit = False
+        self.config_restart_pending = False
+        self.sent_config_restart = False
+        self.stop_desired = False
+        self.finished = False
+        self.exited_cleanly: bool | None = None
+        self.pidfd: int | None = None
+        self.control_channel: ServerControlChannel | None = None
+        self.control_channel_child_fd: int | None = None
+        self.control_thread: Thread | None = None
+        self.pending_replies: dict[int, Future[Any]] = {}
+        self.pending_replies_lock = Lock()
+        self.next_request_id = 0
+
+    @property
+    def prefix(self) -> str:
+        """Prefix for our printed messages (empty outside fleet mode)."""
+        return '' if self.name is None else f'[{self.name}] '
+
+    def send_command(self, command: ServerCommand, future: Future[Any]) -> None:
+        """Send a command to our server subprocess.
+
+        Must be called from the server manager's bg thread.
+        """
+        assert self.subprocess is not None
+
+        # Without a control channel we get no acknowledgement; consider
+        # the command done once it is written.
+        if self.control_channel is None:
+            self._send_command_stdin(command)
+            future.set_result(None)
+            return
+
+        with self.pending_replies_lock:
+            request_id = self.next_request_id
+            self.next_request_id += 1
+            self.pending_replies[request_id] = future
+        try:
+            self.control_channel.send(
+                ServerControlRequest(request_id=request_id, command=command)
+            )
+        except Exception as exc:
+            with self.pending_replies_lock:
+                self.pending_replies.pop(request_id, None)
+            future.set_exception(exc)
+
+    def _send_command_stdin(self, command: ServerCommand) -> None:
+        """Send a command to the server as Python source via stdin."""
+        import pickle
+
+        assert self.subprocess is not None
+        assert self.subprocess.stdin is not None
+
+        # Raw statements get typed in as-is.
+        if isinstance(command, ExecCommand):
+            execcode = (command.statement + '\n').encode()
+        else:
+            val = repr(pickle.dumps(command))
+            assert '\n' not in val
+            execcode = (
+                f'import baclassic._servermode;'
+                f' baclassic._servermode._cmd({val})\n'
+            ).encode()
+        self.subprocess.stdin.write(execcode)
+        self.subprocess.stdin.flush()
+
+    def start_control_channel(self) -> None:
+        """Tell the server process to start servicing its control channel.
+
+        This is the one command still fed through stdin; everything
+        after it goes through the channel.
+        """
+        assert self.subprocess is not None
+        assert self.subprocess.stdin is not None
+        assert self.control_channel is not None
+        assert self.control_channel_child_fd is not None
+
+        self.control_thread = Thread(
+            target=self._control_thread_main,
+            args=(self.control_channel,),
+            daemon=True,
+        )
+        self.control_thread.start()
+
+        self.subprocess.stdin.write(
+            (
+                f'import baclassic._servermode;'
+                f' baclassic._servermode._start_control_channel('
+                f'{self.control_channel_child_fd})\n'
+            ).encode()
+        )
+        self.subprocess.stdin.flush()
+
+    def _control_thread_main(self, channel: ServerControlChannel) -> None:
+        """Read responses from the server process until it goes away."""
+        while True:
+            try:
+                message = channel.recv()
+            except OSError:
+                # Expected when we close the channel out from under
+                # ourself.
+                break
+            except Exception as exc:
+                print(
+                    f'{Clr.RED}{self.prefix}Error reading server control'
+                    f' channel: {exc}{Clr.RST}',
+                    flush=True,
+                )
+                break
+            if message is None:
+                break
+            if not isinstance(message, ServerControlResponse):
+                print(
+                    f'{Clr.RED}{self.prefix}Unexpected server control'
+                    f' message: {type(message)}{Clr.RST}',
+                    flush=True,
+                )
+                continue
+            with self.pending_replies_lock:
+                future = self.pending_replies.pop(message.request_id, None)
+            if future is None:
+                continue
+            if message.error is not None:
+                future.set_exception(RuntimeError(message.error))
+            else:
+                future.set_result(message.result)
+
+        self.fail_pending_replies()
+
+    def fail_pending_replies(self) -> None:
+        """Fail any commands still waiting on a response."""
+        with self.pending_replies_lock:
+            pending = self.pending_replies
+            self.pending_replies = {}
+        for future in pending.values():
+            future.set_exception(
+                RuntimeError('Server subprocess exited before responding.')
+            )
+
+    def close_control_channel(self) -> None:
+        """Tear down our control channel if we have one."""
+        if self.control_channel is not None:
+            self.control_channel.close()
+        if self.control_thread is not None:
+            self.control_thread.join()
+        self.fail_pending_replies()
+        self.control_channel = None
+        self.control_channel_child_fd = None
+        self.control_thread = None
+
+    def kill(self) -> None:
+        """End the server subprocess if it still exists."""
+        if self.subprocess is None:
+            return
+
+        print(
+            f'{Clr.CYN}{self.prefix}Stopping subprocess...{Clr.RST}', flush=True
+        )
+
+        # First, ask it nicely to die and give it a moment. If that
+        # doesn't work, bring down the hammer.
+        self.subprocess.terminate()
+        try:
+            self.subprocess.wait(timeout=10)
+            self.exited_cleanly = self.subprocess.returncode == 0
+        except subprocess.TimeoutExpired:
+            self.exited_cleanly = False
+            self.subprocess.kill()
+        print(f'{Clr.CYN}{self.prefix}Subprocess stopped.{Clr.RST}', flush=True)
+
+    def reset_subprocess_vars(self) -> None:
+        """Clear per-subprocess state after one exits."""
+        self.subprocess = None
+        self.launch_time = None
+        self.sent_clean_exit = False
+        self.sent_unclean_exit = False
+        self.config_restart_pending = False
+        self.sent_config_restart = False
+        self.force_kill_time = None
+        self.exited_cleanly = None
+
+
 class ServerManagerApp:
     """An app which manages BallisticaKit server execution.
 
@@ -135,6 +468,22 @@ class ServerManagerApp:
     # shutdown before bringing down the hammer.
     IMMEDIATE_SHUTDOWN_TIME_LIMIT = 5.0
 
+    # How long we wait for the server process to respond to a command
+    # before giving up on it.
+    COMMAND_REPLY_TIMEOUT = 10.0
+
+    # How often we stat the config file for changes when we can't be
+    # notified of them directly.
+    CONFIG_POLL_INTERVAL = 3.123
+
+    # How long we wait before relaunching a subprocess that died
+    # uncleanly (avoids super fast death loops).
+    UNCLEAN_EXIT_RELAUNCH_DELAY = 5.0
+
+    # In fleet mode, how long a relaunched server gets to come up
+    # before the next rolling restart may begin.
+    ROLLING_RESTART_SETTLE_TIME = 10.0
+
     def __init__(self) -> None:
         self._user_provided_config_path: str | None = None
         self._config = ServerConfig()
@@ -143,9 +492,15 @@ class ServerManagerApp:
         self._interactive = sys.stdin.isatty()
         self._wrapper_shutdown_desired = False
         self._done = False
-        self._subprocess_commands: list[str | ServerCommand] = []
+        self._instances: list[_ServerInstance] = []
         self._subprocess_commands_lock = Lock()
-        self._subprocess_force_kill_time: float | None = None
+
+        # Writing a byte here wakes our bg thread (to send commands,
+        # re-evaluate deadlines, etc).
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        self._config_check_needed = False
         self._auto_restart = True
         self._config_auto_restart = True
         self._config_mtime: float | None = None
@@ -153,15 +508,15 @@ class ServerManagerApp:
         self._should_report_subprocess_error = False
         self._running = False
         self._interpreter_start_time: float | None = None
-        self._subprocess: subprocess.Popen[bytes] | None = None
-        self._subprocess_launch_time: float | None = None
-        self._subprocess_sent_config_auto_restart = False
-        self._subprocess_sent_clean_exit = False
-        self._subprocess_sent_unclean_exit = False
         self._subprocess_thread: Thread | None = None
-        self._subprocess_exited_cleanly: bool | None = None
         self._did_multi_config_warning = False
 
+        # Fleet restart pacing; only one instance may be going through
+        # a rolling restart at once.
+        self._rolling_restart_instance: _ServerInstance | None = None
+        self._rolling_restart_settle_time = 0.0
+        self._last_rolling_restart_time: float | None = None
+
         # This may override the above defaults.
         self._parse_command_line_args()
 
@@ -170,6 +525,8 @@ class ServerManagerApp:
         # attempts.
         self.load_config(strict=True, print_confirmation=False)
 
+        self._create_instances()
+
     @property
     def config(self) -> ServerConfig:
         """The current config for the app."""
@@ -180,6 +537,11 @@ class ServerManagerApp:
         dataclass_validate(value)
         self._config = value
 
+    @property
+    def fleet_mode(self) -> bool:
+        """Whether we are running a fleet of server subprocesses."""
+        return self._config.fleet_instances is not None
+
     def _prerun(self) -> None:
         """Common code at the start of any run."""
 
@@ -194,6 +556,12 @@ class ServerManagerApp:
             f' starting up ({dbgstr} mode)...{Clr.RST}',
             flush=True,
         )
+        if self.fleet_mode:
+            print(
+                f'{Clr.CYN}Fleet mode enabled; managing'
+                f' {len(self._instances)} server instances.{Clr.RST}',
+                flush=True,
+            )
 
         # Python will handle SIGINT for us (as KeyboardInterrupt) but we
         # need to register a SIGTERM handler so we have a chance to
@@ -223,6 +591,7 @@ class ServerManagerApp:
         # Mark ourselves as shutting down and wait for the process to
         # wrap up.
         self._done = True
+        self._wake_bg_thread()
         self._subprocess_thread.join()
 
         # If there's a server error we should care about, exit the
@@ -241,8 +610,14 @@ class ServerManagerApp:
         """Run the app loop to completion noninteractively."""
         self._prerun()
         try:
+            # Just sit and wait for a signal (SIGINT or the SIGTERM our
+            # bg thread sends when it wants us to die).
             while True:
-                time.sleep(1.234)
+                if hasattr(signal, 'pause'):
+                    signal.pause()
+                else:
+                    # Windows has no pause(); settle for long sleeps.
+                    time.sleep(1.234)
         except KeyboardInterrupt:
             # Gracefully bow out if we kill ourself via keyboard.
             pass
@@ -295,41 +670,72 @@ class ServerManagerApp:
 
         self._postrun()
 
-    def cmd(self, statement: str) -> None:
+    def cmd(self, statement: str, instance: int | str | None = None) -> None:
         """Exec a Python command on the current running server subprocess.
 
-        Note that commands are executed asynchronously and no status or
-        return value is accessible from this manager app.
+        Blocks until the server process has run the command. Any output
+        appears in the server's own output; no return value is
+        accessible from this manager app. In fleet mode, 'instance'
+        selects a single server by index or name; otherwise the command
+        runs on all of them.
         """
         if not isinstance(statement, str):
             raise TypeError(f'Expected a string arg; got {type(statement)}')
-        with self._subprocess_commands_lock:
-            self._subprocess_commands.append(statement)
-        self._block_for_command_completion()
-
-    def _block_for_command_completion(self) -> None:
-        # Ideally we'd block here until the command was run so our
-        # prompt would print after it's results. We currently don't get
-        # any response from the app so the best we can do is block until
-        # our bg thread has sent it. In the future we can perhaps add a
-        # proper 'command port' interface for proper blocking two way
-        # communication.
-        while True:
-            with self._subprocess_commands_lock:
-                if not self._subprocess_commands:
-                    break
-            time.sleep(0.1)
+        self._wait_for_replies(
+            [
+                self._enqueue_server_command(
+                    inst, ExecCommand(statement=statement)
+                )
+                for inst in self._get_instances(instance)
+            ]
+        )
+
+    def _wait_for_replies(self, futures: list[Future[Any]]) -> list[Any]:
+        """Block until server processes have responded to commands.
 
-        # One last short delay so if we come out *just* as the command
-        # is sent we'll hopefully still give it enough time to
-        # process/print.
-        time.sleep(0.1)
+        All futures are waited on together so a slow instance does not
+        delay the rest of the fleet. Returns each command's result, or
+        None where it failed or timed out (in which case an error is
+        printed).
+        """
+        wait(futures, timeout=self.COMMAND_REPLY_TIMEOUT)
+        results: list[Any] = []
+        for future in futures:
+            if not future.done():
+                print(
+                    f'{Clr.YLW}Timed out waiting for server response.{Clr.RST}',
+                    flush=True,
+                )
+                results.append(None)
+                continue
+            exc = future.exception()
+            if exc is not None:
+                print(
+                    f'{Clr.RED}Server command failed: {exc}{Clr.RST}',
+                    flush=True,
+                )
+                results.append(None)
+                continue
+            results.append(future.result())
+        return results
+
+    def _get_instances(
+        self, instance: int | str | None
+    ) -> list[_ServerInstance]:
+        """Return instances matching an index/name (or all for None)."""
+        if instance is None:
+            return list(self._instances)
+        for inst in self._instances:
+            if instance in (inst.index, inst.name):
+                return [inst]
+        raise ValueError(f'No server instance found matching {instance!r}.')
 
     def screenmessage(
         self,
         message: str,
         color: tuple[float, float, float] | None = None,
         clients: list[int] | None = None,
+        instance: int | str | None = None,
     ) -> None:
         """Display a screen-message.
 
@@ -338,12 +744,23 @@ class ServerManagerApp:
         """
         from bacommon.servermanager import ScreenMessageCommand
 
-        self._enqueue_server_command(
-            ScreenMessageCommand(message=message, color=color, clients=clients)
+        self._wait_for_replies(
+            [
+                self._enqueue_server_command(
+                    inst,
+                    ScreenMessageCommand(
+                        message=message, color=color, clients=clients
+                    ),
+                )
+                for inst in self._get_instances(instance)
+            ]
         )
 
     def chatmessage(
-        self, message: str, clients: list[int] | None = None
+        self,
+        message: str,
+        clients: list[int] | None = None,
+        instance: int | str | None = None,
     ) -> None:
         """Send a chat message from the server.
 
@@ -352,76 +769,167 @@ class ServerManagerApp:
         """
         from bacommon.servermanager import ChatMessageCommand
 
-        self._enqueue_server_command(
-            ChatMessageCommand(message=message, clients=clients)
+        self._wait_for_replies(
+            [
+                self._enqueue_server_command(
+                    inst, ChatMessageCommand(message=message, clients=clients)
+                )
+                for inst in self._get_instances(instance)
+            ]
         )
 
-    def clientlist(self) -> None:
+    def clientlist(self, instance: int | str | None = None) -> None:
         """Print a list of connected clients."""
         from bacommon.servermanager import ClientListCommand
 
-        self._enqueue_server_command(ClientListCommand())
-        self._block_for_command_completion()
+        instances = self._get_instances(instance)
+        results = self._wait_for_replies(
+            [
+                self._enqueue_server_command(inst, ClientListCommand())
+                for inst in instances
+            ]
+        )
+
+        # Note that result will be None when using the legacy stdin
+        # path; the server prints the list itself in that case.
+        for inst, result in zip(instances, results):
+            if result is not None:
+                if inst.name is not None:
+                    print(f'{Clr.BLD}{inst.name}:{Clr.RST}', flush=True)
+                print(result, flush=True)
+
+    def logs(
+        self,
+        max_entries: int = 50,
+        min_level: str | None = None,
+        name_prefix: str | None = None,
+        since_seconds: float | None = None,
+        instance: int | str | None = None,
+    ) -> None:
+        """Print recent log entries from the server's log cache.
+
+        Shows up to max_entries of the most recent matching entries.
+        min_level is a level name such as 'warning', name_prefix
+        matches a logger and its children (such as 'ba.net'), and
+        since_seconds limits results to that many seconds back.
+        """
+        from efro.logging import LogLevel
+        from bacommon.servermanager import LogQueryCommand
+
+        command = LogQueryCommand(
+            max_entries=max_entries,
+            min_level=(
+                None if min_level is None else LogLevel[min_level.upper()]
+            ),
+            name_prefix=name_prefix,
+            since_seconds=since_seconds,
+        )
+        instances = self._get_instances(instance)
+        results = self._wait_for_replies(
+            [self._enqueue_server_command(inst, command) for inst in instances]
+        )
+        for inst, result in zip(instances, results):
+            if result is not None:
+                if inst.name is not None:
+                    print(f'{Clr.BLD}{inst.name}:{Clr.RST}', flush=True)
+                print(result, flush=True)
 
-    def kick(self, client_id: int, ban_time: int | None = None) -> None:
+    def kick(
+        self,
+        client_id: int,
+        ban_time: int | None = None,
+        instance: int | str | None = None,
+    ) -> None:
         """Kick the client with the provided id.
 
         If ban_time is provided, the client will be banned for that
         length of time in seconds. If it is None, ban duration will
         be determined automatically. Pass 0 or a negative number for no
-        ban time.
+        ban time. In fleet mode, 'instance' must be passed since client
+        ids are only meaningful within a single server.
         """
         from bacommon.servermanager import KickCommand
 
-        self._enqueue_server_command(
-            KickCommand(client_id=client_id, ban_time=ban_time)
+        if instance is None and self.fleet_mode:
+            raise ValueError('An instance must be specified in fleet mode.')
+
+        self._wait_for_replies(
+            [
+                self._enqueue_server_command(
+                    inst, KickCommand(client_id=client_id, ban_time=ban_time)
+                )
+                for inst in self._get_instances(instance)
+            ]
         )
 
-    def restart(self, immediate: bool = True) -> None:
+    def restart(
+        self, immediate: bool = True, instance: int | str | None = None
+    ) -> None:
         """Restart the server subprocess.
 
         By default, the current server process will exit immediately.
         If 'immediate' is passed as False, however, it will instead exit at
         the next clean transition point (the end of a series, etc).
+        In fleet mode, all servers are restarted unless 'instance' is
+        passed.
+        """
+        for inst in self._get_instances(instance):
+            self._restart_instance(inst, immediate=immediate)
+
+    def shutdown(
+        self, immediate: bool = True, instance: int | str | None = None
+    ) -> None:
+        """Shut down the server subprocess and exit the wrapper.
+
+        By default, the current server process will exit immediately.
+        If 'immediate' is passed as False, however, it will instead exit at
+        the next clean transition point (the end of a series, etc).
+        In fleet mode, passing 'instance' shuts down just that server;
+        the wrapper exits once all servers have been shut down.
         """
+        if instance is None:
+            # An explicit shutdown means we know to bail completely once
+            # our subprocesses complete.
+            self._wrapper_shutdown_desired = True
+        for inst in self._get_instances(instance):
+            self._shutdown_instance(inst, immediate=immediate)
+
+    def _restart_instance(self, inst: _ServerInstance, immediate: bool) -> None:
         from bacommon.servermanager import ShutdownCommand, ShutdownReason
 
         self._enqueue_server_command(
+            inst,
             ShutdownCommand(
                 reason=ShutdownReason.RESTARTING, immediate=immediate
-            )
+            ),
         )
 
         # If we're asking for an immediate restart but don't get one
         # within the grace period, bring down the hammer.
         if immediate:
-            self._subprocess_force_kill_time = (
+            inst.force_kill_time = (
                 time.time() + self.IMMEDIATE_SHUTDOWN_TIME_LIMIT
             )
+            self._wake_bg_thread()
 
-    def shutdown(self, immediate: bool = True) -> None:
-        """Shut down the server subprocess and exit the wrapper.
-
-        By default, the current server process will exit immediately.
-        If 'immediate' is passed as False, however, it will instead exit at
-        the next clean transition point (the end of a series, etc).
-        """
+    def _shutdown_instance(
+        self, inst: _ServerInstance, immediate: bool
+    ) -> None:
         from bacommon.servermanager import ShutdownCommand, ShutdownReason
 
         self._enqueue_server_command(
-            ShutdownCommand(reason=ShutdownReason.NONE, immediate=immediate)
+            inst,
+            ShutdownCommand(reason=ShutdownReason.NONE, immediate=immediate),
         )
-
-        # An explicit shutdown means we know to bail completely once
-        # this subprocess completes.
-        self._wrapper_shutdown_desired = True
+        inst.stop_desired = True
 
         # If we're asking for an immediate shutdown but don't get one
         # within the grace period, bring down the hammer.
         if immediate:
-            self._subprocess_force_kill_time = (
+            inst.force_kill_time = (
                 time.time() + self.IMMEDIATE_SHUTDOWN_TIME_LIMIT
             )
+        self._wake_bg_thread()
 
     def _parse_command_line_args(self) -> None:
         """Parse command line args."""
@@ -702,44 +1210,285 @@ class ServerManagerApp:
             # This is expected (readline doesn't exist under windows).
             pass
 
+    def _create_instances(self) -> None:
+        """Set up our server instance(s) based on the initial config."""
+        fleet = self._config.fleet_instances
+        if fleet is None:
+            self._instances = [
+                _ServerInstance(
+                    index=0,
+                    name=None,
+                    ba_root_path=self._ba_root_path,
+                    overrides={},
+                )
+            ]
+        else:
+            if not fleet:
+                raise CleanError('fleet_instances must not be empty.')
+            names: set[str] = set()
+            for i, entry in enumerate(fleet):
+                name = str(entry.get('name', f'server{i}'))
+                if not name or name in names or os.sep in name or '/' in name:
+                    raise CleanError(
+                        f'Invalid or duplicate fleet instance name {name!r}.'
+                    )
+                names.add(name)
+                self._instances.append(
+                    _ServerInstance(
+                        index=i,
+                        name=name,
+                        ba_root_path=os.path.join(
+                            self._ba_root_path, 'fleet', name
+                        ),
+                        overrides=entry,
+                    )
+                )
+
+        # Make sure all instance configs are valid up front so we can
+        # die cleanly if not.
+        try:
+            self._check_instance_configs(self._config)
+            for inst in self._instances:
+                self._update_instance_config(inst)
+        except Exception as exc:
+            raise CleanError(f'Invalid fleet config:\n{exc}') from exc
+
+    def _update_instance_config(self, inst: _ServerInstance) -> None:
+        """Build an instance's effective config from the current config.
+
+        Raises an exception if the result is invalid.
+        """
+        fleet = self._config.fleet_instances
+        if fleet is not None:
+            if inst.index < len(fleet):
+                inst.overrides = fleet[inst.index]
+            if len(fleet) != len(self._instances):
+                print(
+                    f'{Clr.YLW}{inst.prefix}fleet_instances count changed;'
+                    f' restart the server manager to add or remove'
+                    f' instances.{Clr.RST}',
+                    flush=True,
+                )
+        inst.config = self._get_instance_config(self._config, inst)
+
+    def _get_instance_config(
+        self, config: ServerConfig, inst: _ServerInstance
+    ) -> ServerConfig:
+        """Return an instance's effective config given an overall one."""
+        fleet = config.fleet_instances
+        if fleet is None:
+            return config
+        overrides = (
+            fleet[inst.index] if inst.index < len(fleet) else inst.overrides
+        )
+
+        # Instances get base config values overridden by their own
+        # (aside from the fleet-specific bits which don't apply to them).
+        values = dataclass_to_dict(config)
+        values.update(
+            {key: val for key, val in overrides.items() if key != 'name'}
+        )
+        values['fleet_instances'] = None
+        return dataclass_from_dict(ServerConfig, values)
+
+    def _check_instance_configs(self, config: ServerConfig) -> None:
+        """Make sure a config works for all of our instances.
+
+        Raises an exception if not.
+        """
+        ports: dict[int, str] = {}
+        for inst in self._instances:
+            port = self._get_instance_config(config, inst).port
+            if port in ports:
+                raise ValueError(
+                    f'Fleet instances {ports[port]!r} and {inst.name!r}'
+                    f' both use port {port}.'
+                )
+            ports[port] = str(inst.name)
+
     def _bg_thread_main(self) -> None:
-        """Top level method run by our bg thread."""
+        """Top level method run by our bg thread.
+
+        Launches and supervises all server subprocesses from a single
+        selector loop, sleeping until there is something to do.
+        """
+        selector = selectors.DefaultSelector()
+        selector.register(self._wakeup_recv, selectors.EVENT_READ, None)
+        config_watcher: _ConfigFileWatcher | None = None
+        if self._auto_restart and self._config_auto_restart:
+            config_watcher = _ConfigFileWatcher.create(self._get_config_path())
+            if config_watcher is not None:
+                selector.register(config_watcher, selectors.EVENT_READ, None)
+        try:
+            self._supervise_instances(selector, config_watcher)
+        finally:
+            # Ask everything still running to die all at once, then
+            # wait for each to actually do so.
+            for inst in self._instances:
+                if (
+                    inst.subprocess is not None
+                    and inst.subprocess.poll() is None
+                ):
+                    inst.subprocess.terminate()
+            for inst in self._instances:
+                self._cleanup_instance_subprocess(inst, selector)
+            selector.close()
+            if config_watcher is not None:
+                config_watcher.close()
+
+        # EW: it seems that if we die before the main thread has fully
+        # started up the interpreter, its possible that it will not
+        # break out of its loop via the usual SystemExit that gets sent
+        # when we die.
+        if self._interactive:
+            while (
+                self._interpreter_start_time is None
+                or time.time() - self._interpreter_start_time < 0.5
+            ):
+                time.sleep(0.1)
+
+        # If we want to die completely after our subprocesses have
+        # ended, tell the main thread to die. Only do this if the main
+        # thread is not already waiting for us to die; otherwise it can
+        # lead to deadlock. (we hang in os.kill while main thread is
+        # blocked in Thread.join)
+        if not self._done:
+            self._done = True
+
+            # This should break the main thread out of its blocking
+            # interpreter call.
+            os.kill(os.getpid(), signal.SIGTERM)
+
+    def _supervise_instances(
+        self,
+        selector: selectors.BaseSelector,
+        config_watcher: _ConfigFileWatcher | None,
+    ) -> None:
+        """Run our server instances until we're done with them all."""
         while not self._done:
-            self._run_server_cycle()
+            now = time.time()
+            self._check_for_config_changes(now, config_watcher is not None)
+            for inst in self._instances:
+                self._update_instance(inst, selector)
 
-    def _handle_term_signal(self, sig: int, frame: FrameType | None) -> None:
-        """Handle signals (will always run in the main thread)."""
-        del sig, frame  # Unused.
-        sys.exit(1 if self._should_report_subprocess_error else 0)
+            # Once nobody will be relaunched, we're done.
+            if all(inst.finished for inst in self._instances):
+                break
+
+            # Now sleep until something happens or a deadline arrives.
+            timeout = self._get_next_deadline(config_watcher is not None)
+            if timeout is not None:
+                timeout = max(0.0, timeout - time.time())
+            for key, _mask in selector.select(timeout):
+                if key.fileobj is self._wakeup_recv:
+                    self._drain_wakeups()
+                elif (
+                    config_watcher is not None and key.fileobj is config_watcher
+                ):
+                    config_watcher.drain()
+                    self._config_check_needed = True
+
+                # (Subprocess-exit fds just need to wake us up; we
+                # notice the exit when we next update that instance)
+
+    def _update_instance(
+        self, inst: _ServerInstance, selector: selectors.BaseSelector
+    ) -> None:
+        """Do whatever needs doing for a single instance right now."""
+        now = time.time()
+
+        if inst.subprocess is None:
+            if inst.finished:
+                return
+            if (
+                inst.stop_desired
+                or self._wrapper_shutdown_desired
+                or (inst.launch_count > 0 and not self._auto_restart)
+            ):
+                self._finish_instance(inst)
+                return
+            if now >= inst.next_launch_time:
+                self._launch_instance(inst, selector)
+            return
+
+        # Pass along any commands to our process.
+        with self._subprocess_commands_lock:
+            commands = inst.commands
+            inst.commands = []
+        for incmd, future in commands:
+            inst.send_command(incmd, future)
+
+        # Request restarts/shut-downs for various reasons.
+        self._request_shutdowns_or_restarts(inst, now)
+
+        # If they want to force-kill our subprocess, do so; the cleanup
+        # code will kill the process if its still alive.
+        if inst.force_kill_time is not None and now > inst.force_kill_time:
+            print(
+                f'{Clr.CYN}{inst.prefix}Immediate shutdown time limit'
+                f' ({self.IMMEDIATE_SHUTDOWN_TIME_LIMIT:.1f} seconds)'
+                f' expired; force-killing subprocess...{Clr.RST}',
+                flush=True,
+            )
+            self._on_instance_exited(inst, selector)
+            return
+
+        # Watch for the server process exiting..
+        code: int | None = inst.subprocess.poll()
+        if code is not None:
+            clr = Clr.CYN if code == 0 else Clr.RED
+            print(
+                f'{clr}{inst.prefix}Server subprocess exited'
+                f' with code {code}.{Clr.RST}',
+                flush=True,
+            )
+            inst.exited_cleanly = code == 0
+            self._on_instance_exited(inst, selector)
 
-    def _run_server_cycle(self) -> None:
-        """Spin up the server subprocess and run it until exit."""
+    def _finish_instance(self, inst: _ServerInstance) -> None:
+        """Mark an instance as never to be launched again."""
+        inst.finished = True
+        with self._subprocess_commands_lock:
+            commands = inst.commands
+            inst.commands = []
+        for _cmd, future in commands:
+            future.set_exception(RuntimeError('Server is shut down.'))
+        if self._rolling_restart_instance is inst:
+            self._rolling_restart_instance = None
+
+    def _launch_instance(
+        self, inst: _ServerInstance, selector: selectors.BaseSelector
+    ) -> None:
+        """Spin up the server subprocess for an instance."""
         # pylint: disable=consider-using-with
 
         # Reload our config, and update our overall behavior based on
         # it. We do non-strict this time to give the user repeated
         # attempts if if they mess up while modifying the config on the
         # fly.
-        self.load_config(strict=False, print_confirmation=True)
+        if not self._reload_config_for_launch(inst):
+            return
 
-        self._prep_subprocess_environment()
+        self._prep_subprocess_environment(inst)
 
         # Launch the binary and grab its stdin; we'll use this to feed
         # it commands.
-        self._subprocess_launch_time = time.time()
+        inst.launch_count += 1
+        inst.launch_time = time.time()
 
         # Set an environment var so the server process knows its being
         # run under us. This causes it to ignore ctrl-c presses and
         # other slight behavior tweaks. Hmm; should this be an argument
         # instead?
-        os.environ['BA_SERVER_WRAPPER_MANAGED'] = '1'
+        env = dict(os.environ)
+        env['BA_SERVER_WRAPPER_MANAGED'] = '1'
 
         # Set particular things that can *only* be passed as args and
         # not config vals (because they need to be handled by the binary
         # before spinning up Python or whatnot).
         extra_args: list[str] = []
 
-        if self._config.dont_write_bytecode:
+        if inst.config.dont_write_bytecode:
             extra_args += ['--dont-write-bytecode']
 
         if self._initial_exec_code is not None:
@@ -750,91 +1499,203 @@ class ServerManagerApp:
         # Set an environment var to change the device name. Device name
         # is used while making connection with master server,
         # cloud-console recognize us with this name.
-        os.environ['BA_DEVICE_NAME'] = self._config.party_name
+        env['BA_DEVICE_NAME'] = inst.config.party_name
 
-        print(f'{Clr.CYN}Launching server subprocess...{Clr.RST}', flush=True)
+        print(
+            f'{Clr.CYN}{inst.prefix}Launching server subprocess...{Clr.RST}',
+            flush=True,
+        )
         binary_name = (
             'BallisticaKitHeadless.exe'
             if os.name == 'nt'
             else './ballisticakit_headless'
         )
-        assert self._ba_root_path is not None
-        self._subprocess = None
+
+        # Where possible, hand the binary one end of a socket-pair to
+        # use as its control channel. Windows can't pass arbitrary fds
+        # to children, so it sticks with feeding commands via stdin.
+        child_sock: socket.socket | None = None
+        if os.name != 'nt':
+            parent_sock, child_sock = socket.socketpair()
+            inst.control_channel = ServerControlChannel(parent_sock)
+            inst.control_channel_child_fd = child_sock.fileno()
 
         # Launch!
         try:
-            self._subprocess = subprocess.Popen(
-                [binary_name, '--config-dir', self._ba_root_path] + extra_args,
+            inst.subprocess = subprocess.Popen(
+                [binary_name, '--config-dir', inst.ba_root_path] + extra_args,
                 stdin=subprocess.PIPE,
                 cwd='dist',
+                env=env,
+                pass_fds=(() if child_sock is None else (child_sock.fileno(),)),
             )
         except Exception as exc:
-            self._subprocess_exited_cleanly = False
             print(
-                f'{Clr.RED}Error launching server subprocess: {exc}{Clr.RST}',
+                f'{Clr.RED}{inst.prefix}Error launching server subprocess:'
+                f' {exc}{Clr.RST}',
                 flush=True,
             )
+        finally:
+            # The child has its own copy of this now.
+            if child_sock is not None:
+                child_sock.close()
+
+        if inst.subprocess is None:
+            inst.close_control_channel()
+            inst.exited_cleanly = False
+            self._on_instance_exited(inst, selector)
+
+            # Don't hold up the rest of the fleet while this one fails.
+            if self._rolling_restart_instance is inst:
+                self._rolling_restart_instance = None
+            return
+
+        # A rolling restart is complete once its replacement has had a
+        # moment to come up.
+        if self._rolling_restart_instance is inst:
+            self._rolling_restart_instance = None
+            self._rolling_restart_settle_time = (
+                inst.launch_time + self.ROLLING_RESTART_SETTLE_TIME
+            )
 
-        # Do the thing.
         try:
-            self._run_subprocess_until_exit()
+            self._watch_for_exit(inst, selector)
+            if inst.control_channel is not None:
+                inst.start_control_channel()
+
+            # Send the initial server config which should kick things off
+            # (but make sure its values are still valid first).
+            dataclass_validate(inst.config)
+            start_future: Future[Any] = Future()
+            start_future.add_done_callback(
+                partial(self._on_start_command_done, inst)
+            )
+            inst.send_command(StartServerModeCommand(inst.config), start_future)
         except Exception as exc:
             print(
-                f'{Clr.RED}Error running server subprocess: {exc}{Clr.RST}',
+                f'{Clr.RED}{inst.prefix}Error running server subprocess:'
+                f' {exc}{Clr.RST}',
                 flush=True,
             )
+            inst.exited_cleanly = False
+            self._on_instance_exited(inst, selector)
 
-        self._kill_subprocess()
+    def _on_start_command_done(
+        self, inst: _ServerInstance, future: Future[Any]
+    ) -> None:
+        """Report if a server process failed to start server mode."""
+        exc = future.exception()
+        if exc is not None:
+            print(
+                f'{Clr.RED}{inst.prefix}Error starting server mode:'
+                f' {exc}{Clr.RST}',
+                flush=True,
+            )
 
-        assert self._subprocess_exited_cleanly is not None
+    def _reload_config_for_launch(self, inst: _ServerInstance) -> bool:
+        """Reload config before launching an instance.
 
-        # EW: it seems that if we die before the main thread has fully
-        # started up the interpreter, its possible that it will not
-        # break out of its loop via the usual SystemExit that gets sent
-        # when we die.
-        if self._interactive:
-            while (
-                self._interpreter_start_time is None
-                or time.time() - self._interpreter_start_time < 0.5
-            ):
-                time.sleep(0.1)
+        Returns False if the launch should be retried later. Unlike
+        load_config(), this never blocks; retries are scheduled instead.
+        """
+        retry_seconds = 3
+        maxtries = 11
+        try:
+            # Check the new config against the whole fleet (not just
+            # this instance) so we don't launch into port collisions.
+            config = self._load_config_from_file(print_confirmation=True)
+            self._check_instance_configs(config)
+            self._config = config
+            self._update_instance_config(inst)
+            inst.config_load_failures = 0
+            return True
+        except Exception as exc:
+            print(
+                f'{Clr.RED}{inst.prefix}Error loading config file:\n'
+                f'{exc}.{Clr.RST}',
+                flush=True,
+            )
+            inst.config_load_failures += 1
+            if inst.config_load_failures >= maxtries:
+                print(
+                    f'{Clr.RED}Max-tries reached; giving up.'
+                    f' Existing config values will be used.{Clr.RST}',
+                    flush=True,
+                )
+                inst.config_load_failures = 0
+                return True
+            print(
+                f'{Clr.CYN}Please correct the error.'
+                f' Will re-attempt load in {retry_seconds}'
+                f' seconds. (attempt {inst.config_load_failures} of'
+                f' {maxtries-1}).{Clr.RST}',
+                flush=True,
+            )
+            inst.next_launch_time = time.time() + retry_seconds
+            return False
 
-        # Avoid super fast death loops.
-        if (
-            not self._subprocess_exited_cleanly
-            and self._auto_restart
-            and not self._done
-        ):
-            time.sleep(5.0)
+    def _watch_for_exit(
+        self, inst: _ServerInstance, selector: selectors.BaseSelector
+    ) -> None:
+        """Arrange for the selector to wake when a subprocess exits.
 
-        # If they don't want auto-restart, we'll exit the whole wrapper.
-        # (and with an error code if things ended badly).
-        if not self._auto_restart:
-            self._wrapper_shutdown_desired = True
-            if not self._subprocess_exited_cleanly:
-                self._should_report_subprocess_error = True
+        Uses a pidfd where available; otherwise parks a thread in wait()
+        which wakes us.
+        """
+        assert inst.subprocess is not None
+        if hasattr(os, 'pidfd_open'):
+            try:
+                inst.pidfd = os.pidfd_open(inst.subprocess.pid)
+            except OSError:
+                pass
+            else:
+                selector.register(inst.pidfd, selectors.EVENT_READ, None)
+                return
 
-        self._reset_subprocess_vars()
+        proc = inst.subprocess
 
-        # If we want to die completely after this subprocess has ended,
-        # tell the main thread to die.
-        if self._wrapper_shutdown_desired:
-            # Only do this if the main thread is not already waiting for
-            # us to die; otherwise it can lead to deadlock. (we hang in
-            # os.kill while main thread is blocked in Thread.join)
-            if not self._done:
-                self._done = True
+        def _wait_for_exit() -> None:
+            proc.wait()
+            self._wake_bg_thread()
 
-                # This should break the main thread out of its blocking
-                # interpreter call.
-                os.kill(os.getpid(), signal.SIGTERM)
+        Thread(target=_wait_for_exit, daemon=True).start()
 
-    def _prep_subprocess_environment(self) -> None:
+    def _cleanup_instance_subprocess(
+        self, inst: _ServerInstance, selector: selectors.BaseSelector
+    ) -> None:
+        if inst.pidfd is not None:
+            selector.unregister(inst.pidfd)
+            os.close(inst.pidfd)
+            inst.pidfd = None
+        inst.kill()
+        inst.close_control_channel()
+
+    def _on_instance_exited(
+        self, inst: _ServerInstance, selector: selectors.BaseSelector
+    ) -> None:
+        """Clean up after an instance's subprocess has gone away."""
+        self._cleanup_instance_subprocess(inst, selector)
+        assert inst.exited_cleanly is not None
+
+        # Avoid super fast death loops.
+        inst.next_launch_time = time.time() + (
+            0.0 if inst.exited_cleanly else self.UNCLEAN_EXIT_RELAUNCH_DELAY
+        )
+
+        # If they don't want auto-restart, we'll exit the whole wrapper
+        # once everything is down (and with an error code if things
+        # ended badly).
+        if not self._auto_restart and not inst.exited_cleanly:
+            self._should_report_subprocess_error = True
+
+        inst.reset_subprocess_vars()
+
+    def _prep_subprocess_environment(self, inst: _ServerInstance) -> None:
         """Write files that must exist at process launch."""
 
-        assert self._ba_root_path is not None
-        os.makedirs(self._ba_root_path, exist_ok=True)
-        cfgpath = os.path.join(self._ba_root_path, 'config.json')
+        config = inst.config
+        os.makedirs(inst.ba_root_path, exist_ok=True)
+        cfgpath = os.path.join(inst.ba_root_path, 'config.json')
         if os.path.exists(cfgpath):
             with open(cfgpath, encoding='utf-8') as infile:
                 bincfg = json.loads(infile.read())
@@ -848,37 +1709,37 @@ class ServerManagerApp:
         # through; otherwise stale values from previous runs can linger
         # in the bincfg.
 
-        bincfg['Port'] = self._config.port
-        bincfg['Auto Balance Teams'] = self._config.auto_balance_teams
-        bincfg['Show Tutorial'] = self._config.show_tutorial
+        bincfg['Port'] = config.port
+        bincfg['Auto Balance Teams'] = config.auto_balance_teams
+        bincfg['Show Tutorial'] = config.show_tutorial
 
         binkey = 'SceneV1 Host Protocol'
-        if self._config.protocol_version is not None:
-            bincfg[binkey] = self._config.protocol_version
+        if config.protocol_version is not None:
+            bincfg[binkey] = config.protocol_version
         elif binkey in bincfg:
             del bincfg[binkey]
 
         binkey = 'Custom Team Names'
-        if self._config.team_names is not None:
-            bincfg[binkey] = self._config.team_names
+        if config.team_names is not None:
+            bincfg[binkey] = config.team_names
         elif binkey in bincfg:
             del bincfg[binkey]
 
         binkey = 'Custom Team Colors'
-        if self._config.team_colors is not None:
-            bincfg[binkey] = self._config.team_colors
+        if config.team_colors is not None:
+            bincfg[binkey] = config.team_colors
         elif binkey in bincfg:
             del bincfg[binkey]
 
-        bincfg['Idle Exit Minutes'] = self._config.idle_exit_minutes
+        bincfg['Idle Exit Minutes'] = config.idle_exit_minutes
 
         binkey = 'Log Levels'
-        if self._config.log_levels is not None:
+        if config.log_levels is not None:
             # Users supply us log level names like NOTSET; convert those
             # to numeric vals which the engine expects.
             bincfg[binkey] = {
                 key: logging.getLevelName(val)
-                for key, val in self._config.log_levels.items()
+                for key, val in config.log_levels.items()
             }
         elif binkey in bincfg:
             del bincfg[binkey]
@@ -890,205 +1751,293 @@ class ServerManagerApp:
         with open(cfgpath, 'w', encoding='utf-8') as outfile:
             outfile.write(json.dumps(bincfg))
 
-    def _enqueue_server_command(self, command: ServerCommand) -> None:
-        """Enqueue a command to be sent to the server.
+    def _enqueue_server_command(
+        self, inst: _ServerInstance, command: ServerCommand
+    ) -> Future[Any]:
+        """Enqueue a command to be sent to a server instance.
 
-        Can be called from any thread.
+        Can be called from any thread. The returned future completes
+        once the server process has run the command.
         """
+        future: Future[Any] = Future()
         with self._subprocess_commands_lock:
-            self._subprocess_commands.append(command)
+            inst.commands.append((command, future))
+        self._wake_bg_thread()
+        return future
+
+    def _wake_bg_thread(self) -> None:
+        """Wake our bg thread if it is waiting. Can be called anywhere."""
+        try:
+            self._wakeup_send.send(b'\0')
+        except BlockingIOError:
+            # Buffer is full, meaning a wakeup is already pending.
+            pass
+
+    def _drain_wakeups(self) -> None:
+        while True:
+            try:
+                if not self._wakeup_recv.recv(4096):
+                    return
+            except BlockingIOError:
+                return
+
+    def _get_restart_stagger(self) -> float:
+        """Seconds between rolling restarts (zero outside fleet mode)."""
+        if len(self._instances) < 2:
+            return 0.0
+        return self._config.fleet_restart_stagger_minutes * 60.0
+
+    def _get_clean_exit_minutes(self, inst: _ServerInstance) -> float:
+        # Enforce a 6 hour max if not provided.
+        clean_exit_minutes = 360.0
+        if inst.config.clean_exit_minutes is not None:
+            clean_exit_minutes = min(
+                clean_exit_minutes, inst.config.clean_exit_minutes
+            )
+        return clean_exit_minutes
+
+    def _get_unclean_exit_minutes(self, inst: _ServerInstance) -> float:
+        # Enforce a 7 hour max if not provided.
+        unclean_exit_minutes = 420.0
+        if inst.config.unclean_exit_minutes is not None:
+            unclean_exit_minutes = min(
+                unclean_exit_minutes, inst.config.unclean_exit_minutes
+            )
+        return unclean_exit_minutes
 
-    def _send_server_command(self, command: ServerCommand) -> None:
-        """Send a command to the server.
+    def _get_exit_time_offset(self, inst: _ServerInstance) -> float:
+        """Seconds added to an instance's exit times.
 
-        Must be called from the server process thread.
+        Fleet instances all launch together, so we spread out their
+        first exit times to keep their restarts from bunching up.
         """
-        import pickle
+        if inst.launch_count > 1:
+            return 0.0
+        return inst.index * self._get_restart_stagger()
+
+    def _get_clean_exit_time(self, inst: _ServerInstance) -> float:
+        assert inst.launch_time is not None
+        return (
+            inst.launch_time
+            + self._get_clean_exit_minutes(inst) * 60.0
+            + self._get_exit_time_offset(inst)
+        )
 
-        assert current_thread() is self._subprocess_thread
-        assert self._subprocess is not None
-        assert self._subprocess.stdin is not None
-        val = repr(pickle.dumps(command))
-        assert '\n' not in val
-        execcode = (
-            f'import baclassic._servermode;'
-            f' baclassic._servermode._cmd({val})\n'
-        ).encode()
-        self._subprocess.stdin.write(execcode)
-        self._subprocess.stdin.flush()
-
-    def _run_subprocess_until_exit(self) -> None:
-        if self._subprocess is None:
-            return
+    def _get_unclean_exit_time(self, inst: _ServerInstance) -> float:
+        assert inst.launch_time is not None
+        return (
+            inst.launch_time
+            + self._get_unclean_exit_minutes(inst) * 60.0
+            + self._get_exit_time_offset(inst)
+        )
 
-        assert current_thread() is self._subprocess_thread
-        assert self._subprocess.stdin is not None
+    def _rolling_restart_allowed(self, now: float, stagger: bool) -> bool:
+        """Can an instance begin a rolling restart right now?
 
-        # Send the initial server config which should kick things off
-        # (but make sure its values are still valid first).
-        dataclass_validate(self._config)
-        self._send_server_command(StartServerModeCommand(self._config))
+        Only one instance at a time may be restarting, and 'stagger'
+        additionally enforces the fleet restart stagger time since the
+        last one began.
+        """
+        if (
+            self._rolling_restart_instance is not None
+            or now < self._rolling_restart_settle_time
+        ):
+            return False
+        if stagger and self._last_rolling_restart_time is not None:
+            return (
+                now - self._last_rolling_restart_time
+                >= self._get_restart_stagger()
+            )
+        return True
 
-        while True:
-            # If the app is trying to shut down, nope out immediately.
-            if self._done:
-                break
+    def _is_most_overdue_for_clean_exit(
+        self, inst: _ServerInstance, now: float
+    ) -> bool:
+        """Is this the instance that has waited longest for its restart?
 
-            # Pass along any commands to our process.
-            with self._subprocess_commands_lock:
-                for incmd in self._subprocess_commands:
-                    # If we're passing a raw string to exec, no need to
-                    # wrap it in any proper structure.
-                    if isinstance(incmd, str):
-                        self._subprocess.stdin.write((incmd + '\n').encode())
-                        self._subprocess.stdin.flush()
-                    else:
-                        self._send_server_command(incmd)
-                self._subprocess_commands = []
-
-            # Request restarts/shut-downs for various reasons.
-            self._request_shutdowns_or_restarts()
-
-            # If they want to force-kill our subprocess, simply exit
-            # this loop; the cleanup code will kill the process if its
-            # still alive.
+        Keeps one instance with a short clean_exit_minutes from
+        repeatedly grabbing the restart slot ahead of others.
+        """
+        due = [
+            other
+            for other in self._instances
+            if other.subprocess is not None
+            and not other.sent_clean_exit
+            and now >= self._get_clean_exit_time(other)
+        ]
+        return min(due, key=self._get_clean_exit_time) is inst
+
+    def _begin_rolling_restart(self, inst: _ServerInstance, now: float) -> None:
+        if len(self._instances) > 1:
+            self._rolling_restart_instance = inst
+        self._last_rolling_restart_time = now
+
+    def _get_next_deadline(self, watching_config: bool) -> float | None:
+        """Return the next time we need to wake with nothing happening."""
+        deadlines: list[float] = []
+        for inst in self._instances:
+            if inst.finished:
+                continue
+            if inst.subprocess is None:
+                deadlines.append(inst.next_launch_time)
+                continue
+            if inst.force_kill_time is not None:
+                deadlines.append(inst.force_kill_time)
+            # (When another instance holds the rolling-restart slot,
+            # we'll get woken as it relaunches instead)
             if (
-                self._subprocess_force_kill_time is not None
-                and time.time() > self._subprocess_force_kill_time
+                not inst.sent_clean_exit
+                and self._rolling_restart_instance is None
             ):
-                print(
-                    f'{Clr.CYN}Immediate shutdown time limit'
-                    f' ({self.IMMEDIATE_SHUTDOWN_TIME_LIMIT:.1f} seconds)'
-                    f' expired; force-killing subprocess...{Clr.RST}',
-                    flush=True,
-                )
-                break
-
-            # Watch for the server process exiting..
-            code: int | None = self._subprocess.poll()
-            if code is not None:
-                clr = Clr.CYN if code == 0 else Clr.RED
-                print(
-                    f'{clr}Server subprocess exited'
-                    f' with code {code}.{Clr.RST}',
-                    flush=True,
+                deadline = self._get_clean_exit_time(inst)
+
+                # If the restart is being held up for the stagger or
+                # settle time, wake when that passes instead.
+                if self._last_rolling_restart_time is not None:
+                    deadline = max(
+                        deadline,
+                        self._last_rolling_restart_time
+                        + self._get_restart_stagger(),
+                    )
+                deadlines.append(
+                    max(deadline, self._rolling_restart_settle_time)
                 )
-                self._subprocess_exited_cleanly = code == 0
-                break
-
-            time.sleep(0.25)
-
-    def _request_shutdowns_or_restarts(self) -> None:
-        assert current_thread() is self._subprocess_thread
-        assert self._subprocess_launch_time is not None
-        now = time.time()
-        minutes_since_launch = (now - self._subprocess_launch_time) / 60.0
+            if (
+                inst.config_restart_pending
+                and not inst.sent_config_restart
+                and self._rolling_restart_instance is None
+            ):
+                deadlines.append(self._rolling_restart_settle_time)
+            if not inst.sent_unclean_exit:
+                deadlines.append(self._get_unclean_exit_time(inst))
 
-        # If we're doing auto-restart with config changes, handle that.
         if (
             self._auto_restart
             and self._config_auto_restart
-            and not self._subprocess_sent_config_auto_restart
+            and not watching_config
+            and self._last_config_mtime_check_time is not None
         ):
-            if (
-                self._last_config_mtime_check_time is None
-                or (now - self._last_config_mtime_check_time) > 3.123
-            ):
-                self._last_config_mtime_check_time = now
-                mtime: float | None
-                config_path = self._get_config_path()
-                if os.path.isfile(config_path):
-                    mtime = Path(config_path).stat().st_mtime
-                else:
-                    mtime = None
-                if mtime != self._config_mtime:
-                    print(
-                        f'{Clr.CYN}Config-file change detected;'
-                        f' requesting immediate restart.{Clr.RST}',
-                        flush=True,
-                    )
-                    self.restart(immediate=True)
-                    self._subprocess_sent_config_auto_restart = True
+            deadlines.append(
+                self._last_config_mtime_check_time + self.CONFIG_POLL_INTERVAL
+            )
+        return min(deadlines) if deadlines else None
 
-        # Attempt clean exit if our clean-exit-time passes (and enforce
-        # a 6 hour max if not provided).
-        clean_exit_minutes = 360.0
-        if self._config.clean_exit_minutes is not None:
-            clean_exit_minutes = min(
-                clean_exit_minutes, self._config.clean_exit_minutes
+    def _check_for_config_changes(
+        self, now: float, watching_config: bool
+    ) -> None:
+        """Flag instances for restart if the config file has changed."""
+        if not self._auto_restart or not self._config_auto_restart:
+            return
+        if not (
+            self._config_check_needed
+            or self._last_config_mtime_check_time is None
+            or (
+                not watching_config
+                and (now - self._last_config_mtime_check_time)
+                >= self.CONFIG_POLL_INTERVAL
             )
-        if clean_exit_minutes is not None:
-            if (
-                minutes_since_launch > clean_exit_minutes
-                and not self._subprocess_sent_clean_exit
-            ):
-                opname = 'restart' if self._auto_restart else 'shutdown'
-                print(
-                    f'{Clr.CYN}clean_exit_minutes'
-                    f' ({clean_exit_minutes})'
-                    f' elapsed; requesting soft'
-                    f' {opname}.{Clr.RST}',
-                    flush=True,
-                )
-                if self._auto_restart:
-                    self.restart(immediate=False)
-                else:
-                    self.shutdown(immediate=False)
-                self._subprocess_sent_clean_exit = True
+        ):
+            return
 
-        # Attempt unclean exit if our unclean-exit-time passes (and
-        # enforce a 7 hour max if not provided).
-        unclean_exit_minutes = 420.0
-        if self._config.unclean_exit_minutes is not None:
-            unclean_exit_minutes = min(
-                unclean_exit_minutes, self._config.unclean_exit_minutes
+        self._config_check_needed = False
+        self._last_config_mtime_check_time = now
+        mtime: float | None
+        config_path = self._get_config_path()
+        if os.path.isfile(config_path):
+            mtime = Path(config_path).stat().st_mtime
+        else:
+            mtime = None
+        if mtime == self._config_mtime:
+            return
+
+        # Note that we've seen this change; instances reload the config
+        # for real as they relaunch.
+        self._config_mtime = mtime
+        running = [
+            inst for inst in self._instances if inst.subprocess is not None
+        ]
+        if not running:
+            return
+        if len(self._instances) > 1:
+            print(
+                f'{Clr.CYN}Config-file change detected;'
+                f' requesting rolling restart.{Clr.RST}',
+                flush=True,
             )
-        if unclean_exit_minutes is not None:
-            if (
-                minutes_since_launch > unclean_exit_minutes
-                and not self._subprocess_sent_unclean_exit
-            ):
-                opname = 'restart' if self._auto_restart else 'shutdown'
-                print(
-                    f'{Clr.CYN}unclean_exit_minutes'
-                    f' ({unclean_exit_minutes})'
-                    f' elapsed; requesting immediate'
-                    f' {opname}.{Clr.RST}',
-                    flush=True,
-                )
-                if self._auto_restart:
-                    self.restart(immediate=True)
-                else:
-                    self.shutdown(immediate=True)
-                self._subprocess_sent_unclean_exit = True
-
-    def _reset_subprocess_vars(self) -> None:
-        self._subprocess = None
-        self._subprocess_launch_time = None
-        self._subprocess_sent_config_auto_restart = False
-        self._subprocess_sent_clean_exit = False
-        self._subprocess_sent_unclean_exit = False
-        self._subprocess_force_kill_time = None
-        self._subprocess_exited_cleanly = None
-
-    def _kill_subprocess(self) -> None:
-        """End the server subprocess if it still exists."""
+        else:
+            print(
+                f'{Clr.CYN}Config-file change detected;'
+                f' requesting immediate restart.{Clr.RST}',
+                flush=True,
+            )
+        for inst in running:
+            inst.config_restart_pending = True
+
+    def _request_shutdowns_or_restarts(
+        self, inst: _ServerInstance, now: float
+    ) -> None:
         assert current_thread() is self._subprocess_thread
-        if self._subprocess is None:
-            return
+        assert inst.launch_time is not None
 
-        print(f'{Clr.CYN}Stopping subprocess...{Clr.RST}', flush=True)
+        # Config changes restart instances immediately, but only one at
+        # a time.
+        if (
+            inst.config_restart_pending
+            and not inst.sent_config_restart
+            and self._rolling_restart_allowed(now, stagger=False)
+        ):
+            self._begin_rolling_restart(inst, now)
+            self._restart_instance(inst, immediate=True)
+            inst.sent_config_restart = True
 
-        # First, ask it nicely to die and give it a moment. If that
-        # doesn't work, bring down the hammer.
-        self._subprocess.terminate()
-        try:
-            self._subprocess.wait(timeout=10)
-            self._subprocess_exited_cleanly = self._subprocess.returncode == 0
-        except subprocess.TimeoutExpired:
-            self._subprocess_exited_cleanly = False
-            self._subprocess.kill()
-        print(f'{Clr.CYN}Subprocess stopped.{Clr.RST}', flush=True)
+        # Attempt clean exit if our clean-exit-time passes (staggering
+        # these between instances when running a fleet).
+        if (
+            now >= self._get_clean_exit_time(inst)
+            and not inst.sent_clean_exit
+            and self._rolling_restart_allowed(now, stagger=True)
+            and self._is_most_overdue_for_clean_exit(inst, now)
+        ):
+            clean_exit_minutes = self._get_clean_exit_minutes(inst)
+            opname = 'restart' if self._auto_restart else 'shutdown'
+            print(
+                f'{Clr.CYN}{inst.prefix}clean_exit_minutes'
+                f' ({clean_exit_minutes})'
+                f' elapsed; requesting soft'
+                f' {opname}.{Clr.RST}',
+                flush=True,
+            )
+            if self._auto_restart:
+                self._begin_rolling_restart(inst, now)
+                self._restart_instance(inst, immediate=False)
+            else:
+                self._shutdown_instance(inst, immediate=False)
+            inst.sent_clean_exit = True
+
+        # Attempt unclean exit if our unclean-exit-time passes.
+        if (
+            now >= self._get_unclean_exit_time(inst)
+            and not inst.sent_unclean_exit
+        ):
+            unclean_exit_minutes = self._get_unclean_exit_minutes(inst)
+            opname = 'restart' if self._auto_restart else 'shutdown'
+            print(
+                f'{Clr.CYN}{inst.prefix}unclean_exit_minutes'
+                f' ({unclean_exit_minutes})'
+                f' elapsed; requesting immediate'
+                f' {opname}.{Clr.RST}',
+                flush=True,
+            )
+            if self._auto_restart:
+                self._restart_instance(inst, immediate=True)
+            else:
+                self._shutdown_instance(inst, immediate=True)
+            inst.sent_unclean_exit = True
+
+    def _handle_term_signal(self, sig: int, frame: FrameType | None) -> None:
+        """Handle signals (will always run in the main thread)."""
+        del sig, frame  # Unused.
+        sys.exit(1 if self._should_report_subprocess_error else 0)
 
 
 def main() -> None:
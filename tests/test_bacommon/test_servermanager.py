@@ -0,0 +1,563 @@
+# Released under the MIT License. See LICENSE for details.
+#
+"""Testing server-manager functionality."""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import queue
+import socket
+import struct
+import selectors
+import threading
+import subprocess
+import contextlib
+import importlib.util
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bacommon.servermanager import (
+    ExecCommand,
+    ChatMessageCommand,
+    ServerControlChannel,
+    ServerControlRequest,
+    ServerControlResponse,
+    CONTROL_FRAME_MAX_SIZE,
+)
+
+if TYPE_CHECKING:
+    from types import ModuleType
+    from typing import Any, Iterator
+    from pathlib import Path
+
+
+def test_control_channel_round_trip() -> None:
+    """Requests and responses should survive the trip intact."""
+    sock_a, sock_b = socket.socketpair()
+    chan_a = ServerControlChannel(sock_a)
+    chan_b = ServerControlChannel(sock_b)
+    try:
+        request = ServerControlRequest(
+            request_id=3, command=ChatMessageCommand(message='hi', clients=[1])
+        )
+        chan_a.send(request)
+        chan_a.send(ServerControlRequest(request_id=4, command=request.command))
+        assert chan_b.recv() == request
+        received = chan_b.recv()
+        assert isinstance(received, ServerControlRequest)
+        assert received.request_id == 4
+
+        chan_b.send(ServerControlResponse(request_id=3, result=[1, 2]))
+        chan_b.send(ServerControlResponse(request_id=4, error='nope'))
+        assert chan_a.recv() == ServerControlResponse(
+            request_id=3, result=[1, 2]
+        )
+        assert chan_a.recv() == ServerControlResponse(
+            request_id=4, error='nope'
+        )
+    finally:
+        chan_a.close()
+        chan_b.close()
+
+
+def test_control_channel_close() -> None:
+    """A clean close should show up as None; a partial frame as an error."""
+    sock_a, sock_b = socket.socketpair()
+    chan_b = ServerControlChannel(sock_b)
+    sock_a.close()
+    assert chan_b.recv() is None
+    chan_b.close()
+
+    sock_a, sock_b = socket.socketpair()
+    chan_b = ServerControlChannel(sock_b)
+    sock_a.sendall(struct.pack('>I', 100) + b'abc')
+    sock_a.close()
+    with pytest.raises(RuntimeError):
+        chan_b.recv()
+    chan_b.close()
+
+
+def test_control_channel_bad_frames() -> None:
+    """Oversized frames and unexpected payloads should be rejected."""
+    sock_a, sock_b = socket.socketpair()
+    chan_b = ServerControlChannel(sock_b)
+    try:
+        sock_a.sendall(struct.pack('>I', CONTROL_FRAME_MAX_SIZE + 1))
+        with pytest.raises(RuntimeError):
+            chan_b.recv()
+    finally:
+        sock_a.close()
+        chan_b.close()
+
+    sock_a, sock_b = socket.socketpair()
+    chan_b = ServerControlChannel(sock_b)
+    try:
+        payload = b'\x80\x05K\x05.'  # A pickled int.
+        sock_a.sendall(struct.pack('>I', len(payload)) + payload)
+        with pytest.raises(TypeError):
+            chan_b.recv()
+    finally:
+        sock_a.close()
+        chan_b.close()
+
+
+def _load_server_manager_module() -> ModuleType:
+    path = os.path.join(
+        os.path.dirname(__file__),
+        '..',
+        '..',
+        'src',
+        'assets',
+        'server_package',
+        'ballisticakit_server.py',
+    )
+    spec = importlib.util.spec_from_file_location('_test_bkserver', path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# A basic fleet of server instances.
+_FLEET_INSTANCES = [
+    {'name': 'alpha', 'port': 43210},
+    {'name': 'beta', 'port': 43211},
+    {'name': 'gamma', 'port': 43212},
+]
+
+
+def _make_server_manager(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, config: dict[str, Any]
+) -> Any:
+    """Create a server manager using the provided config values."""
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps(config), encoding='utf-8')
+    monkeypatch.setattr(
+        sys,
+        'argv',
+        [
+            'ballisticakit_server.py',
+            '--config',
+            str(config_path),
+            '--root',
+            str(tmp_path / 'root'),
+            '--noninteractive',
+        ],
+    )
+    return _load_server_manager_module().ServerManagerApp()
+
+
+def test_fleet_command_fan_out(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Commands should go to each targeted instance and be waited on."""
+    app = _make_server_manager(
+        tmp_path, monkeypatch, {'fleet_instances': _FLEET_INSTANCES}
+    )
+    app.COMMAND_REPLY_TIMEOUT = 0.5
+    instances = app._instances  # pylint: disable=protected-access
+
+    # Stand in for the bg thread; answer commands as soon as they are
+    # queued, except for any sent to a 'stalled' instance.
+    stalled: set[str] = set()
+
+    def _answer_commands() -> None:
+        for inst in instances:
+            if inst.name in stalled:
+                continue
+            for command, future in inst.commands:
+                future.set_result(f'{type(command).__name__}@{inst.name}')
+            inst.commands.clear()
+
+    monkeypatch.setattr(app, '_wake_bg_thread', _answer_commands)
+
+    # No instance given means all of them.
+    app.clientlist()
+    out = capsys.readouterr().out
+    for name in ('alpha', 'beta', 'gamma'):
+        assert f'ClientListCommand@{name}' in out
+
+    # Instances can be picked by name or index.
+    app.clientlist(instance='beta')
+    out = capsys.readouterr().out
+    assert 'ClientListCommand@beta' in out
+    assert 'alpha' not in out and 'gamma' not in out
+    app.clientlist(instance=2)
+    out = capsys.readouterr().out
+    assert 'ClientListCommand@gamma' in out
+    assert 'alpha' not in out and 'beta' not in out
+    with pytest.raises(ValueError):
+        app.clientlist(instance='delta')
+
+    # A stalled instance should cost one timeout total, not one per
+    # instance, and should not hide results from the others.
+    stalled.update({'alpha', 'beta'})
+    starttime = time.monotonic()
+    app.clientlist()
+    duration = time.monotonic() - starttime
+    out = capsys.readouterr().out
+    assert 'ClientListCommand@gamma' in out
+    assert out.count('Timed out waiting for server response.') == 2
+    assert duration < app.COMMAND_REPLY_TIMEOUT * 2
+
+
+def test_fleet_exit_time_offsets(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """First exit times should be spread across the fleet."""
+    # pylint: disable=protected-access
+    app = _make_server_manager(
+        tmp_path,
+        monkeypatch,
+        {
+            'fleet_instances': _FLEET_INSTANCES,
+            'clean_exit_minutes': 60.0,
+            'fleet_restart_stagger_minutes': 5.0,
+        },
+    )
+    for inst in app._instances:
+        inst.launch_count = 1
+        inst.launch_time = 1000.0
+    assert [app._get_exit_time_offset(i) for i in app._instances] == [
+        0.0,
+        300.0,
+        600.0,
+    ]
+    assert [app._get_clean_exit_time(i) for i in app._instances] == [
+        4600.0,
+        4900.0,
+        5200.0,
+    ]
+    assert [app._get_unclean_exit_time(i) for i in app._instances] == [
+        26200.0,
+        26500.0,
+        26800.0,
+    ]
+
+    # Relaunched instances are already spread out.
+    inst = app._instances[2]
+    inst.launch_count = 2
+    assert app._get_exit_time_offset(inst) == 0.0
+    assert app._get_clean_exit_time(inst) == 4600.0
+
+    # There is nothing to stagger with a single server.
+    app = _make_server_manager(
+        tmp_path, monkeypatch, {'fleet_restart_stagger_minutes': 5.0}
+    )
+    inst = app._instances[0]
+    inst.launch_count = 1
+    assert app._get_exit_time_offset(inst) == 0.0
+
+
+def test_fleet_most_overdue(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Only the instance waiting longest should claim a clean exit."""
+    # pylint: disable=protected-access
+    app = _make_server_manager(
+        tmp_path,
+        monkeypatch,
+        {
+            'fleet_instances': [
+                {'name': 'alpha', 'port': 43210, 'clean_exit_minutes': 10.0},
+                {'name': 'beta', 'port': 43211},
+                {'name': 'gamma', 'port': 43212},
+            ],
+            'clean_exit_minutes': 60.0,
+            'fleet_restart_stagger_minutes': 0.0,
+        },
+    )
+    alpha, beta, gamma = app._instances
+    for inst in app._instances:
+        inst.subprocess = object()
+        inst.launch_count = 2
+    alpha.launch_time = 3050.0
+    beta.launch_time = 0.0
+    gamma.launch_time = 100.0
+
+    # Beta has been due the longest (even though alpha restarts more
+    # often) and nobody else gets to go ahead of it.
+    now = 3700.0
+    assert app._is_most_overdue_for_clean_exit(beta, now)
+    assert not app._is_most_overdue_for_clean_exit(alpha, now)
+    assert not app._is_most_overdue_for_clean_exit(gamma, now)
+
+    # Instances that have already been asked to exit or aren't running
+    # don't count.
+    beta.sent_clean_exit = True
+    assert app._is_most_overdue_for_clean_exit(alpha, now)
+    alpha.subprocess = None
+    assert app._is_most_overdue_for_clean_exit(gamma, now)
+
+
+def test_fleet_rolling_restarts(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Only one instance should be down for a restart at a time."""
+    # pylint: disable=protected-access
+    app = _make_server_manager(
+        tmp_path,
+        monkeypatch,
+        {
+            'fleet_instances': _FLEET_INSTANCES,
+            'clean_exit_minutes': 60.0,
+            'fleet_restart_stagger_minutes': 5.0,
+        },
+    )
+    app._subprocess_thread = threading.current_thread()
+    restarts: list[tuple[str, bool]] = []
+    monkeypatch.setattr(
+        app,
+        '_restart_instance',
+        lambda inst, immediate: restarts.append((inst.name, immediate)),
+    )
+    for inst in app._instances:
+        inst.subprocess = object()
+        inst.launch_count = 1
+        inst.launch_time = 0.0
+
+    def _update_all(now: float) -> list[tuple[str, bool]]:
+        for inst in app._instances:
+            app._request_shutdowns_or_restarts(inst, now)
+        out = list(restarts)
+        restarts.clear()
+        return out
+
+    def _relaunch(name: str, now: float) -> None:
+        # Stand in for what happens as a restarted instance comes back.
+        inst = app._get_instances(name)[0]
+        inst.reset_subprocess_vars()
+        inst.subprocess = object()
+        inst.launch_count += 1
+        inst.launch_time = now
+        assert app._rolling_restart_instance is inst
+        app._rolling_restart_instance = None
+        app._rolling_restart_settle_time = (
+            now + app.ROLLING_RESTART_SETTLE_TIME
+        )
+
+    # Nothing is due until an hour in, and then only alpha (the others
+    # are offset).
+    assert not _update_all(3599.0)
+    assert _update_all(3600.0) == [('alpha', False)]
+
+    # Beta is due shortly after but has to wait for alpha to come back
+    # and settle.
+    assert not _update_all(3900.0)
+    _relaunch('alpha', 3950.0)
+    assert not _update_all(3955.0)
+    assert _update_all(3960.0) == [('beta', False)]
+
+    # Config changes restart things immediately, but still one at a
+    # time and not while another restart is underway.
+    for inst in app._instances:
+        inst.config_restart_pending = True
+    assert not _update_all(3970.0)
+    _relaunch('beta', 3980.0)
+    assert not _update_all(3985.0)
+    assert _update_all(3990.0) == [('alpha', True)]
+    assert not _update_all(3991.0)
+    _relaunch('alpha', 4000.0)
+    assert _update_all(4010.0) == [('gamma', True)]
+    _relaunch('gamma', 4020.0)
+
+    # Relaunched instances' clean exits are no longer offset, so they
+    # come due close together (beta, then alpha, then gamma). They
+    # should still go one at a time, most overdue first, and staggered.
+    assert not _update_all(4030.0)
+    assert _update_all(7580.0) == [('beta', False)]
+    assert not _update_all(7620.0)
+    _relaunch('beta', 7625.0)
+    assert not _update_all(7635.0)
+    assert _update_all(7880.0) == [('alpha', False)]
+    _relaunch('alpha', 7890.0)
+    assert not _update_all(7900.0)
+    assert _update_all(8180.0) == [('gamma', False)]
+
+
+def test_fleet_config_reload_port_collisions(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Config reloads that would collide ports should be refused."""
+    # pylint: disable=protected-access
+    app = _make_server_manager(
+        tmp_path, monkeypatch, {'fleet_instances': _FLEET_INSTANCES}
+    )
+    alpha, beta, _gamma = app._instances
+    config_path = tmp_path / 'config.json'
+
+    config_path.write_text(
+        json.dumps(
+            {
+                'fleet_instances': [
+                    {'name': 'alpha', 'port': 43210},
+                    {'name': 'beta', 'port': 43210},
+                    {'name': 'gamma', 'port': 43212},
+                ]
+            }
+        ),
+        encoding='utf-8',
+    )
+    assert not app._reload_config_for_launch(beta)
+    assert beta.config.port == 43211
+    assert app.config.fleet_instances == _FLEET_INSTANCES
+
+    # Relaunching the other side of a collision should fail too.
+    assert not app._reload_config_for_launch(alpha)
+    assert alpha.config.port == 43210
+
+    # Once fixed we should be good to go.
+    config_path.write_text(
+        json.dumps(
+            {
+                'fleet_instances': [
+                    {'name': 'alpha', 'port': 43210},
+                    {'name': 'beta', 'port': 43213},
+                    {'name': 'gamma', 'port': 43212},
+                ]
+            }
+        ),
+        encoding='utf-8',
+    )
+    assert app._reload_config_for_launch(beta)
+    assert beta.config.port == 43213
+
+
+# Stands in for a server binary; it just exits cleanly once it is told
+# to shut down (commands arrive via stdin without a control channel).
+_FAKE_SERVER = """
+import sys
+for line in sys.stdin:
+    if 'ShutdownCommand' in line:
+        sys.exit(0)
+"""
+
+
+@contextlib.contextmanager
+def _run_supervisor(
+    app: Any, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[queue.Queue[subprocess.Popen[bytes]]]:
+    """Run an app's supervision loop in a thread with fake servers.
+
+    Yields a queue that gets each launched subprocess.
+    """
+    # pylint: disable=protected-access
+    launches: queue.Queue[subprocess.Popen[bytes]] = queue.Queue()
+    selector = selectors.DefaultSelector()
+    selector.register(app._wakeup_recv, selectors.EVENT_READ, None)
+    watcher = _load_server_manager_module()._ConfigFileWatcher.create(
+        app._get_config_path()
+    )
+    if watcher is not None:
+        selector.register(watcher, selectors.EVENT_READ, None)
+
+    def _launch_instance(inst: Any, sel: selectors.BaseSelector) -> None:
+        # pylint: disable=consider-using-with
+        if not app._reload_config_for_launch(inst):
+            return
+        inst.launch_count += 1
+        inst.launch_time = time.time()
+        inst.subprocess = subprocess.Popen(
+            [sys.executable, '-c', _FAKE_SERVER], stdin=subprocess.PIPE
+        )
+        app._watch_for_exit(inst, sel)
+        launches.put(inst.subprocess)
+
+    monkeypatch.setattr(app, '_launch_instance', _launch_instance)
+    # (Daemon so a loop that fails to wake doesn't hang the test run)
+    thread = threading.Thread(
+        target=app._supervise_instances, args=(selector, watcher), daemon=True
+    )
+    app._subprocess_thread = thread
+    thread.start()
+    try:
+        yield launches
+    finally:
+        app._done = True
+        app._wake_bg_thread()
+        thread.join(timeout=10.0)
+        assert not thread.is_alive()
+        for inst in app._instances:
+            app._cleanup_instance_subprocess(inst, selector)
+        selector.close()
+        if watcher is not None:
+            watcher.close()
+
+
+# Note: supervision deadlines (clean_exit_minutes, etc.) are hours out
+# in these tests; anything happening promptly means the loop was woken
+# by the event in question and not by a timeout.
+
+
+def test_supervisor_child_exit(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Server processes exiting should be noticed and relaunched."""
+    # pylint: disable=protected-access
+    app = _make_server_manager(tmp_path, monkeypatch, {})
+    app.UNCLEAN_EXIT_RELAUNCH_DELAY = 0.0
+    with _run_supervisor(app, monkeypatch) as launches:
+        proc = launches.get(timeout=10.0)
+        proc.kill()
+        proc2 = launches.get(timeout=10.0)
+        assert proc2 is not proc
+        assert proc.poll() is not None
+        assert app._instances[0].launch_count == 2
+
+
+def test_supervisor_wakeup(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Queued commands should wake the loop to send them."""
+    # pylint: disable=protected-access
+    app = _make_server_manager(tmp_path, monkeypatch, {})
+    inst = app._instances[0]
+    with _run_supervisor(app, monkeypatch) as launches:
+        proc = launches.get(timeout=10.0)
+        for _i in range(3):
+            future = app._enqueue_server_command(inst, ExecCommand('pass'))
+            future.result(timeout=10.0)
+        assert proc.poll() is None
+        assert launches.empty()
+
+    # Redundant wakeups shouldn't block or pile up.
+    for _i in range(100000):
+        app._wake_bg_thread()
+    app._drain_wakeups()
+    with pytest.raises(BlockingIOError):
+        app._wakeup_recv.recv(1)
+
+
+def test_supervisor_config_change(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Config file changes should restart servers with the new config."""
+    # pylint: disable=protected-access
+    app = _make_server_manager(tmp_path, monkeypatch, {'port': 43210})
+    app.CONFIG_POLL_INTERVAL = 0.1
+    inst = app._instances[0]
+    config_path = tmp_path / 'config.json'
+    with _run_supervisor(app, monkeypatch) as launches:
+        proc = launches.get(timeout=10.0)
+        assert inst.config.port == 43210
+
+        # Editors often write a new file and move it into place; make
+        # sure that gets noticed (and that mtime differs).
+        newpath = tmp_path / 'config.json.new'
+        newpath.write_text(json.dumps({'port': 43211}), encoding='utf-8')
+        mtime = config_path.stat().st_mtime + 10.0
+        os.utime(newpath, (mtime, mtime))
+        os.replace(newpath, config_path)
+
+        # The old server gets asked to shut down and a new one comes up
+        # with the new config.
+        proc2 = launches.get(timeout=10.0)
+        assert proc.wait(timeout=10.0) == 0
+        assert proc2 is not proc
+        assert inst.config.port == 43211
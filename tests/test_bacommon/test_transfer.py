@@ -0,0 +1,222 @@
+# Released under the MIT License. See LICENSE for details.
+#
+"""Testing file transfer functionality."""
+
+from __future__ import annotations
+
+import os
+import time
+import hashlib
+from typing import TYPE_CHECKING
+
+from bacommon import transfer
+from bacommon.transfer import (
+    FileHashCache,
+    DirectoryManifest,
+    DirectoryManifestFile,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def _count_hashes(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Keep track of the files that actually get hashed."""
+    hashed: list[str] = []
+    hash_file = transfer._hash_file  # pylint: disable=protected-access
+
+    def _hash_file_counted(path: str) -> DirectoryManifestFile:
+        hashed.append(path)
+        return hash_file(path)
+
+    monkeypatch.setattr(transfer, '_hash_file', _hash_file_counted)
+    return hashed
+
+
+def _write(path: Path, data: bytes, mtime_ns: int | None = None) -> str:
+    """Write a file, backdating it past the racy window by default."""
+    path.write_bytes(data)
+    if mtime_ns is None:
+        mtime_ns = time.time_ns() - 3600 * 1_000_000_000
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+def _info(data: bytes) -> DirectoryManifestFile:
+    return DirectoryManifestFile(
+        hash_sha256=hashlib.sha256(data).hexdigest(), size=len(data)
+    )
+
+
+def test_file_hash_cache_hit(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Unchanged files should only get hashed once."""
+    hashed = _count_hashes(monkeypatch)
+    path = _write(tmp_path / 'a', b'hello')
+    cache = FileHashCache()
+
+    assert cache.lookup(path) is None
+    assert cache.get_file_info(path) == _info(b'hello')
+    assert cache.get_file_info(path) == _info(b'hello')
+    assert cache.lookup(path) == _info(b'hello')
+    assert hashed == [path]
+
+    # Relative paths should map to the same entry.
+    monkeypatch.chdir(tmp_path)
+    assert cache.lookup('a') == _info(b'hello')
+
+    # As should things going through manifests.
+    manifest = DirectoryManifest.create_from_disk(tmp_path, hash_cache=cache)
+    assert manifest.files == {'a': _info(b'hello')}
+    assert hashed == [path]
+
+
+def test_file_hash_cache_invalidation(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Changes to mtime, size, or inode should each mean re-hashing."""
+    hashed = _count_hashes(monkeypatch)
+    cache = FileHashCache()
+    mtime_ns = time.time_ns() - 3600 * 1_000_000_000
+    path = _write(tmp_path / 'a', b'aaaa', mtime_ns)
+    assert cache.get_file_info(path) == _info(b'aaaa')
+
+    # Same size, new mtime.
+    _write(tmp_path / 'a', b'bbbb', mtime_ns + 1_000_000_000)
+    assert cache.lookup(path) is None
+    assert cache.get_file_info(path) == _info(b'bbbb')
+
+    # New size, same mtime.
+    _write(tmp_path / 'a', b'ccccc', mtime_ns + 1_000_000_000)
+    assert cache.lookup(path) is None
+    assert cache.get_file_info(path) == _info(b'ccccc')
+
+    # Same size and mtime, but a different file moved into place.
+    newpath = _write(tmp_path / 'b', b'ddddd', mtime_ns + 1_000_000_000)
+    os.replace(newpath, path)
+    assert cache.lookup(path) is None
+    assert cache.get_file_info(path) == _info(b'ddddd')
+
+    assert hashed == [path] * 4
+    assert cache.lookup(path) == _info(b'ddddd')
+
+    # Files going away should just be misses.
+    os.unlink(path)
+    assert cache.lookup(path) is None
+
+
+def test_file_hash_cache_racy_mtime(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Files modified too recently to trust shouldn't get cached."""
+    hashed = _count_hashes(monkeypatch)
+    cache = FileHashCache()
+    path = _write(tmp_path / 'a', b'hello', time.time_ns())
+
+    # We should still get correct results; just not cached ones.
+    assert cache.get_file_info(path) == _info(b'hello')
+    assert cache.lookup(path) is None
+    assert cache.get_file_info(path) == _info(b'hello')
+    assert len(hashed) == 2
+
+    # Once it has settled down it's fair game.
+    _write(tmp_path / 'a', b'hello')
+    assert cache.get_file_info(path) == _info(b'hello')
+    assert cache.lookup(path) == _info(b'hello')
+    assert len(hashed) == 3
+
+
+def test_file_hash_cache_save_load(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Caches should survive a trip to disk."""
+    hashed = _count_hashes(monkeypatch)
+    cachepath = tmp_path / 'cache' / 'hashes.json'
+    datadir = tmp_path / 'data'
+    datadir.mkdir()
+    path_a = _write(datadir / 'a', b'aaa')
+    path_b = _write(datadir / 'b', b'bbb')
+
+    cache = FileHashCache(cachepath)
+    cache.get_file_info(path_a)
+    cache.get_file_info(path_b)
+    cache.save()
+    assert cachepath.is_file()
+
+    # A fresh cache should pick up where the old one left off.
+    cache = FileHashCache(cachepath)
+    assert cache.lookup(path_a) == _info(b'aaa')
+    assert cache.lookup(path_b) == _info(b'bbb')
+    assert len(hashed) == 2
+
+    # Entries for files that are gone get dropped when saving (which
+    # only happens when something has changed).
+    os.unlink(path_b)
+    path_c = _write(datadir / 'c', b'ccc')
+    cache.get_file_info(path_c)
+    cache.save()
+    cache = FileHashCache(cachepath)
+    assert cache.lookup(path_a) == _info(b'aaa')
+    assert cache.lookup(path_c) == _info(b'ccc')
+    _write(datadir / 'b', b'bbb')
+    assert cache.lookup(path_b) is None
+
+    # Unreadable caches should just start out empty.
+    cachepath.write_text('not json', encoding='utf-8')
+    assert FileHashCache(cachepath).lookup(path_a) is None
+
+
+def test_file_hash_cache_save_error(tmp_path: Path) -> None:
+    """Failing to write a cache shouldn't be fatal."""
+    blocker = tmp_path / 'blocker'
+    blocker.write_text('', encoding='utf-8')
+    path = _write(tmp_path / 'a', b'hello')
+
+    cache = FileHashCache(blocker / 'hashes.json')
+    cache.get_file_info(path)
+    cache.save()
+    assert blocker.is_file()
+    assert cache.lookup(path) == _info(b'hello')
+
+    # We should try again next time.
+    blocker.unlink()
+    cache.save()
+    assert FileHashCache(blocker / 'hashes.json').lookup(path) == _info(
+        b'hello'
+    )
+
+
+def test_manifest_diff(tmp_path: Path) -> None:
+    """Diffs should sort files into added, removed, and changed."""
+    olddir = tmp_path / 'old'
+    newdir = tmp_path / 'new'
+    for dirpath in (olddir, newdir, olddir / 'sub', newdir / 'sub'):
+        dirpath.mkdir()
+    _write(olddir / 'same', b'same')
+    _write(newdir / 'same', b'same')
+    _write(olddir / 'sub' / 'edited', b'old')
+    _write(newdir / 'sub' / 'edited', b'new')
+    _write(olddir / 'removed', b'removed')
+    _write(newdir / 'sub' / 'added', b'added')
+
+    old = DirectoryManifest.create_from_disk(olddir)
+    new = DirectoryManifest.create_from_disk(newdir)
+    diff = old.diff(new)
+    assert diff.added == {'sub/added': _info(b'added')}
+    assert diff.removed == {'removed': _info(b'removed')}
+    assert diff.changed == {'sub/edited': _info(b'new')}
+    assert not diff.empty
+
+    # Going the other way should swap things around.
+    diff = new.diff(old)
+    assert diff.added == {'removed': _info(b'removed')}
+    assert diff.removed == {'sub/added': _info(b'added')}
+    assert diff.changed == {'sub/edited': _info(b'old')}
+
+    assert old.diff(old).empty
+    assert DirectoryManifest.create_from_disk(tmp_path / 'nope').diff(
+        old
+    ).added == dict(old.files)
@@ -4,42 +4,146 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, override
+import os
+import sys
+import types
 import weakref
+import hashlib
+import logging
 import tempfile
+import threading
+import functools
+import importlib.util
 from pathlib import Path
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 
+from bacommon.assets import AssetPackageFlavorManifest
+from bacommon.bacloud import asset_file_cache_path
 
-from bacommon.assets import AssetPackageFlavor
+if TYPE_CHECKING:
+    from typing import Any
 
-# import pytest
+    import pytest
 
-if TYPE_CHECKING:
-    pass
 
+def _load_assetmanager_module(monkeypatch: pytest.MonkeyPatch) -> Any:
+    # The babase package itself needs our binary module, but the asset
+    # manager only needs its logger from it; provide that and load the
+    # module on its own.
+    logmodule = types.ModuleType('babase._logging')
+    setattr(logmodule, 'assetslog', logging.getLogger('ba.assets'))
+    monkeypatch.setitem(sys.modules, 'babase._logging', logmodule)
+
+    path = os.path.join(
+        os.path.dirname(__file__),
+        '..',
+        '..',
+        'src',
+        'assets',
+        'ba_data',
+        'python',
+        'babase',
+        '_assetmanager.py',
+    )
+    name = '_test_ba_assetmanager'
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+
+    # Dataclass prep needs to find the module to resolve annotations.
+    monkeypatch.setitem(sys.modules, name, module)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _RequestHandler(SimpleHTTPRequestHandler):
+    """Serves files and keeps track of what was asked for."""
+
+    requests: list[str]
+
+    @override
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
 
-def test_assetmanager() -> None:
+    @override
+    def do_GET(self) -> None:
+        """Serve a GET request."""
+        self.requests.append(self.path)
+        super().do_GET()
+
+
+def test_assetmanager(monkeypatch: pytest.MonkeyPatch) -> None:
     """Testing."""
+    assetmanager = _load_assetmanager_module(monkeypatch)
+    requests: list[str] = []
+
+    with (
+        tempfile.TemporaryDirectory() as tmpdir,
+        tempfile.TemporaryDirectory() as serverdir,
+    ):
+        # Stand in for an asset server with some files laid out the way
+        # it would host them.
+        filedatas = [os.urandom(1000 * (i + 1)) for i in range(10)]
+        filehashes = [hashlib.sha256(d).hexdigest() for d in filedatas]
+        for filehash, data in zip(filehashes, filedatas):
+            path = Path(serverdir, asset_file_cache_path(filehash))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        handler = type('_Handler', (_RequestHandler,), {'requests': requests})
+        server = ThreadingHTTPServer(
+            ('127.0.0.1', 0), functools.partial(handler, directory=serverdir)
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+
+        manager = assetmanager.AssetManager(rootdir=Path(tmpdir))
+        wref = weakref.ref(manager)
+        manager.start()
+
+        # Packages sharing files should only fetch them once.
+        gather = manager.launch_gather(
+            manifests=[
+                AssetPackageFlavorManifest(
+                    cloudfiles={f'a{i}': h for i, h in enumerate(hashes)}
+                )
+                for hashes in (filehashes[:7], filehashes[3:])
+            ],
+            base_url=base_url,
+        )
+        wref2 = weakref.ref(gather)
+        assert gather.wait(timeout=10.0)
+        assert gather.succeeded
+        assert gather.total_count == len(filehashes)
+        assert gather.bytes_downloaded == sum(len(d) for d in filedatas)
+        assert len(requests) == len(filehashes)
+        for filehash, data in zip(filehashes, filedatas):
+            assert manager.get_file_path(filehash).read_bytes() == data
+
+        # Files we already have shouldn't be fetched again, and ones
+        # the server doesn't have should fail without retries.
+        requests.clear()
+        missing = hashlib.sha256(b'missing').hexdigest()
+        gather = manager.launch_gather(
+            manifests=[
+                AssetPackageFlavorManifest(
+                    cloudfiles={'a': filehashes[0], 'b': missing}
+                )
+            ],
+            base_url=base_url,
+        )
+        assert gather.wait(timeout=10.0)
+        assert not gather.succeeded
+        assert list(gather.failed_files) == [missing]
+        assert gather.completed_count == 1
+        assert requests == [f'/{asset_file_cache_path(missing)}']
+
+        manager.stop()
+        server.shutdown()
+        server.server_close()
 
-    # Disabling for now...
-    if bool(False):
-        from babase._assetmanager import AssetManager
-
-        with tempfile.TemporaryDirectory() as tmpdir:
-            manager = AssetManager(rootdir=Path(tmpdir))
-            wref = weakref.ref(manager)
-            manager.start()
-            gather = manager.launch_gather(
-                packages=['a@2'],
-                flavor=AssetPackageFlavor.DESKTOP,
-                account_token='dummytoken',
-            )
-            wref2 = weakref.ref(gather)
-
-            manager.stop()
-
-            # Make sure nothing is keeping itself alive.
-            del manager
-            del gather
-            assert wref() is None
-            assert wref2() is None
+        # Make sure nothing is keeping itself alive.
+        del manager
+        del gather
+        assert wref() is None
+        assert wref2() is None
@@ -0,0 +1,93 @@
+# Released under the MIT License. See LICENSE for details.
+#
+"""Testing the logic-thread asyncio event loop."""
+
+from __future__ import annotations
+
+import os
+import time
+import queue
+import importlib.util
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from types import ModuleType
+    from typing import Callable
+
+
+def _load_asyncio_module() -> ModuleType:
+    # The babase package itself needs our binary module, but the loop
+    # only needs the stdlib, so we load its module on its own.
+    path = os.path.join(
+        os.path.dirname(__file__),
+        '..',
+        '..',
+        'src',
+        'assets',
+        'ba_data',
+        'python',
+        'babase',
+        '_asyncio.py',
+    )
+    spec = importlib.util.spec_from_file_location('_test_ba_asyncio', path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_logic_thread_event_loop() -> None:
+    """Test call ordering, waking, and closing with a fake logic thread."""
+    # pylint: disable=protected-access
+
+    # Stand in for the logic thread's event queue; we run whatever
+    # gets posted to it ourself.
+    posted: queue.SimpleQueue[Callable[[], None]] = queue.SimpleQueue()
+    loop = _load_asyncio_module()._LogicThreadEventLoop(posted.put)
+    order: list[str] = []
+
+    def _run_until(count: int, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while len(order) < count:
+            remaining = deadline - time.monotonic()
+            assert remaining > 0.0, f'Timed out; got {order}.'
+            try:
+                call = posted.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            call()
+
+    try:
+        # Soon calls run in order, and before timers due later.
+        loop.call_at(loop.time() + 0.05, order.append, 'at')
+        loop.call_soon(order.append, 'soon1')
+        loop.call_soon(order.append, 'soon2')
+        loop.start()
+        _run_until(3)
+        assert order == ['soon1', 'soon2', 'at']
+
+        # With nothing left to do, the loop hands off to its wait
+        # thread; a new call should wake it to post another step.
+        assert loop._waiting
+        loop.call_soon(order.append, 'wake')
+        _run_until(4)
+        assert order[-1] == 'wake'
+
+        # Same for a timer due before the one being waited on (adding
+        # the first timer wakes things too, so run that step).
+        loop.call_at(loop.time() + 3600.0, order.append, 'never')
+        posted.get(timeout=5.0)()
+        assert loop._waiting
+        loop.call_at(loop.time() + 0.01, order.append, 'early')
+        _run_until(5)
+        assert order[-1] == 'early'
+    finally:
+        # Closing stops the wait thread, and steps posted after that
+        # should do nothing.
+        loop.close()
+
+    assert loop.is_closed()
+    assert not loop._wait_thread.is_alive()
+    while not posted.empty():
+        posted.get()()
+    assert 'never' not in order
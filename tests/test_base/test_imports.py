@@ -23,3 +23,12 @@ def test_imports() -> None:
     # themselves.
     apprun.python_command('import babase', purpose='import testing')
     apprun.python_command('import _babase', purpose='import testing')
+
+    # Most of our package's names get imported lazily on first access;
+    # make sure they all actually resolve.
+    apprun.python_command(
+        'import babase\n'
+        'for name in babase.__all__:\n'
+        '    getattr(babase, name)\n',
+        purpose='import testing',
+    )
@@ -0,0 +1,299 @@
+# Released under the MIT License. See LICENSE for details.
+#
+"""Testing logging functionality."""
+
+from __future__ import annotations
+
+import os
+import time
+import logging
+import datetime
+from typing import TYPE_CHECKING
+
+from efro.util import utc_now
+from efro.logging import LogHandler, LogEntry, LogLevel, LogCache
+from efro.dataclassio import dataclass_from_json
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _make_logger(name: str, handler: LogHandler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.handlers = [handler]
+    return logger
+
+
+def _read_entries(path: str | Path) -> list[LogEntry]:
+    with open(path, encoding='utf-8') as infile:
+        return [dataclass_from_json(LogEntry, line) for line in infile]
+
+
+def test_log_file_batching(tmp_path: Path) -> None:
+    """Test buffered writes to the structured log file."""
+    path = tmp_path / 'log.json'
+    handler = LogHandler(
+        path=path,
+        echofile=None,
+        cache_size_limit=1024 * 1024,
+        cache_time_limit=None,
+        strict_threads=True,
+        file_flush_interval=60.0,
+        file_flush_entries=10,
+    )
+    logger = _make_logger('test_log_file_batching', handler)
+    try:
+        for i in range(25):
+            logger.warning('entry %d', i, extra={'labels': {'i': str(i)}})
+
+        # Full batches should go out on their own, with the rest waiting
+        # around until an explicit flush.
+        handler.flush()
+        entries = _read_entries(path)
+        assert [e.message for e in entries] == [f'entry {i}' for i in range(25)]
+        assert all(e.level is LogLevel.WARNING for e in entries)
+        assert entries[3].labels == {'i': '3'}
+        assert entries[0].name == 'test_log_file_batching'
+
+        # Shutdown should write out anything still pending.
+        logger.info('last one')
+    finally:
+        handler.shutdown()
+    assert _read_entries(path)[-1].message == 'last one'
+
+    # Our cache should have gotten everything too.
+    assert len(handler.get_cached().entries) == 26
+
+
+def test_log_file_flush_interval(tmp_path: Path) -> None:
+    """Test time-based flushing of the structured log file."""
+    path = tmp_path / 'log.json'
+    handler = LogHandler(
+        path=path,
+        echofile=None,
+        cache_size_limit=0,
+        cache_time_limit=None,
+        strict_threads=True,
+        file_flush_interval=0.05,
+    )
+    logger = _make_logger('test_log_file_flush_interval', handler)
+    try:
+        logger.info('hello')
+        starttime = time.monotonic()
+        while not _read_entries(path):
+            assert time.monotonic() - starttime < 5.0
+            time.sleep(0.01)
+        assert _read_entries(path)[0].message == 'hello'
+    finally:
+        handler.shutdown()
+
+
+def test_log_file_rotation(tmp_path: Path) -> None:
+    """Test size-based rotation of the structured log file."""
+    path = tmp_path / 'log.json'
+    handler = LogHandler(
+        path=path,
+        echofile=None,
+        cache_size_limit=0,
+        cache_time_limit=None,
+        strict_threads=True,
+        file_flush_entries=5,
+        file_max_size=1000,
+        file_backup_count=2,
+    )
+    logger = _make_logger('test_log_file_rotation', handler)
+    try:
+        for i in range(200):
+            logger.info('rotation entry %d', i)
+        handler.flush()
+    finally:
+        handler.shutdown()
+
+    # We should have rotated through a bunch of files but only kept
+    # the most recent few.
+    assert os.path.exists(f'{path}.1')
+    assert os.path.exists(f'{path}.2')
+    assert not os.path.exists(f'{path}.3')
+    assert os.path.getsize(f'{path}.1') >= 1000
+    entries = (
+        _read_entries(f'{path}.2')
+        + _read_entries(f'{path}.1')
+        + _read_entries(path)
+    )
+    messages = [e.message for e in entries]
+    assert messages == [
+        f'rotation entry {i}' for i in range(200 - len(messages), 200)
+    ]
+
+
+def _make_entry(
+    name: str,
+    level: LogLevel,
+    when: datetime.datetime,
+    labels: dict[str, str] | None = None,
+) -> LogEntry:
+    return LogEntry(
+        name=name,
+        message=f'{name} {level.name} {when.second}',
+        level=level,
+        time=when,
+        labels={} if labels is None else labels,
+    )
+
+
+def test_log_cache_query() -> None:
+    """Test filtering entries in the log cache."""
+    cache = LogCache(size_limit=1024 * 1024)
+    start = utc_now()
+    names = ['ba', 'ba.net', 'bax', 'other']
+    levels = list(LogLevel)
+    for i in range(100):
+        cache.add(
+            _make_entry(
+                names[i % len(names)],
+                levels[i % len(levels)],
+                start + datetime.timedelta(seconds=i),
+                labels={'parity': str(i % 2)},
+            ),
+            size=100,
+        )
+    allentries = cache.get_range(0, 100)
+    assert len(allentries) == 100
+
+    def _brute(
+        since: int | None = None,
+        until: int | None = None,
+        min_level: LogLevel | None = None,
+        name_prefix: str | None = None,
+        labels: dict[str, str] | None = None,
+    ) -> list[LogEntry]:
+        out = []
+        for i, entry in enumerate(allentries):
+            if since is not None and i < since:
+                continue
+            if until is not None and i > until:
+                continue
+            if min_level is not None and entry.level.value < min_level.value:
+                continue
+            if name_prefix is not None and not (
+                entry.name == name_prefix
+                or entry.name.startswith(name_prefix + '.')
+            ):
+                continue
+            if labels and entry.labels != labels:
+                continue
+            out.append(entry)
+        return out
+
+    # Logger names match themselves and their children only.
+    assert cache.query(name_prefix='ba') == _brute(name_prefix='ba')
+    assert {e.name for e in cache.query(name_prefix='ba')} == {'ba', 'ba.net'}
+    assert cache.query(name_prefix='ba.net') == _brute(name_prefix='ba.net')
+    assert not cache.query(name_prefix='b')
+    assert len(cache.query(name_prefix='')) == 100
+
+    assert cache.query(min_level=LogLevel.WARNING) == _brute(
+        min_level=LogLevel.WARNING
+    )
+    assert cache.query(
+        min_level=LogLevel.ERROR, name_prefix='ba', labels={'parity': '0'}
+    ) == _brute(
+        min_level=LogLevel.ERROR, name_prefix='ba', labels={'parity': '0'}
+    )
+
+    # Time ranges are inclusive.
+    since = start + datetime.timedelta(seconds=20)
+    until = start + datetime.timedelta(seconds=30)
+    assert cache.query(since=since, until=until) == _brute(since=20, until=30)
+    assert cache.query(
+        since=since, until=until, min_level=LogLevel.INFO
+    ) == _brute(since=20, until=30, min_level=LogLevel.INFO)
+
+    # We should get the most recent matches, oldest first.
+    result = cache.query(name_prefix='other', max_entries=3)
+    assert result == _brute(name_prefix='other')[-3:]
+    assert not cache.query(max_entries=0)
+
+
+def test_log_cache_pruning() -> None:
+    """Test size and time based pruning of the log cache."""
+    cache = LogCache(size_limit=1000)
+    start = utc_now()
+    for i in range(500):
+        cache.add(
+            _make_entry(
+                'ba' if i % 2 else 'other',
+                LogLevel.ERROR if i % 10 == 0 else LogLevel.INFO,
+                start + datetime.timedelta(seconds=i),
+            ),
+            size=100,
+        )
+    assert len(cache) == 10
+    assert cache.size == 1000
+    assert cache.start_index == 490
+    assert cache.end_index == 500
+
+    # Requests outside what we have get clamped.
+    assert cache.get_range(0, 495) == cache.query()[:5]
+    assert len(cache.get_range(0, 1000)) == 10
+
+    # Indexes should only cover what's still present.
+    assert len(cache.query(min_level=LogLevel.ERROR)) == 1
+    assert len(cache.query(name_prefix='ba')) == 5
+
+    cache.prune(start + datetime.timedelta(seconds=494))
+    assert cache.start_index == 495
+    assert len(cache.query(name_prefix='other')) == 2
+    assert not cache.query(min_level=LogLevel.ERROR)
+
+    cache.prune(start + datetime.timedelta(seconds=1000))
+    assert len(cache) == 0
+    assert cache.size == 0
+    assert cache.start_index == cache.end_index == 500
+
+
+def test_log_handler_query_cached() -> None:
+    """Test querying a LogHandler's cache."""
+    handler = LogHandler(
+        path=None,
+        echofile=None,
+        cache_size_limit=1024 * 1024,
+        cache_time_limit=None,
+        strict_threads=True,
+    )
+    logger = _make_logger('test_log_handler_query_cached', handler)
+    childlogger = _make_logger('test_log_handler_query_cached.sub', handler)
+    try:
+        for i in range(20):
+            (childlogger if i % 2 else logger).log(
+                logging.WARNING if i % 5 == 0 else logging.DEBUG,
+                'entry %d',
+                i,
+            )
+
+        # Wait for the background thread to process everything.
+        handler.flush()
+        deadline = time.monotonic() + 5.0
+        while len(handler.get_cached().entries) < 20:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        warnings = handler.query_cached(min_level=LogLevel.WARNING)
+        assert [e.message for e in warnings] == [
+            f'entry {i}' for i in (0, 5, 10, 15)
+        ]
+        subs = handler.query_cached(
+            name_prefix='test_log_handler_query_cached.sub', max_entries=2
+        )
+        assert [e.message for e in subs] == ['entry 17', 'entry 19']
+
+        archive = handler.get_cached(start_index=5, max_entries=3)
+        assert archive.log_size == 20
+        assert archive.start_index == 5
+        assert [e.message for e in archive.entries] == [
+            f'entry {i}' for i in (5, 6, 7)
+        ]
+    finally:
+        handler.shutdown()
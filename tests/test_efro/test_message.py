@@ -1131,3 +1131,143 @@ def test_full_pipeline(caplog: pytest.LogCaptureFixture) -> None:
         response4 = asyncio.run(obj.msg.send_async(_TMsg1(ival=0)))
 
     obj.test_send_method_exceptions = False
+
+
+def test_binary_messages() -> None:
+    """Test binary message encoding negotiated over rpc."""
+    import socket
+
+    from efro.rpc import RPCEndpoint
+
+    class _TestClassR:
+        receiver = _TestAsyncMessageReceiver()
+
+        @receiver.handler
+        async def handle_test_message_1(self, msg: _TMsg1) -> _TResp1:
+            """Test."""
+            if msg.ival == 1:
+                raise CleanError('Testing Clean Error')
+            return _TResp1(bval=True)
+
+        @receiver.handler
+        async def handle_test_message_2(self, msg: _TMsg2) -> _TResp1 | _TResp2:
+            """Test."""
+            del msg  # Unused
+            return _TResp2(fval=1.2)
+
+        @receiver.handler
+        async def handle_test_message_3(self, msg: _TMsg3) -> None:
+            """Test."""
+            del msg  # Unused
+
+        receiver.validate()
+
+    class _TestClassS:
+        msg = _TestMessageSenderBBoth()
+
+        def __init__(self, endpoint: RPCEndpoint) -> None:
+            self.endpoint = endpoint
+            self.sent: list[bytes] = []
+
+        @msg.send_async_method
+        async def _send_raw_message_async(self, data: str) -> str:
+            self.sent.append(data.encode())
+            return (await self.endpoint.send_message(data.encode())).decode()
+
+        @msg.send_async_binary_method
+        async def _send_raw_message_binary(self, data: bytes) -> bytes:
+            self.sent.append(data)
+            return await self.endpoint.send_message(data)
+
+        @msg.use_binary_method
+        def _use_binary(self) -> bool:
+            return self.endpoint.peer_accepts_message_encoding(
+                MessageProtocol.ENCODING_BINARY
+            )
+
+    async def _handle_nothing(message: bytes) -> bytes:
+        raise RuntimeError(f'Unexpected message: {message!r}.')
+
+    async def _run(peer_binary: bool) -> None:
+        sock1, sock2 = socket.socketpair()
+        reader1, writer1 = await asyncio.open_connection(sock=sock1)
+        reader2, writer2 = await asyncio.open_connection(sock=sock2)
+        obj_r = _TestClassR()
+        server = RPCEndpoint(
+            obj_r.receiver.handle_raw_message_bytes_async,
+            reader1,
+            writer1,
+            'test_binary_server',
+            message_encodings=(
+                [MessageProtocol.ENCODING_BINARY] if peer_binary else []
+            ),
+        )
+        client = RPCEndpoint(
+            _handle_nothing, reader2, writer2, 'test_binary_client'
+        )
+        tasks = [
+            asyncio.create_task(server.run()),
+            asyncio.create_task(client.run()),
+        ]
+        await client.wait_for_handshake()
+
+        obj_s = _TestClassS(client)
+        response1 = await obj_s.msg.send_async(_TMsg1(ival=0))
+        assert response1.bval
+        response2 = await obj_s.msg.send_async(_TMsg2(sval='foo'))
+        assert isinstance(response2, _TResp2) and response2.fval == 1.2
+        await obj_s.msg.send_async(_TMsg3(sval='foo'))
+        with pytest.raises(CleanError, match='Testing Clean Error'):
+            await obj_s.msg.send_async(_TMsg1(ival=1))
+
+        # We should only have sent binary if our peer said it was ok.
+        assert len(obj_s.sent) == 4
+        assert all(
+            MessageProtocol.is_binary_encoded(data) == peer_binary
+            for data in obj_s.sent
+        )
+
+        client.close()
+        server.close()
+        await client.wait_closed()
+        await server.wait_closed()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(_run(peer_binary=True))
+    asyncio.run(_run(peer_binary=False))
+
+    # Sync sends should work the same way.
+    class _TestClassRSync:
+        receiver = _TestSyncMessageReceiver()
+
+        @receiver.handler
+        def handle_test_message_1(self, msg: _TMsg1) -> _TResp1:
+            """Test."""
+            return _TResp1(bval=msg.ival == 5)
+
+        @receiver.handler
+        def handle_test_message_2(self, msg: _TMsg2) -> _TResp1 | _TResp2:
+            """Test."""
+            raise RuntimeError('Testing Runtime Error')
+
+        @receiver.handler
+        def handle_test_message_3(self, msg: _TMsg3) -> None:
+            """Test."""
+            del msg  # Unused
+
+    class _TestClassSSync:
+        msg = _TestMessageSenderSync()
+
+        def __init__(self, target: _TestClassRSync) -> None:
+            self.target = target
+
+        @msg.send_binary_method
+        def _send_raw_message_binary(self, data: bytes) -> bytes:
+            assert MessageProtocol.is_binary_encoded(data)
+            return self.target.receiver.handle_raw_message_bytes(data)
+
+    obj_s_sync = _TestClassSSync(_TestClassRSync())
+    response = obj_s_sync.msg.send(_TMsg1(ival=5))
+    assert response.bval
+    with pytest.raises(RemoteError):
+        obj_s_sync.msg.send(_TMsg2(sval='foo'))
@@ -7,6 +7,7 @@ from __future__ import annotations
 import os
 import time
 import random
+import socket
 import asyncio
 import weakref
 from enum import unique, Enum
@@ -15,6 +16,7 @@ from dataclasses import dataclass
 
 import pytest
 
+from efro import rpc
 from efro.rpc import RPCEndpoint
 from efro.error import CommunicationError
 from efro.dataclassio import ioprepped, dataclass_from_json, dataclass_to_json
@@ -456,3 +458,211 @@ def test_client_interrupt() -> None:
             await tester.server.send_message(_Message(_MessageType.TEST_SLOW))
 
     tester.run(_do_it())
+
+
+@pytest.mark.skipif(FAST_MODE, reason='fast mode')
+def test_backpressure() -> None:
+    """Test throttled sends and batched writes."""
+
+    async def _do_it() -> None:
+        sock1, sock2 = socket.socketpair()
+        reader1, writer1 = await asyncio.open_connection(sock=sock1)
+        reader2, writer2 = await asyncio.open_connection(sock=sock2)
+        high_water = 16 * 1024
+        server = RPCEndpoint(
+            _echo,
+            reader1,
+            writer1,
+            'test_bp_server',
+            out_queue_high_water=high_water,
+            out_queue_low_water=4 * 1024,
+        )
+        client = RPCEndpoint(
+            _echo,
+            reader2,
+            writer2,
+            'test_bp_client',
+            out_queue_high_water=high_water,
+            out_queue_low_water=4 * 1024,
+        )
+        tasks = [
+            asyncio.create_task(server.run()),
+            asyncio.create_task(client.run()),
+        ]
+
+        # Fire off a burst much larger than our high water mark.
+        count = 300
+        messages = [bytes([i % 256]) * 2000 for i in range(count)]
+        responses = await asyncio.gather(
+            *(client.send_message_throttled(m) for m in messages)
+        )
+        assert responses == messages
+
+        # The queue should never have grown much past its limit and
+        # packets should have gone out in batches.
+        for endpoint in (client, server):
+            stats = endpoint.get_stats()
+            assert stats.out_queue_peak_bytes < high_water + 2100
+            assert stats.write_batches < count
+        cstats = client.get_stats()
+        assert cstats.backpressure_waits > 0
+        assert cstats.total_bytes_written > count * 2000
+        assert cstats.total_bytes_read == server.get_stats().total_bytes_written
+
+        # Plain sends still enqueue immediately (keeping their order) but
+        # should not hand control back while the queue is over its high
+        # water mark.
+        async def _send_plain(message: bytes) -> bytes:
+            response = await client.send_message(message)
+            assert client.get_stats().out_queue_bytes < high_water
+            return response
+
+        waits = cstats.backpressure_waits
+        responses = await asyncio.gather(*(_send_plain(m) for m in messages))
+        assert responses == messages
+        assert client.get_stats().backpressure_waits > waits
+
+        with pytest.raises(ValueError):
+            RPCEndpoint(
+                _echo,
+                reader1,
+                writer1,
+                'test_bp_bad',
+                out_queue_high_water=100,
+                out_queue_low_water=200,
+            )
+
+        client.close()
+        server.close()
+        await client.wait_closed()
+        await server.wait_closed()
+        await asyncio.gather(*tasks)
+
+        # Waiting on a closed endpoint should fail cleanly.
+        with pytest.raises(CommunicationError):
+            await client.send_message_throttled(b'foo')
+
+    asyncio.run(_do_it())
+
+
+async def _echo(message: bytes) -> bytes:
+    return message
+
+
+async def _make_endpoint_pair() -> tuple[RPCEndpoint, RPCEndpoint]:
+    sock1, sock2 = socket.socketpair()
+    reader1, writer1 = await asyncio.open_connection(sock=sock1)
+    reader2, writer2 = await asyncio.open_connection(sock=sock2)
+    return (
+        RPCEndpoint(_echo, reader1, writer1, 'test_rpc_server'),
+        RPCEndpoint(_echo, reader2, writer2, 'test_rpc_client'),
+    )
+
+
+async def _close_endpoint_pair(
+    endpoints: tuple[RPCEndpoint, RPCEndpoint], tasks: list[asyncio.Task]
+) -> None:
+    for endpoint in endpoints:
+        endpoint.close()
+    for endpoint in endpoints:
+        await endpoint.wait_closed()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.skipif(FAST_MODE, reason='fast mode')
+@pytest.mark.parametrize('protocol', [3, rpc.OUR_PROTOCOL])
+def test_pipelining(protocol: int, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test handshake waits, pipelined batches, and message ids."""
+    # Older protocols only support 16 bit message ids.
+    monkeypatch.setattr(rpc, 'OUR_PROTOCOL', protocol)
+
+    async def _do_it() -> None:
+        endpoints = await _make_endpoint_pair()
+        server, client = endpoints
+
+        # Messages sent before the handshake should go out once it
+        # arrives (and in order).
+        early = [client.send_message(b'early%d' % i) for i in range(3)]
+        assert client.get_stats().in_flight_messages == 3
+        tasks = [asyncio.create_task(e.run()) for e in endpoints]
+        await client.wait_for_handshake()
+        assert client.peer_message_encodings == []
+        assert await asyncio.gather(*early) == [b'early0', b'early1', b'early2']
+
+        # Pipelined batches should come back in order; these also run
+        # our message ids past their wrap point.
+        messages = [b'msg%d' % i for i in range(100)]
+        assert await client.send_messages(messages) == messages
+        assert await server.send_messages([]) == []
+        assert client.get_stats().in_flight_messages == 0
+
+        await _close_endpoint_pair(endpoints, tasks)
+
+        with pytest.raises(CommunicationError):
+            await client.send_messages([b'foo'])
+
+    asyncio.run(_do_it())
+
+
+@pytest.mark.skipif(FAST_MODE, reason='fast mode')
+def test_handshake_close() -> None:
+    """Test closing an endpoint before its handshake arrives."""
+
+    async def _do_it() -> None:
+        sock1, sock2 = socket.socketpair()
+        reader, writer = await asyncio.open_connection(sock=sock1)
+        endpoint = RPCEndpoint(_echo, reader, writer, 'test_rpc_lonely')
+        task = asyncio.create_task(endpoint.run())
+        waiter = asyncio.create_task(endpoint.wait_for_handshake())
+        response = asyncio.ensure_future(endpoint.send_message(b'foo'))
+        await asyncio.sleep(0.01)
+        endpoint.close()
+        with pytest.raises(CommunicationError):
+            await waiter
+        with pytest.raises(CommunicationError):
+            await response
+        await task
+        sock2.close()
+
+    asyncio.run(_do_it())
+
+
+@pytest.mark.skipif(FAST_MODE, reason='fast mode')
+def test_latency_benchmark() -> None:
+    """Measure round trip latency for individual and pipelined sends."""
+
+    async def _do_it() -> None:
+        endpoints = await _make_endpoint_pair()
+        _server, client = endpoints
+        tasks = [asyncio.create_task(e.run()) for e in endpoints]
+
+        # The first message after connecting shouldn't have to wait
+        # around any longer than the handshake itself takes.
+        starttime = time.perf_counter()
+        assert await client.send_message(b'first') == b'first'
+        first = time.perf_counter() - starttime
+
+        count = 2000
+        messages = [b'x' * 100] * count
+        starttime = time.perf_counter()
+        for message in messages:
+            assert await client.send_message(message) == message
+        serial = time.perf_counter() - starttime
+
+        starttime = time.perf_counter()
+        assert await client.send_messages(messages) == messages
+        pipelined = time.perf_counter() - starttime
+
+        print(
+            f'RPC latency: first message {first * 1000.0:.2f}ms,'
+            f' serial {serial * 1000000.0 / count:.1f}us/msg,'
+            f' pipelined {pipelined * 1000000.0 / count:.1f}us/msg.'
+        )
+
+        # Timings are informational only; they vary too much between
+        # machines to assert on.
+        assert client.get_stats().in_flight_messages == 0
+
+        await _close_endpoint_pair(endpoints, tasks)
+
+    asyncio.run(_do_it())
@@ -0,0 +1,202 @@
+# Released under the MIT License. See LICENSE for details.
+#
+"""Testing rpc pool functionality."""
+
+from __future__ import annotations
+
+import os
+import time
+import socket
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from efro.rpc import RPCEndpoint
+from efro.rpcws import RPCWSEndpoint
+from efro.rpcpool import RPCPool
+from efro.error import CommunicationError
+
+if TYPE_CHECKING:
+    from typing import Callable
+
+    from efro.rpcpool import PoolableEndpoint
+
+FAST_MODE = os.environ.get('BA_TEST_FAST_MODE') == '1'
+
+SLOW_WAIT = 0.5
+
+
+async def _handle_message(message: bytes) -> bytes:
+    if message == b'slow':
+        await asyncio.sleep(SLOW_WAIT)
+    return message
+
+
+class _QueueTransport:
+    """In-memory WebSocketTransport implementation."""
+
+    def __init__(
+        self, inbox: asyncio.Queue[bytes | None], outbox: asyncio.Queue
+    ) -> None:
+        self._inbox = inbox
+        self._outbox = outbox
+        self._closed = False
+
+    async def send(self, data: bytes) -> None:
+        """Send binary data."""
+        if self._closed:
+            raise ConnectionError('Transport closed.')
+        await self._outbox.put(data)
+
+    async def recv(self) -> bytes:
+        """Receive binary data."""
+        data = await self._inbox.get()
+        if data is None:
+            self._closed = True
+            raise ConnectionError('Transport closed.')
+        return data
+
+    async def close(self) -> None:
+        """Close the connection."""
+        if not self._closed:
+            self._closed = True
+            await self._inbox.put(None)
+            await self._outbox.put(None)
+
+
+class _Connector:
+    """Creates connected endpoint pairs for a pool."""
+
+    def __init__(self, websocket: bool) -> None:
+        self.websocket = websocket
+        self.clients: list[PoolableEndpoint] = []
+        self.servers: list[PoolableEndpoint] = []
+        self.server_tasks: list[asyncio.Task] = []
+        self.fail_count = 0
+
+    async def connect(self) -> PoolableEndpoint:
+        """Create a new client endpoint (and a server for it to talk to)."""
+        if self.fail_count > 0:
+            self.fail_count -= 1
+            raise ConnectionRefusedError('Testing connect failure.')
+
+        client: PoolableEndpoint
+        server: PoolableEndpoint
+        if self.websocket:
+            queue1: asyncio.Queue[bytes | None] = asyncio.Queue()
+            queue2: asyncio.Queue[bytes | None] = asyncio.Queue()
+            server = RPCWSEndpoint(
+                _handle_message, _QueueTransport(queue1, queue2), 'server'
+            )
+            client = RPCWSEndpoint(
+                _handle_message, _QueueTransport(queue2, queue1), 'client'
+            )
+        else:
+            sock1, sock2 = socket.socketpair()
+            reader1, writer1 = await asyncio.open_connection(sock=sock1)
+            reader2, writer2 = await asyncio.open_connection(sock=sock2)
+            server = RPCEndpoint(_handle_message, reader1, writer1, 'server')
+            client = RPCEndpoint(_handle_message, reader2, writer2, 'client')
+        self.servers.append(server)
+        self.server_tasks.append(asyncio.create_task(server.run()))
+        self.clients.append(client)
+        return client
+
+    async def shutdown(self) -> None:
+        """Bring down all servers."""
+        for server in self.servers:
+            server.close()
+        await asyncio.gather(*self.server_tasks)
+
+
+async def _wait_for(call: Callable[[], bool]) -> None:
+    starttime = time.monotonic()
+    while not call():
+        assert time.monotonic() - starttime < 5.0
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.skipif(FAST_MODE, reason='fast mode')
+@pytest.mark.parametrize('websocket', [False, True])
+def test_pool(websocket: bool) -> None:
+    """Test routing, stats, and endpoint replacement."""
+
+    async def _do_it() -> None:
+        connector = _Connector(websocket)
+        connector.fail_count = 1
+        pool = RPCPool(connector.connect, 3, 'test_pool', reconnect_delay=0.05)
+        pool_task = asyncio.create_task(pool.run())
+
+        # Sends should wait for an endpoint to come up (including
+        # retrying the connection that fails).
+        assert await pool.send_message(b'hello') == b'hello'
+        await _wait_for(lambda: pool.endpoint_count == 3)
+
+        # A slow message should not hold up other traffic.
+        slow = asyncio.create_task(pool.send_message(b'slow'))
+        await asyncio.sleep(0.05)
+        starttime = time.monotonic()
+        responses = await asyncio.gather(
+            pool.send_message(b'fast1'), pool.send_message(b'fast2')
+        )
+        assert list(responses) == [b'fast1', b'fast2']
+        assert time.monotonic() - starttime < SLOW_WAIT * 0.5
+        assert sorted(s.in_flight_messages for s in pool.get_stats()) == [
+            0,
+            0,
+            1,
+        ]
+        assert await slow == b'slow'
+
+        stats = pool.get_stats()
+        assert sum(s.messages_sent for s in stats) == 4
+        assert sum(s.bytes_sent for s in stats) == len(b'helloslowfast1fast2')
+        assert sum(s.bytes_received for s in stats) == sum(
+            s.bytes_sent for s in stats
+        )
+        assert all(s.total_bytes_read >= s.bytes_received for s in stats)
+
+        # Dead endpoints should get replaced.
+        connector.clients[0].close()
+        await _wait_for(lambda: pool.replaced_endpoint_count == 1)
+        await _wait_for(lambda: pool.endpoint_count == 3)
+        assert len(connector.clients) == 4
+        assert await pool.send_message(b'again') == b'again'
+
+        pool.close()
+        await pool.wait_closed()
+        await pool_task
+        assert pool.endpoint_count == 0
+        with pytest.raises(CommunicationError):
+            await pool.send_message(b'closed')
+        await connector.shutdown()
+
+    asyncio.run(_do_it())
+
+
+@pytest.mark.skipif(FAST_MODE, reason='fast mode')
+def test_pool_no_endpoints() -> None:
+    """Test sends timing out when no endpoints can connect."""
+
+    async def _do_it() -> None:
+        connector = _Connector(websocket=False)
+        connector.fail_count = 1000
+        pool = RPCPool(connector.connect, 2, 'test_pool', reconnect_delay=0.01)
+        pool_task = asyncio.create_task(pool.run())
+        with pytest.raises(CommunicationError):
+            await pool.send_message(b'hello', timeout=0.1)
+
+        # Closing should also fail any waiting sends.
+        send = asyncio.create_task(pool.send_message(b'hello'))
+        await asyncio.sleep(0.01)
+        pool.close()
+        with pytest.raises(CommunicationError):
+            await send
+        await pool.wait_closed()
+        await pool_task
+
+        with pytest.raises(ValueError):
+            RPCPool(connector.connect, 0, 'test_pool')
+
+    asyncio.run(_do_it())
@@ -23,3 +23,12 @@ def test_imports() -> None:
     # themselves.
     apprun.python_command('import bascenev1', purpose='import testing')
     apprun.python_command('import _bascenev1', purpose='import testing')
+
+    # Most of our package's names get imported lazily on first access;
+    # make sure they all actually resolve.
+    apprun.python_command(
+        'import bascenev1\n'
+        'for name in bascenev1.__all__:\n'
+        '    getattr(bascenev1, name)\n',
+        purpose='import testing',
+    )
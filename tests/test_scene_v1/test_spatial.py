@@ -0,0 +1,136 @@
+# Released under the MIT License. See LICENSE for details.
+#
+"""Testing spatial index functionality."""
+
+from __future__ import annotations
+
+import os
+import pytest
+
+from batools import apprun
+
+FAST_MODE = os.environ.get('BA_TEST_FAST_MODE') == '1'
+
+# Checks SpatialIndex queries against brute-force answers. Run in the
+# app since the index needs bascenev1; any object with a position and
+# truthiness works as a node, so we don't need a running activity.
+_SPATIAL_INDEX_TEST = """
+import random
+from bascenev1._spatial import SpatialIndex, _ring_cells
+
+class FakeNode:
+    def __init__(self, position):
+        self.position = position
+        self.alive = True
+
+    def __bool__(self):
+        return self.alive
+
+def dist_sq(node, point):
+    return sum((node.position[i] - point[i]) ** 2 for i in range(3))
+
+def brute_nearest(nodes, point, count, max_distance=None, predicate=None):
+    found = sorted(
+        (dist_sq(node, point), id(node), node)
+        for node in nodes
+        if node
+        and (max_distance is None or dist_sq(node, point) <= max_distance**2)
+        and (predicate is None or predicate(node))
+    )
+    return [node for _d, _i, node in found[:count]]
+
+def check(index, nodes, rand):
+    for _i in range(100):
+        # Include points well outside the occupied area so we walk
+        # lots of empty rings.
+        point = (
+            rand.uniform(-150.0, 150.0),
+            rand.uniform(-5.0, 10.0),
+            rand.uniform(-150.0, 150.0),
+        )
+        count = rand.randint(1, 6)
+        assert index.nearest(point, count) == brute_nearest(
+            nodes, point, count
+        )
+        assert index.nearest(
+            point, count, max_distance=12.0
+        ) == brute_nearest(nodes, point, count, max_distance=12.0)
+        pred = lambda node: id(node) % 3 != 0
+        assert index.nearest(point, count, predicate=pred) == brute_nearest(
+            nodes, point, count, predicate=pred
+        )
+        radius = rand.uniform(0.0, 20.0)
+        assert index.within(point, radius) == brute_nearest(
+            nodes, point, len(nodes), max_distance=radius
+        )
+
+# Rings are the cells exactly a given distance out.
+for ring in range(5):
+    cells = list(_ring_cells(3, -2, ring))
+    assert len(cells) == len(set(cells)) == max(1, 8 * ring)
+    assert all(max(abs(cx - 3), abs(cz + 2)) == ring for cx, cz in cells)
+
+rand = random.Random(123)
+index = SpatialIndex(cell_size=3.0)
+nodes = [
+    FakeNode(
+        (
+            rand.uniform(-50.0, 50.0),
+            rand.uniform(0.0, 5.0),
+            rand.uniform(-50.0, 50.0),
+        )
+    )
+    for _i in range(300)
+]
+for node in nodes:
+    index.add(node)
+    index.add(node)
+assert len(index) == len(nodes)
+check(index, nodes, rand)
+
+# Nodes moving across cells get re-bucketed.
+for node in nodes[:100]:
+    node.position = (
+        node.position[0] + rand.uniform(-20.0, 20.0),
+        node.position[1],
+        node.position[2] + rand.uniform(-20.0, 20.0),
+    )
+index.refresh(force=True)
+check(index, nodes, rand)
+assert index.nearest(nodes[0].position) == [nodes[0]]
+
+# Removed and dead nodes drop out.
+for node in nodes[:150]:
+    index.remove(node)
+    assert node not in index
+index.remove(nodes[0])
+for node in nodes[150:200]:
+    node.alive = False
+index.refresh(force=True)
+nodes = nodes[200:]
+assert len(index) == len(nodes)
+check(index, nodes, rand)
+
+# The farthest point is the one whose nearest node is farthest away.
+points = [(rand.uniform(-60.0, 60.0), 0.0, rand.uniform(-60.0, 60.0))
+          for _i in range(20)]
+best = max(points, key=lambda pt: dist_sq(brute_nearest(nodes, pt, 1)[0], pt))
+assert points[index.farthest_from(points)] == best
+
+# Small indexes just get scanned.
+index.clear()
+assert len(index) == 0 and index.nearest((0.0, 0.0, 0.0)) == []
+nodes = nodes[:5]
+for node in nodes:
+    index.add(node)
+check(index, nodes, rand)
+"""
+
+
+@pytest.mark.skipif(
+    apprun.test_runs_disabled(), reason=apprun.test_runs_disabled_reason()
+)
+@pytest.mark.skipif(FAST_MODE, reason='fast mode')
+def test_spatial_index() -> None:
+    """Test spatial index queries, ring search, and removal."""
+    apprun.python_command(_SPATIAL_INDEX_TEST, purpose='spatial index testing')
@@ -0,0 +1,109 @@
+# Released under the MIT License. See LICENSE for details.
+#
+"""Testing spaz-bot functionality."""
+
+from __future__ import annotations
+
+import os
+import pytest
+
+from batools import apprun
+
+FAST_MODE = os.environ.get('BA_TEST_FAST_MODE') == '1'
+
+# Exercises select_targets(); run in the app since its module needs
+# bascenev1.
+_SELECT_TARGETS_TEST = """
+from bascenev1lib.actor.spazbot import select_targets, TARGET_MAX_DROP
+
+targets = [
+    # Right below our first bot but exactly at the drop limit.
+    (0.0, 10.0 - TARGET_MAX_DROP, 0.0),
+    # Farther from it but just within the limit.
+    (0.0, 10.01 - TARGET_MAX_DROP, 4.0),
+    # Equally close to our second bot.
+    (4.0, 0.0, 0.0),
+    (6.0, 0.0, 0.0),
+]
+bots = [
+    (0.0, 10.0, 0.0),
+    (5.0, 0.0, 0.0),
+    (0.0, 0.0, 0.0),
+    (0.0, 20.0, 0.0),
+]
+
+# Targets at or past the drop limit get skipped, ties go to the
+# earliest target, bots with nothing valid get -1, and results come
+# back in bot order.
+assert select_targets(bots, targets) == [1, 2, 2, -1]
+assert select_targets(list(reversed(bots)), targets) == [-1, 2, 2, 1]
+assert select_targets(bots, []) == [-1, -1, -1, -1]
+assert select_targets([], targets) == []
+"""
+
+# Checks that select_indexed_targets() agrees with select_targets().
+# Any object with a position and truthiness works as a node in the
+# index, so we don't need a running activity.
+_SELECT_INDEXED_TARGETS_TEST = """
+import random
+from bascenev1._spatial import SpatialIndex
+from bascenev1lib.actor.spazbot import select_targets, select_indexed_targets
+
+class FakeNode:
+    def __init__(self, position):
+        self.position = position
+
+    def __bool__(self):
+        return True
+
+def randpos():
+    return (
+        rand.uniform(-40.0, 40.0),
+        rand.uniform(0.0, 15.0),
+        rand.uniform(-40.0, 40.0),
+    )
+
+rand = random.Random(123)
+index = SpatialIndex(cell_size=3.0)
+targets = [FakeNode(randpos()) for _i in range(30)]
+
+# Other things in the index (such as the bots) should get ignored.
+others = [FakeNode(randpos()) for _i in range(100)]
+for node in targets + others:
+    index.add(node)
+bots = [randpos() for _i in range(50)] + [node.position for node in others]
+
+# Bots high above everything have nothing valid to go after.
+bots += [(0.0, 50.0, 0.0), (20.0, 50.0, -20.0)]
+
+expected = [
+    None if i == -1 else targets[i]
+    for i in select_targets(bots, [node.position for node in targets])
+]
+assert None in expected
+found = select_indexed_targets(
+    index, bots, {node: node.position for node in targets}
+)
+assert found == expected
+assert select_indexed_targets(index, bots, {}) == [None] * len(bots)
+"""
+
+
+@pytest.mark.skipif(
+    apprun.test_runs_disabled(), reason=apprun.test_runs_disabled_reason()
+)
+@pytest.mark.skipif(FAST_MODE, reason='fast mode')
+def test_select_targets() -> None:
+    """Test bot target selection rules and ordering."""
+    apprun.python_command(_SELECT_TARGETS_TEST, purpose='spazbot testing')
+
+
+@pytest.mark.skipif(
+    apprun.test_runs_disabled(), reason=apprun.test_runs_disabled_reason()
+)
+@pytest.mark.skipif(FAST_MODE, reason='fast mode')
+def test_select_indexed_targets() -> None:
+    """Test bot target selection through a spatial index."""
+    apprun.python_command(
+        _SELECT_INDEXED_TARGETS_TEST, purpose='spazbot testing'
+    )
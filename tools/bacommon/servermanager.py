@@ -4,14 +4,18 @@
 
 from __future__ import annotations
 
+import socket
+import struct
+import pickle
 from enum import Enum
+from threading import Lock
 from dataclasses import field, dataclass
 from typing import TYPE_CHECKING, Any
 
 from efro.dataclassio import ioprepped
 
 if TYPE_CHECKING:
-    pass
+    from efro.logging import LogLevel
 
 
 @ioprepped
@@ -146,6 +150,13 @@ class ServerConfig:
     # https://legacy.ballistica.net/accountquery?id=ACCOUNT_ID_HERE
     stats_url: str | None = None
 
+    # If present, the server keeps persistent player stats (kills,
+    # deaths, score, games played, and wins) in an SQLite database at
+    # this path. Relative paths are relative to the server's root
+    # directory. Players are keyed by name. The database can be read
+    # by other tools while the server is running.
+    player_stats_file: str | None = None
+
     # If present, the server subprocess will attempt to gracefully exit
     # after this amount of time. A graceful exit can occur at the end of
     # a series or other opportune time. Server-managers set to
@@ -194,6 +205,12 @@ class ServerConfig:
     # (internal) stress-testing mode.
     stress_test_players: int | None = None
 
+    # (internal) run a load benchmark of this many games and then exit.
+    stress_test_games: int | None = None
+
+    # (internal) load benchmark report path (relative to the server root).
+    stress_test_report_file: str = 'stress_test_report.json'
+
     # How many seconds individual players from a given account must wait
     # before rejoining the game. This can help suppress exploits
     # involving leaving and rejoining or switching teams rapidly.
@@ -213,6 +230,22 @@ class ServerConfig:
     # modules on demand could cause visual hitches.
     dont_write_bytecode: bool = False
 
+    # Fleet mode: if present, the server manager runs one server
+    # subprocess per entry here instead of just one, all supervised by
+    # a single manager process. Each entry is a dict of values from this
+    # config (port, party_name, playlist_code, playlist_inline, etc.)
+    # overriding the ones set here for that particular server. Each
+    # server must be given its own port. An entry can also contain a
+    # 'name' value which is used in output and as the name of that
+    # server's own ba_root subdirectory ('fleet/<name>'); it defaults
+    # to 'server<index>'.
+    fleet_instances: list[dict[str, Any]] | None = None
+
+    # In fleet mode, clean_exit_minutes restarts are staggered so that
+    # only one server restarts at a time and at least this many minutes
+    # pass between them, so parties never all go down at once.
+    fleet_restart_stagger_minutes: float = 5.0
+
 
 # NOTE: as much as possible, communication from the server-manager to
 # the child-process should go through these and not ad-hoc Python string
@@ -271,3 +304,119 @@ class KickCommand(ServerCommand):
 
     client_id: int
     ban_time: int | None
+
+
+@dataclass
+class ExecCommand(ServerCommand):
+    """Run a raw Python statement in the server process."""
+
+    statement: str
+
+
+@dataclass
+class LogQueryCommand(ServerCommand):
+    """Fetch recent entries from the server's in-memory log cache.
+
+    Results are the most recent max_entries matching entries, formatted
+    one per line.
+    """
+
+    max_entries: int = 50
+    min_level: LogLevel | None = None
+    name_prefix: str | None = None
+    since_seconds: float | None = None
+
+
+# Each control-channel frame is a big-endian 32 bit payload length
+# followed by that many bytes of pickled payload.
+_CONTROL_FRAME_HEADER = struct.Struct('>I')
+
+# Sanity limit; nothing we send should come anywhere close to this.
+CONTROL_FRAME_MAX_SIZE = 16 * 1024 * 1024
+
+
+@dataclass
+class ServerControlRequest:
+    """A command sent to the server over the control channel."""
+
+    request_id: int
+    command: ServerCommand
+
+
+@dataclass
+class ServerControlResponse:
+    """A reply to a :class:`ServerControlRequest`.
+
+    Every request gets exactly one response; ``error`` is set if the
+    command raised an exception in the server process.
+    """
+
+    request_id: int
+    result: Any = None
+    error: str | None = None
+
+
+class ServerControlChannel:
+    """Length-prefixed binary framing over a connected stream socket.
+
+    This links the server-manager with the server process it launches.
+    Both sides of the channel are trusted (one launches the other), so
+    payloads are simply pickled. Sending is safe from any thread;
+    receiving should be done from a single thread.
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._send_lock = Lock()
+
+    def send(
+        self, message: ServerControlRequest | ServerControlResponse
+    ) -> None:
+        """Send a single message as one frame."""
+        payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > CONTROL_FRAME_MAX_SIZE:
+            raise ValueError(f'Control frame too large ({len(payload)} bytes).')
+        with self._send_lock:
+            self._sock.sendall(
+                _CONTROL_FRAME_HEADER.pack(len(payload)) + payload
+            )
+
+    def recv(self) -> ServerControlRequest | ServerControlResponse | None:
+        """Receive a single message; blocks until one is available.
+
+        Returns None if the other end closed the channel cleanly.
+        """
+        header = self._recv_exact(_CONTROL_FRAME_HEADER.size)
+        if header is None:
+            return None
+        (size,) = _CONTROL_FRAME_HEADER.unpack(header)
+        if size > CONTROL_FRAME_MAX_SIZE:
+            raise RuntimeError(f'Control frame too large ({size} bytes).')
+        payload = self._recv_exact(size)
+        if payload is None:
+            raise RuntimeError('Control channel closed mid-frame.')
+        message = pickle.loads(payload)
+        if not isinstance(
+            message, (ServerControlRequest, ServerControlResponse)
+        ):
+            raise TypeError(f'Unexpected control message: {type(message)}.')
+        return message
+
+    def close(self) -> None:
+        """Close the channel; any blocked recv() will return."""
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+    def _recv_exact(self, size: int) -> bytes | None:
+        buf = bytearray()
+        while len(buf) < size:
+            chunk = self._sock.recv(size - len(buf))
+            if not chunk:
+                if not buf:
+                    return None
+                raise RuntimeError('Control channel closed mid-frame.')
+            buf += chunk
+        return bytes(buf)
@@ -11,15 +11,28 @@
 from __future__ import annotations
 
 import os
+import time
+import hashlib
+import threading
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Annotated
 
-from efro.dataclassio import ioprepped, IOAttrs
+from efro.dataclassio import (
+    ioprepped,
+    IOAttrs,
+    dataclass_from_json,
+    dataclass_to_json,
+)
 
 if TYPE_CHECKING:
     pass
 
+# Files modified more recently than this (in nanoseconds) don't get
+# cached by FileHashCache. An edit landing within the filesystem's
+# timestamp resolution of our hashing could otherwise go unnoticed.
+_RACY_INTERVAL_NS = 2_000_000_000
+
 
 @ioprepped
 @dataclass
@@ -42,59 +55,98 @@ class DirectoryManifest:
     exists: Annotated[bool, IOAttrs('e', soft_default=True)]
 
     @classmethod
-    def create_from_disk(cls, path: Path) -> DirectoryManifest:
-        """Create a manifest from a directory on disk."""
-        import hashlib
+    def create_from_disk(
+        cls, path: Path, hash_cache: FileHashCache | None = None
+    ) -> DirectoryManifest:
+        """Create a manifest from a directory on disk.
+
+        If a hash cache is provided, only files that have changed since
+        it last saw them get re-hashed.
+        """
         from concurrent.futures import ThreadPoolExecutor
 
         pathstr = str(path)
         paths: list[str] = []
+        fullpaths: list[str] = []
 
         exists = path.exists()
 
         if path.is_dir():
-            # Build the full list of relative paths.
-            for basename, _dirnames, filenames in os.walk(path):
+            # Build the full list of relative paths. Note that this
+            # sticks to plain string ops; pathlib overhead adds up with
+            # lots of files.
+            for basename, _dirnames, filenames in os.walk(pathstr):
+                assert basename.startswith(pathstr)
+                relbase = basename[len(pathstr) + 1 :]
+
+                # Make sure we end up with forward slashes no matter
+                # what the os.* stuff above here was using.
+                if os.sep != '/':
+                    relbase = relbase.replace(os.sep, '/')
+                relprefix = f'{relbase}/' if relbase else ''
+                fullprefix = basename + os.sep
                 for filename in filenames:
-                    fullname = os.path.join(basename, filename)
-                    assert fullname.startswith(pathstr)
-                    # Make sure we end up with forward slashes no matter
-                    # what the os.* stuff above here was using.
-                    paths.append(Path(fullname[len(pathstr) + 1 :]).as_posix())
+                    paths.append(relprefix + filename)
+                    fullpaths.append(fullprefix + filename)
         elif exists:
             # Just return a single file entry if path is not a dir.
             paths.append(path.as_posix())
+            fullpaths.append(pathstr)
 
-        def _get_file_info(filepath: str) -> tuple[str, DirectoryManifestFile]:
-            sha = hashlib.sha256()
-            fullfilepath = os.path.join(pathstr, filepath)
+        def _get_file_info(fullfilepath: str) -> DirectoryManifestFile:
             if not os.path.isfile(fullfilepath):
                 raise RuntimeError(f'File not found: "{fullfilepath}".')
-            # Stream the file through sha256 to keep peak memory
-            # bounded — manifest generation must not load arbitrarily
-            # large files into RAM, since the whole point of streaming
-            # uploads is to handle files larger than process memory.
-            filesize = 0
-            with open(fullfilepath, 'rb') as infile:
-                for chunk in iter(lambda: infile.read(1024 * 1024), b''):
-                    sha.update(chunk)
-                    filesize += len(chunk)
-            return (
-                filepath,
-                DirectoryManifestFile(
-                    hash_sha256=sha.hexdigest(),
-                    size=filesize,
-                ),
-            )
+            if hash_cache is not None:
+                return hash_cache.get_file_info(fullfilepath)
+            return _hash_file(fullfilepath)
+
+        # Files the cache already knows about are cheap; only farm out
+        # the rest.
+        infos: list[DirectoryManifestFile | None]
+        if hash_cache is None:
+            infos = [None] * len(paths)
+        else:
+            infos = [hash_cache.lookup(p) for p in fullpaths]
+        misses = [i for i, info in enumerate(infos) if info is None]
 
         # Now use all procs to hash the files efficiently.
-        cpus = os.cpu_count()
-        if cpus is None:
-            cpus = 4
-        with ThreadPoolExecutor(max_workers=cpus) as executor:
-            return cls(
-                files=dict(executor.map(_get_file_info, paths)), exists=exists
-            )
+        if misses:
+            cpus = os.cpu_count()
+            if cpus is None:
+                cpus = 4
+            with ThreadPoolExecutor(max_workers=cpus) as executor:
+                for i, hashed in zip(
+                    misses,
+                    executor.map(
+                        _get_file_info, [fullpaths[i] for i in misses]
+                    ),
+                ):
+                    infos[i] = hashed
+
+        files: dict[str, DirectoryManifestFile] = {}
+        for filepath, fileinfo in zip(paths, infos):
+            assert fileinfo is not None
+            files[filepath] = fileinfo
+        return cls(files=files, exists=exists)
+
+    def diff(self, newer: DirectoryManifest) -> DirectoryManifestDiff:
+        """Return how a newer manifest differs from this one."""
+        added: dict[str, DirectoryManifestFile] = {}
+        changed: dict[str, DirectoryManifestFile] = {}
+        for fpath, fentry in newer.files.items():
+            oldentry = self.files.get(fpath)
+            if oldentry is None:
+                added[fpath] = fentry
+            elif oldentry != fentry:
+                changed[fpath] = fentry
+        removed = {
+            fpath: fentry
+            for fpath, fentry in self.files.items()
+            if fpath not in newer.files
+        }
+        return DirectoryManifestDiff(
+            added=added, removed=removed, changed=changed
+        )
 
     def validate(self) -> None:
         """Log any odd data in the manifest; for debugging."""
@@ -119,3 +171,182 @@ class DirectoryManifest:
     #         sha = hashlib.sha256()
     #         cls._empty_hash = sha.hexdigest()
     #     return cls._empty_hash
+
+
+@dataclass
+class DirectoryManifestDiff:
+    """Differences between two directory manifests."""
+
+    #: Files only in the newer manifest.
+    added: dict[str, DirectoryManifestFile]
+
+    #: Files only in the older manifest (with their old entries).
+    removed: dict[str, DirectoryManifestFile]
+
+    #: Files in both whose contents differ (with their new entries).
+    changed: dict[str, DirectoryManifestFile]
+
+    @property
+    def empty(self) -> bool:
+        """Whether the manifests are equivalent."""
+        return not (self.added or self.removed or self.changed)
+
+
+@ioprepped
+@dataclass
+class FileHashCacheEntry:
+    """Cached hash for a file along with the stat info it applies to."""
+
+    hash_sha256: Annotated[str, IOAttrs('h')]
+    size: Annotated[int, IOAttrs('s')]
+    mtime_ns: Annotated[int, IOAttrs('m')]
+    inode: Annotated[int, IOAttrs('i')]
+
+
+@ioprepped
+@dataclass
+class FileHashCacheData:
+    """Persistent data for a FileHashCache."""
+
+    entries: Annotated[dict[str, FileHashCacheEntry], IOAttrs('e')] = field(
+        default_factory=dict
+    )
+
+
+class FileHashCache:
+    """A cache of file sha256 hashes keyed on file stat info.
+
+    Files are only re-hashed when their size, modification time, or
+    inode differ from when they were last hashed. Pass a path to
+    persist the cache between runs (call save() to write it). This is
+    safe to use from multiple threads.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._data = FileHashCacheData()
+        if path is not None and path.exists():
+            try:
+                with open(path, encoding='utf-8') as infile:
+                    self._data = dataclass_from_json(
+                        FileHashCacheData, infile.read()
+                    )
+            except Exception:
+                import logging
+
+                logging.warning(
+                    'Error loading file hash cache at %s; resetting.',
+                    path,
+                    exc_info=True,
+                )
+
+    def lookup(self, path: str) -> DirectoryManifestFile | None:
+        """Return cached info for a file if still valid; otherwise None."""
+        abspath = path if os.path.isabs(path) else os.path.abspath(path)
+        try:
+            stat = os.stat(abspath)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._data.entries.get(abspath)
+        if entry is None or not _stat_matches(entry, stat):
+            return None
+        return DirectoryManifestFile(
+            hash_sha256=entry.hash_sha256, size=entry.size
+        )
+
+    def get_file_info(self, path: str) -> DirectoryManifestFile:
+        """Return hash info for a file, hashing it only if need be."""
+        info = self.lookup(path)
+        if info is not None:
+            return info
+
+        abspath = path if os.path.isabs(path) else os.path.abspath(path)
+        stat = os.stat(abspath)
+        info = _hash_file(abspath)
+
+        # Only keep results for files that held still while we hashed
+        # them and haven't been touched too recently.
+        stat2 = os.stat(abspath)
+        if (
+            stat2.st_size == stat.st_size == info.size
+            and stat2.st_mtime_ns == stat.st_mtime_ns
+            and stat2.st_ino == stat.st_ino
+            and stat.st_mtime_ns < time.time_ns() - _RACY_INTERVAL_NS
+        ):
+            with self._lock:
+                self._data.entries[abspath] = FileHashCacheEntry(
+                    hash_sha256=info.hash_sha256,
+                    size=info.size,
+                    mtime_ns=stat.st_mtime_ns,
+                    inode=stat.st_ino,
+                )
+                self._dirty = True
+        return info
+
+    def save(self) -> None:
+        """Write the cache to disk if it has a path and has changed.
+
+        Entries for files that no longer exist are dropped as part of
+        this. Errors writing are logged but not raised.
+        """
+        if self._path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._data.entries = {
+                fpath: entry
+                for fpath, entry in self._data.entries.items()
+                if os.path.isfile(fpath)
+            }
+            datastr = dataclass_to_json(self._data)
+
+        # Write to a temp file and move it into place so concurrent
+        # users never see a partial cache.
+        tmppath = Path(f'{self._path}.{os.getpid()}.tmp')
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmppath, 'w', encoding='utf-8') as outfile:
+                outfile.write(datastr)
+            os.replace(tmppath, self._path)
+        except OSError:
+            import logging
+
+            # A cache we can't write just means more hashing next time;
+            # not worth failing over.
+            logging.warning(
+                'Error saving file hash cache at %s.', self._path, exc_info=True
+            )
+            with self._lock:
+                self._dirty = True
+            try:
+                tmppath.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+def _stat_matches(entry: FileHashCacheEntry, stat: os.stat_result) -> bool:
+    return (
+        entry.size == stat.st_size
+        and entry.mtime_ns == stat.st_mtime_ns
+        and entry.inode == stat.st_ino
+    )
+
+
+def _hash_file(path: str) -> DirectoryManifestFile:
+    sha = hashlib.sha256()
+
+    # Stream the file through sha256 to keep peak memory bounded —
+    # manifest generation must not load arbitrarily large files into
+    # RAM, since the whole point of streaming uploads is to handle
+    # files larger than process memory.
+    filesize = 0
+    with open(path, 'rb') as infile:
+        for chunk in iter(lambda: infile.read(1024 * 1024), b''):
+            sha.update(chunk)
+            filesize += len(chunk)
+    return DirectoryManifestFile(hash_sha256=sha.hexdigest(), size=filesize)
@@ -32,6 +32,7 @@ from bacommon.bacloud import (
     StreamOutput,
     BACLOUD_VERSION,
 )
+from bacommon.transfer import FileHashCache
 
 TOOL_NAME = 'bacloud'
 
@@ -43,21 +44,6 @@ VERBOSE = os.environ.get('BACLOUD_VERBOSE') == '1'
 BACLOUD_SERVER = os.getenv('BACLOUD_SERVER', 'regional.ballistica.net')
 
 
-def _hash_file(path: str) -> tuple[int, str]:
-    """Return (size, sha256_hex) for a local file."""
-    import hashlib
-
-    size = os.path.getsize(path)
-    h = hashlib.sha256()
-    with open(path, 'rb') as f:
-        while True:
-            chunk = f.read(1024 * 1024)
-            if not chunk:
-                break
-            h.update(chunk)
-    return size, h.hexdigest()
-
-
 def _upload_plan_sibling(finalize_command: str, sibling: str) -> str:
     """Derive a sibling command path from a finalize command.
 
@@ -174,6 +160,7 @@ class App:
         self._end_command_args: dict = {}
         self._return_code = 0
         self._api_key: str | None = None
+        self._hash_cache: FileHashCache | None = None
 
     def run(self) -> int:
         """Run the tool."""
@@ -211,6 +198,12 @@ class App:
         if self._api_key is None:
             self._save_state()
 
+        # Unlike our state, this is safe to share between parallel runs
+        # (entries are validated against file stats on use and the
+        # cache is replaced atomically on save).
+        if self._hash_cache is not None:
+            self._hash_cache.save()
+
         return self._return_code
 
     @property
@@ -224,6 +217,13 @@ class App:
         """The full path to the state data file."""
         return Path(self._state_dir, 'state')
 
+    @property
+    def _file_hash_cache(self) -> FileHashCache:
+        """Cached file hashes so unchanged files don't get re-hashed."""
+        if self._hash_cache is None:
+            self._hash_cache = FileHashCache(Path(self._state_dir, 'hashcache'))
+        return self._hash_cache
+
     def _load_state(self) -> None:
         if not os.path.exists(self._state_data_path):
             return
@@ -411,7 +411,9 @@ class App:
         from bacommon.transfer import DirectoryManifest
 
         self._end_command_args['manifest'] = dataclass_to_dict(
-            DirectoryManifest.create_from_disk(Path(dirmanifest))
+            DirectoryManifest.create_from_disk(
+                Path(dirmanifest), hash_cache=self._file_hash_cache
+            )
         )
 
     def _handle_deletes(self, deletes: list[str]) -> None:
@@ -592,9 +594,13 @@ class App:
             for fn in filenames:
                 full = os.path.join(basepath, fn)
                 rel = os.path.relpath(full, source_dir)
-                size, sha256 = _hash_file(full)
+                fileinfo = self._file_hash_cache.get_file_info(full)
                 files.append(
-                    UploadPlanFileInfo(name=rel, sha256=sha256, size=size)
+                    UploadPlanFileInfo(
+                        name=rel,
+                        sha256=fileinfo.hash_sha256,
+                        size=fileinfo.size,
+                    )
                 )
                 local_paths[rel] = full
 
@@ -526,6 +526,7 @@ def _get_server_config_template_toml(projroot: str) -> str:
     # commented out instead.
     cfg.playlist_code = 12345
     cfg.stats_url = 'https://mystatssite.com/showstats?player=${ACCOUNT}'
+    cfg.player_stats_file = 'player_stats.db'
     cfg.clean_exit_minutes = 60
     cfg.unclean_exit_minutes = 90
     cfg.idle_exit_minutes = 20
@@ -538,6 +539,15 @@ def _get_server_config_template_toml(projroot: str) -> str:
     cfg.public_ipv4_address = '123.123.123.123'
     cfg.public_ipv6_address = '123A::A123:23A1:A312:12A3:A213:2A13'
     cfg.log_levels = {'ba.lifecycle': 'INFO', 'ba.assets': 'INFO'}
+    cfg.fleet_instances = [
+        {'name': 'ffa', 'port': 43210, 'party_name': 'My FFA Party'},
+        {
+            'name': 'teams',
+            'port': 43211,
+            'party_name': 'My Teams Party',
+            'session_type': 'teams',
+        },
+    ]
 
     lines_in = _get_server_config_raw_contents(projroot).splitlines()
 
@@ -548,7 +558,11 @@ def _get_server_config_template_toml(projroot: str) -> str:
     # lines_in = [l.replace("'", '"') for l in lines_in]
 
     lines_out: list[str] = []
-    ignore_vars = {'stress_test_players'}
+    ignore_vars = {
+        'stress_test_players',
+        'stress_test_games',
+        'stress_test_report_file',
+    }
     for line in lines_in:
 
         # Replace attr declarations with commented out toml values.
@@ -0,0 +1,165 @@
+# Released under the MIT License. See LICENSE for details.
+#
+"""Generates lazy-import tables for package __init__ modules.
+
+Packages such as babase and bascenev1 re-export lots of names from their
+submodules. Rather than importing all of those submodules up front, they
+list the imports in an ``if TYPE_CHECKING or not _LAZY_IMPORTS:`` block
+(so type checkers and linters still see them) and we generate a table
+here mapping each name to its module, which the package then uses to
+import things on first access.
+"""
+
+from __future__ import annotations
+
+import ast
+
+from efrotools.util import replace_section
+
+# Packages we generate tables for.
+LAZY_IMPORT_PACKAGES = ['babase', 'bascenev1']
+
+# The condition guarding the imports we provide lazily.
+LAZY_IMPORTS_TEST = 'TYPE_CHECKING or not _LAZY_IMPORTS'
+
+
+def generate_lazy_imports(path: str, existing_data: str) -> str:
+    """Generate the lazy-import section of a package __init__ module."""
+
+    tree = ast.parse(existing_data, filename=path)
+    exports = _get_exports(tree, path)
+    eager_names = _get_runtime_names(tree.body)
+    lazy_attrs = _get_lazy_imports(tree, path)
+
+    missing = [
+        name
+        for name in exports
+        if name not in eager_names and name not in lazy_attrs
+    ]
+    if missing:
+        names = ', '.join(missing)
+        raise RuntimeError(
+            f'{path}: names in __all__ are neither defined nor imported'
+            f' in its lazy-import block: {names}.'
+        )
+
+    info = f'# This section generated by {__name__}; do not edit.'
+    entries = ''.join(
+        f"    '{name}': '{modname}',\n"
+        for name, modname in sorted(lazy_attrs.items())
+        if name in exports and name not in eager_names
+    )
+
+    # Note: this should stay black-formatted.
+    return replace_section(
+        existing_data,
+        '# __LAZY_IMPORTS_BEGIN__\n',
+        '# __LAZY_IMPORTS_END__\n',
+        f'{info}\n'
+        f'\n'
+        f'# Names we provide but only import from their modules when\n'
+        f'# first accessed (see lazy-import block above).\n'
+        f'_LAZY_ATTRS: dict[str, str] = {{\n'
+        f'{entries}'
+        f'}}\n'
+        f'\n'
+        f'if not TYPE_CHECKING:\n'
+        f'\n'
+        f'    def __getattr__(name: str) -> object:\n'
+        f'        modname = _LAZY_ATTRS.get(name)\n'
+        f'        if modname is None:\n'
+        f'            raise AttributeError(\n'
+        f"                f'module {{__name__!r}} has no attribute"
+        f" {{name!r}}'\n"
+        f'            )\n'
+        f'        value = getattr(importlib.import_module(modname), name)\n'
+        f'\n'
+        f"        # Store it so we don't come through here next time.\n"
+        f'        globals()[name] = value\n'
+        f'        return value\n'
+        f'\n'
+        f'    def __dir__() -> list[str]:\n'
+        f'        return sorted(set(globals()) | _LAZY_ATTRS.keys())\n'
+        f'\n'
+        f'\n',
+        keep_markers=True,
+    )
+
+
+def _get_exports(tree: ast.Module, path: str) -> list[str]:
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id == '__all__'
+        ):
+            exports = ast.literal_eval(node.value)
+            assert isinstance(exports, list)
+            return exports
+    raise RuntimeError(f'{path}: no __all__ found.')
+
+
+def _is_type_checking_test(node: ast.expr) -> bool:
+    return isinstance(node, ast.Name) and node.id == 'TYPE_CHECKING'
+
+
+def _is_lazy_imports_test(node: ast.expr) -> bool:
+    return ast.unparse(node) == LAZY_IMPORTS_TEST
+
+
+def _get_runtime_names(body: list[ast.stmt]) -> set[str]:
+    """Return names bound at module level when actually running."""
+    names = set[str]()
+    for node in body:
+        if isinstance(node, ast.If):
+            if not _is_type_checking_test(
+                node.test
+            ) and not _is_lazy_imports_test(node.test):
+                names |= _get_runtime_names(node.body)
+            names |= _get_runtime_names(node.orelse)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add((alias.asname or alias.name).split('.')[0])
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                for subnode in ast.walk(target):
+                    if isinstance(subnode, ast.Name):
+                        names.add(subnode.id)
+        elif isinstance(node, ast.AnnAssign):
+            if isinstance(node.target, ast.Name):
+                names.add(node.target.id)
+        elif isinstance(
+            node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+        ):
+            names.add(node.name)
+    return names
+
+
+def _get_lazy_imports(tree: ast.Module, path: str) -> dict[str, str]:
+    """Return names imported in the top level lazy-import block."""
+    imports: dict[str, str] = {}
+    blocks = [
+        node
+        for node in tree.body
+        if isinstance(node, ast.If) and _is_lazy_imports_test(node.test)
+    ]
+    if len(blocks) != 1:
+        raise RuntimeError(
+            f"{path}: expected one 'if {LAZY_IMPORTS_TEST}:' block;"
+            f' found {len(blocks)}.'
+        )
+    for subnode in blocks[0].body:
+        if not isinstance(subnode, ast.ImportFrom):
+            continue
+        if subnode.module is None or subnode.level != 0:
+            raise RuntimeError(
+                'Relative imports are not supported for lazy imports.'
+            )
+        for alias in subnode.names:
+            if alias.asname is not None:
+                raise RuntimeError(
+                    'Renaming imports are not supported for lazy imports.'
+                )
+            imports[alias.name] = subnode.module
+    return imports
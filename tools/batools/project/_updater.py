@@ -115,6 +115,7 @@ class ProjectUpdater:
             self._update_visual_studio_projects()
             self._update_xcode_projects()
             self._update_app_module()
+            self._update_lazy_import_modules()
 
     @property
     def source_files(self) -> list[str]:
@@ -407,6 +408,8 @@ class ProjectUpdater:
                 self._generate_meta_makefile(existing_data)
             elif path == 'src/assets/ba_data/python/babase/_app.py':
                 self._generate_app_module(path, existing_data)
+            elif path in self._lazy_import_module_paths():
+                self._generate_lazy_import_module(path, existing_data)
             elif path.startswith('src/meta/.meta_manifest_'):
                 # These are always generated as a side-effect of the
                 # meta Makefile.
@@ -423,6 +426,20 @@ class ProjectUpdater:
     def _update_app_module(self) -> None:
         self.enqueue_update('src/assets/ba_data/python/babase/_app.py')
 
+    def _lazy_import_module_paths(self) -> list[str]:
+        from batools.lazyimports import LAZY_IMPORT_PACKAGES
+
+        return [
+            f'src/assets/ba_data/python/{pkg}/__init__.py'
+            for pkg in LAZY_IMPORT_PACKAGES
+        ]
+
+    def _update_lazy_import_modules(self) -> None:
+        for path in self._lazy_import_module_paths():
+            # Spinoff projects may not include all of these packages.
+            if os.path.exists(os.path.join(self.projroot, path)):
+                self.enqueue_update(path)
+
     def _update_xcode_projects(self) -> None:
         # from batools.xcode import update_xcode_project
 
@@ -730,6 +747,13 @@ class ProjectUpdater:
             self.projroot, self.feature_sets, existing_data
         )
 
+    def _generate_lazy_import_module(
+        self, path: str, existing_data: str
+    ) -> None:
+        from batools.lazyimports import generate_lazy_imports
+
+        self._generated_files[path] = generate_lazy_imports(path, existing_data)
+
     def _update_meta_makefile(self) -> None:
         self.enqueue_update('src/meta/Makefile')
 
@@ -27,12 +27,15 @@ from efro.dataclassio._prep import (
     is_ioprepped_dataclass,
 )
 from efro.dataclassio._pathcapture import DataclassFieldLookup
+from efro.dataclassio._binary import encode_binary, decode_binary
 from efro.dataclassio._api import (
     JsonStyle,
     dataclass_to_dict,
     dataclass_to_json,
+    dataclass_to_binary,
     dataclass_from_dict,
     dataclass_from_json,
+    dataclass_from_binary,
     dataclass_validate,
     dataclass_hash,
 )
@@ -45,12 +48,16 @@ __all__ = [
     'IOExtendedData',
     'IOMultiType',
     'JsonStyle',
+    'dataclass_from_binary',
     'dataclass_from_dict',
     'dataclass_from_json',
+    'dataclass_to_binary',
     'dataclass_to_dict',
     'dataclass_to_json',
     'dataclass_validate',
     'dataclass_hash',
+    'decode_binary',
+    'encode_binary',
     'ioprep',
     'ioprepped',
     'is_ioprepped_dataclass',
@@ -178,6 +178,49 @@ def dataclass_from_json[T](
     )
 
 
+def dataclass_to_binary(obj: Any, coerce_to_float: bool = True) -> bytes:
+    """Utility function; return compact binary data for a dataclass.
+
+    Basically encode_binary(dataclass_to_dict(..., codec=Codec.BINARY)).
+    Output is deterministic for a given object and is generally much
+    smaller than json for data containing bytes, datetimes, or tagged
+    fields.
+    """
+    from efro.dataclassio._binary import encode_binary
+
+    return encode_binary(
+        dataclass_to_dict(
+            obj=obj, coerce_to_float=coerce_to_float, codec=Codec.BINARY
+        )
+    )
+
+
+def dataclass_from_binary[T](
+    cls: type[T],
+    data: bytes,
+    *,
+    coerce_to_float: bool = True,
+    allow_unknown_attrs: bool = True,
+    discard_unknown_attrs: bool = False,
+    lossy: bool = False,
+) -> T:
+    """Return a dataclass instance given binary data.
+
+    Basically dataclass_from_dict(decode_binary(...), codec=Codec.BINARY)
+    """
+    from efro.dataclassio._binary import decode_binary
+
+    return dataclass_from_dict(
+        cls=cls,
+        values=decode_binary(data),
+        codec=Codec.BINARY,
+        coerce_to_float=coerce_to_float,
+        allow_unknown_attrs=allow_unknown_attrs,
+        discard_unknown_attrs=discard_unknown_attrs,
+        lossy=lossy,
+    )
+
+
 def dataclass_validate(
     obj: Any,
     coerce_to_float: bool = True,
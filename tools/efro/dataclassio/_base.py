@@ -41,6 +41,13 @@ class Codec(Enum):
     #: as-is instead of converting them to json-friendly types.
     FIRESTORE = 'firestore'
 
+    #: Compact binary codec (see :func:`dataclass_to_binary()`). Like
+    #: FIRESTORE it passes bytes through as-is; datetime and timedelta
+    #: values are stored as single int microsecond counts, and fields
+    #: with an :attr:`IOAttrs.tag` are keyed by that int instead of their
+    #: storage name.
+    BINARY = 'binary'
+
     #: Output-only codec for human-readable dicts. Uses Python attribute
     #: names as keys, enum ``.name`` as values, and ISO 8601 format for
     #: all datetime/date values. NOT suitable for round-trip parsing;
@@ -227,6 +234,12 @@ class IOAttrs:
     #: If passed, is the name used when storing to json/etc.
     storagename: str | None = None
 
+    #: If passed, an int used as this field's key under the BINARY
+    #: codec in place of its storage name. Tags must be unique within a
+    #: dataclass and, like storage names, should never be reused for a
+    #: different field once data has been written with them.
+    tag: int | None = None
+
     #: Can be set to ``False`` to avoid writing values when equal to the
     #: default value. Note that this requires the dataclass field to
     #: define a ``default`` or ``default_factory`` or for its ``IOAttrs``
@@ -334,6 +347,7 @@ class IOAttrs:
         multiline: bool | None = None,
         edit_as_options: bool | None = None,
         text_literal: bool | None = None,
+        tag: int | None = None,
     ):
 
         # Only store values that differ from class defaults to keep
@@ -385,6 +399,12 @@ class IOAttrs:
             self.edit_as_options = edit_as_options
         if text_literal is not cls.text_literal:
             self.text_literal = text_literal
+        if tag is not cls.tag:
+            if not isinstance(tag, int) or isinstance(tag, bool) or tag < 0:
+                raise ValueError(
+                    f'tag must be a non-negative int; got {tag!r}.'
+                )
+            self.tag = tag
 
     def validate_for_field(self, cls: type, field: dataclasses.Field) -> None:
         """Ensure the IOAttrs is ok to use with provided field."""
@@ -471,12 +491,20 @@ def _raise_type_error(
     )
 
 
+# Reference point for datetimes stored as ints by the BINARY codec.
+_BINARY_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.UTC)
+
+# Unit for datetimes and timedeltas stored as ints by the BINARY codec.
+_BINARY_TIME_UNIT = datetime.timedelta(microseconds=1)
+
+
 def _is_valid_for_codec(obj: Any, codec: Codec) -> bool:
     """Return whether a value consists solely of json-supported types.
 
     Note that this does not include things like tuples which are
     implicitly translated to lists by python's json module.
     """
+    # pylint: disable=too-many-return-statements
     if obj is None:
         return True
 
@@ -485,7 +513,12 @@ def _is_valid_for_codec(obj: Any, codec: Codec) -> bool:
         return True
     if objtype is dict:
         # JSON 'objects' supports only string dict keys, but all value
-        # types.
+        # types. Binary maps can also be keyed by int tags.
+        if codec is Codec.BINARY:
+            return all(
+                type(k) in (str, int) and _is_valid_for_codec(v, codec)
+                for k, v in obj.items()
+            )
         return all(
             isinstance(k, str) and _is_valid_for_codec(v, codec)
             for k, v in obj.items()
@@ -493,8 +526,10 @@ def _is_valid_for_codec(obj: Any, codec: Codec) -> bool:
     if objtype is list:
         return all(_is_valid_for_codec(elem, codec) for elem in obj)
 
-    # A few things are valid in firestore but not json.
-    if issubclass(objtype, datetime.datetime) or objtype is bytes:
+    # A few things are valid in firestore or binary but not json.
+    if objtype is bytes:
+        return codec is Codec.FIRESTORE or codec is Codec.BINARY
+    if issubclass(objtype, datetime.datetime):
         return codec is Codec.FIRESTORE
 
     return False
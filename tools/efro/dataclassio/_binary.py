@@ -0,0 +1,324 @@
+# Released under the MIT License. See LICENSE for details.
+#
+"""Compact binary encoding used by the BINARY dataclassio codec.
+
+The wire format is a subset of MessagePack (https://msgpack.org), so
+data can be inspected or produced with standard msgpack tools. Values
+are limited to what the BINARY codec emits: None, bools, ints, floats,
+strs, bytes, lists, and dicts keyed by strs or ints. Ints which do not
+fit in 64 bits are stored as a msgpack extension type.
+
+This is implemented in pure Python since it needs to run in
+environments (such as the game's embedded interpreter) where third
+party packages are not available.
+"""
+
+# We do lots of comparing of exact types here which is normally frowned
+# upon (stuff like isinstance() is usually encouraged).
+# pylint: disable=unidiomatic-typecheck
+
+from __future__ import annotations
+
+import struct
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+# Extension type we use for ints too large for msgpack's native ones.
+_EXT_BIGINT = 1
+
+# Plain values and type-code-prefixed headers.
+_U8 = struct.Struct('>B')
+_U16 = struct.Struct('>H')
+_U32 = struct.Struct('>I')
+_HDR_U8 = struct.Struct('>BB')
+_HDR_U16 = struct.Struct('>BH')
+_HDR_U32 = struct.Struct('>BI')
+_HDR_U64 = struct.Struct('>BQ')
+_HDR_I8 = struct.Struct('>Bb')
+_HDR_I16 = struct.Struct('>Bh')
+_HDR_I32 = struct.Struct('>Bi')
+_HDR_I64 = struct.Struct('>Bq')
+_HDR_F64 = struct.Struct('>Bd')
+_I8 = struct.Struct('>b')
+_I16 = struct.Struct('>h')
+_I32 = struct.Struct('>i')
+_U64 = struct.Struct('>Q')
+_I64 = struct.Struct('>q')
+_F32 = struct.Struct('>f')
+_F64 = struct.Struct('>d')
+
+
+def encode_binary(obj: Any) -> bytes:
+    """Encode a value to compact binary data.
+
+    Supports the same values as json plus bytes and int dict keys.
+    Raises TypeError on unsupported types (including tuples and sets,
+    which dataclassio never emits).
+    """
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def decode_binary(data: bytes) -> Any:
+    """Decode a value from data created by encode_binary().
+
+    Raises ValueError on malformed or truncated data.
+    """
+    if type(data) is not bytes:
+        data = bytes(data)
+    try:
+        value, pos = _unpack(data, 0)
+    except (IndexError, struct.error) as exc:
+        raise ValueError('Truncated binary data.') from exc
+    if pos != len(data):
+        raise ValueError(
+            f'Extra data found after binary value'
+            f' ({len(data) - pos} bytes).'
+        )
+    return value
+
+
+def _pack(obj: Any, out: bytearray) -> None:
+    # pylint: disable=too-many-branches
+    objtype = type(obj)
+    if objtype is str:
+        data = obj.encode()
+        size = len(data)
+        if size < 0x20:
+            out.append(0xA0 | size)
+        elif size < 0x100:
+            out += _HDR_U8.pack(0xD9, size)
+        elif size < 0x10000:
+            out += _HDR_U16.pack(0xDA, size)
+        else:
+            out += _HDR_U32.pack(0xDB, size)
+        out += data
+    elif objtype is int:
+        _pack_int(obj, out)
+    elif obj is None:
+        out.append(0xC0)
+    elif objtype is bool:
+        out.append(0xC3 if obj else 0xC2)
+    elif objtype is float:
+        out += _HDR_F64.pack(0xCB, obj)
+    elif objtype is dict:
+        size = len(obj)
+        if size < 0x10:
+            out.append(0x80 | size)
+        elif size < 0x10000:
+            out += _HDR_U16.pack(0xDE, size)
+        else:
+            out += _HDR_U32.pack(0xDF, size)
+        for key, val in obj.items():
+            keytype = type(key)
+            if keytype is not str and keytype is not int:
+                raise TypeError(
+                    f'Binary dict keys must be str or int;'
+                    f' found {keytype.__name__}.'
+                )
+            _pack(key, out)
+            _pack(val, out)
+    elif objtype is list:
+        size = len(obj)
+        if size < 0x10:
+            out.append(0x90 | size)
+        elif size < 0x10000:
+            out += _HDR_U16.pack(0xDC, size)
+        else:
+            out += _HDR_U32.pack(0xDD, size)
+        for val in obj:
+            _pack(val, out)
+    elif objtype is bytes:
+        size = len(obj)
+        if size < 0x100:
+            out += _HDR_U8.pack(0xC4, size)
+        elif size < 0x10000:
+            out += _HDR_U16.pack(0xC5, size)
+        else:
+            out += _HDR_U32.pack(0xC6, size)
+        out += obj
+    else:
+        raise TypeError(
+            f'Object of type {objtype.__name__} is not binary serializable.'
+        )
+
+
+def _pack_int(obj: int, out: bytearray) -> None:
+    if obj >= 0:
+        if obj < 0x80:
+            out.append(obj)
+        elif obj < 0x100:
+            out += _HDR_U8.pack(0xCC, obj)
+        elif obj < 0x10000:
+            out += _HDR_U16.pack(0xCD, obj)
+        elif obj < 0x100000000:
+            out += _HDR_U32.pack(0xCE, obj)
+        elif obj < 0x10000000000000000:
+            out += _HDR_U64.pack(0xCF, obj)
+        else:
+            _pack_bigint(obj, out)
+    elif obj >= -0x20:
+        out.append(obj & 0xFF)
+    elif obj >= -0x80:
+        out += _HDR_I8.pack(0xD0, obj)
+    elif obj >= -0x8000:
+        out += _HDR_I16.pack(0xD1, obj)
+    elif obj >= -0x80000000:
+        out += _HDR_I32.pack(0xD2, obj)
+    elif obj >= -0x8000000000000000:
+        out += _HDR_I64.pack(0xD3, obj)
+    else:
+        _pack_bigint(obj, out)
+
+
+def _pack_bigint(obj: int, out: bytearray) -> None:
+    data = obj.to_bytes((obj.bit_length() + 8) // 8, 'big', signed=True)
+    size = len(data)
+    if size < 0x100:
+        out += _HDR_U8.pack(0xC7, size)
+    elif size < 0x10000:
+        out += _HDR_U16.pack(0xC8, size)
+    else:
+        out += _HDR_U32.pack(0xC9, size)
+    out.append(_EXT_BIGINT)
+    out += data
+
+
+def _take(data: bytes, pos: int, size: int) -> bytes:
+    end = pos + size
+    if end > len(data):
+        raise ValueError('Truncated binary data.')
+    return data[pos:end]
+
+
+def _unpack(data: bytes, pos: int) -> tuple[Any, int]:
+    code = data[pos]
+    pos += 1
+
+    # Single-byte and fixed-size-header cases first since they're the
+    # most common.
+    if code < 0x80:
+        return code, pos
+    if code >= 0xE0:
+        return code - 0x100, pos
+    if 0xA0 <= code < 0xC0:
+        size = code & 0x1F
+        return _take(data, pos, size).decode(), pos + size
+    if 0x90 <= code < 0xA0:
+        return _unpack_list(data, pos, code & 0x0F)
+    if code < 0x90:
+        return _unpack_dict(data, pos, code & 0x0F)
+
+    handler = _HANDLERS.get(code)
+    if handler is None:
+        raise ValueError(f'Invalid binary type code 0x{code:02X}.')
+    return handler(data, pos)
+
+
+def _unpack_list(data: bytes, pos: int, size: int) -> tuple[Any, int]:
+    out = []
+    for _i in range(size):
+        val, pos = _unpack(data, pos)
+        out.append(val)
+    return out, pos
+
+
+def _unpack_dict(data: bytes, pos: int, size: int) -> tuple[Any, int]:
+    out = {}
+    for _i in range(size):
+        key, pos = _unpack(data, pos)
+        keytype = type(key)
+        if keytype is not str and keytype is not int:
+            raise ValueError(
+                f'Binary dict keys must be str or int;'
+                f' found {keytype.__name__}.'
+            )
+        out[key], pos = _unpack(data, pos)
+    return out, pos
+
+
+def _unpack_ext(data: bytes, pos: int, size: int) -> tuple[Any, int]:
+    exttype = data[pos]
+    pos += 1
+    payload = _take(data, pos, size)
+    if exttype != _EXT_BIGINT:
+        raise ValueError(f'Unsupported binary extension type {exttype}.')
+    return int.from_bytes(payload, 'big', signed=True), pos + size
+
+
+def _sized(
+    sizestruct: struct.Struct,
+    func: Callable[[bytes, int, int], tuple[Any, int]],
+) -> Callable[[bytes, int], tuple[Any, int]]:
+    """Wrap an unpack function taking a size read from a header."""
+
+    def _unpack_sized(data: bytes, pos: int) -> tuple[Any, int]:
+        size = sizestruct.unpack_from(data, pos)[0]
+        return func(data, pos + sizestruct.size, size)
+
+    return _unpack_sized
+
+
+def _fixed(
+    valstruct: struct.Struct,
+) -> Callable[[bytes, int], tuple[Any, int]]:
+    """Wrap a plain numeric value read."""
+
+    def _unpack_fixed(data: bytes, pos: int) -> tuple[Any, int]:
+        return valstruct.unpack_from(data, pos)[0], pos + valstruct.size
+
+    return _unpack_fixed
+
+
+def _unpack_str(data: bytes, pos: int, size: int) -> tuple[Any, int]:
+    return _take(data, pos, size).decode(), pos + size
+
+
+def _unpack_bytes(data: bytes, pos: int, size: int) -> tuple[Any, int]:
+    return bytes(_take(data, pos, size)), pos + size
+
+
+def _const(value: Any) -> Callable[[bytes, int], tuple[Any, int]]:
+    return lambda data, pos: (value, pos)
+
+
+def _fixext(size: int) -> Callable[[bytes, int], tuple[Any, int]]:
+    return lambda data, pos: _unpack_ext(data, pos, size)
+
+
+_HANDLERS: dict[int, Callable[[bytes, int], tuple[Any, int]]] = {
+    0xC0: _const(None),
+    0xC2: _const(False),
+    0xC3: _const(True),
+    0xC4: _sized(_U8, _unpack_bytes),
+    0xC5: _sized(_U16, _unpack_bytes),
+    0xC6: _sized(_U32, _unpack_bytes),
+    0xC7: _sized(_U8, _unpack_ext),
+    0xC8: _sized(_U16, _unpack_ext),
+    0xC9: _sized(_U32, _unpack_ext),
+    0xCA: _fixed(_F32),
+    0xCB: _fixed(_F64),
+    0xCC: _fixed(_U8),
+    0xCD: _fixed(_U16),
+    0xCE: _fixed(_U32),
+    0xCF: _fixed(_U64),
+    0xD0: _fixed(_I8),
+    0xD1: _fixed(_I16),
+    0xD2: _fixed(_I32),
+    0xD3: _fixed(_I64),
+    0xD4: _fixext(1),
+    0xD5: _fixext(2),
+    0xD6: _fixext(4),
+    0xD7: _fixext(8),
+    0xD8: _fixext(16),
+    0xD9: _sized(_U8, _unpack_str),
+    0xDA: _sized(_U16, _unpack_str),
+    0xDB: _sized(_U32, _unpack_str),
+    0xDC: _sized(_U16, _unpack_list),
+    0xDD: _sized(_U32, _unpack_list),
+    0xDE: _sized(_U16, _unpack_dict),
+    0xDF: _sized(_U32, _unpack_dict),
+}
@@ -1,5 +1,6 @@
 # Released under the MIT License. See LICENSE for details.
 #
+# pylint: disable=too-many-lines
 """Functionality for dataclassio related to pulling data into dataclasses."""
 
 # Note: We do lots of comparing of exact types here which is normally
@@ -13,7 +14,7 @@ import dataclasses
 import typing
 import types
 import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, cast
 
 from efro.util import check_utc
 from efro.dataclassio._base import (
@@ -22,6 +23,8 @@ from efro.dataclassio._base import (
     EXTRA_ATTRS_ATTR,
     LOSSY_ATTR,
     _is_valid_for_codec,
+    _BINARY_EPOCH,
+    _BINARY_TIME_UNIT,
     _get_origin,
     SIMPLE_TYPES,
     _raise_type_error,
@@ -30,11 +33,11 @@ from efro.dataclassio._base import (
     IOMultiType,
     TypeNotPresentError,
 )
-from efro.dataclassio._prep import PrepSession
+from efro.dataclassio._prep import PrepSession, CODECS_ATTR
 
 if TYPE_CHECKING:
 
-    from typing import Any
+    from typing import Any, Callable
 
     from efro.dataclassio._base import IOAttrs
     from efro.dataclassio._outputter import _Outputter
@@ -50,8 +53,10 @@ class _Inputter:
         allow_unknown_attrs: bool = True,
         discard_unknown_attrs: bool = False,
         lossy: bool = False,
+        compiled: bool = True,
     ):
         self._cls = cls
+        self._compiled = compiled
         self._codec = codec
         self._coerce_to_float = coerce_to_float
         self._allow_unknown_attrs = allow_unknown_attrs
@@ -59,6 +64,16 @@ class _Inputter:
         self._soft_default_validator: _Outputter | None = None
         self._lossy = lossy
 
+        # Key we use to look up compiled decoders for these options.
+        self._codec_key = (
+            'in',
+            codec,
+            coerce_to_float,
+            allow_unknown_attrs,
+            discard_unknown_attrs,
+            lossy,
+        )
+
         if not allow_unknown_attrs and discard_unknown_attrs:
             raise ValueError(
                 'discard_unknown_attrs cannot be True'
@@ -306,9 +321,9 @@ class _Inputter:
         """Given input data, returns bytes."""
         import base64
 
-        # For firestore, bytes are passed as-is. Otherwise, they're encoded
-        # as base64.
-        if self._codec is Codec.FIRESTORE:
+        # For firestore and binary, bytes are passed as-is. Otherwise,
+        # they're encoded as base64.
+        if self._codec is Codec.FIRESTORE or self._codec is Codec.BINARY:
             if not isinstance(value, bytes):
                 raise TypeError(
                     f'Expected a bytes object for {fieldpath}'
@@ -337,6 +352,8 @@ class _Inputter:
         passed as dicts.
         """
         try:
+            if self._compiled:
+                return self._get_dataclass_decoder(cls)(values, fieldpath)
             return self._do_dataclass_from_input(cls, fieldpath, values)
         except Exception as exc:
             # Extended data types can choose to substitute default data
@@ -355,10 +372,352 @@ class _Inputter:
                 return fallback
             raise
 
+    def _get_dataclass_decoder(self, cls: type) -> Callable[[Any, str], Any]:
+        """Return a compiled decoder for a dataclass type.
+
+        Decoders are built the first time a type is encountered with a
+        particular set of options and are then cached on the type.
+        """
+        codecs: dict[tuple, Callable[[Any, str], Any]] | None = (
+            cls.__dict__.get(CODECS_ATTR)
+        )
+        if codecs is not None:
+            decoder = codecs.get(self._codec_key)
+            if decoder is not None:
+                return decoder
+        else:
+            codecs = {}
+            setattr(cls, CODECS_ATTR, codecs)
+
+        # Compile using a fresh inputter so we're not tied to our own
+        # top-level class.
+        # pylint: disable=protected-access
+        decoder = _Inputter(
+            cls,
+            codec=self._codec,
+            coerce_to_float=self._coerce_to_float,
+            allow_unknown_attrs=self._allow_unknown_attrs,
+            discard_unknown_attrs=self._discard_unknown_attrs,
+            lossy=self._lossy,
+        )._compile_dataclass_decoder(cls)
+        codecs[self._codec_key] = decoder
+        return decoder
+
+    def _compile_dataclass_decoder(
+        self, cls: type
+    ) -> Callable[[Any, str], Any]:
+        """Build a function to instantiate a dataclass type from a dict.
+
+        This does all per-type work (prep lookups, annotation parsing,
+        storage-name resolution, etc.) up front so the resulting
+        function only has to deal with values.
+        """
+        prep = PrepSession(explicit=False).prep_dataclass(
+            cls, recursion_level=0
+        )
+        assert prep is not None
+
+        # Map storage names (and attr names and binary tags) to attr
+        # names and decoders.
+        fieldspecs: dict[str | int, tuple[str, Callable[[Any, str], Any]]] = {}
+        soft_default_fields: list[tuple[str, Any, IOAttrs]] = []
+        fields = dataclasses.fields(cls)
+        for field in fields:
+            anntype, ioattrs = parse_annotated(prep.annotations[field.name])
+            fieldspecs[field.name] = (
+                field.name,
+                self._compile_value_decoder(cls, anntype, ioattrs),
+            )
+            if ioattrs is not None and (
+                ioattrs.soft_default is not ioattrs.MISSING
+                or ioattrs.soft_default_factory is not ioattrs.MISSING
+            ):
+                soft_default_fields.append((field.name, anntype, ioattrs))
+        storage_names_to_attr_names = prep.storage_names_to_attr_names
+        for storagename, attrname in storage_names_to_attr_names.items():
+            if attrname in fieldspecs:
+                fieldspecs[storagename] = fieldspecs[attrname]
+        if self._codec is Codec.BINARY:
+            for tag, attrname in prep.tags_to_attr_names.items():
+                if attrname in fieldspecs:
+                    fieldspecs[tag] = fieldspecs[attrname]
+
+        # Special case: if this is a multi-type class it probably has a
+        # type attr. Ignore that while parsing since we already have a
+        # definite type and it will just pollute extra-attrs otherwise.
+        type_id_store_name: str | None
+        if issubclass(cls, IOMultiType):
+            type_id_store_name = cls.get_type_id_storage_name()
+
+            # However we do want to make sure the class we're loading
+            # doesn't itself use this same name, as this could lead to
+            # tricky breakage. We can't verify this for types at prep
+            # time because IOMultiTypes are lazy-loaded, so this is the
+            # best we can do.
+            if any(f.name == type_id_store_name for f in fields):
+                raise RuntimeError(
+                    f"{cls} contains a '{type_id_store_name}' field"
+                    ' which clashes with the type-id-storage-name of'
+                    ' the IOMultiType it inherits from.'
+                )
+        else:
+            type_id_store_name = None
+
+        def _decode_dataclass(values: Any, fieldpath: str) -> Any:
+            if not isinstance(values, dict):
+                raise TypeError(
+                    f'Expected a dict for {fieldpath} on {cls.__name__};'
+                    f' got a {type(values)}.'
+                )
+
+            # Go through all data in the input, converting it to either
+            # dataclass args or extra data.
+            args: dict[str, Any] = {}
+            extra_attrs: dict[str | int, Any] = {}
+            for rawkey, value in values.items():
+                # Ignore _dciotype or whatnot.
+                if type_id_store_name is not None and (
+                    rawkey == type_id_store_name
+                ):
+                    continue
+
+                fieldspec = fieldspecs.get(rawkey)
+                if fieldspec is None:
+                    key = storage_names_to_attr_names.get(rawkey)
+                    self._process_unknown_attr(
+                        cls,
+                        fieldpath,
+                        rawkey if key is None else key,
+                        value,
+                        extra_attrs,
+                    )
+                    continue
+                fieldname, decode = fieldspec
+                args[fieldname] = decode(
+                    value,
+                    f'{fieldpath}.{fieldname}' if fieldpath else fieldname,
+                )
+
+            # Inject soft-default values for any fields not present.
+            for fieldname, anntype, ioattrs in soft_default_fields:
+                if fieldname not in args:
+                    args[fieldname] = self._get_soft_default(
+                        fieldname, anntype, ioattrs, fieldpath
+                    )
+
+            try:
+                out = cls(**args)
+            except Exception as exc:
+                raise ValueError(
+                    f'Error instantiating class {cls.__name__}'
+                    f' at {fieldpath}: {exc}'
+                ) from exc
+            if extra_attrs:
+                setattr(out, EXTRA_ATTRS_ATTR, extra_attrs)
+            return out
+
+        return _decode_dataclass
+
+    def _compile_value_decoder(
+        self, cls: type, anntype: Any, ioattrs: IOAttrs | None
+    ) -> Callable[[Any, str], Any]:
+        """Build a function to convert input values for a field type.
+
+        Common types get specialized functions; anything else falls
+        back to the general-purpose _value_from_input().
+        """
+        # pylint: disable=too-many-return-statements
+        origin = _get_origin(anntype)
+
+        if origin is typing.Union or origin is types.UnionType:
+            # Currently, the only unions we support are None/Value
+            # (translated from Optional), which we verified on prep.
+            childanntypes_l = [
+                c for c in typing.get_args(anntype) if c is not type(None)
+            ]  # noqa (pycodestyle complains about *is* with type)
+            assert len(childanntypes_l) == 1
+            decode_child = self._compile_value_decoder(
+                cls, childanntypes_l[0], ioattrs
+            )
+
+            def _decode_optional(value: Any, fieldpath: str) -> Any:
+                if value is None:
+                    return None
+                return decode_child(value, fieldpath)
+
+            return _decode_optional
+
+        if origin is not typing.Any and origin in SIMPLE_TYPES:
+            coerce_int = self._coerce_to_float and origin is float
+
+            def _decode_simple(value: Any, fieldpath: str) -> Any:
+                if type(value) is not origin:
+                    if coerce_int and type(value) is int:
+                        return float(value)
+                    _raise_type_error(fieldpath, type(value), (origin,))
+                return value
+
+            return _decode_simple
+
+        if origin is list or origin is set:
+            childanntypes = typing.get_args(anntype)
+            if (
+                len(childanntypes) == 1
+                and childanntypes[0] is not typing.Any
+                and not (
+                    isinstance(childanntypes[0], type)
+                    and issubclass(childanntypes[0], IOMultiType)
+                )
+            ):
+                return self._compile_sequence_decoder(
+                    cls, childanntypes[0], origin, ioattrs
+                )
+
+        if origin is dict:
+            childtypes = typing.get_args(anntype)
+            if len(childtypes) == 2 and childtypes[0] is str:
+                return self._compile_str_dict_decoder(
+                    cls, childtypes[1], ioattrs
+                )
+
+        if dataclasses.is_dataclass(origin) and not issubclass(
+            cast(type, origin), IOExtendedData
+        ):
+            # Resolve lazily; types can contain themselves.
+            dcls = cast(type, origin)
+            resolved: list[Callable[[Any, str], Any]] = []
+
+            def _decode_nested_dataclass(value: Any, fieldpath: str) -> Any:
+                if not resolved:
+                    resolved.append(self._get_dataclass_decoder(dcls))
+                return resolved[0](value, fieldpath)
+
+            return _decode_nested_dataclass
+
+        if (
+            isinstance(origin, type)
+            and issubclass(origin, Enum)
+            and not issubclass(origin, IOMultiType)
+        ):
+
+            def _decode_enum(value: Any, fieldpath: str) -> Any:
+                try:
+                    return origin(value)
+                except ValueError:
+                    # Let the general path deal with fallbacks/errors.
+                    return self._value_from_input(
+                        cls, fieldpath, anntype, value, ioattrs
+                    )
+
+            return _decode_enum
+
+        # Everything else goes through the general-purpose path.
+        def _decode_other(value: Any, fieldpath: str) -> Any:
+            return self._value_from_input(
+                cls, fieldpath, anntype, value, ioattrs
+            )
+
+        return _decode_other
+
+    def _compile_sequence_decoder(
+        self,
+        cls: type,
+        childanntype: Any,
+        seqtype: type,
+        ioattrs: IOAttrs | None,
+    ) -> Callable[[Any, str], Any]:
+        decode_child = self._compile_value_decoder(cls, childanntype, ioattrs)
+
+        def _decode_sequence(value: Any, fieldpath: str) -> Any:
+            # Because we are json-centric, we expect a list for all
+            # sequences.
+            if type(value) is not list:
+                raise TypeError(
+                    f'Invalid input value for "{fieldpath}";'
+                    f' expected a list, got a {type(value).__name__}'
+                )
+            if seqtype is list:
+                return [decode_child(x, fieldpath) for x in value]
+            return seqtype(decode_child(x, fieldpath) for x in value)
+
+        return _decode_sequence
+
+    def _compile_str_dict_decoder(
+        self, cls: type, valanntype: Any, ioattrs: IOAttrs | None
+    ) -> Callable[[Any, str], Any]:
+        decode_child = self._compile_value_decoder(cls, valanntype, ioattrs)
+
+        def _decode_str_dict(value: Any, fieldpath: str) -> Any:
+            if not isinstance(value, dict):
+                raise TypeError(
+                    f'Expected a dict for \'{fieldpath}\' on {cls.__name__};'
+                    f' got a {type(value)}.'
+                )
+            out: dict = {}
+            for key, val in value.items():
+                if not isinstance(key, str):
+                    raise TypeError(
+                        f'Got invalid key type {type(key)} for'
+                        f' dict key at \'{fieldpath}\' on {cls.__name__};'
+                        f' expected a str.'
+                    )
+                out[key] = decode_child(val, fieldpath)
+            return out
+
+        return _decode_str_dict
+
+    def _process_unknown_attr(
+        self,
+        cls: type,
+        fieldpath: str,
+        key: str | int,
+        value: Any,
+        extra_attrs: dict[str | int, Any],
+    ) -> None:
+        """Store unknown attrs off to the side (or error if desired)."""
+        # pylint: disable=too-many-positional-arguments
+        if not self._allow_unknown_attrs:
+            raise AttributeError(f"'{cls.__name__}' has no '{key}' field.")
+        if self._discard_unknown_attrs:
+            return
+
+        # Treat this like 'Any' data; ensure that it is valid raw json.
+        if not _is_valid_for_codec(value, self._codec):
+            raise TypeError(
+                f'Unknown attr \'{key}\''
+                f' on {fieldpath} contains data type(s)'
+                f' not supported by the specified codec'
+                f' ({self._codec.name}).'
+            )
+        extra_attrs[key] = value
+
+    def _get_soft_default(
+        self, key: str, anntype: Any, ioattrs: IOAttrs, fieldpath: str
+    ) -> Any:
+        if ioattrs.soft_default is not ioattrs.MISSING:
+            soft_default = ioattrs.soft_default
+        else:
+            assert callable(ioattrs.soft_default_factory)
+            soft_default = ioattrs.soft_default_factory()
+
+        # Make sure these values are valid since we didn't run them
+        # through our normal input type checking.
+        self._type_check_soft_default(
+            value=soft_default,
+            anntype=anntype,
+            fieldpath=(f'{fieldpath}.{key}' if fieldpath else key),
+        )
+        return soft_default
+
     def _do_dataclass_from_input(
         self, cls: type, fieldpath: str, values: dict
     ) -> Any:
-        # pylint: disable=too-many-branches
+        """Instantiate a dataclass without using compiled decoders.
+
+        This is the original general-purpose implementation; it is
+        much slower but is kept around as a reference for testing and
+        benchmarking compiled decoders.
+        """
         if not isinstance(values, dict):
             raise TypeError(
                 f'Expected a dict for {fieldpath} on {cls.__name__};'
@@ -370,7 +729,7 @@ class _Inputter:
         )
         assert prep is not None
 
-        extra_attrs = {}
+        extra_attrs: dict[str | int, Any] = {}
 
         fields = dataclasses.fields(cls)
         fields_by_name = {f.name: f for f in fields}
@@ -411,36 +770,25 @@ class _Inputter:
             if type_id_store_name is not None and rawkey == type_id_store_name:
                 continue
 
-            key = prep.storage_names_to_attr_names.get(rawkey, rawkey)
-            field = fields_by_name.get(key)
+            key: str | int
+            if type(rawkey) is int and self._codec is Codec.BINARY:
+                key = prep.tags_to_attr_names.get(rawkey, rawkey)
+            else:
+                key = prep.storage_names_to_attr_names.get(rawkey, rawkey)
+            field = fields_by_name.get(key) if isinstance(key, str) else None
 
             # Store unknown attrs off to the side (or error if desired).
             if field is None:
-                if self._allow_unknown_attrs:
-                    if self._discard_unknown_attrs:
-                        continue
-
-                    # Treat this like 'Any' data; ensure that it is
-                    # valid raw json.
-                    if not _is_valid_for_codec(value, self._codec):
-                        raise TypeError(
-                            f'Unknown attr \'{key}\''
-                            f' on {fieldpath} contains data type(s)'
-                            f' not supported by the specified codec'
-                            f' ({self._codec.name}).'
-                        )
-                    extra_attrs[key] = value
-                else:
-                    raise AttributeError(
-                        f"'{cls.__name__}' has no '{key}' field."
-                    )
+                self._process_unknown_attr(
+                    cls, fieldpath, key, value, extra_attrs
+                )
             else:
                 fieldname = field.name
                 anntype, ioattrs = parsed_field_annotations[fieldname]
                 subfieldpath = (
                     f'{fieldpath}.{fieldname}' if fieldpath else fieldname
                 )
-                args[key] = self._value_from_input(
+                args[fieldname] = self._value_from_input(
                     cls, subfieldpath, anntype, value, ioattrs
                 )
 
@@ -455,20 +803,8 @@ class _Inputter:
                 ioattrs.soft_default is not ioattrs.MISSING
                 or ioattrs.soft_default_factory is not ioattrs.MISSING
             ):
-                if ioattrs.soft_default is not ioattrs.MISSING:
-                    soft_default = ioattrs.soft_default
-                else:
-                    assert callable(ioattrs.soft_default_factory)
-                    soft_default = ioattrs.soft_default_factory()
-                args[key] = soft_default
-
-                # Make sure these values are valid since we didn't run
-                # them through our normal input type checking.
-
-                self._type_check_soft_default(
-                    value=soft_default,
-                    anntype=aparsed[0],
-                    fieldpath=(f'{fieldpath}.{key}' if fieldpath else key),
+                args[key] = self._get_soft_default(
+                    key, aparsed[0], ioattrs, fieldpath
                 )
 
         try:
@@ -756,6 +1092,19 @@ class _Inputter:
             check_utc(value)
             return value
 
+        # For binary we expect an int microsecond count.
+        if self._codec is Codec.BINARY:
+            if type(value) is not int:
+                raise TypeError(
+                    f'Invalid input value for "{fieldpath}" on'
+                    f' "{cls.__name__}";'
+                    f' expected an int, got a {type(value).__name__}'
+                )
+            out = _BINARY_EPOCH + value * _BINARY_TIME_UNIT
+            if ioattrs is not None:
+                ioattrs.validate_datetime(out, fieldpath)
+            return out
+
         assert self._codec is Codec.JSON
 
         # We expect a list of 7 ints (exact datetime value dump),
@@ -799,6 +1148,16 @@ class _Inputter:
     ) -> Any:
         del ioattrs  # Unused.
 
+        # For binary we expect an int microsecond count.
+        if self._codec is Codec.BINARY:
+            if type(value) is not int:
+                raise TypeError(
+                    f'Invalid input value for "{fieldpath}" on'
+                    f' "{cls.__name__}";'
+                    f' expected an int, got a {type(value).__name__}'
+                )
+            return value * _BINARY_TIME_UNIT
+
         # We expect a list of 3 ints (exact timedelta value dump) OR a
         # float/int (seconds).
         valt = type(value)
@@ -1,5 +1,6 @@
 # Released under the MIT License. See LICENSE for details.
 #
+# pylint: disable=too-many-lines
 """Functionality for dataclassio related to exporting data from dataclasses."""
 
 # Note: We do lots of comparing of exact types here which is normally
@@ -24,14 +25,18 @@ from efro.dataclassio._base import (
     LOSSY_ATTR,
     _is_valid_for_codec,
     _get_origin,
+    _BINARY_EPOCH,
+    _BINARY_TIME_UNIT,
     SIMPLE_TYPES,
     _raise_type_error,
     IOExtendedData,
     IOMultiType,
 )
-from efro.dataclassio._prep import PrepSession
+from efro.dataclassio._prep import PrepSession, CODECS_ATTR
 
 if TYPE_CHECKING:
+    from typing import Callable
+
     from efro.dataclassio._base import IOAttrs
 
 
@@ -46,13 +51,24 @@ class _Outputter:
         codec: Codec,
         coerce_to_float: bool,
         discard_extra_attrs: bool,
+        compiled: bool = True,
     ) -> None:
         self._obj = obj
+        self._compiled = compiled
         self._create = create
         self._codec = codec
         self._coerce_to_float = coerce_to_float
         self._discard_extra_attrs = discard_extra_attrs
 
+        # Key we use to look up compiled encoders for these options.
+        self._codec_key = (
+            'out',
+            codec,
+            create,
+            coerce_to_float,
+            discard_extra_attrs,
+        )
+
     def run(self) -> Any:
         """Do the thing."""
 
@@ -91,13 +107,384 @@ class _Outputter:
         )
 
     def _process_dataclass(self, cls: type, obj: Any, fieldpath: str) -> Any:
+        if self._compiled:
+            return self._get_dataclass_encoder(type(obj))(obj, fieldpath)
+        return self._process_dataclass_interpreted(cls, obj, fieldpath)
+
+    def _get_dataclass_encoder(self, cls: type) -> Callable[[Any, str], Any]:
+        """Return a compiled encoder for a dataclass type.
+
+        Encoders are built the first time a type is encountered with a
+        particular set of options and are then cached on the type.
+        """
+        codecs: dict[tuple, Callable[[Any, str], Any]] | None = (
+            cls.__dict__.get(CODECS_ATTR)
+        )
+        if codecs is not None:
+            encoder = codecs.get(self._codec_key)
+            if encoder is not None:
+                return encoder
+        else:
+            codecs = {}
+            setattr(cls, CODECS_ATTR, codecs)
+
+        # Compile using a fresh outputter so we don't keep our own
+        # object alive through closures.
+        # pylint: disable=protected-access
+        encoder = _Outputter(
+            None,
+            create=self._create,
+            codec=self._codec,
+            coerce_to_float=self._coerce_to_float,
+            discard_extra_attrs=self._discard_extra_attrs,
+        )._compile_dataclass_encoder(cls)
+        codecs[self._codec_key] = encoder
+        return encoder
+
+    def _compile_dataclass_encoder(
+        self, cls: type
+    ) -> Callable[[Any, str], Any]:
+        """Build a function to validate/export a dataclass of a type.
+
+        This does all per-type work (prep lookups, annotation parsing,
+        storage-name resolution, etc.) up front so the resulting
+        function only has to deal with values.
+        """
+        prep = PrepSession(explicit=False).prep_dataclass(
+            cls, recursion_level=0
+        )
+        assert prep is not None
+
+        fieldspecs: list[
+            tuple[
+                str,
+                str | int,
+                Callable[[Any], bool] | None,
+                Callable[[Any, str], Any],
+            ]
+        ] = []
+        for field in dataclasses.fields(cls):
+            fieldname = field.name
+            anntype, ioattrs = parse_annotated(prep.annotations[fieldname])
+            fieldspecs.append(
+                (
+                    fieldname,
+                    self._storage_key(fieldname, ioattrs),
+                    self._compile_default_check(cls, field, ioattrs),
+                    self._compile_value_encoder(cls, anntype, ioattrs),
+                )
+            )
+
+        create = self._create
+        include_extra_attrs = not self._discard_extra_attrs
+        is_multitype = issubclass(cls, IOMultiType)
+
+        def _encode_dataclass(obj: Any, fieldpath: str) -> Any:
+            out: dict[str | int, Any] | None = {} if create else None
+            for fieldname, storagename, is_default, encode in fieldspecs:
+                value = getattr(obj, fieldname)
+                if is_default is not None and is_default(value):
+                    continue
+                outvalue = encode(
+                    value,
+                    f'{fieldpath}.{fieldname}' if fieldpath else fieldname,
+                )
+                if out is not None:
+                    out[storagename] = outvalue
+
+            if include_extra_attrs:
+                extra_attrs = getattr(obj, EXTRA_ATTRS_ATTR, None)
+                if extra_attrs is not None:
+                    self._process_extra_attrs(extra_attrs, fieldpath, out)
+
+            if is_multitype:
+                self._process_multitype_id(obj, out)
+
+            return out
+
+        return _encode_dataclass
+
+    def _storage_key(
+        self, fieldname: str, ioattrs: IOAttrs | None
+    ) -> str | int:
+        """Return the key a field is stored under in our codec."""
+        if self._codec is Codec.HUMAN:
+            return fieldname.replace('_', ' ')
+        if ioattrs is None:
+            return fieldname
+        if self._codec is Codec.BINARY and ioattrs.tag is not None:
+            return ioattrs.tag
+        if ioattrs.storagename is not None:
+            return ioattrs.storagename
+        return fieldname
+
+    def _compile_default_check(
+        self, cls: type, field: dataclasses.Field, ioattrs: IOAttrs | None
+    ) -> Callable[[Any], bool] | None:
+        """Build a check for whether a value can be omitted from output.
+
+        Returns None if the field always gets stored.
+        """
+        if ioattrs is None or ioattrs.store_default:
+            return None
+
+        # If both soft_defaults and regular field defaults are present
+        # we want to go with soft_defaults since those same values would
+        # be re-injected when reading the same data back in if we've
+        # omitted the field.
+        default_factory: Any = field.default_factory
+        if ioattrs.soft_default is not ioattrs.MISSING:
+            soft_default = ioattrs.soft_default
+            return lambda value: bool(soft_default == value)
+        if ioattrs.soft_default_factory is not ioattrs.MISSING:
+            soft_default_factory = ioattrs.soft_default_factory
+            assert callable(soft_default_factory)
+            return lambda value: bool(soft_default_factory() == value)
+        if field.default is not dataclasses.MISSING:
+            default = field.default
+            return lambda value: bool(default == value)
+        if default_factory is not dataclasses.MISSING:
+            return lambda value: bool(default_factory() == value)
+        raise RuntimeError(
+            f'Field {field.name} of {cls.__name__} has'
+            f' no source of default values; store_default=False'
+            f' cannot be set for it. (AND THIS SHOULD HAVE BEEN'
+            f' CAUGHT IN PREP!)'
+        )
+
+    def _compile_value_encoder(
+        self, cls: type, anntype: Any, ioattrs: IOAttrs | None
+    ) -> Callable[[Any, str], Any]:
+        """Build a function to validate/export values of a field type.
+
+        Common types get specialized functions; anything else falls
+        back to the general-purpose _process_value().
+        """
+        # pylint: disable=too-many-return-statements
+        origin = _get_origin(anntype)
+        create = self._create
+
+        if origin is typing.Union or origin is types.UnionType:
+            # Currently, the only unions we support are None/Value
+            # (translated from Optional), which we verified on prep.
+            childanntypes_l = [
+                c for c in typing.get_args(anntype) if c is not type(None)
+            ]  # noqa (pycodestyle complains about *is* with type)
+            assert len(childanntypes_l) == 1
+            encode_child = self._compile_value_encoder(
+                cls, childanntypes_l[0], ioattrs
+            )
+
+            def _encode_optional(value: Any, fieldpath: str) -> Any:
+                if value is None:
+                    return None
+                return encode_child(value, fieldpath)
+
+            return _encode_optional
+
+        if origin is not typing.Any and origin in SIMPLE_TYPES:
+            coerce_int = self._coerce_to_float and origin is float
+
+            def _encode_simple(value: Any, fieldpath: str) -> Any:
+                if type(value) is not origin:
+                    if coerce_int and type(value) is int:
+                        return float(value) if create else None
+                    _raise_type_error(fieldpath, type(value), (origin,))
+                return value if create else None
+
+            return _encode_simple
+
+        if origin is list:
+            childanntypes = typing.get_args(anntype)
+            if (
+                len(childanntypes) == 1
+                and childanntypes[0] is not typing.Any
+                and not (
+                    isinstance(childanntypes[0], type)
+                    and issubclass(childanntypes[0], IOMultiType)
+                )
+            ):
+                return self._compile_list_encoder(
+                    cls, childanntypes[0], ioattrs
+                )
+
+        if origin is dict:
+            childtypes = typing.get_args(anntype)
+            if len(childtypes) == 2 and childtypes[0] is str:
+                return self._compile_str_dict_encoder(
+                    cls, childtypes[1], ioattrs
+                )
+
+        if dataclasses.is_dataclass(origin):
+            return self._compile_nested_dataclass_encoder(cls, origin)
+
+        if (
+            isinstance(origin, type)
+            and issubclass(origin, Enum)
+            and not issubclass(origin, IOMultiType)
+        ):
+            human = self._codec is Codec.HUMAN
+
+            def _encode_enum(value: Any, fieldpath: str) -> Any:
+                if not isinstance(value, origin):
+                    raise TypeError(
+                        f'Expected a {origin} for {fieldpath};'
+                        f' found a {type(value)}.'
+                    )
+                # At prep-time we verified that these enums had valid
+                # value types, so we can blindly return it here.
+                if not create:
+                    return None
+                if human:
+                    return value.name.lower().replace('_', ' ')
+                return value.value
+
+            return _encode_enum
+
+        # Everything else goes through the general-purpose path.
+        def _encode_other(value: Any, fieldpath: str) -> Any:
+            return self._process_value(cls, fieldpath, anntype, value, ioattrs)
+
+        return _encode_other
+
+    def _compile_list_encoder(
+        self, cls: type, childanntype: Any, ioattrs: IOAttrs | None
+    ) -> Callable[[Any, str], Any]:
+        encode_child = self._compile_value_encoder(cls, childanntype, ioattrs)
+        create = self._create
+
+        def _encode_list(value: Any, fieldpath: str) -> Any:
+            if not isinstance(value, list):
+                raise TypeError(
+                    f'Expected a list for {fieldpath};'
+                    f' found a {type(value)}'
+                )
+            if create:
+                return [encode_child(x, fieldpath) for x in value]
+            for x in value:
+                encode_child(x, fieldpath)
+            return None
+
+        return _encode_list
+
+    def _compile_str_dict_encoder(
+        self, cls: type, valanntype: Any, ioattrs: IOAttrs | None
+    ) -> Callable[[Any, str], Any]:
+        encode_child = self._compile_value_encoder(cls, valanntype, ioattrs)
+        create = self._create
+
+        def _encode_str_dict(value: Any, fieldpath: str) -> Any:
+            if not isinstance(value, dict):
+                raise TypeError(
+                    f'Expected a dict for {fieldpath};'
+                    f' found a {type(value)}.'
+                )
+            out: dict | None = {} if create else None
+            for key, val in value.items():
+                if not isinstance(key, str):
+                    raise TypeError(
+                        f'Got invalid key type {type(key)} for'
+                        f' dict key at \'{fieldpath}\' on {cls.__name__};'
+                        f' expected {str}.'
+                    )
+                outval = encode_child(val, fieldpath)
+                if out is not None:
+                    out[key] = outval
+            return out
+
+        return _encode_str_dict
+
+    def _compile_nested_dataclass_encoder(
+        self, cls: type, origin: Any
+    ) -> Callable[[Any, str], Any]:
+        del cls  # Unused.
+
+        # We resolve the encoder for the exact annotated type lazily
+        # (types can contain themselves). Subclass instances get looked
+        # up per-object since output is based on each object's own type.
+        resolved: list[Callable[[Any, str], Any]] = []
+
+        def _encode_nested_dataclass(value: Any, fieldpath: str) -> Any:
+            if type(value) is origin:
+                if not resolved:
+                    resolved.append(self._get_dataclass_encoder(origin))
+                return resolved[0](value, fieldpath)
+            if not isinstance(value, origin):
+                raise TypeError(
+                    f'Expected a {origin} for {fieldpath};'
+                    f' found a {type(value)}.'
+                )
+            return self._get_dataclass_encoder(type(value))(value, fieldpath)
+
+        return _encode_nested_dataclass
+
+    def _process_extra_attrs(
+        self,
+        extra_attrs: Any,
+        fieldpath: str,
+        out: dict[str | int, Any] | None,
+    ) -> None:
+        if isinstance(extra_attrs, dict):
+            if not _is_valid_for_codec(extra_attrs, self._codec):
+                raise TypeError(
+                    f'Extra attrs on \'{fieldpath}\' contains data type(s)'
+                    f' not supported by \'{self._codec.value}\' codec:'
+                    f' {extra_attrs}.'
+                )
+            if out is not None:
+                out.update(extra_attrs)
+
+    def _process_multitype_id(
+        self, obj: IOMultiType, out: dict[str | int, Any] | None
+    ) -> None:
+        type_id = obj.get_type_id()
+
+        # Sanity checks; make sure looking up this id gets us this
+        # type.
+        assert isinstance(type_id.value, str)
+        if obj.get_type_cached(type_id) is not type(obj):
+            raise RuntimeError(
+                f'dataclassio: object of type {type(obj)}'
+                f' gives type-id {type_id} but that id gives type'
+                f' {obj.get_type_cached(type_id)}.'
+                f' Something is out of sync.'
+            )
+        if out is not None:
+            storagename = obj.get_type_id_storage_name()
+            if any(
+                f.name == storagename
+                for f in dataclasses.fields(cast(Any, obj))
+            ):
+                raise RuntimeError(
+                    f'dataclassio: {type(obj)} contains a'
+                    f" '{storagename}' field which clashes with"
+                    f' the type-id-storage-name of the IOMulticlass'
+                    f' it inherits from.'
+                )
+            if self._codec is Codec.HUMAN:
+                storagename = storagename.replace('_', ' ')
+            out[storagename] = (
+                type_id.name.lower().replace('_', ' ')
+                if self._codec is Codec.HUMAN
+                else type_id.value
+            )
+
+    def _process_dataclass_interpreted(
+        self, cls: type, obj: Any, fieldpath: str
+    ) -> Any:
+        """Validate/export a dataclass without using compiled encoders.
+
+        This is the original general-purpose implementation; it is
+        much slower but is kept around as a reference for testing and
+        benchmarking compiled encoders.
+        """
         # pylint: disable=too-many-branches
         prep = PrepSession(explicit=False).prep_dataclass(
             type(obj), recursion_level=0
         )
         assert prep is not None
         fields = dataclasses.fields(obj)
-        out: dict[str, Any] | None = {} if self._create else None
+        out: dict[str | int, Any] | None = {} if self._create else None
         for field in fields:
             fieldname = field.name
             if fieldpath:
@@ -143,59 +530,16 @@ class _Outputter:
             )
             if self._create:
                 assert out is not None
-                if self._codec is Codec.HUMAN:
-                    storagename = fieldname.replace('_', ' ')
-                elif ioattrs is None or ioattrs.storagename is None:
-                    storagename = fieldname
-                else:
-                    storagename = ioattrs.storagename
-                out[storagename] = outvalue
+                out[self._storage_key(fieldname, ioattrs)] = outvalue
 
         # If there's extra-attrs stored on us, check/include them.
         if not self._discard_extra_attrs:
             extra_attrs = getattr(obj, EXTRA_ATTRS_ATTR, None)
-            if isinstance(extra_attrs, dict):
-                if not _is_valid_for_codec(extra_attrs, self._codec):
-                    raise TypeError(
-                        f'Extra attrs on \'{fieldpath}\' contains data type(s)'
-                        f' not supported by \'{self._codec.value}\' codec:'
-                        f' {extra_attrs}.'
-                    )
-                if self._create:
-                    assert out is not None
-                    out.update(extra_attrs)
+            self._process_extra_attrs(extra_attrs, fieldpath, out)
 
         # If this obj inherits from multi-type, store its type id.
         if isinstance(obj, IOMultiType):
-            type_id = obj.get_type_id()
-
-            # Sanity checks; make sure looking up this id gets us this
-            # type.
-            assert isinstance(type_id.value, str)
-            if obj.get_type_cached(type_id) is not type(obj):
-                raise RuntimeError(
-                    f'dataclassio: object of type {type(obj)}'
-                    f' gives type-id {type_id} but that id gives type'
-                    f' {obj.get_type_cached(type_id)}.'
-                    f' Something is out of sync.'
-                )
-            if self._create:
-                assert out is not None
-                storagename = obj.get_type_id_storage_name()
-                if any(f.name == storagename for f in fields):
-                    raise RuntimeError(
-                        f'dataclassio: {type(obj)} contains a'
-                        f" '{storagename}' field which clashes with"
-                        f' the type-id-storage-name of the IOMulticlass'
-                        f' it inherits from.'
-                    )
-                if self._codec is Codec.HUMAN:
-                    storagename = storagename.replace('_', ' ')
-                out[storagename] = (
-                    type_id.name.lower().replace('_', ' ')
-                    if self._codec is Codec.HUMAN
-                    else type_id.value
-                )
+            self._process_multitype_id(obj, out)
 
         return out
 
@@ -382,7 +726,7 @@ class _Outputter:
                 # good reason to avoid set[Any] though. Perhaps we
                 # should just disallow it altogether.
                 return (
-                    sorted(value, key=lambda v: json.dumps(v, sort_keys=True))
+                    sorted(value, key=self._set_sort_key)
                     if self._create
                     else None
                 )
@@ -414,8 +758,8 @@ class _Outputter:
                     key=(
                         None
                         if childanntypes[0]
-                        in [str, int, float, bool, datetime.datetime]
-                        else lambda v: json.dumps(v, sort_keys=True)
+                        in [str, int, float, bool, bytes, datetime.datetime]
+                        else self._set_sort_key
                     ),
                 )
 
@@ -484,6 +828,12 @@ class _Outputter:
                 time_format = 'ints'
             if self._codec is Codec.FIRESTORE:
                 return value
+            if self._codec is Codec.BINARY:
+                return (
+                    (value - _BINARY_EPOCH) // _BINARY_TIME_UNIT
+                    if self._create
+                    else None
+                )
             if self._codec is Codec.HUMAN:
                 return (
                     value.isoformat().replace('+00:00', 'Z')
@@ -525,6 +875,8 @@ class _Outputter:
             else:
                 time_format = 'ints'
 
+            if self._codec is Codec.BINARY:
+                return value // _BINARY_TIME_UNIT if self._create else None
             if time_format == 'float':
                 return value.total_seconds() if self._create else None
             if self._codec is Codec.HUMAN:
@@ -570,14 +922,27 @@ class _Outputter:
         if not self._create:
             return None
 
-        # In JSON/HUMAN we convert to base64, but firestore directly
-        # supports bytes.
+        # In JSON/HUMAN we convert to base64, but firestore and binary
+        # directly support bytes.
         if self._codec in (Codec.JSON, Codec.HUMAN):
             return base64.b64encode(value).decode()
 
-        assert self._codec is Codec.FIRESTORE
+        assert self._codec is Codec.FIRESTORE or self._codec is Codec.BINARY
         return value
 
+    def _set_sort_key(self, value: Any) -> Any:
+        """Sort key for set values with no natural ordering.
+
+        We dump each value to a string (itself with keys sorted) and
+        sort on that. Binary values may contain things json can't
+        represent, so they sort on their binary encoding instead.
+        """
+        if self._codec is Codec.BINARY:
+            from efro.dataclassio._binary import encode_binary
+
+            return encode_binary(value)
+        return json.dumps(value, sort_keys=True)
+
     def _process_dict(
         self,
         cls: type,
@@ -42,6 +42,12 @@ PREP_ATTR = '_DCIOPREP'
 # (necessary to support recursive types).
 PREP_SESSION_ATTR = '_DCIOPREPSESSION'
 
+# Attr name for compiled encoders/decoders we cache on prepped dataclass
+# types (keyed by codec options). Note that we always access this
+# through the type's own __dict__ so subclasses don't pick up their
+# parents' codecs.
+CODECS_ATTR = '_DCIOCODECS'
+
 
 def ioprep(cls: type, globalns: dict | None = None) -> None:
     """Prep a dataclass type for use with this module's functionality.
@@ -118,6 +124,9 @@ class PrepData:
     # Map of storage names to attr names.
     storage_names_to_attr_names: dict[str, str]
 
+    # Map of binary-codec tags to attr names.
+    tags_to_attr_names: dict[int, str]
+
 
 class PrepSession:
     """Context for a prep."""
@@ -202,6 +211,7 @@ class PrepSession:
 
         all_storage_names: set[str] = set()
         storage_names_to_attr_names: dict[str, str] = {}
+        tags_to_attr_names: dict[int, str] = {}
 
         # Ok; we've resolved actual types for this dataclass. now
         # recurse through them, verifying that we support all contained
@@ -218,6 +228,13 @@ class PrepSession:
                     storage_names_to_attr_names[ioattrs.storagename] = attrname
                 else:
                     storagename = attrname
+                if ioattrs.tag is not None:
+                    if ioattrs.tag in tags_to_attr_names:
+                        raise TypeError(
+                            f'Multiple attrs on {cls} are using'
+                            f' tag {ioattrs.tag}.'
+                        )
+                    tags_to_attr_names[ioattrs.tag] = attrname
             else:
                 storagename = attrname
 
@@ -242,6 +259,7 @@ class PrepSession:
         prepdata = PrepData(
             annotations=resolved_annotations,
             storage_names_to_attr_names=storage_names_to_attr_names,
+            tags_to_attr_names=tags_to_attr_names,
         )
         setattr(cls, PREP_ATTR, prepdata)
 
@@ -1,29 +1,37 @@
 # Released under the MIT License. See LICENSE for details.
 #
+# pylint: disable=too-many-lines
 """Logging functionality."""
 
 from __future__ import annotations
 
+import os
 import sys
+import json
 import time
+import heapq
+import bisect
 import asyncio
 import logging
 import datetime
-import itertools
 from enum import Enum
 from functools import partial
 from collections import deque
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Annotated, override
-from threading import Thread, current_thread, Lock
+from threading import Thread, current_thread, Lock, Event
 
 from efro.util import utc_now, strip_exception_tracebacks
 from efro.terminal import Clr, color_enabled
-from efro.dataclassio import ioprepped, IOAttrs, dataclass_to_json
+from efro.dataclassio import ioprepped, IOAttrs, dataclass_to_dict
 
 if TYPE_CHECKING:
     from pathlib import Path
-    from typing import Any, Callable, TextIO, Literal
+    from typing import Any, Callable, TextIO, Literal, Iterable
+
+# Matches the compact output of dataclass_to_json(); note that
+# ensure_ascii means character counts are byte counts.
+_LOG_FILE_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'))
 
 
 class LogLevel(Enum):
@@ -97,6 +105,21 @@ class LogEntry:
     )
 
 
+# Rough memory footprint of a cached LogEntry aside from the characters
+# in its name and message. Used so cache size accounting doesn't need
+# to measure every entry.
+_LOG_ENTRY_BASE_SIZE = sum(
+    sys.getsizeof(x)
+    for x in (
+        LogEntry(name='', message='', level=LogLevel.INFO, time=utc_now()),
+        '',
+        '',
+        LogLevel.INFO,
+        utc_now(),
+    )
+)
+
+
 @ioprepped
 @dataclass
 class LogArchive:
@@ -112,15 +135,249 @@ class LogArchive:
     entries: Annotated[list[LogEntry], IOAttrs('e')]
 
 
+class LogCache:
+    """An indexed in-memory store of recent log entries.
+
+    Entries are kept in arrival order and pruned from the oldest end
+    based on total size (or explicitly by age). Every entry has a log
+    index which increases by one per entry added and never changes.
+
+    Secondary indexes on logger name and level, plus binary search on
+    time, let query() find matches without walking the whole cache.
+    Time searches use arrival order, so entries that arrive slightly out
+    of time order (from different threads, etc.) at the edge of a
+    'until' range may be missed.
+
+    This class is not thread-safe; LogHandler guards it with a lock.
+    """
+
+    def __init__(self, size_limit: int) -> None:
+        assert size_limit >= 0
+        self._size_limit = size_limit
+        self._size = 0
+
+        # Parallel lists; we advance _head as entries are pruned and
+        # trim the lists only occasionally to keep pruning cheap.
+        self._entries: list[LogEntry] = []
+        self._sizes: list[int] = []
+
+        # Running max of entry timestamps; never decreases so we can
+        # binary search it.
+        self._times: list[float] = []
+        self._head = 0
+
+        # Log index of _entries[0].
+        self._base = 0
+
+        # Log indexes for each level/name in increasing order.
+        self._level_indexes: dict[LogLevel, deque[int]] = {
+            level: deque() for level in LogLevel
+        }
+        self._name_indexes: dict[str, deque[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries) - self._head
+
+    @property
+    def size(self) -> int:
+        """Rough total size of our entries in bytes."""
+        return self._size
+
+    @property
+    def start_index(self) -> int:
+        """Log index of our oldest entry."""
+        return self._base + self._head
+
+    @property
+    def end_index(self) -> int:
+        """Log index our next entry will have.
+
+        This is also the total number of entries ever added.
+        """
+        return self._base + len(self._entries)
+
+    def add(self, entry: LogEntry, size: int) -> None:
+        """Add an entry, pruning old ones to stay within our size limit."""
+        index = self.end_index
+        self._entries.append(entry)
+        self._sizes.append(size)
+        timestamp = entry.time.timestamp()
+        if self._times and self._times[-1] > timestamp:
+            timestamp = self._times[-1]
+        self._times.append(timestamp)
+        self._level_indexes[entry.level].append(index)
+        name_indexes = self._name_indexes.get(entry.name)
+        if name_indexes is None:
+            name_indexes = self._name_indexes[entry.name] = deque()
+        name_indexes.append(index)
+        self._size += size
+
+        while self._size > self._size_limit and len(self) > 0:
+            self._prune_oldest()
+
+    def prune(self, cutoff: datetime.datetime) -> None:
+        """Remove oldest entries with times at or before cutoff."""
+        while len(self) > 0 and self._entries[self._head].time <= cutoff:
+            self._prune_oldest()
+
+    def get_range(self, start: int, end: int) -> list[LogEntry]:
+        """Return entries with log indexes in [start:end].
+
+        Indexes are clamped to what is present in the cache.
+        """
+        start = max(start, self.start_index) - self._base
+        end = min(end, self.end_index) - self._base
+        return self._entries[start:end]
+
+    def query(
+        self,
+        *,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        min_level: LogLevel | None = None,
+        name_prefix: str | None = None,
+        labels: dict[str, str] | None = None,
+        max_entries: int | None = None,
+    ) -> list[LogEntry]:
+        """Return cached entries matching all provided criteria.
+
+        Entries are returned oldest first. If max_entries is passed,
+        only the most recent matches (up to that many) are returned.
+        name_prefix matches a logger and its descendants ('ba' matches
+        'ba' and 'ba.net' but not 'bax'). labels matches entries having
+        all of the provided label values.
+        """
+        if max_entries is not None and max_entries <= 0:
+            return []
+
+        # Narrow to a range of log indexes by time.
+        lo = self._head
+        hi = len(self._entries)
+        if since is not None:
+            lo = bisect.bisect_left(self._times, since.timestamp(), lo, hi)
+        if until is not None:
+            hi = bisect.bisect_right(self._times, until.timestamp(), lo, hi)
+        lo_index = self._base + lo
+        hi_index = self._base + hi
+
+        # Then use whichever of our indexes narrows things down most.
+        sources = self._get_index_sources(min_level, name_prefix)
+
+        # Walk candidates newest first so we can stop early.
+        candidates: Iterable[int]
+        if sources is None:
+            candidates = range(hi_index - 1, lo_index - 1, -1)
+        else:
+            candidates = heapq.merge(
+                *(reversed(indexes) for indexes in sources), reverse=True
+            )
+
+        out: list[LogEntry] = []
+        for index in candidates:
+            if index >= hi_index:
+                continue
+            if index < lo_index:
+                break
+            entry = self._entries[index - self._base]
+            if min_level is not None and entry.level.value < min_level.value:
+                continue
+            if name_prefix is not None and not _logger_name_matches(
+                entry.name, name_prefix
+            ):
+                continue
+            if (since is not None and entry.time < since) or (
+                until is not None and entry.time > until
+            ):
+                continue
+            if labels and any(
+                entry.labels.get(key) != val for key, val in labels.items()
+            ):
+                continue
+            out.append(entry)
+            if max_entries is not None and len(out) >= max_entries:
+                break
+        out.reverse()
+        return out
+
+    def _get_index_sources(
+        self, min_level: LogLevel | None, name_prefix: str | None
+    ) -> list[deque[int]] | None:
+        """Return the smallest set of indexes covering a query.
+
+        Returns None if no index applies.
+        """
+        sources: list[deque[int]] | None = None
+        if min_level is not None and min_level.value > 0:
+            sources = [
+                indexes
+                for level, indexes in self._level_indexes.items()
+                if level.value >= min_level.value
+            ]
+        if name_prefix is not None:
+            name_sources = [
+                indexes
+                for name, indexes in self._name_indexes.items()
+                if _logger_name_matches(name, name_prefix)
+            ]
+            if sources is None or sum(len(i) for i in name_sources) < sum(
+                len(i) for i in sources
+            ):
+                sources = name_sources
+        return sources
+
+    def _prune_oldest(self) -> None:
+        entry = self._entries[self._head]
+        index = self.start_index
+        self._size -= self._sizes[self._head]
+
+        # Our oldest entry is always first in its indexes.
+        level_indexes = self._level_indexes[entry.level]
+        assert level_indexes[0] == index
+        level_indexes.popleft()
+        name_indexes = self._name_indexes[entry.name]
+        assert name_indexes[0] == index
+        name_indexes.popleft()
+        if not name_indexes:
+            del self._name_indexes[entry.name]
+
+        # Trim our lists once the dead space at the front gets big
+        # enough to be worth the copy.
+        self._head += 1
+        if self._head >= 64 and self._head * 4 >= len(self._entries):
+            del self._entries[: self._head]
+            del self._sizes[: self._head]
+            del self._times[: self._head]
+            self._base += self._head
+            self._head = 0
+
+
+def _logger_name_matches(name: str, prefix: str) -> bool:
+    return (
+        not prefix
+        or name == prefix
+        or (name.startswith(prefix) and name[len(prefix)] == '.')
+    )
+
+
 class LogHandler(logging.Handler):
     """Fancy-pants handler for logging output.
 
     Writes logs to disk in structured json format and echoes them
     to stdout/stderr with pretty colors.
+
+    Structured log entries are buffered and written in batches; a batch
+    goes out once file_flush_entries entries are pending or
+    file_flush_interval seconds after its first entry, as well as on
+    flush() and shutdown(). If file_max_size is given, the file is
+    rotated once it grows past that many bytes, keeping up to
+    file_backup_count old files ('.1' being the most recent).
     """
 
     _event_loop: asyncio.AbstractEventLoop
 
+    DEFAULT_FILE_FLUSH_INTERVAL = 0.5
+    DEFAULT_FILE_FLUSH_ENTRIES = 256
+
     # IMPORTANT: Any debug prints we do here should ONLY go to echofile.
     # Otherwise we can get infinite loops as those prints come back to us
     # as new log entries.
@@ -135,10 +392,24 @@ class LogHandler(logging.Handler):
         echofile_timestamp_format: Literal['default', 'relative'] = 'default',
         launch_time: float | None = None,
         strict_threads: bool = False,
+        file_flush_interval: float = DEFAULT_FILE_FLUSH_INTERVAL,
+        file_flush_entries: int = DEFAULT_FILE_FLUSH_ENTRIES,
+        file_max_size: int | None = None,
+        file_backup_count: int = 1,
     ):
         super().__init__()
+        assert file_flush_entries > 0 and file_backup_count >= 0
+        self._path = path
         # pylint: disable=consider-using-with
         self._file = None if path is None else open(path, 'w', encoding='utf-8')
+        self._file_size = 0
+        self._file_pending: list[LogEntry] = []
+        self._file_flush_handle: asyncio.TimerHandle | None = None
+        self._file_flush_interval = file_flush_interval
+        self._file_flush_entries = file_flush_entries
+        self._file_max_size = file_max_size
+        self._file_backup_count = file_backup_count
+        self._did_shutdown = False
         self._echofile = echofile
         self._echofile_timestamp_format = echofile_timestamp_format
         self._callbacks: list[Callable[[LogEntry], None]] = []
@@ -148,12 +419,10 @@ class LogHandler(logging.Handler):
             'stderr': None,
         }
         self._launch_time = time.time() if launch_time is None else launch_time
-        self._cache_size = 0
         assert cache_size_limit >= 0
         self._cache_size_limit = cache_size_limit
         self._cache_time_limit = cache_time_limit
-        self._cache = deque[tuple[int, LogEntry]]()
-        self._cache_index_offset = 0
+        self._cache = LogCache(cache_size_limit)
         self._cache_lock = Lock()
         self._printed_callback_error = False
         self._aux_handler: logging.Handler | None = None
@@ -209,7 +478,9 @@ class LogHandler(logging.Handler):
         # Run all of our cached entries through the new callback if desired.
         if feed_existing_logs and self._cache_size_limit > 0:
             with self._cache_lock:
-                for _id, entry in self._cache:
+                for entry in self._cache.get_range(
+                    self._cache.start_index, self._cache.end_index
+                ):
                     self._run_callback_on_entry(call, entry)
 
     def set_aux_handler(self, handler: logging.Handler | None) -> None:
@@ -259,17 +530,8 @@ class LogHandler(logging.Handler):
         assert self._cache_time_limit is not None
         while bool(True):
             await asyncio.sleep(61.27)
-            now = utc_now()
             with self._cache_lock:
-                # Prune the oldest entry as long as there is a first one
-                # that is too old.
-                while (
-                    self._cache
-                    and (now - self._cache[0][1].time) >= self._cache_time_limit
-                ):
-                    popped = self._cache.popleft()
-                    self._cache_size -= popped[0]
-                    self._cache_index_offset += 1
+                self._cache.prune(utc_now() - self._cache_time_limit)
 
     def get_cached(
         self, start_index: int = 0, max_entries: int | None = None
@@ -287,39 +549,46 @@ class LogHandler(logging.Handler):
         if max_entries is not None:
             assert max_entries >= 0
         with self._cache_lock:
-            # Transform start_index to our present cache space.
-            start_index -= self._cache_index_offset
-            # Calc end-index in our present cache space.
+            cache = self._cache
+            start_index = max(
+                cache.start_index, min(start_index, cache.end_index)
+            )
             end_index = (
-                len(self._cache)
+                cache.end_index
                 if max_entries is None
                 else start_index + max_entries
             )
-
-            # Clamp both indexes to both ends of our present space.
-            start_index = max(0, min(start_index, len(self._cache)))
-            end_index = max(0, min(end_index, len(self._cache)))
-
             return LogArchive(
-                log_size=self._cache_index_offset + len(self._cache),
-                start_index=start_index + self._cache_index_offset,
-                entries=self._cache_slice(start_index, end_index),
+                log_size=cache.end_index,
+                start_index=start_index,
+                entries=cache.get_range(start_index, end_index),
             )
 
-    def _cache_slice(
-        self, start: int, end: int, step: int = 1
+    def query_cached(
+        self,
+        *,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+        min_level: LogLevel | None = None,
+        name_prefix: str | None = None,
+        labels: dict[str, str] | None = None,
+        max_entries: int | None = None,
     ) -> list[LogEntry]:
-        # Deque doesn't natively support slicing but we can do it
-        # manually. It sounds like rotating the deque and pulling from
-        # the beginning is the most efficient way to do this. The
-        # downside is the deque gets temporarily modified in the process
-        # so we need to make sure we're holding the lock.
-        assert self._cache_lock.locked()
-        cache = self._cache
-        cache.rotate(-start)
-        slc = [e[1] for e in itertools.islice(cache, 0, end - start, step)]
-        cache.rotate(start)
-        return slc
+        """Return cached log entries matching all provided criteria.
+
+        See LogCache.query() for details. As with get_cached(), only
+        entries already processed by the background thread are
+        included.
+        """
+        with self._cache_lock:
+            return self._cache.query(
+                since=since,
+                until=until,
+                min_level=min_level,
+                name_prefix=name_prefix,
+                labels=labels,
+                max_entries=max_entries,
+            )
 
     @classmethod
     def _is_immutable_log_data(cls, data: Any) -> bool:
@@ -546,6 +815,8 @@ class LogHandler(logging.Handler):
         # done = False
         self.file_flush('stdout')
         self.file_flush('stderr')
+        self._event_loop.call_soon_threadsafe(self._flush_file)
+        self._did_shutdown = True
 
         # Push a message to our thread to break out of its loop, and
         # then wait for the thread to exit. This will effectively flush
@@ -568,6 +839,29 @@ class LogHandler(logging.Handler):
         #         break
         #     time.sleep(0.01)
 
+    @override
+    def flush(self) -> None:
+        """Write out any buffered structured log entries.
+
+        Blocks (briefly) until entries submitted before this call have
+        been written.
+        """
+        if (
+            self._file is None
+            or self._did_shutdown
+            or current_thread() is self._thread
+        ):
+            return
+
+        done = Event()
+
+        def _flush_in_thread() -> None:
+            self._flush_file()
+            done.set()
+
+        self._event_loop.call_soon_threadsafe(_flush_in_thread)
+        done.wait(timeout=5.0)
+
     def file_flush(self, name: str) -> None:
         """Send raw stdout/stderr flush to the logger to be collated."""
 
@@ -621,36 +915,67 @@ class LogHandler(logging.Handler):
         if self._cache_size_limit > 0:
             with self._cache_lock:
                 # Do a rough calc of how many bytes this entry consumes.
-                entry_size = sum(
-                    sys.getsizeof(x)
-                    for x in (
-                        entry,
-                        entry.name,
-                        entry.message,
-                        entry.level,
-                        entry.time,
-                    )
+                self._cache.add(
+                    entry,
+                    _LOG_ENTRY_BASE_SIZE + len(entry.name) + len(entry.message),
                 )
-                self._cache.append((entry_size, entry))
-                self._cache_size += entry_size
-
-                # Prune old until we are back at or under our limit.
-                while self._cache_size > self._cache_size_limit:
-                    popped = self._cache.popleft()
-                    self._cache_size -= popped[0]
-                    self._cache_index_offset += 1
 
         # Pass to callbacks.
         for call in self._callbacks:
             self._run_callback_on_entry(call, entry)
 
-        # Dump to our structured log file.
-        #
-        # TODO: should set a timer for flushing; don't flush every line.
+        # Queue for our structured log file; we write these in batches.
         if self._file is not None:
-            entry_s = dataclass_to_json(entry)
-            assert '\n' not in entry_s  # Make sure its a single line.
-            print(entry_s, file=self._file, flush=True)
+            self._file_pending.append(entry)
+            if len(self._file_pending) >= self._file_flush_entries:
+                self._flush_file()
+            elif self._file_flush_handle is None:
+                self._file_flush_handle = self._event_loop.call_later(
+                    self._file_flush_interval, self._flush_file
+                )
+
+    def _flush_file(self) -> None:
+        """Write pending entries to our structured log file."""
+        assert current_thread() is self._thread
+        if self._file_flush_handle is not None:
+            self._file_flush_handle.cancel()
+            self._file_flush_handle = None
+        if self._file is None or not self._file_pending:
+            return
+        pending = self._file_pending
+        self._file_pending = []
+        try:
+            # Compact json never contains raw newlines, so each entry
+            # is guaranteed to be a single line.
+            encode = _LOG_FILE_JSON_ENCODER.encode
+            text = ''.join(
+                [encode(dataclass_to_dict(entry)) + '\n' for entry in pending]
+            )
+            self._file.write(text)
+            self._file.flush()
+            self._file_size += len(text)
+            if (
+                self._file_max_size is not None
+                and self._file_size >= self._file_max_size
+            ):
+                self._rotate_file()
+        except Exception:
+            import traceback
+
+            traceback.print_exc(file=self._echofile)
+
+    def _rotate_file(self) -> None:
+        assert self._file is not None and self._path is not None
+        self._file.close()
+        path = str(self._path)
+        for i in range(self._file_backup_count - 1, 0, -1):
+            if os.path.exists(f'{path}.{i}'):
+                os.replace(f'{path}.{i}', f'{path}.{i + 1}')
+        if self._file_backup_count > 0:
+            os.replace(path, f'{path}.1')
+        # pylint: disable=consider-using-with
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file_size = 0
 
     def _run_callback_on_entry(
         self, callback: Callable[[LogEntry], None], entry: LogEntry
@@ -725,11 +1050,15 @@ def setup_logging(
     launch_time: float | None = None,
     strict_threads: bool = False,
     standard_filters: bool = True,
+    log_file_max_size: int | None = None,
+    log_file_backup_count: int = 1,
 ) -> LogHandler:
     """Set up our logging environment.
 
     Returns the custom handler which can be used to fetch information
     about logs that have passed through it. (worst log-levels, caches, etc.).
+    Pass log_file_max_size to rotate the structured log file at log_path
+    once it reaches that many bytes.
     """
 
     lmap = {
@@ -760,6 +1089,8 @@ def setup_logging(
         cache_time_limit=cache_time_limit,
         launch_time=launch_time,
         strict_threads=strict_threads,
+        file_max_size=log_file_max_size,
+        file_backup_count=log_file_backup_count,
     )
 
     if standard_filters:
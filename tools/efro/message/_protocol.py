@@ -15,6 +15,9 @@ from efro.dataclassio import (
     is_ioprepped_dataclass,
     dataclass_to_dict,
     dataclass_from_dict,
+    encode_binary,
+    decode_binary,
+    Codec,
 )
 from efro.message._message import (
     Message,
@@ -36,8 +39,17 @@ class MessageProtocol:
     all message types must retain the same id, message attr storage
     names must not change, newly added attrs must have default values,
     etc.
+
+    Messages are encoded as json strings by default. They can also be
+    encoded as compact binary data (see :attr:`ENCODING_BINARY`) for
+    transports carrying bytes; in that case any IOAttrs tags on message
+    fields must remain stable as well.
     """
 
+    #: Name used to advertise support for binary-encoded messages (for
+    #: instance via efro.rpc.RPCEndpoint's 'message_encodings').
+    ENCODING_BINARY = 'binary'
+
     def __init__(
         self,
         message_types: dict[int, type[Message]],
@@ -189,13 +201,38 @@ class MessageProtocol:
             allow_nan=False,
         )
 
-    def message_to_dict(self, message: Message) -> dict:
+    @staticmethod
+    def encode_dict_binary(obj: dict) -> bytes:
+        """Binary-encode a provided dict.
+
+        The dict should have been created using the BINARY codec.
+        """
+        return encode_binary(obj)
+
+    @staticmethod
+    def is_binary_encoded(data: bytes) -> bool:
+        """Return whether raw message bytes are binary or utf-8 json.
+
+        Encoded messages are always dicts; json ones always start with
+        '{' which can never begin a binary-encoded dict.
+        """
+        return not data.startswith(b'{')
+
+    def message_to_dict(
+        self, message: Message, codec: Codec = Codec.JSON
+    ) -> dict:
         """Encode a message to a json ready dict."""
-        return self._to_dict(message, self.message_ids_by_type, 'message')
+        return self._to_dict(
+            message, self.message_ids_by_type, 'message', codec
+        )
 
-    def response_to_dict(self, response: Response | SysResponse) -> dict:
+    def response_to_dict(
+        self, response: Response | SysResponse, codec: Codec = Codec.JSON
+    ) -> dict:
         """Encode a response to a json ready dict."""
-        return self._to_dict(response, self.response_ids_by_type, 'response')
+        return self._to_dict(
+            response, self.response_ids_by_type, 'response', codec
+        )
 
     def error_to_response(self, exc: Exception) -> tuple[SysResponse, bool]:
         """Translate an Exception to a SysResponse.
@@ -244,7 +281,11 @@ class MessageProtocol:
         )
 
     def _to_dict(
-        self, message: Any, ids_by_type: dict[type, int], opname: str
+        self,
+        message: Any,
+        ids_by_type: dict[type, int],
+        opname: str,
+        codec: Codec,
     ) -> dict:
         """Encode a message to a json string for transport."""
 
@@ -254,7 +295,7 @@ class MessageProtocol:
                 f'{opname} type is not registered in protocol:'
                 f' {type(message)}'
             )
-        out = {'t': m_id, 'm': dataclass_to_dict(message)}
+        out = {'t': m_id, 'm': dataclass_to_dict(message, codec=codec)}
         return out
 
     @staticmethod
@@ -264,22 +305,40 @@ class MessageProtocol:
         assert isinstance(out, dict)
         return out
 
-    def message_from_dict(self, data: dict) -> Message:
+    @staticmethod
+    def decode_dict_binary(data: bytes) -> dict:
+        """Decode binary data to a dict."""
+        out = decode_binary(data)
+        if not isinstance(out, dict):
+            raise ValueError(f'Expected a dict; got a {type(out)}.')
+        return out
+
+    def message_from_dict(
+        self, data: dict, codec: Codec = Codec.JSON
+    ) -> Message:
         """Decode a message from a dict."""
-        out = self._from_dict(data, self.message_types_by_id, 'message')
+        out = self._from_dict(data, self.message_types_by_id, 'message', codec)
         assert isinstance(out, Message)
         return out
 
-    def response_from_dict(self, data: dict) -> Response | SysResponse:
+    def response_from_dict(
+        self, data: dict, codec: Codec = Codec.JSON
+    ) -> Response | SysResponse:
         """Decode a response from a json string."""
-        out = self._from_dict(data, self.response_types_by_id, 'response')
+        out = self._from_dict(
+            data, self.response_types_by_id, 'response', codec
+        )
         assert isinstance(out, Response | SysResponse)
         return out
 
     # Weeeird; we get mypy errors returning dict[int, type] but
     # dict[int, typing.Type] or dict[int, type[Any]] works..
     def _from_dict(
-        self, data: dict, types_by_id: dict[int, type[Any]], opname: str
+        self,
+        data: dict,
+        types_by_id: dict[int, type[Any]],
+        opname: str,
+        codec: Codec,
     ) -> Any:
         """Decode a message from a json string."""
         msgdict: dict | None
@@ -304,7 +363,7 @@ class MessageProtocol:
         # enums/multitype data. Be aware that this flags the object as
         # 'lossy' however which prevents it from being reserialized by
         # default.
-        return dataclass_from_dict(msgtype, msgdict, lossy=True)
+        return dataclass_from_dict(msgtype, msgdict, codec=codec, lossy=True)
 
     def _get_module_header(
         self,
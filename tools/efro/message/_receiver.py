@@ -9,9 +9,10 @@ from __future__ import annotations
 import types
 import inspect
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, overload
 
 from efro.util import strip_exception_tracebacks
+from efro.dataclassio import Codec
 from efro.message._message import (
     Message,
     Response,
@@ -56,6 +57,9 @@ class MessageReceiver:
     Any unhandled Exception occurring during message handling will
     result in an :class:`efro.error.RemoteError` being raised on the
     sending end.
+
+    Raw messages can be passed as either json strs or binary-encoded
+    bytes; responses are returned in the same encoding.
     """
 
     is_async = False
@@ -214,17 +218,25 @@ class MessageReceiver:
                     raise TypeError(msg)
 
     def _decode_incoming_message_base(
-        self, bound_obj: Any, msg: str
+        self, bound_obj: Any, msg: str | bytes
     ) -> tuple[Any, dict, Message]:
         # Decode the incoming message.
-        msg_dict = self.protocol.decode_dict(msg)
-        msg_decoded = self.protocol.message_from_dict(msg_dict)
+        if isinstance(msg, bytes):
+            msg_dict = self.protocol.decode_dict_binary(msg)
+            msg_decoded = self.protocol.message_from_dict(
+                msg_dict, codec=Codec.BINARY
+            )
+        else:
+            msg_dict = self.protocol.decode_dict(msg)
+            msg_decoded = self.protocol.message_from_dict(msg_dict)
         assert isinstance(msg_decoded, Message)
         if self._decode_filter_call is not None:
             self._decode_filter_call(bound_obj, msg_dict, msg_decoded)
         return bound_obj, msg_dict, msg_decoded
 
-    def _decode_incoming_message(self, bound_obj: Any, msg: str) -> Message:
+    def _decode_incoming_message(
+        self, bound_obj: Any, msg: str | bytes
+    ) -> Message:
         bound_obj, _msg_dict, msg_decoded = self._decode_incoming_message_base(
             bound_obj=bound_obj, msg=msg
         )
@@ -234,7 +246,25 @@ class MessageReceiver:
         self, bound_obj: Any, message: Message, response: Response | None
     ) -> str:
         """Encode a response provided by the user for sending."""
+        return self.protocol.encode_dict(
+            self._user_response_dict(bound_obj, message, response, Codec.JSON)
+        )
 
+    def encode_user_response_binary(
+        self, bound_obj: Any, message: Message, response: Response | None
+    ) -> bytes:
+        """Binary-encode a response provided by the user for sending."""
+        return self.protocol.encode_dict_binary(
+            self._user_response_dict(bound_obj, message, response, Codec.BINARY)
+        )
+
+    def _user_response_dict(
+        self,
+        bound_obj: Any,
+        message: Message,
+        response: Response | None,
+        codec: Codec,
+    ) -> dict:
         assert isinstance(response, Response | None)
         # (user should never explicitly return error-responses)
         assert (
@@ -248,28 +278,90 @@ class MessageReceiver:
         else:
             out_response = response
 
-        response_dict = self.protocol.response_to_dict(out_response)
+        response_dict = self.protocol.response_to_dict(
+            out_response, codec=codec
+        )
         if self._encode_filter_call is not None:
             self._encode_filter_call(
                 bound_obj, message, out_response, response_dict
             )
-        return self.protocol.encode_dict(response_dict)
+        return response_dict
 
     def encode_error_response(
         self, bound_obj: Any, message: Message | None, exc: Exception
     ) -> tuple[str, bool]:
         """Given an error, return sysresponse str and whether to log."""
+        response_dict, dolog = self._error_response_dict(
+            bound_obj, message, exc, Codec.JSON
+        )
+        return self.protocol.encode_dict(response_dict), dolog
+
+    def encode_error_response_binary(
+        self, bound_obj: Any, message: Message | None, exc: Exception
+    ) -> tuple[bytes, bool]:
+        """Given an error, return sysresponse bytes and whether to log."""
+        response_dict, dolog = self._error_response_dict(
+            bound_obj, message, exc, Codec.BINARY
+        )
+        return self.protocol.encode_dict_binary(response_dict), dolog
+
+    def _error_response_dict(
+        self,
+        bound_obj: Any,
+        message: Message | None,
+        exc: Exception,
+        codec: Codec,
+    ) -> tuple[dict, bool]:
         response, dolog = self.protocol.error_to_response(exc)
-        response_dict = self.protocol.response_to_dict(response)
+        response_dict = self.protocol.response_to_dict(response, codec=codec)
         if self._encode_filter_call is not None:
             self._encode_filter_call(
                 bound_obj, message, response, response_dict
             )
-        return self.protocol.encode_dict(response_dict), dolog
+        return response_dict, dolog
 
+    def _encode_user_response_for(
+        self,
+        msg: str | bytes,
+        bound_obj: Any,
+        message: Message,
+        response: Response | None,
+    ) -> str | bytes:
+        """Encode a response in the same encoding as a raw message."""
+        if isinstance(msg, bytes):
+            return self.encode_user_response_binary(
+                bound_obj, message, response
+            )
+        return self.encode_user_response(bound_obj, message, response)
+
+    def _encode_error_response_for(
+        self,
+        msg: str | bytes,
+        bound_obj: Any,
+        message: Message | None,
+        exc: Exception,
+    ) -> tuple[str | bytes, bool]:
+        """Encode an error in the same encoding as a raw message."""
+        if isinstance(msg, bytes):
+            return self.encode_error_response_binary(bound_obj, message, exc)
+        return self.encode_error_response(bound_obj, message, exc)
+
+    @overload
     def handle_raw_message(
         self, bound_obj: Any, msg: str, raise_unregistered: bool = False
-    ) -> str:
+    ) -> str: ...
+
+    @overload
+    def handle_raw_message(
+        self, bound_obj: Any, msg: bytes, raise_unregistered: bool = False
+    ) -> bytes: ...
+
+    def handle_raw_message(
+        self,
+        bound_obj: Any,
+        msg: str | bytes,
+        raise_unregistered: bool = False,
+    ) -> str | bytes:
         """Decode, handle, and return an response for a message.
 
         if 'raise_unregistered' is True, will raise an
@@ -287,15 +379,17 @@ class MessageReceiver:
                 raise RuntimeError(f'Got unhandled message type: {msgtype}.')
             response = handler(bound_obj, msg_decoded)
             assert isinstance(response, Response | None)
-            return self.encode_user_response(bound_obj, msg_decoded, response)
+            return self._encode_user_response_for(
+                msg, bound_obj, msg_decoded, response
+            )
 
         except Exception as exc:
             if raise_unregistered and isinstance(
                 exc, UnregisteredMessageIDError
             ):
                 raise
-            rstr, dolog = self.encode_error_response(
-                bound_obj, msg_decoded, exc
+            rstr, dolog = self._encode_error_response_for(
+                msg, bound_obj, msg_decoded, exc
             )
             if dolog:
                 if msg_decoded is not None:
@@ -317,9 +411,22 @@ class MessageReceiver:
 
             return rstr
 
+    @overload
     def handle_raw_message_async(
         self, bound_obj: Any, msg: str, raise_unregistered: bool = False
-    ) -> Awaitable[str]:
+    ) -> Awaitable[str]: ...
+
+    @overload
+    def handle_raw_message_async(
+        self, bound_obj: Any, msg: bytes, raise_unregistered: bool = False
+    ) -> Awaitable[bytes]: ...
+
+    def handle_raw_message_async(
+        self,
+        bound_obj: Any,
+        msg: str | bytes,
+        raise_unregistered: bool = False,
+    ) -> Awaitable[str | bytes]:
         """Should be called when the receiver gets a message.
 
         The return value is the raw response to the message.
@@ -357,11 +464,13 @@ class MessageReceiver:
     async def _handle_raw_message_async_error(
         self,
         bound_obj: Any,
-        msg_raw: str,
+        msg_raw: str | bytes,
         msg_decoded: Message | None,
         exc: Exception,
-    ) -> str:
-        rstr, dolog = self.encode_error_response(bound_obj, msg_decoded, exc)
+    ) -> str | bytes:
+        rstr, dolog = self._encode_error_response_for(
+            msg_raw, bound_obj, msg_decoded, exc
+        )
         if dolog:
             if msg_decoded is not None:
                 msgtype = type(msg_decoded)
@@ -389,10 +498,10 @@ class MessageReceiver:
     async def _handle_raw_message_async(
         self,
         bound_obj: Any,
-        msg_raw: str,
+        msg_raw: str | bytes,
         msg_decoded: Message,
         handler_awaitable: Awaitable[Response | None],
-    ) -> str:
+    ) -> str | bytes:
         """Should be called when the receiver gets a message.
 
         The return value is the raw response to the message.
@@ -400,7 +509,9 @@ class MessageReceiver:
         try:
             response = await handler_awaitable
             assert isinstance(response, Response | None)
-            return self.encode_user_response(bound_obj, msg_decoded, response)
+            return self._encode_user_response_for(
+                msg_raw, bound_obj, msg_decoded, response
+            )
 
         except Exception as exc:
             return await self._handle_raw_message_async_error(
@@ -436,3 +547,49 @@ class BoundMessageReceiver:
         # available for things going wrong in the handler (which this is
         # not for).
         return self._receiver.encode_error_response(self._obj, None, exc)[0]
+
+    def encode_error_response_binary(self, exc: Exception) -> bytes:
+        """Binary version of encode_error_response()."""
+        return self._receiver.encode_error_response_binary(
+            self._obj, None, exc
+        )[0]
+
+    def handle_raw_message_bytes(
+        self, message: bytes, raise_unregistered: bool = False
+    ) -> bytes:
+        """Synchronously handle a raw incoming message in bytes form.
+
+        Accepts either binary-encoded messages or utf-8 json ones and
+        responds in kind, making it suitable for byte-oriented
+        transports such as efro.rpc. Only for sync receivers.
+        """
+        if not self.protocol.is_binary_encoded(message):
+            return self._receiver.handle_raw_message(
+                self._obj, message.decode(), raise_unregistered
+            ).encode()
+        return self._receiver.handle_raw_message(
+            self._obj, message, raise_unregistered
+        )
+
+    def handle_raw_message_bytes_async(
+        self, message: bytes, raise_unregistered: bool = False
+    ) -> Awaitable[bytes]:
+        """Asynchronously handle a raw incoming message in bytes form.
+
+        Accepts either binary-encoded messages or utf-8 json ones and
+        responds in kind, making it suitable for byte-oriented
+        transports such as efro.rpc. Only for async receivers.
+        """
+        if not self.protocol.is_binary_encoded(message):
+            return _encode_str_awaitable(
+                self._receiver.handle_raw_message_async(
+                    self._obj, message.decode(), raise_unregistered
+                )
+            )
+        return self._receiver.handle_raw_message_async(
+            self._obj, message, raise_unregistered
+        )
+
+
+async def _encode_str_awaitable(awaitable: Awaitable[str]) -> bytes:
+    return (await awaitable).encode()
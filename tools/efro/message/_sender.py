@@ -10,6 +10,7 @@ import logging
 from typing import TYPE_CHECKING
 
 from efro.error import CleanError, RemoteError, CommunicationError
+from efro.dataclassio import Codec
 from efro.message._message import EmptySysResponse, ErrorSysResponse, Response
 
 if TYPE_CHECKING:
@@ -49,6 +50,11 @@ class MessageSender:
         # 'response' is a SomeResponseType or whatever is associated with
         # SomeMessageType.
         response = obj.msg.send(SomeMessageType())
+
+    Binary send methods can also be registered (see
+    send_binary_method()) to send messages as compact binary data
+    instead of json strings; use_binary_method() can then be used to
+    decide per connection which to use.
     """
 
     def __init__(self, protocol: MessageProtocol) -> None:
@@ -63,6 +69,13 @@ class MessageSender:
         self._send_async_raw_message_ex_call: (
             Callable[[Any, str, Message], Awaitable[str]] | None
         ) = None
+        self._send_raw_message_binary_call: (
+            Callable[[Any, bytes], bytes] | None
+        ) = None
+        self._send_async_raw_message_binary_call: (
+            Callable[[Any, bytes], Awaitable[bytes]] | None
+        ) = None
+        self._use_binary_call: Callable[[Any], bool] | None = None
         self._encode_filter_call: (
             Callable[[Any, Message, dict], None] | None
         ) = None
@@ -133,6 +146,49 @@ class MessageSender:
         self._send_async_raw_message_ex_call = call
         return call
 
+    def send_binary_method(
+        self, call: Callable[[Any, bytes], bytes]
+    ) -> Callable[[Any, bytes], bytes]:
+        """Function decorator for setting raw binary send method.
+
+        Version of send_method which takes and returns binary-encoded
+        messages. When registered, it is used in place of send_method
+        whenever binary is in use (see use_binary_method()).
+        """
+        assert self._send_raw_message_binary_call is None
+        self._send_raw_message_binary_call = call
+        return call
+
+    def send_async_binary_method(
+        self, call: Callable[[Any, bytes], Awaitable[bytes]]
+    ) -> Callable[[Any, bytes], Awaitable[bytes]]:
+        """Function decorator for setting raw binary send-async method.
+
+        Version of send_async_method which takes and returns
+        binary-encoded messages. When registered, it is used in place
+        of send_async_method whenever binary is in use (see
+        use_binary_method()).
+        """
+        assert self._send_async_raw_message_binary_call is None
+        self._send_async_raw_message_binary_call = call
+        return call
+
+    def use_binary_method(
+        self, call: Callable[[Any], bool]
+    ) -> Callable[[Any], bool]:
+        """Function decorator for deciding when to send binary messages.
+
+        Called for each send when a binary send method is registered;
+        should return whether the receiver can accept binary messages
+        (generally negotiated per connection, such as via
+        efro.rpc.RPCEndpoint.peer_accepts_message_encoding()). If
+        False, the regular json send methods are used. If this is not
+        defined, registered binary send methods are always used.
+        """
+        assert self._use_binary_call is None
+        self._use_binary_call = call
+        return call
+
     def encode_filter_method(
         self, call: Callable[[Any, Message, dict], None]
     ) -> Callable[[Any, Message, dict], None]:
@@ -218,6 +274,12 @@ class MessageSender:
         for when message sending and response handling need to happen
         in different contexts/threads.
         """
+        binary_call = self._send_raw_message_binary_call
+        if binary_call is not None and self._use_binary(bound_obj):
+            return self._fetch_raw_response_binary(
+                bound_obj, message, binary_call
+            )
+
         if (
             self._send_raw_message_call is None
             and self._send_raw_message_ex_call is None
@@ -236,21 +298,42 @@ class MessageSender:
                     bound_obj, msg_encoded
                 )
         except Exception as exc:
-            response = ErrorSysResponse(
-                error_message='Error in MessageSender @send_method.',
-                error_type=(
-                    ErrorSysResponse.ErrorType.COMMUNICATION
-                    if isinstance(exc, CommunicationError)
-                    else ErrorSysResponse.ErrorType.LOCAL
-                ),
-            )
-            # Can include the actual exception since we'll be looking at
-            # this response locally; might be helpful.
-            response.set_local_exception(exc)
-            return response
+            return self._send_error_response(exc, 'send_method')
 
         return self._decode_raw_response(bound_obj, message, response_encoded)
 
+    def _fetch_raw_response_binary(
+        self,
+        bound_obj: Any,
+        message: Message,
+        call: Callable[[Any, bytes], bytes],
+    ) -> Response | SysResponse:
+        msg_encoded = self._encode_message_binary(bound_obj, message)
+        try:
+            response_encoded = call(bound_obj, msg_encoded)
+        except Exception as exc:
+            return self._send_error_response(exc, 'send_binary_method')
+        return self._decode_raw_response(bound_obj, message, response_encoded)
+
+    def _send_error_response(
+        self, exc: Exception, methodname: str
+    ) -> SysResponse:
+        response = ErrorSysResponse(
+            error_message=f'Error in MessageSender @{methodname}.',
+            error_type=(
+                ErrorSysResponse.ErrorType.COMMUNICATION
+                if isinstance(exc, CommunicationError)
+                else ErrorSysResponse.ErrorType.LOCAL
+            ),
+        )
+        # Can include the actual exception since we'll be looking at
+        # this response locally; might be helpful.
+        response.set_local_exception(exc)
+        return response
+
+    def _use_binary(self, bound_obj: Any) -> bool:
+        return self._use_binary_call is None or self._use_binary_call(bound_obj)
+
     def fetch_raw_response_async(
         self, bound_obj: Any, message: Message
     ) -> Awaitable[Response | SysResponse]:
@@ -268,6 +351,19 @@ class MessageSender:
         # happen synchronously. If the whole call were async we wouldn't be
         # able to guarantee that messages sent in order would actually go
         # out in order.
+        binary_call = self._send_async_raw_message_binary_call
+        send_awaitable: Awaitable[str] | Awaitable[bytes]
+        if binary_call is not None and self._use_binary(bound_obj):
+            try:
+                send_awaitable = binary_call(
+                    bound_obj, self._encode_message_binary(bound_obj, message)
+                )
+            except Exception as exc:
+                return self._error_awaitable(exc)
+            return self._fetch_raw_response_awaitable(
+                bound_obj, message, send_awaitable
+            )
+
         if (
             self._send_async_raw_message_call is None
             and self._send_async_raw_message_ex_call is None
@@ -294,37 +390,18 @@ class MessageSender:
         )
 
     async def _error_awaitable(self, exc: Exception) -> SysResponse:
-        response = ErrorSysResponse(
-            error_message='Error in MessageSender @send_async_method.',
-            error_type=(
-                ErrorSysResponse.ErrorType.COMMUNICATION
-                if isinstance(exc, CommunicationError)
-                else ErrorSysResponse.ErrorType.LOCAL
-            ),
-        )
-        # Can include the actual exception since we'll be looking at
-        # this response locally; might be helpful.
-        response.set_local_exception(exc)
-        return response
+        return self._send_error_response(exc, 'send_async_method')
 
     async def _fetch_raw_response_awaitable(
-        self, bound_obj: Any, message: Message, send_awaitable: Awaitable[str]
+        self,
+        bound_obj: Any,
+        message: Message,
+        send_awaitable: Awaitable[str] | Awaitable[bytes],
     ) -> Response | SysResponse:
         try:
             response_encoded = await send_awaitable
         except Exception as exc:
-            response = ErrorSysResponse(
-                error_message='Error in MessageSender @send_async_method.',
-                error_type=(
-                    ErrorSysResponse.ErrorType.COMMUNICATION
-                    if isinstance(exc, CommunicationError)
-                    else ErrorSysResponse.ErrorType.LOCAL
-                ),
-            )
-            # Can include the actual exception since we'll be looking at
-            # this response locally; might be helpful.
-            response.set_local_exception(exc)
-            return response
+            return self._send_error_response(exc, 'send_async_method')
         return self._decode_raw_response(bound_obj, message, response_encoded)
 
     def unpack_raw_response(
@@ -348,13 +425,29 @@ class MessageSender:
 
     def _encode_message(self, bound_obj: Any, message: Message) -> str:
         """Encode a message for sending."""
-        msg_dict = self.protocol.message_to_dict(message)
+        return self.protocol.encode_dict(
+            self._message_dict(bound_obj, message, Codec.JSON)
+        )
+
+    def _encode_message_binary(self, bound_obj: Any, message: Message) -> bytes:
+        """Binary-encode a message for sending."""
+        return self.protocol.encode_dict_binary(
+            self._message_dict(bound_obj, message, Codec.BINARY)
+        )
+
+    def _message_dict(
+        self, bound_obj: Any, message: Message, codec: Codec
+    ) -> dict:
+        msg_dict = self.protocol.message_to_dict(message, codec=codec)
         if self._encode_filter_call is not None:
             self._encode_filter_call(bound_obj, message, msg_dict)
-        return self.protocol.encode_dict(msg_dict)
+        return msg_dict
 
     def _decode_raw_response(
-        self, bound_obj: Any, message: Message, response_encoded: str
+        self,
+        bound_obj: Any,
+        message: Message,
+        response_encoded: str | bytes,
     ) -> Response | SysResponse:
         """Create a Response from returned data.
 
@@ -365,8 +458,16 @@ class MessageSender:
         """
         response: Response | SysResponse
         try:
-            response_dict = self.protocol.decode_dict(response_encoded)
-            response = self.protocol.response_from_dict(response_dict)
+            if isinstance(response_encoded, bytes):
+                response_dict = self.protocol.decode_dict_binary(
+                    response_encoded
+                )
+                response = self.protocol.response_from_dict(
+                    response_dict, codec=Codec.BINARY
+                )
+            else:
+                response_dict = self.protocol.decode_dict(response_encoded)
+                response = self.protocol.response_from_dict(response_dict)
             if self._decode_filter_call is not None:
                 self._decode_filter_call(
                     bound_obj, message, response_dict, response
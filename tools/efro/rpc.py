@@ -1,5 +1,6 @@
 # Released under the MIT License. See LICENSE for details.
 #
+# pylint: disable=too-many-lines
 """Remote procedure call related functionality."""
 
 from __future__ import annotations
@@ -26,7 +27,7 @@ from efro.dataclassio import (
 )
 
 if TYPE_CHECKING:
-    from typing import Literal, Awaitable, Callable
+    from typing import Literal, Awaitable, Callable, Sequence
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +59,11 @@ class _PeerInfo:
     # How often we'll be sending out keepalives (in seconds).
     keepalive_interval: Annotated[float, IOAttrs('k')]
 
+    # Message encodings we can accept beyond the default (json).
+    message_encodings: Annotated[
+        list[str], IOAttrs('e', soft_default_factory=list)
+    ]
+
 
 # Note: we are expected to be forward and backward compatible; we can
 # increment protocol freely and expect everyone else to still talk to us.
@@ -65,7 +71,9 @@ class _PeerInfo:
 # Protocol history:
 # 1 - initial release
 # 2 - gained big (32-bit len val) package/response packets
-OUR_PROTOCOL = 2
+# 3 - gained message-encodings in handshake
+# 4 - gained 32 bit message ids
+OUR_PROTOCOL = 4
 
 
 def ssl_stream_writer_underlying_transport_info(
@@ -84,26 +92,67 @@ def ssl_stream_writer_underlying_transport_info(
     return '(not found)'
 
 
-class _InFlightMessage:
-    """Represents a message that is out on the wire."""
+@dataclass
+class RPCEndpointStats:
+    """A snapshot of an RPCEndpoint's traffic and queue state."""
 
-    def __init__(self, message_id: int) -> None:
-        self._response: bytes | None = None
-        self._got_response = asyncio.Event()
-        self.wait_task = asyncio.create_task(
-            self._wait(), name=f'rpc in-flight-msg {message_id} wait'
-        )
+    #: Packets waiting to be handed to our stream writer.
+    out_queue_packets: int
+
+    #: Bytes in those packets.
+    out_queue_bytes: int
+
+    #: Largest out_queue_bytes value seen so far.
+    out_queue_peak_bytes: int
+
+    #: Once out_queue_bytes reaches this, sends wait.
+    out_queue_high_water: int
+
+    #: Waiting sends resume once out_queue_bytes falls to this.
+    out_queue_low_water: int
+
+    #: How many times a send had to wait due to backpressure.
+    backpressure_waits: int
+
+    #: How many batches of packets the writer has written.
+    write_batches: int
 
-    async def _wait(self) -> bytes:
-        await self._got_response.wait()
-        assert self._response is not None
-        return self._response
+    #: Messages we have sent which are awaiting responses.
+    in_flight_messages: int
 
-    def set_response(self, data: bytes) -> None:
-        """Set response data."""
-        assert self._response is None
-        self._response = data
-        self._got_response.set()
+    total_bytes_read: int
+    total_bytes_written: int
+
+
+class _InFlightMessages:
+    """Represents one or more messages that are out on the wire.
+
+    A single future fires once all responses have arrived, so a batch
+    of pipelined messages wakes its sender only once.
+    """
+
+    def __init__(self, messages: Sequence[bytes]) -> None:
+        self.messages = messages
+        self.message_ids: list[int] = []
+        self.future: asyncio.Future[list[bytes]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._responses: list[bytes | None] = [None] * len(messages)
+        self._remaining = len(messages)
+        if not messages:
+            self.future.set_result([])
+
+    def set_response(self, index: int, data: bytes) -> None:
+        """Set response data for one of our messages."""
+        if self.future.done():
+            return
+        assert self._responses[index] is None
+        self._responses[index] = data
+        self._remaining -= 1
+        if self._remaining == 0:
+            responses = [r for r in self._responses if r is not None]
+            assert len(responses) == len(self._responses)
+            self.future.set_result(responses)
 
 
 class _KeepaliveTimeoutError(Exception):
@@ -118,6 +167,18 @@ class RPCEndpoint:
     stream. So excessively long messages/responses will delay all other
     communication. If/when this becomes an issue we can look into breaking up
     long messages into multiple packets.
+
+    Outgoing packets are queued and written out in batches. Once the
+    queue holds out_queue_high_water bytes, senders and outgoing
+    responses wait until it drains to out_queue_low_water.
+    send_message() still enqueues immediately (to preserve send order)
+    and does its waiting afterwards; send_message_throttled() waits
+    before enqueueing.
+
+    Endpoints can advertise extra message encodings they accept (such as
+    efro.message's 'binary') via 'message_encodings'; senders can then
+    use peer_accepts_message_encoding() to pick an encoding per
+    connection.
     """
 
     # Set to True on an instance to test keepalive failures.
@@ -134,6 +195,11 @@ class RPCEndpoint:
     # disconnect.
     DEFAULT_KEEPALIVE_TIMEOUT = 30.0
 
+    # Outgoing queue sizes (in bytes) where backpressure kicks in and
+    # where it is released.
+    DEFAULT_OUT_QUEUE_HIGH_WATER = 1024 * 1024
+    DEFAULT_OUT_QUEUE_LOW_WATER = 256 * 1024
+
     def __init__(
         self,
         handle_raw_message_call: Callable[[bytes], Awaitable[bytes]],
@@ -146,6 +212,9 @@ class RPCEndpoint:
         debug_print_call: Callable[[str], None] | None = None,
         keepalive_interval: float = DEFAULT_KEEPALIVE_INTERVAL,
         keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        message_encodings: Sequence[str] = (),
+        out_queue_high_water: int = DEFAULT_OUT_QUEUE_HIGH_WATER,
+        out_queue_low_water: int = DEFAULT_OUT_QUEUE_LOW_WATER,
     ) -> None:
         self._handle_raw_message_call = handle_raw_message_call
         self._reader = reader
@@ -162,14 +231,29 @@ class RPCEndpoint:
         self._event_loop = asyncio.get_running_loop()
         self._out_packets = deque[bytes]()
         self._have_out_packets = asyncio.Event()
+        self._out_queue_bytes = 0
+        self._out_queue_peak_bytes = 0
+        self._out_queue_high_water = out_queue_high_water
+        self._out_queue_low_water = out_queue_low_water
+
+        # Set whenever senders are allowed to add to our queue.
+        self._out_queue_writable = asyncio.Event()
+        self._out_queue_writable.set()
+        self._backpressure_waits = 0
+        self._write_batches = 0
         self._run_called = False
         self._peer_info: _PeerInfo | None = None
+        self._handshake_future: asyncio.Future[None] = (
+            self._event_loop.create_future()
+        )
+        self._wide_message_ids = False
         self._keepalive_interval = keepalive_interval
         self._keepalive_timeout = keepalive_timeout
+        self._message_encodings = list(message_encodings)
         self._did_close_writer = False
         self._did_wait_closed_writer = False
-        self._did_out_packets_buildup_warning = False
         self._total_bytes_read = 0
+        self._total_bytes_written = 0
         self._create_time = time.monotonic()
 
         # Need to hold weak-refs to these otherwise it creates dep-loops
@@ -180,9 +264,18 @@ class RPCEndpoint:
         self._last_keepalive_receive_time: float | None = None
 
         # (Start near the end to make sure our looping logic is sound).
-        self._next_message_id = 65530
+        self._next_message_id = 0xFFFFFFFA
+
+        # Message ids mapped to their batch and index within it.
+        self._in_flight_messages: dict[int, tuple[_InFlightMessages, int]] = {}
 
-        self._in_flight_messages: dict[int, _InFlightMessage] = {}
+        # Messages sent before we know how to encode them for our peer.
+        self._pre_handshake_messages: list[_InFlightMessages] = []
+
+        if not 0 <= out_queue_low_water <= out_queue_high_water:
+            raise ValueError(
+                'Expected 0 <= out_queue_low_water <= out_queue_high_water.'
+            )
 
         if self.debug_print:
             peername = self._writer.get_extra_info('peername')
@@ -195,6 +288,54 @@ class RPCEndpoint:
         """How many total bytes have been read."""
         return self._total_bytes_read
 
+    @property
+    def total_bytes_written(self) -> int:
+        """How many total bytes have been handed to our stream writer."""
+        return self._total_bytes_written
+
+    def get_stats(self) -> RPCEndpointStats:
+        """Return a snapshot of our traffic and queue state."""
+        return RPCEndpointStats(
+            out_queue_packets=len(self._out_packets),
+            out_queue_bytes=self._out_queue_bytes,
+            out_queue_peak_bytes=self._out_queue_peak_bytes,
+            out_queue_high_water=self._out_queue_high_water,
+            out_queue_low_water=self._out_queue_low_water,
+            backpressure_waits=self._backpressure_waits,
+            write_batches=self._write_batches,
+            in_flight_messages=(
+                len(self._in_flight_messages)
+                + sum(len(b.messages) for b in self._pre_handshake_messages)
+            ),
+            total_bytes_read=self._total_bytes_read,
+            total_bytes_written=self._total_bytes_written,
+        )
+
+    @property
+    def peer_message_encodings(self) -> list[str] | None:
+        """Message encodings our peer says it can accept.
+
+        These are opaque names passed as 'message_encodings' when the
+        peer's endpoint was created (for example, 'binary' for the
+        efro.message binary encoding). This will be None until the
+        peer's handshake has been received.
+        """
+        if self._peer_info is None:
+            return None
+        return self._peer_info.message_encodings
+
+    def peer_accepts_message_encoding(self, encoding: str) -> bool:
+        """Return whether messages can be sent to our peer in an encoding.
+
+        Always returns False until the peer's handshake has been
+        received, so callers should fall back to the default encoding
+        in that case.
+        """
+        return (
+            self._peer_info is not None
+            and encoding in self._peer_info.message_encodings
+        )
+
     def __del__(self) -> None:
         if self._run_called:
             if not self._did_close_writer:
@@ -302,124 +443,250 @@ class RPCEndpoint:
         errors. This allows messages to be treated as 'reliable' with
         respect to a given endpoint. Pass close_on_error=False to
         override this for a particular message.
+
+        The message is always enqueued immediately, but if that leaves
+        our outgoing queue at its high water mark, the returned
+        awaitable first waits for the queue to drain so that callers
+        sending in bulk are held back. See send_message_throttled()
+        for a version that waits before enqueueing.
         """
         # Note: This call is synchronous so that the first part of it
         # (enqueueing outgoing messages) happens synchronously. If it were
         # a pure async call it could be possible for send order to vary
         # based on how the async tasks get processed.
+        batch = self._send_batch([message])
 
-        if self.debug_print_io:
-            self.debug_print_call(
-                f'{self._label}: sending message of size {len(message)}'
-                f' at {self._tm()}.'
-            )
+        # Now complete the send asynchronously.
+        return self._wait_for_single_response(
+            self._wait_for_responses(batch, timeout, close_on_error),
+            wait_for_drain=not self._out_queue_writable.is_set(),
+        )
 
-        self._check_env()
+    def send_messages(
+        self,
+        messages: Sequence[bytes],
+        timeout: float | None = None,
+        close_on_error: bool = True,
+    ) -> Awaitable[list[bytes]]:
+        """Send a batch of messages to the peer and return responses.
+
+        The messages are pipelined: they are all enqueued at once (and
+        generally go out in a single write), and the caller is woken
+        only once, when all responses have arrived. The timeout applies
+        to the batch as a whole. Otherwise this behaves like
+        send_message().
+        """
+        batch = self._send_batch(messages)
+        responses = self._wait_for_responses(batch, timeout, close_on_error)
+        if self._out_queue_writable.is_set():
+            return responses
+        return self._wait_for_drain_then(responses)
 
+    async def send_message_throttled(
+        self,
+        message: bytes,
+        timeout: float | None = None,
+        close_on_error: bool = True,
+    ) -> bytes:
+        """Send a message to the peer, respecting backpressure.
+
+        Like send_message() except that, if our outgoing queue has
+        reached its high water mark, this first waits for it to drain
+        to its low water mark. Concurrent throttled callers that have
+        to wait are not guaranteed to be sent in call order.
+        """
+        await self.wait_for_out_queue()
+        return await self.send_message(
+            message, timeout=timeout, close_on_error=close_on_error
+        )
+
+    async def wait_for_out_queue(self) -> None:
+        """Wait until our outgoing queue is accepting more data.
+
+        Returns immediately unless the queue has reached its high water
+        mark, in which case this waits until it has drained to its low
+        water mark. Raises CommunicationError if the endpoint closes.
+        """
+        self._check_env()
         if self._closing:
             raise CommunicationError('Endpoint is closed.')
+        if not self._out_queue_writable.is_set():
+            self._backpressure_waits += 1
+
+            # Others woken alongside us may fill the queue back up
+            # before we get to run, so keep waiting in that case.
+            while not self._out_queue_writable.is_set():
+                await self._out_queue_writable.wait()
+                if self._closing:
+                    raise CommunicationError('Endpoint is closed.')
+
+    async def wait_for_handshake(self) -> None:
+        """Wait until we have received our peer's handshake.
+
+        Messages can be sent before this completes (they will go out
+        once it does), but things such as peer_message_encodings are
+        not available until then. Raises CommunicationError if the
+        endpoint closes first.
+        """
+        self._check_env()
+        if self._peer_info is not None:
+            return
+        if self._closing:
+            raise CommunicationError('Endpoint closed before handshake.')
+        try:
+            # Shield so a cancelled waiter doesn't cancel it for all.
+            await asyncio.shield(self._handshake_future)
+        except asyncio.CancelledError as exc:
+            current_task = asyncio.current_task()
+            if current_task is not None and current_task.cancelling() > 0:
+                raise
+            raise CommunicationError(
+                'Endpoint closed before handshake.'
+            ) from exc
 
-        if self.debug_print_io:
-            self.debug_print_call(
-                f'{self._label}: have peerinfo? {self._peer_info is not None}.'
-            )
-
-        # message_id is a 16 bit looping value.
-        message_id = self._next_message_id
-        self._next_message_id = (self._next_message_id + 1) % 65536
+    def _send_batch(self, messages: Sequence[bytes]) -> _InFlightMessages:
+        self._check_env()
 
         if self.debug_print_io:
             self.debug_print_call(
-                f'{self._label}: will enqueue at {self._tm()}.'
+                f'{self._label}: sending {len(messages)} message(s) of'
+                f' total size {sum(len(m) for m in messages)}'
+                f' at {self._tm()}; have peerinfo?'
+                f' {self._peer_info is not None}.'
             )
 
-        # FIXME - should handle backpressure (waiting here if there are
-        # enough packets already enqueued).
+        if self._closing:
+            raise CommunicationError('Endpoint is closed.')
 
-        if len(message) > 65535:
-            # Payload consists of type (1b), message_id (2b),
-            # len (4b), and data.
-            self._enqueue_outgoing_packet(
-                _PacketType.MESSAGE_BIG.value.to_bytes(1, _BYTE_ORDER)
-                + message_id.to_bytes(2, _BYTE_ORDER)
-                + len(message).to_bytes(4, _BYTE_ORDER)
-                + message
-            )
+        batch = _InFlightMessages(messages)
+
+        # We can't encode messages until we know what our peer speaks;
+        # until then just hold on to them (in order).
+        # (They still count towards our outgoing queue size though).
+        if self._peer_info is None:
+            self._pre_handshake_messages.append(batch)
+            self._add_out_queue_bytes(sum(len(m) for m in batch.messages))
         else:
-            # Payload consists of type (1b), message_id (2b),
-            # len (2b), and data.
-            self._enqueue_outgoing_packet(
-                _PacketType.MESSAGE.value.to_bytes(1, _BYTE_ORDER)
-                + message_id.to_bytes(2, _BYTE_ORDER)
-                + len(message).to_bytes(2, _BYTE_ORDER)
-                + message
-            )
+            self._enqueue_batch(batch)
+        return batch
+
+    def _enqueue_batch(self, batch: _InFlightMessages) -> None:
+        """Assign ids to a batch's messages and enqueue their packets."""
+        assert self._peer_info is not None
+
+        if self._peer_info.protocol == 1:
+            if any(len(m) > 65535 for m in batch.messages):
+                batch.future.set_exception(
+                    RuntimeError('Message cannot be larger than 65535 bytes')
+                )
+                return
+
+        for index, message in enumerate(batch.messages):
+            try:
+                message_id = self._alloc_message_id()
+            except CommunicationError as exc:
+                self._forget_batch(batch)
+                batch.future.set_exception(exc)
+                return
+            batch.message_ids.append(message_id)
+            self._in_flight_messages[message_id] = (batch, index)
+            if len(message) > 65535:
+                # Payload consists of type (1b), message_id (2b or 4b),
+                # len (4b), and data.
+                self._enqueue_outgoing_packet(
+                    _PacketType.MESSAGE_BIG.value.to_bytes(1, _BYTE_ORDER)
+                    + self._encode_message_id(message_id)
+                    + len(message).to_bytes(4, _BYTE_ORDER)
+                    + message
+                )
+            else:
+                # Payload consists of type (1b), message_id (2b or 4b),
+                # len (2b), and data.
+                self._enqueue_outgoing_packet(
+                    _PacketType.MESSAGE.value.to_bytes(1, _BYTE_ORDER)
+                    + self._encode_message_id(message_id)
+                    + len(message).to_bytes(2, _BYTE_ORDER)
+                    + message
+                )
 
         if self.debug_print_io:
             self.debug_print_call(
-                f'{self._label}: enqueued message of size {len(message)}'
+                f'{self._label}: enqueued message(s) {batch.message_ids}'
                 f' at {self._tm()}.'
             )
 
-        # Make an entry so we know this message is out there.
-        assert message_id not in self._in_flight_messages
-        msgobj = self._in_flight_messages[message_id] = _InFlightMessage(
-            message_id
+    def _alloc_message_id(self) -> int:
+        # Older peers only understand 16 bit ids, which wrap often
+        # enough under load that we need to skip ones still in use.
+        limit = 0x100000000 if self._wide_message_ids else 0x10000
+        if len(self._in_flight_messages) >= limit:
+            raise CommunicationError('Too many messages in flight.')
+        while True:
+            message_id = self._next_message_id % limit
+            self._next_message_id = (message_id + 1) % limit
+            if message_id not in self._in_flight_messages:
+                return message_id
+
+    def _encode_message_id(self, message_id: int) -> bytes:
+        return message_id.to_bytes(
+            4 if self._wide_message_ids else 2, _BYTE_ORDER
         )
 
-        # Also add its task to our list so we properly cancel it if we
-        # die.
-        self._prune_tasks()  # Keep our list from filling with dead tasks.
-        self._tasks.append(msgobj.wait_task)
+    def _forget_batch(self, batch: _InFlightMessages) -> None:
+        """Remove all record of a batch we no longer care about."""
+        for message_id in batch.message_ids:
+            self._in_flight_messages.pop(message_id, None)
+        if batch in self._pre_handshake_messages:
+            self._pre_handshake_messages.remove(batch)
+            self._remove_out_queue_bytes(sum(len(m) for m in batch.messages))
 
-        # Note: we always want to incorporate a timeout. Individual
-        # messages may hang or error on the other end and this ensures
-        # we won't build up lots of zombie tasks waiting around for
-        # responses that will never arrive.
-        if timeout is None:
-            timeout = self.DEFAULT_MESSAGE_TIMEOUT
-        assert timeout is not None
+    async def _wait_for_single_response(
+        self, responses: Awaitable[list[bytes]], wait_for_drain: bool
+    ) -> bytes:
+        if wait_for_drain:
+            return (await self._wait_for_drain_then(responses))[0]
+        return (await responses)[0]
 
-        # Now complete the send asynchronously.
-        return self._send_message(
-            message, timeout, close_on_error, msgobj.wait_task, message_id
-        )
+    async def _wait_for_drain_then(
+        self, responses: Awaitable[list[bytes]]
+    ) -> list[bytes]:
+        """Wait for our outgoing queue to drain, then for responses.
+
+        Unlike wait_for_out_queue() this never raises; if we close in
+        the meantime, the responses will carry the error.
+        """
+        self._backpressure_waits += 1
+        while not self._out_queue_writable.is_set() and not self._closing:
+            await self._out_queue_writable.wait()
+        return await responses
 
-    async def _send_message(
+    async def _wait_for_responses(
         self,
-        message: bytes,
+        batch: _InFlightMessages,
         timeout: float | None,
         close_on_error: bool,
-        bytes_awaitable: asyncio.Task[bytes],
-        message_id: int,
-    ) -> bytes:
-        # pylint: disable=too-many-positional-arguments
-
-        # We need to know their protocol, so if we haven't gotten a
-        # handshake from them yet, just wait.
-        while self._peer_info is None:
-            if self._closing:
-                raise CommunicationError('Endpoint closed before handshake.')
-            await asyncio.sleep(0.01)
-        assert self._peer_info is not None
-
-        if self._peer_info.protocol == 1:
-            if len(message) > 65535:
-                raise RuntimeError('Message cannot be larger than 65535 bytes')
-
+    ) -> list[bytes]:
+        # Note: we always want to incorporate a timeout. Individual
+        # messages may hang or error on the other end and this ensures
+        # we won't build up lots of zombie entries waiting around for
+        # responses that will never arrive.
+        if timeout is None:
+            timeout = self.DEFAULT_MESSAGE_TIMEOUT
         try:
-            return await asyncio.wait_for(bytes_awaitable, timeout=timeout)
+            return await asyncio.wait_for(batch.future, timeout=timeout)
         except asyncio.CancelledError as exc:
-            # If the current task itself was cancelled (vs an inner task
+            # If the current task itself was cancelled (vs our batch
             # being cancelled by endpoint close()), preserve the
             # CancelledError rather than swallowing it as a
             # CommunicationError or incorrectly closing the endpoint.
             current_task = asyncio.current_task()
             if current_task is not None and current_task.cancelling() > 0:
+                self._forget_batch(batch)
                 raise
             if self.debug_print:
                 self.debug_print_call(
-                    f'{self._label}: message {message_id} was cancelled.'
+                    f'{self._label}: message(s) {batch.message_ids}'
+                    f' cancelled.'
                 )
             if close_on_error:
                 self.close()
@@ -432,15 +699,12 @@ class RPCEndpoint:
             ) or is_asyncio_streams_communication_error(exc):
                 if self.debug_print:
                     self.debug_print_call(
-                        f'{self._label}: got {type(exc)} sending message'
-                        f' {message_id}; raising CommunicationError.'
+                        f'{self._label}: got {type(exc)} sending message(s)'
+                        f' {batch.message_ids}; raising CommunicationError.'
                     )
 
-                # Stop waiting on the response.
-                bytes_awaitable.cancel()
-
-                # Remove the record of this message.
-                del self._in_flight_messages[message_id]
+                # Remove the record of these messages.
+                self._forget_batch(batch)
 
                 if close_on_error:
                     self.close()
@@ -450,8 +714,6 @@ class RPCEndpoint:
 
             # Some unexpected error; let it bubble up.
             raise
-        # finally:
-        #     print(f'DID WAIT {message_id}')
 
     def close(self) -> None:
         """I said seagulls; mmmm; stop it now."""
@@ -472,6 +734,19 @@ class RPCEndpoint:
         for task in self._get_live_tasks():
             task.cancel()
 
+        # Anyone waiting on responses or a handshake gets cancelled too.
+        for batch, _index in self._in_flight_messages.values():
+            batch.future.cancel()
+        for batch in self._pre_handshake_messages:
+            batch.future.cancel()
+        self._in_flight_messages.clear()
+        self._pre_handshake_messages.clear()
+        self._handshake_future.cancel()
+
+        # Wake anyone waiting on backpressure (they'll see we're
+        # closing and bail).
+        self._out_queue_writable.set()
+
         # Close our writer.
         assert not self._did_close_writer
         if self.debug_print:
@@ -615,12 +890,22 @@ class RPCEndpoint:
         message = await self._reader.readexactly(mlen)
         self._total_bytes_read += mlen
         self._peer_info = dataclass_from_json(_PeerInfo, message.decode())
+        self._wide_message_ids = self._peer_info.protocol >= 4
         self._last_keepalive_receive_time = time.monotonic()
         if self.debug_print:
             self.debug_print_call(
                 f'{self._label}: received handshake at {self._tm()}.'
             )
 
+        # Now that we know how to talk to our peer, send out anything
+        # that was waiting on that and let any waiters know.
+        pending = self._pre_handshake_messages
+        self._pre_handshake_messages = []
+        for batch in pending:
+            self._out_queue_bytes -= sum(len(m) for m in batch.messages)
+            self._enqueue_batch(batch)
+        self._handshake_future.set_result(None)
+
         # Now just sit and handle stuff as it comes in.
         while True:
             if self._closing:
@@ -656,7 +941,7 @@ class RPCEndpoint:
 
     async def _handle_message_packet(self, big: bool) -> None:
         assert self._peer_info is not None
-        msgid = await self._read_int_16()
+        msgid = await self._read_message_id()
         if big:
             msglen = await self._read_int_32()
         else:
@@ -686,7 +971,7 @@ class RPCEndpoint:
 
     async def _handle_response_packet(self, big: bool) -> None:
         assert self._peer_info is not None
-        msgid = await self._read_int_16()
+        msgid = await self._read_message_id()
         # Protocol 2 gained 32 bit data lengths.
         if big:
             rsplen = await self._read_int_32()
@@ -699,8 +984,8 @@ class RPCEndpoint:
             )
         rsp = await self._reader.readexactly(rsplen)
         self._total_bytes_read += rsplen
-        msgobj = self._in_flight_messages.get(msgid)
-        if msgobj is None:
+        entry = self._in_flight_messages.pop(msgid, None)
+        if entry is None:
             # It's possible for us to get a response to a message
             # that has timed out. In this case we will have no local
             # record of it.
@@ -710,7 +995,8 @@ class RPCEndpoint:
                     f' message id {msgid}; perhaps it timed out?'
                 )
         else:
-            msgobj.set_response(rsp)
+            batch, index = entry
+            batch.set_response(index, rsp)
 
     async def _run_write_task(self) -> None:
         """Write to the peer."""
@@ -722,40 +1008,36 @@ class RPCEndpoint:
             _PeerInfo(
                 protocol=OUR_PROTOCOL,
                 keepalive_interval=self._keepalive_interval,
+                message_encodings=self._message_encodings,
             )
         ).encode()
         self._writer.write(len(data).to_bytes(4, _BYTE_ORDER) + data)
 
+        self._total_bytes_written += 4 + len(data)
+
         # Now just write out-messages as they come in.
         while True:
             # Wait until some data comes in.
             await self._have_out_packets.wait()
 
+            # Grab everything that's built up and write it in one go;
+            # under load this saves a ton of per-packet overhead.
             assert self._out_packets
-            data = self._out_packets.popleft()
-
-            # Important: only clear this once all packets are sent.
-            if not self._out_packets:
-                self._have_out_packets.clear()
-
-            self._writer.write(data)
+            packets = list(self._out_packets)
+            self._out_packets.clear()
+            self._have_out_packets.clear()
+            batchsize = sum(len(p) for p in packets)
+            self._writer.writelines(packets)
+            self._write_batches += 1
+            self._total_bytes_written += batchsize
+            del packets
 
             # This should keep our writer from buffering huge amounts
-            # of outgoing data. We must remember though that we also
-            # need to prevent _out_packets from growing too large and
-            # that part's on us.
+            # of outgoing data. Until it completes we still count the
+            # batch as queued so backpressure reflects it.
             await self._writer.drain()
 
-            # For now we're not applying backpressure, but let's make
-            # noise if this gets out of hand.
-            if len(self._out_packets) > 200:
-                if not self._did_out_packets_buildup_warning:
-                    logger.warning(
-                        '_out_packets building up too'
-                        ' much on RPCEndpoint %s.',
-                        id(self),
-                    )
-                    self._did_out_packets_buildup_warning = True
+            self._remove_out_queue_bytes(batchsize)
 
     async def _run_keepalive_task(self) -> None:
         """Send periodic keepalive packets."""
@@ -851,19 +1133,26 @@ class RPCEndpoint:
             if len(response) > 65535:
                 raise RuntimeError('Response cannot be larger than 65535 bytes')
 
+        # Don't pile responses onto an already backed-up queue.
+        try:
+            await self.wait_for_out_queue()
+        except CommunicationError:
+            return
+
         # Now send back our response.
-        # Payload consists of type (1b), msgid (2b), len (2b), and data.
+        # Payload consists of type (1b), msgid (2b or 4b), len (2b or
+        # 4b), and data.
         if len(response) > 65535:
             self._enqueue_outgoing_packet(
                 _PacketType.RESPONSE_BIG.value.to_bytes(1, _BYTE_ORDER)
-                + message_id.to_bytes(2, _BYTE_ORDER)
+                + self._encode_message_id(message_id)
                 + len(response).to_bytes(4, _BYTE_ORDER)
                 + response
             )
         else:
             self._enqueue_outgoing_packet(
                 _PacketType.RESPONSE.value.to_bytes(1, _BYTE_ORDER)
-                + message_id.to_bytes(2, _BYTE_ORDER)
+                + self._encode_message_id(message_id)
                 + len(response).to_bytes(2, _BYTE_ORDER)
                 + response
             )
@@ -883,6 +1172,11 @@ class RPCEndpoint:
         self._total_bytes_read += 4
         return out
 
+    async def _read_message_id(self) -> int:
+        if self._wide_message_ids:
+            return await self._read_int_32()
+        return await self._read_int_16()
+
     @classmethod
     def _is_expected_connection_error(cls, exc: Exception) -> bool:
         """Stuff we expect to end our connection in normal circumstances."""
@@ -920,6 +1214,27 @@ class RPCEndpoint:
         self._out_packets.append(data)
         self._have_out_packets.set()
 
+        self._add_out_queue_bytes(len(data))
+
+    def _remove_out_queue_bytes(self, size: int) -> None:
+        self._out_queue_bytes -= size
+        if (
+            not self._out_queue_writable.is_set()
+            and self._out_queue_bytes <= self._out_queue_low_water
+        ):
+            self._out_queue_writable.set()
+
+    def _add_out_queue_bytes(self, size: int) -> None:
+        self._out_queue_bytes += size
+        self._out_queue_peak_bytes = max(
+            self._out_queue_peak_bytes, self._out_queue_bytes
+        )
+        if (
+            self._out_queue_bytes >= self._out_queue_high_water
+            and not self._closing
+        ):
+            self._out_queue_writable.clear()
+
     def _prune_tasks(self) -> None:
         self._tasks = self._get_live_tasks()
 
@@ -0,0 +1,336 @@
+# Released under the MIT License. See LICENSE for details.
+#
+"""Pooling of multiple rpc endpoints to a single peer."""
+
+from __future__ import annotations
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Protocol
+
+from efro.error import CommunicationError
+from efro.util import gather_strip, strip_exception_tracebacks
+
+if TYPE_CHECKING:
+    from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PoolableEndpoint(Protocol):
+    """The parts of an endpoint RPCPool needs.
+
+    Both efro.rpc.RPCEndpoint and efro.rpcws.RPCWSEndpoint provide this.
+    """
+
+    @property
+    def total_bytes_read(self) -> int:
+        """How many total bytes have been read."""
+
+    def send_message(
+        self,
+        message: bytes,
+        timeout: float | None = None,
+        close_on_error: bool = True,
+    ) -> Awaitable[bytes]:
+        """Send a message to the peer and return a response."""
+
+    async def run(self) -> None:
+        """Run the endpoint until the connection is lost or closed."""
+
+    def close(self) -> None:
+        """Begin closing the endpoint."""
+
+    def is_closing(self) -> bool:
+        """Have we begun the process of closing?"""
+
+
+@dataclass
+class RPCPoolEndpointStats:
+    """Stats for one endpoint in an RPCPool."""
+
+    #: Which of the pool's slots the endpoint occupies.
+    slot: int
+
+    #: Messages sent through the endpoint still awaiting responses.
+    in_flight_messages: int
+
+    messages_sent: int
+
+    #: Message payload bytes sent through the endpoint.
+    bytes_sent: int
+
+    #: Response payload bytes received through the endpoint.
+    bytes_received: int
+
+    #: The endpoint's own total_bytes_read (includes framing, keepalives,
+    #: and incoming messages).
+    total_bytes_read: int
+
+
+class _PooledEndpoint:
+    """An endpoint along with our bookkeeping for it."""
+
+    def __init__(self, endpoint: PoolableEndpoint, slot: int) -> None:
+        self.endpoint = endpoint
+        self.slot = slot
+        self.in_flight_messages = 0
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+
+class RPCPool:
+    """Maintains multiple endpoints to a single peer.
+
+    Messages are routed to whichever endpoint has the fewest messages
+    in flight, so a slow or very large message only holds up traffic
+    on its own endpoint. Endpoints that go down are replaced
+    automatically using the provided connect call, which should create
+    and return a new (not yet running) endpoint each time it is called.
+
+    Note that messages in flight on an endpoint when it goes down still
+    fail with CommunicationError as usual; the pool does not resend
+    them since it can't know whether that is safe.
+    """
+
+    # How long we should wait before giving up on a message by default.
+    # Note this includes any time spent waiting for an endpoint to
+    # become available.
+    DEFAULT_MESSAGE_TIMEOUT = 60.0
+
+    # How long to wait before retrying a failed connection (doubles
+    # with each consecutive failure up to the max).
+    DEFAULT_RECONNECT_DELAY = 1.0
+    DEFAULT_MAX_RECONNECT_DELAY = 30.0
+
+    def __init__(
+        self,
+        connect_call: Callable[[], Awaitable[PoolableEndpoint]],
+        size: int,
+        label: str,
+        *,
+        reconnect_delay: float = DEFAULT_RECONNECT_DELAY,
+        max_reconnect_delay: float = DEFAULT_MAX_RECONNECT_DELAY,
+        debug_print: bool = False,
+        debug_print_call: Callable[[str], None] | None = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError('Pool size must be at least 1.')
+        self._connect_call = connect_call
+        self._size = size
+        self._label = label
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self.debug_print = debug_print
+        if debug_print_call is None:
+            debug_print_call = print
+        self.debug_print_call: Callable[[str], None] = debug_print_call
+        self._closing = False
+        self._run_called = False
+        self._did_wait_closed = False
+        self._slots: list[_PooledEndpoint | None] = [None] * size
+        self._slot_tasks: list[asyncio.Task] = []
+        self._slots_changed = asyncio.Event()
+        self._replaced_endpoint_count = 0
+
+    @property
+    def endpoint_count(self) -> int:
+        """How many endpoints are currently up and usable."""
+        return sum(
+            1
+            for pooled in self._slots
+            if pooled is not None and not pooled.endpoint.is_closing()
+        )
+
+    @property
+    def replaced_endpoint_count(self) -> int:
+        """How many times an endpoint has gone down and been replaced."""
+        return self._replaced_endpoint_count
+
+    def get_stats(self) -> list[RPCPoolEndpointStats]:
+        """Return stats for each of our current endpoints."""
+        return [
+            RPCPoolEndpointStats(
+                slot=pooled.slot,
+                in_flight_messages=pooled.in_flight_messages,
+                messages_sent=pooled.messages_sent,
+                bytes_sent=pooled.bytes_sent,
+                bytes_received=pooled.bytes_received,
+                total_bytes_read=pooled.endpoint.total_bytes_read,
+            )
+            for pooled in self._slots
+            if pooled is not None
+        ]
+
+    async def run(self) -> None:
+        """Connect and maintain endpoints until the pool is closed."""
+        if self._run_called:
+            raise RuntimeError('Run can be called only once per pool.')
+        self._run_called = True
+        self._slot_tasks = [
+            asyncio.create_task(
+                self._run_slot(slot), name=f'{self._label} slot {slot}'
+            )
+            for slot in range(self._size)
+        ]
+        await gather_strip(*self._slot_tasks)
+        if self.debug_print:
+            self.debug_print_call(f'{self._label}: finished.')
+
+    async def send_message(
+        self,
+        message: bytes,
+        timeout: float | None = None,
+        close_on_error: bool = True,
+    ) -> bytes:
+        """Send a message to the peer and return a response.
+
+        Uses our least loaded endpoint, waiting for one to become
+        available if need be. Raises CommunicationError if the round
+        trip is not completed for any reason. close_on_error applies to
+        the endpoint used; the pool will replace it if it goes down.
+        """
+        if self._closing:
+            raise CommunicationError('Pool is closed.')
+        if timeout is None:
+            timeout = self.DEFAULT_MESSAGE_TIMEOUT
+
+        pooled = self._pick_endpoint()
+        if pooled is None:
+            starttime = time.monotonic()
+            try:
+                pooled = await asyncio.wait_for(
+                    self._wait_for_endpoint(), timeout=timeout
+                )
+            except asyncio.TimeoutError as exc:
+                raise CommunicationError(
+                    'Timed out waiting for an endpoint.'
+                ) from exc
+            timeout = max(0.0, timeout - (time.monotonic() - starttime))
+
+        # Note: RPCEndpoint.send_message() enqueues synchronously, so
+        # sends to a given RPCEndpoint go out in the order made here.
+        response_awaitable = pooled.endpoint.send_message(
+            message, timeout=timeout, close_on_error=close_on_error
+        )
+        pooled.in_flight_messages += 1
+        pooled.messages_sent += 1
+        pooled.bytes_sent += len(message)
+        try:
+            response = await response_awaitable
+        finally:
+            pooled.in_flight_messages -= 1
+        pooled.bytes_received += len(response)
+        return response
+
+    def close(self) -> None:
+        """Begin closing the pool and all of its endpoints."""
+        if self._closing:
+            return
+        if self.debug_print:
+            self.debug_print_call(f'{self._label}: closing...')
+        self._closing = True
+
+        # Wake anyone waiting on an endpoint so they can bail.
+        self._slots_changed.set()
+
+        # Running endpoints shut down their slots when they finish;
+        # slots still connecting or waiting to reconnect just get
+        # cancelled.
+        for slot, task in enumerate(self._slot_tasks):
+            pooled = self._slots[slot]
+            if pooled is None:
+                task.cancel()
+            else:
+                pooled.endpoint.close()
+
+    def is_closing(self) -> bool:
+        """Have we begun the process of closing?"""
+        return self._closing
+
+    async def wait_closed(self) -> None:
+        """Wait for the pool and all of its endpoints to finish closing."""
+        if self._did_wait_closed:
+            return
+        self._did_wait_closed = True
+        if not self._closing:
+            raise RuntimeError('Must be called after close()')
+        results = await gather_strip(*self._slot_tasks)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(
+                    'Got unexpected error cleaning up %s slot: %s',
+                    self._label,
+                    result,
+                )
+
+    def _pick_endpoint(self) -> _PooledEndpoint | None:
+        best: _PooledEndpoint | None = None
+        for pooled in self._slots:
+            if pooled is None or pooled.endpoint.is_closing():
+                continue
+            if best is None or (
+                pooled.in_flight_messages < best.in_flight_messages
+            ):
+                best = pooled
+        return best
+
+    async def _wait_for_endpoint(self) -> _PooledEndpoint:
+        while True:
+            if self._closing:
+                raise CommunicationError('Pool is closed.')
+            pooled = self._pick_endpoint()
+            if pooled is not None:
+                return pooled
+            self._slots_changed.clear()
+            await self._slots_changed.wait()
+
+    async def _run_slot(self, slot: int) -> None:
+        failures = 0
+        while not self._closing:
+            try:
+                endpoint = await self._connect_call()
+            except Exception as exc:
+                failures += 1
+                delay = min(
+                    self._reconnect_delay * 2 ** (failures - 1),
+                    self._max_reconnect_delay,
+                )
+                logger.info(
+                    'Error connecting %s slot %d (retrying in %.1fs): %s',
+                    self._label,
+                    slot,
+                    delay,
+                    exc,
+                )
+                strip_exception_tracebacks(exc)
+                await asyncio.sleep(delay)
+                continue
+
+            failures = 0
+            pooled = _PooledEndpoint(endpoint, slot)
+            self._slots[slot] = pooled
+            self._slots_changed.set()
+            if self.debug_print:
+                self.debug_print_call(f'{self._label}: slot {slot} connected.')
+            starttime = time.monotonic()
+            try:
+                await endpoint.run()
+            finally:
+                self._slots[slot] = None
+
+            # (close() may have been called while we were running).
+            if self.is_closing():
+                return
+            self._replaced_endpoint_count += 1
+            if self.debug_print:
+                self.debug_print_call(
+                    f'{self._label}: slot {slot} went down; replacing.'
+                )
+
+            # Avoid spinning if connections are dying right away.
+            if time.monotonic() - starttime < self._reconnect_delay:
+                await asyncio.sleep(self._reconnect_delay)
@@ -100,6 +100,8 @@ class RPCWSEndpoint:
         self._event_loop = asyncio.get_running_loop()
         self._run_called = False
         self._create_time = time.monotonic()
+        self._total_bytes_read = 0
+        self._total_bytes_written = 0
 
         self._tasks: list[asyncio.Task] = []
         self._transport_close_task: asyncio.Task | None = None
@@ -112,6 +114,16 @@ class RPCWSEndpoint:
         if self.debug_print:
             self.debug_print_call(f'{self._label}: connected at {self._tm()}.')
 
+    @property
+    def total_bytes_read(self) -> int:
+        """How many total bytes have been read (including framing)."""
+        return self._total_bytes_read
+
+    @property
+    def total_bytes_written(self) -> int:
+        """How many total bytes have been written (including framing)."""
+        return self._total_bytes_written
+
     async def run(self) -> None:
         """Run the endpoint until the connection is lost or closed."""
         if self._run_called:
@@ -206,6 +218,7 @@ class RPCWSEndpoint:
 
         try:
             await self._transport.send(frame)
+            self._total_bytes_written += len(frame)
         except Exception as exc:
             bytes_awaitable.cancel()
             del self._in_flight_messages[message_id]
@@ -319,6 +332,7 @@ class RPCWSEndpoint:
                 if self.is_closing():
                     return
                 raise CommunicationError() from exc
+            self._total_bytes_read += len(raw)
 
             if len(raw) < 3:
                 raise CommunicationError('Invalid rpcws frame.')
@@ -384,6 +398,7 @@ class RPCWSEndpoint:
         )
         try:
             await self._transport.send(frame)
+            self._total_bytes_written += len(frame)
         except Exception:
             if not self._closing:
                 logger.warning(